@@ -0,0 +1,147 @@
+"""Requests autenticados por segundo: SELECT por email vs `uid` + caché de usuarios.
+
+Se levanta una app FastAPI con un endpoint protegido de dos formas y se le
+hacen requests en proceso con `httpx.ASGITransport`, con tokens de varios
+usuarios repartidos al azar:
+
+- `email`: la dependencia previa, que decodifica el token y busca al usuario
+  con `SELECT ... WHERE email = :sub` en cada request.
+- `uid_cache`: `check_user_login` tal como está, que resuelve por `uid` desde
+  `principal_cache` y valida `ver` y la sesión contra la lista de revocados.
+
+La base es un archivo SQLite, sin round-trip de red: contra MySQL la
+diferencia por request crece con la latencia hasta el servidor.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import random
+import tempfile
+import time
+from datetime import timedelta
+from pathlib import Path
+
+from common import print_table
+
+import httpx
+from fastapi import Depends, FastAPI, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+import models  # noqa: F401  (registra todas las tablas en Base.metadata)
+from auth import auth_utils
+from auth.auth_utils import check_user_login, create_access_token, decode_token, oauth2_scheme
+from auth.principal_cache import principal_cache
+from auth.token_revocation import TokenRevocationList
+from database.database import Base, get_db
+from models.User import User, UserRole
+
+
+async def email_lookup_user(
+    token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db)
+) -> User:
+    """Forma previa: un SELECT por email en cada request."""
+    payload = decode_token(token)
+    user = await auth_utils.get_user_by_email(payload.get("sub"), db)
+    if user is None:
+        raise HTTPException(status_code=401, detail="User not found")
+    return user
+
+
+def build_app(session_factory) -> FastAPI:
+    app = FastAPI()
+
+    async def bench_db():
+        async with session_factory() as session:
+            yield session
+
+    @app.get("/email")
+    async def via_email(user: User = Depends(email_lookup_user)):
+        return {"id": user.id}
+
+    @app.get("/uid_cache")
+    async def via_cache(user: User = Depends(check_user_login)):
+        return {"id": user.id}
+
+    app.dependency_overrides[get_db] = bench_db
+    return app
+
+
+async def seed(session_factory, users: int):
+    async with session_factory() as db:
+        rows = [
+            User(
+                # SQLite sólo autoincrementa INTEGER PRIMARY KEY, no BIGINT
+                id=i + 1,
+                role=UserRole.CLIENT,
+                first_name="Bench",
+                last_name=str(i),
+                email=f"bench{i}@example.com",
+                phone=f"+5491100{i:05d}",
+                password_hash="x" * 60,
+                is_active=True,
+            )
+            for i in range(users)
+        ]
+        db.add_all(rows)
+        await db.commit()
+    return [
+        create_access_token(
+            {"sub": user.email, "uid": user.id, "ver": 0, "sid": f"sesion-{user.id}"},
+            timedelta(hours=1),
+        )
+        for user in rows
+    ]
+
+
+async def run(client: httpx.AsyncClient, path: str, tokens, requests: int, concurrency: int):
+    slots = asyncio.Semaphore(concurrency)
+
+    async def one(token: str) -> None:
+        async with slots:
+            response = await client.get(path, headers={"Authorization": f"Bearer {token}"})
+            response.raise_for_status()
+
+    picks = [random.choice(tokens) for _ in range(requests)]
+    started = time.perf_counter()
+    await asyncio.gather(*(one(token) for token in picks))
+    return requests / (time.perf_counter() - started)
+
+
+async def main(args) -> None:
+    random.seed(args.seed)
+    with tempfile.TemporaryDirectory() as workdir:
+        engine = create_async_engine(f"sqlite+aiosqlite:///{Path(workdir) / 'bench.db'}")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        session_factory = async_sessionmaker(engine, expire_on_commit=False)
+        tokens = await seed(session_factory, args.users)
+        auth_utils.token_revocation_list = TokenRevocationList(session_factory)
+
+        transport = httpx.ASGITransport(app=build_app(session_factory))
+        rows = []
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            for concurrency in args.concurrency:
+                principal_cache.clear()
+                # Calienta la caché y la lista de revocados como en régimen estable
+                await run(client, "/uid_cache", tokens, args.users, concurrency)
+                before = await run(client, "/email", tokens, args.requests, concurrency)
+                after = await run(client, "/uid_cache", tokens, args.requests, concurrency)
+                rows.append((concurrency, before, after, f"{after / before:.2f}x"))
+        await engine.dispose()
+
+    print(
+        f"{args.requests} requests por escenario, {args.users} usuarios, "
+        f"caché: {principal_cache.metrics()}"
+    )
+    print_table(("concurrencia", "email_req_s", "uid_cache_req_s", "mejora"), rows)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--requests", type=int, default=3000)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 10, 50])
+    parser.add_argument("--seed", type=int, default=7)
+    asyncio.run(main(parser.parse_args()))
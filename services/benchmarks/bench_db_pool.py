@@ -0,0 +1,149 @@
+"""Carga sobre el pool de conexiones: políticas de pre-ping y drivers de MySQL.
+
+Cada escenario crea el engine con `create_pooled_engine`, igual que la API, y
+lanza `--requests` consultas cortas con `--concurrency` a la vez (checkout,
+`SELECT 1`, devolución al pool). Informa throughput, latencia por request,
+cuántos pings hizo el dialecto (de cualquier política) y la espera máxima por
+una conexión libre según `pool_metrics`.
+
+Sin `--mysql` se mide contra un archivo SQLite (aiosqlite), que sirve para
+comparar las políticas de pre-ping pero no los drivers. Con `--mysql` se usa
+el servidor de `DB_HOST`/`DB_PORT` con aiomysql y asyncmy; los drivers que no
+estén instalados se informan y se saltean.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import importlib.util
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from typing import List, Tuple
+
+from common import print_table
+
+from sqlalchemy import text
+
+import settings
+from database.database import create_pooled_engine
+from database.pool import PRE_PING_POLICIES, pool_metrics
+
+MYSQL_DRIVERS = ("aiomysql", "asyncmy")
+
+
+def mysql_url(driver: str) -> str:
+    return (
+        f"mysql+{driver}://{settings.DB_USER}:{settings.DB_PASSWORD}"
+        f"@{settings.DB_HOST}:{settings.DB_PORT}/{settings.DB_NAME}?charset=utf8mb4"
+    )
+
+
+async def run_load(url: str, name: str, policy: str, requests: int, concurrency: int):
+    # create_pooled_engine lee la política de settings al crear el engine
+    settings.DB_POOL_PRE_PING = policy
+    engine = create_pooled_engine(url, name)
+    dialect = engine.sync_engine.dialect
+    do_ping = dialect.do_ping
+    pings = 0
+
+    def counting_ping(dbapi_connection):
+        nonlocal pings
+        pings += 1
+        return do_ping(dbapi_connection)
+
+    # Lo usan tanto `pool_pre_ping` ("always") como `install_idle_ping`
+    dialect.do_ping = counting_ping
+    slots = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+
+    async def one_request() -> None:
+        async with slots:
+            started = time.perf_counter()
+            async with engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+            latencies.append(time.perf_counter() - started)
+
+    try:
+        # Abre las conexiones antes de medir: sólo interesa el régimen estable
+        await asyncio.gather(*(one_request() for _ in range(concurrency)))
+        latencies.clear()
+        pings = 0
+
+        started = time.perf_counter()
+        await asyncio.gather(*(one_request() for _ in range(requests)))
+        elapsed = time.perf_counter() - started
+        after = pool_metrics(engine)
+    finally:
+        await engine.dispose()
+
+    latencies.sort()
+    return (
+        requests / elapsed,
+        statistics.median(latencies) * 1000,
+        latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000,
+        pings,
+        after["max_wait_seconds"] * 1000,
+    )
+
+
+def targets(args, workdir: Path) -> List[Tuple[str, str]]:
+    if not args.mysql:
+        return [("aiosqlite", f"sqlite+aiosqlite:///{workdir / 'bench.db'}")]
+    found = []
+    for driver in MYSQL_DRIVERS:
+        if importlib.util.find_spec(driver) is None:
+            print(f"Driver {driver} no instalado: se saltea")
+            continue
+        found.append((driver, mysql_url(driver)))
+    return found
+
+
+async def main(args) -> None:
+    settings.DB_POOL_SIZE = args.pool_size
+    settings.DB_MAX_OVERFLOW = args.max_overflow
+
+    rows = []
+    with tempfile.TemporaryDirectory() as workdir:
+        for driver, url in targets(args, Path(workdir)):
+            for policy in args.policies:
+                for concurrency in args.concurrency:
+                    name = f"bench_{driver}_{policy}_{concurrency}"
+                    rows.append(
+                        (driver, policy, concurrency)
+                        + await run_load(url, name, policy, args.requests, concurrency)
+                    )
+
+    print(
+        f"{args.requests} requests por escenario, pool_size={args.pool_size}, "
+        f"max_overflow={args.max_overflow}, "
+        f"pre-ping idle tras {settings.DB_POOL_PRE_PING_IDLE_SECONDS:.0f}s"
+    )
+    print_table(
+        (
+            "driver",
+            "pre_ping",
+            "concurrencia",
+            "req_s",
+            "p50_ms",
+            "p99_ms",
+            "pings",
+            "max_espera_ms",
+        ),
+        rows,
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--mysql", action="store_true", help="Usar MySQL de settings")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 10, 50])
+    parser.add_argument(
+        "--policies", nargs="+", choices=PRE_PING_POLICIES, default=list(PRE_PING_POLICIES)
+    )
+    parser.add_argument("--pool-size", type=int, default=settings.DB_POOL_SIZE)
+    parser.add_argument("--max-overflow", type=int, default=settings.DB_MAX_OVERFLOW)
+    asyncio.run(main(parser.parse_args()))
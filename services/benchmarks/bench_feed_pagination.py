@@ -0,0 +1,131 @@
+"""Feed del prestador: página por OFFSET vs página por keyset (cursor).
+
+Siembra `provider_request_matches` para un prestador y mide cuánto tarda en
+salir una página a distintas profundidades con cada estrategia, usando el
+mismo índice `ix_provider_request_matches_feed_geo` y `keyset_after` que el
+feed. Por defecto usa SQLite en memoria; con `--url` se puede apuntar a un
+MySQL de pruebas vacío (la tabla se crea y se borra).
+
+Las sentencias se arman antes de medir: armar la condición keyset con
+SQLAlchemy cuesta alrededor de 1 ms por request y no depende de la
+profundidad, así que queda fuera de la comparación.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import random
+
+from common import measure, print_table
+
+from sqlalchemy import delete, insert, select
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from models.ProviderRequestMatch import ProviderRequestMatch
+from utils.pagination import keyset_after
+
+PROVIDER_ID = 1
+RANK_COLUMNS = (
+    ProviderRequestMatch.segment,
+    ProviderRequestMatch.type_rank,
+    ProviderRequestMatch.score_rank,
+    ProviderRequestMatch.distance_rank,
+    ProviderRequestMatch.created_rank,
+    ProviderRequestMatch.request_id,
+)
+
+
+def feed_query():
+    return (
+        select(*RANK_COLUMNS)
+        .where(ProviderRequestMatch.provider_profile_id == PROVIDER_ID)
+        .order_by(*RANK_COLUMNS)
+    )
+
+
+async def seed(conn, rows: int) -> None:
+    rng = random.Random(42)
+    batch = []
+    for request_id in range(1, rows + 1):
+        batch.append(
+            {
+                "provider_profile_id": PROVIDER_ID,
+                "request_id": request_id,
+                "segment": 0 if request_id % 50 == 0 else 1,
+                "type_rank": rng.randint(0, 1),
+                "score_rank": rng.randint(0, 10_000),
+                "distance_rank": rng.randint(0, 30_000),
+                "created_rank": 1_790_000_000 + rng.randint(0, 10_000_000),
+            }
+        )
+        if len(batch) == 5000:
+            await conn.execute(insert(ProviderRequestMatch), batch)
+            batch = []
+    if batch:
+        await conn.execute(insert(ProviderRequestMatch), batch)
+
+
+async def main(args) -> None:
+    engine = create_async_engine(args.url)
+    table = ProviderRequestMatch.__table__
+    async with engine.begin() as conn:
+        # Sólo esta tabla: las claves foráneas no se usan en la medición
+        await conn.run_sync(lambda sync_conn: table.drop(sync_conn, checkfirst=True))
+        await conn.run_sync(lambda sync_conn: table.create(sync_conn))
+        await seed(conn, args.rows)
+
+    rows = []
+    async with engine.connect() as conn:
+        for depth in args.depths:
+            if depth >= args.rows:
+                continue
+            # Claves de la fila anterior a la página, como las traería el cursor
+            last = (
+                await conn.execute(feed_query().offset(depth - 1).limit(1))
+            ).first() if depth else None
+
+            offset_stmt = feed_query().offset(depth).limit(args.page_size + 1)
+            keyset_stmt = feed_query().limit(args.page_size + 1)
+            if last is not None:
+                keyset_stmt = keyset_stmt.where(
+                    keyset_after(
+                        [
+                            (column, True, value)
+                            for column, value in zip(RANK_COLUMNS, last)
+                        ]
+                    )
+                )
+
+            async def by_offset():
+                return (await conn.execute(offset_stmt)).all()
+
+            async def by_keyset():
+                return (await conn.execute(keyset_stmt)).all()
+
+            assert await by_offset() == await by_keyset()
+            offset_s = await measure(by_offset, args.repeat)
+            keyset_s = await measure(by_keyset, args.repeat)
+            rows.append(
+                (depth, offset_s * 1000, keyset_s * 1000, f"{offset_s / keyset_s:.1f}x")
+            )
+
+    async with engine.begin() as conn:
+        await conn.execute(delete(ProviderRequestMatch))
+        await conn.run_sync(lambda sync_conn: table.drop(sync_conn))
+    await engine.dispose()
+
+    print(f"{args.rows} filas en el feed, páginas de {args.page_size}, {args.url}")
+    print_table(("profundidad", "offset_ms", "keyset_ms", "mejora"), rows)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--url", default="sqlite+aiosqlite://")
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--page-size", type=int, default=20)
+    parser.add_argument(
+        "--depths", type=int, nargs="+", default=[0, 1_000, 10_000, 50_000, 99_000]
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    asyncio.run(main(parser.parse_args()))
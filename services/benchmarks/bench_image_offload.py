@@ -0,0 +1,142 @@
+"""Optimización de imágenes: Pillow dentro del event loop vs `BoundedExecutor`.
+
+Se lanzan varias optimizaciones concurrentes de una foto grande, como las que
+hace `S3Service.store_variants`. Mientras tanto, una corrutina se despierta
+cada `--tick-ms` y registra cuánto tarda el loop en atenderla: es la demora
+que vería cualquier otro request del worker. También se cuenta cuántas
+optimizaciones rechaza el pool con `PoolSaturated` (un 503 en la API).
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import time
+from io import BytesIO
+from typing import List
+
+from common import print_table
+
+from PIL import Image
+
+import settings
+from services.image_processing import render_variants
+from services.offload import BoundedExecutor, PoolSaturated
+
+VARIANTS = [
+    ("thumb", settings.IMAGE_THUMB_WIDTH),
+    ("card", settings.IMAGE_CARD_WIDTH),
+    ("full", 1200),
+]
+FORMATS = [("webp", {"quality": settings.IMAGE_WEBP_QUALITY, "method": 4})]
+
+
+def make_photo(width: int, height: int) -> bytes:
+    """JPEG con ruido: no se comprime trivialmente, como una foto real."""
+    noise = Image.effect_noise((width, height), 64).convert("RGB")
+    output = BytesIO()
+    noise.save(output, format="JPEG", quality=90)
+    return output.getvalue()
+
+
+async def watch_loop(stop: asyncio.Event, tick: float, delays: List[float]) -> None:
+    """Registra el atraso con que el loop despierta a un `sleep(tick)`."""
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        started = loop.time()
+        await asyncio.sleep(tick)
+        delays.append(loop.time() - started - tick)
+
+
+async def run_scenario(uploads: int, photo: bytes, tick: float, optimize):
+    stop = asyncio.Event()
+    delays: List[float] = []
+    watcher = asyncio.create_task(watch_loop(stop, tick, delays))
+    await asyncio.sleep(tick)
+
+    started = time.perf_counter()
+    results = await asyncio.gather(
+        *(optimize(photo) for _ in range(uploads)), return_exceptions=True
+    )
+    elapsed = time.perf_counter() - started
+
+    stop.set()
+    await watcher
+    for result in results:
+        if isinstance(result, Exception) and not isinstance(result, PoolSaturated):
+            raise result
+    rejected = sum(isinstance(result, PoolSaturated) for result in results)
+    delays.sort()
+    p99 = delays[min(len(delays) - 1, int(len(delays) * 0.99))]
+    return (
+        uploads - rejected,
+        rejected,
+        elapsed,
+        max(delays) * 1000,
+        p99 * 1000,
+        statistics.median(delays) * 1000,
+    )
+
+
+async def main(args) -> None:
+    photo = make_photo(args.width, args.height)
+    tick = args.tick_ms / 1000
+
+    async def inline(data: bytes):
+        # Forma previa: Pillow corre en la corrutina del request
+        return render_variants(data, VARIANTS, FORMATS)
+
+    pool = BoundedExecutor(
+        "bench-image",
+        workers=args.workers,
+        max_pending=args.max_pending,
+        processes=True,
+    )
+
+    async def offloaded(data: bytes):
+        return await pool.run(render_variants, data, VARIANTS, FORMATS)
+
+    # El primer uso levanta los procesos (spawn): queda fuera de la medición
+    await offloaded(photo)
+
+    rows = []
+    try:
+        for uploads in args.uploads:
+            for name, optimize in (("inline", inline), ("executor", offloaded)):
+                rows.append(
+                    (name, uploads)
+                    + await run_scenario(uploads, photo, tick, optimize)
+                )
+    finally:
+        pool.shutdown()
+
+    print(
+        f"Foto {args.width}x{args.height} ({len(photo) / 1024:.0f} KiB), "
+        f"pool de {args.workers} procesos con max_pending={pool.max_pending}, "
+        f"tick {args.tick_ms:.0f} ms"
+    )
+    print_table(
+        (
+            "modo",
+            "subidas",
+            "aceptadas",
+            "rechazadas",
+            "total_s",
+            "max_atraso_ms",
+            "p99_atraso_ms",
+            "mediana_atraso_ms",
+        ),
+        rows,
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--uploads", type=int, nargs="+", default=[1, 4, 8, 24])
+    parser.add_argument("--width", type=int, default=4000)
+    parser.add_argument("--height", type=int, default=3000)
+    parser.add_argument("--workers", type=int, default=settings.IMAGE_PROCESS_WORKERS)
+    parser.add_argument("--max-pending", type=int, default=settings.IMAGE_MAX_PENDING)
+    parser.add_argument("--tick-ms", type=float, default=5.0)
+    asyncio.run(main(parser.parse_args()))
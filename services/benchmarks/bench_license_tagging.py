@@ -0,0 +1,84 @@
+"""Tagging de licencias: llamadas al LLM en serie vs concurrentes por lote.
+
+El LLM y la escritura de vínculos se simulan con demoras fijas, así que lo que
+se mide es el costo de la orquestación de `generate_tags_for_licenses` frente
+al recorrido anterior (una licencia a la vez: LLM y luego escritura).
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+from types import SimpleNamespace
+
+from common import measure, print_table
+
+from controllers.tags_controllers import TagsController
+from settings import LICENSE_TAGGING_CONCURRENCY
+
+LLM_RESPONSE = '[{"profesion": "Gasista", "descripcion": "Instalaciones de gas", "confianza": 0.9}]'
+
+
+def make_fakes(llm_latency: float, write_latency: float):
+    async def raw_tag_generator(prompt, existing_tags):
+        await asyncio.sleep(llm_latency)
+        return LLM_RESPONSE
+
+    async def bulk_attach(db, link_model, parent_column, items):
+        await asyncio.sleep(write_latency)
+
+    return raw_tag_generator, bulk_attach
+
+
+async def serial_version(licenses, raw_tag_generator, bulk_attach):
+    """Forma previa: cada licencia se envía al LLM y se escribe por turno."""
+    existing_tags = ["gasista", "plomero"]
+    for license_model in licenses:
+        prompt = TagsController._compose_prompt(license_model)
+        raw_response = await raw_tag_generator(prompt, existing_tags)
+        entries = TagsController._parse_llm_response(raw_response)
+        await bulk_attach(None, None, "license_id", [(license_model, entries)])
+
+
+async def main(args) -> None:
+    raw_tag_generator, bulk_attach = make_fakes(args.llm_latency, args.write_latency)
+
+    async def existing_tag_names(db):
+        return ["gasista", "plomero"]
+
+    TagsController._get_all_tag_names = staticmethod(existing_tag_names)
+    TagsController._bulk_attach = staticmethod(bulk_attach)
+
+    rows = []
+    for size in args.sizes:
+        licenses = [
+            SimpleNamespace(id=i, title=f"Matrícula {i}", issued_by="ENARGAS")
+            for i in range(size)
+        ]
+        serial = await measure(
+            lambda: serial_version(licenses, raw_tag_generator, bulk_attach),
+            args.repeat,
+        )
+        batched = await measure(
+            lambda: TagsController.generate_tags_for_licenses(
+                None, licenses, raw_tag_generator
+            ),
+            args.repeat,
+        )
+        rows.append((size, serial, batched, f"{serial / batched:.1f}x"))
+
+    print(
+        f"LLM simulado {args.llm_latency * 1000:.0f} ms, "
+        f"escritura {args.write_latency * 1000:.0f} ms, "
+        f"LICENSE_TAGGING_CONCURRENCY={LICENSE_TAGGING_CONCURRENCY}"
+    )
+    print_table(("licencias", "serie_s", "lote_s", "mejora"), rows)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    parser.add_argument("--llm-latency", type=float, default=0.2)
+    parser.add_argument("--write-latency", type=float, default=0.01)
+    parser.add_argument("--repeat", type=int, default=3)
+    asyncio.run(main(parser.parse_args()))
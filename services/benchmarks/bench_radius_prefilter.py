@@ -0,0 +1,173 @@
+"""Feed por radio: `refresh_provider` con y sin el prefiltro por bounding box.
+
+Siembra solicitudes etiquetadas repartidas por Argentina y un prestador en
+Córdoba, y mide `match_index.refresh_provider` tal como corre en producción
+contra la versión sin prefiltro (bounding box que cubre el planeta, o sea
+haversine sobre todas las solicitudes). La escritura del índice se reemplaza
+por una captura de filas porque usa `INSERT ... ON DUPLICATE KEY UPDATE`.
+
+Una parte de las solicitudes no tiene coordenadas y llega por la rama con
+`IS NULL` del `UNION ALL`. SQLite no reproduce el plan de MySQL: ahí hay que
+confirmar con `EXPLAIN` que la rama por rango usa `ix_service_requests_point`.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import random
+from datetime import datetime
+
+from common import measure, print_table
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+import models  # noqa: F401  (registra todas las tablas)
+import settings
+from database.database import Base
+from models.Address import Address
+from models.ProviderProfile import ProviderLicense, ProviderProfile
+from models.ServiceRequest import ServiceRequest, ServiceRequestStatus, ServiceRequestType
+from models.Tag import ProviderLicenseTag, ServiceRequestTag, Tag
+from models.User import User, UserRole
+from services import match_index as match_index_module
+
+CORDOBA = (-31.4201, -64.1888)
+
+
+async def seed(conn, requests: int, nearby_share: float, unlocated_share: float) -> None:
+    rng = random.Random(7)
+    now = datetime(2026, 10, 1)
+    await conn.execute(
+        insert(User),
+        [
+            {
+                "id": user_id,
+                "role": role,
+                "first_name": "Bench",
+                "last_name": str(user_id),
+                "email": f"bench{user_id}@example.com",
+                "phone": f"+5400000{user_id}",
+                "password_hash": "x" * 60,
+                "is_active": True,
+            }
+            for user_id, role in ((1, UserRole.CLIENT), (2, UserRole.PROVIDER))
+        ],
+    )
+    await conn.execute(
+        insert(Address),
+        {
+            "id": 1,
+            "user_id": 2,
+            "title": "Casa",
+            "street": "San Martín 100",
+            "city": "Córdoba",
+            "state": "Córdoba",
+            "is_default": True,
+            "is_active": True,
+            "latitude": CORDOBA[0],
+            "longitude": CORDOBA[1],
+        },
+    )
+    await conn.execute(insert(ProviderProfile), {"id": 1, "user_id": 2})
+    await conn.execute(
+        insert(ProviderLicense), {"id": 1, "provider_profile_id": 1, "title": "Gasista"}
+    )
+    await conn.execute(
+        insert(Tag), {"id": 1, "slug": "gasista", "name": "GASISTA", "created_at": now}
+    )
+    await conn.execute(
+        insert(ProviderLicenseTag),
+        {"id": 1, "license_id": 1, "tag_id": 1, "confidence": 0.9, "created_at": now},
+    )
+
+    request_rows, tag_rows = [], []
+    for request_id in range(1, requests + 1):
+        draw = rng.random()
+        if draw < unlocated_share:
+            # Sin coordenadas: van por la consulta aparte con IS NULL
+            lat = lon = None
+        elif draw < unlocated_share + nearby_share:
+            lat = CORDOBA[0] + rng.uniform(-0.5, 0.5)
+            lon = CORDOBA[1] + rng.uniform(-0.5, 0.5)
+        else:
+            lat, lon = rng.uniform(-55, -22), rng.uniform(-73, -53)
+        request_rows.append(
+            {
+                "id": request_id,
+                "client_id": 1,
+                "description": "Revisión de la instalación de gas",
+                "request_type": ServiceRequestType.FAST,
+                "status": ServiceRequestStatus.PUBLISHED,
+                "city_snapshot": "Otra",
+                "lat_snapshot": None if lat is None else round(lat, 6),
+                "lon_snapshot": None if lon is None else round(lon, 6),
+                "created_at": now,
+            }
+        )
+        tag_rows.append(
+            {
+                "id": request_id,
+                "request_id": request_id,
+                "tag_id": 1,
+                "confidence": 0.8,
+                "created_at": now,
+            }
+        )
+        if len(request_rows) == 5000:
+            await conn.execute(insert(ServiceRequest), request_rows)
+            await conn.execute(insert(ServiceRequestTag), tag_rows)
+            request_rows, tag_rows = [], []
+    if request_rows:
+        await conn.execute(insert(ServiceRequest), request_rows)
+        await conn.execute(insert(ServiceRequestTag), tag_rows)
+
+
+async def main(args) -> None:
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await seed(conn, args.requests, args.nearby_share, args.unlocated_share)
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+
+    captured = {}
+
+    async def capture_rows(db, rows):
+        captured["rows"] = rows
+
+    match_index_module._insert_rows = capture_rows
+    real_bounding_box = match_index_module.bounding_box
+
+    def whole_world(lat, lon, radius_km):
+        return -90.0, 90.0, -180.0, 180.0
+
+    async def refresh():
+        async with session_factory() as db:
+            await match_index_module.match_index.refresh_provider(db, 1)
+            await db.rollback()
+
+    results = []
+    variants = (("bounding box", real_bounding_box), ("sólo haversine", whole_world))
+    for label, box in variants:
+        match_index_module.bounding_box = box
+        elapsed = await measure(refresh, args.repeat)
+        results.append((label, elapsed * 1000, len(captured["rows"])))
+    match_index_module.bounding_box = real_bounding_box
+    await engine.dispose()
+
+    assert results[0][2] == results[1][2], "las dos variantes deben dar el mismo feed"
+    print(
+        f"{args.requests} solicitudes etiquetadas, radio {settings.MATCH_RADIUS_KM} km, "
+        f"prestador en Córdoba"
+    )
+    print_table(("variante", "refresh_ms", "coincidencias"), results)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=100_000)
+    parser.add_argument("--nearby-share", type=float, default=0.0005)
+    parser.add_argument("--unlocated-share", type=float, default=0.01)
+    parser.add_argument("--repeat", type=int, default=3)
+    asyncio.run(main(parser.parse_args()))
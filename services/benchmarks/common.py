@@ -0,0 +1,48 @@
+"""Utilidades compartidas por los benchmarks.
+
+Los benchmarks se ejecutan desde `services/`, por ejemplo:
+
+    uv run python benchmarks/bench_license_tagging.py
+
+Importar este módulo agrega `src` al path y define las variables obligatorias
+de configuración, igual que `tests/conftest.py`, para que no hagan falta MinIO,
+OpenAI ni MySQL.
+"""
+
+from __future__ import annotations
+
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Awaitable, Callable, List, Sequence
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+os.environ.setdefault("S3_ENDPOINT", "http://127.0.0.1:1")
+os.environ.setdefault("S3_BUCKET_NAME", "fastservices")
+os.environ.setdefault("S3_ACCESS_KEY", "bench")
+os.environ.setdefault("S3_SECRET_KEY", "bench")
+os.environ.setdefault("OPENAI_API_KEY", "bench")
+
+
+async def measure(fn: Callable[[], Awaitable[object]], repeat: int = 3) -> float:
+    """Mediana en segundos de `repeat` ejecuciones de `fn`."""
+    samples: List[float] = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        await fn()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples)
+
+
+def print_table(headers: Sequence[str], rows: Sequence[Sequence[object]]) -> None:
+    cells = [[str(h) for h in headers]] + [
+        [f"{v:.4f}" if isinstance(v, float) else str(v) for v in row] for row in rows
+    ]
+    widths = [max(len(row[i]) for row in cells) for i in range(len(headers))]
+    for index, row in enumerate(cells):
+        print("  ".join(value.rjust(width) for value, width in zip(row, widths)))
+        if index == 0:
+            print("  ".join("-" * width for width in widths))
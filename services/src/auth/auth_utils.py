@@ -1,3 +1,5 @@
+import logging
+import uuid
 from datetime import datetime, timedelta
 from typing import Union
 from jose import jwt, JWTError
@@ -5,31 +7,31 @@ from fastapi import HTTPException, Depends
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from settings import JWT_SECRET_KEY, JWT_ALGORITHM
-from models.User import User
+from models.User import User, UserRole
 from database.database import get_db
+from auth.password_hasher import password_hasher
+from auth.principal_cache import principal_cache
+from auth.token_revocation import token_revocation_list
 from fastapi.security import OAuth2PasswordBearer
-import bcrypt
+
+logger = logging.getLogger(__name__)
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
 
 
-def is_password_valid(plain_password: str, hashed_password: str) -> bool:
+async def is_password_valid(plain_password: str, hashed_password: str) -> bool:
     """Verifica si la contraseña en texto plano coincide con la hasheada."""
-    return bcrypt.checkpw(
-        plain_password.encode("utf-8"), hashed_password.encode("utf-8")
-    )
+    return await password_hasher.verify(plain_password, hashed_password)
 
 
-def get_password_hash(password: str) -> str:
+async def get_password_hash(password: str) -> str:
     """Retorna el hash de una contraseña."""
-    salt = bcrypt.gensalt()
-    hashed = bcrypt.hashpw(password.encode("utf-8"), salt)
-    return hashed.decode("utf-8")
+    return await password_hasher.hash(password)
 
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Alias para compatibilidad - verifica contraseña."""
-    return is_password_valid(plain_password, hashed_password)
+    return await is_password_valid(plain_password, hashed_password)
 
 
 async def get_user_by_email(email: str, db: AsyncSession) -> Union[User, None]:
@@ -38,13 +40,31 @@ async def get_user_by_email(email: str, db: AsyncSession) -> Union[User, None]:
     return result.scalar_one_or_none()
 
 
+async def get_user_by_id(user_id: int, db: AsyncSession) -> Union[User, None]:
+    """Obtiene un usuario activo de la base de datos por id."""
+    result = await db.execute(select(User).where(User.id == user_id, User.is_active))
+    return result.scalar_one_or_none()
+
+
 async def authenticate_user(
     email: str, password: str, db: AsyncSession
 ) -> Union[User, None]:
-    """Autentica un usuario verificando email y password."""
+    """Autentica un usuario verificando email y password.
+
+    Si el hash se generó con otro costo de bcrypt se regenera con el actual;
+    un fallo al guardarlo no impide el login.
+    """
     user = await get_user_by_email(email, db)
-    if not user or not is_password_valid(password, user.password_hash):
+    if not user or not await is_password_valid(password, user.password_hash):
         return None
+
+    if password_hasher.needs_rehash(user.password_hash):
+        try:
+            user.password_hash = await password_hasher.hash(password)
+            await db.commit()
+        except Exception:
+            await db.rollback()
+            logger.exception("No se pudo regenerar el hash de contraseña de %s", user.id)
     return user
 
 
@@ -58,6 +78,13 @@ def create_access_token(
     return jwt.encode(to_encode, JWT_SECRET_KEY, algorithm=JWT_ALGORITHM)
 
 
+def create_refresh_token(data: dict, expires_delta: timedelta) -> str:
+    """Crea un refresh token JWT con un `jti` propio para poder rotarlo."""
+    return create_access_token(
+        {**data, "typ": "refresh", "jti": str(uuid.uuid4())}, expires_delta
+    )
+
+
 def decode_token(token: str) -> dict:
     """Decodifica un token JWT y retorna los datos."""
     try:
@@ -73,20 +100,51 @@ def decode_token(token: str) -> dict:
 async def get_authenticated_user(
     token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db)
 ) -> User:
-    """Obtiene el usuario desde el token JWT."""
+    """Obtiene el usuario desde el token JWT.
+
+    Se resuelve por el `uid` del token usando la caché de usuarios, así la
+    mayoría de los requests no consultan la base. El token deja de valer si
+    su `ver` no coincide con el `token_version` actual del usuario o si su
+    sesión (`sid`) está en la lista de revocados.
+    """
     payload = decode_token(token)
     email: str = payload.get("sub")
-    if email is None:
+    if email is None or payload.get("typ") == "refresh":
         raise HTTPException(
             status_code=401,
             detail="Could not validate credentials",
         )
-    user = await get_user_by_email(email, db)
+    # Sesión cerrada con logout o por reuso de un refresh token
+    session_id = payload.get("sid")
+    if session_id and await token_revocation_list.is_revoked(db, session_id):
+        raise HTTPException(
+            status_code=401,
+            detail="Token has been revoked",
+        )
+
+    uid = payload.get("uid")
+    if uid is None:
+        user = await get_user_by_email(email, db)
+    else:
+        user = principal_cache.get(uid)
+        if user is None:
+            user = await get_user_by_id(uid, db)
+            if user is not None:
+                principal_cache.put(user)
+        else:
+            user = await db.merge(user, load=False)
+
     if user is None:
         raise HTTPException(
             status_code=401,
             detail="User not found",
         )
+    # Los tokens emitidos antes de versionarlos no traen `ver`
+    if user.token_version != payload.get("ver", 0):
+        raise HTTPException(
+            status_code=401,
+            detail="Token has been revoked",
+        )
     return user
 
 
@@ -102,4 +160,14 @@ async def check_user_login(
     return current_user
 
 
+async def check_admin(current_user: User = Depends(check_user_login)) -> User:
+    """Verifica que el usuario activo sea administrador."""
+    if getattr(current_user.role, "value", current_user.role) != UserRole.ADMIN.value:
+        raise HTTPException(
+            status_code=403,
+            detail="Admin privileges required",
+        )
+    return current_user
+
+
 get_current_user = check_user_login
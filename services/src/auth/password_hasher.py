@@ -0,0 +1,73 @@
+"""Hash y verificación de contraseñas con bcrypt fuera del event loop.
+
+bcrypt tarda cientos de milisegundos de CPU por llamada a propósito; correrlo
+dentro de un handler async frena a todos los requests del worker. Acá se
+ejecuta en `password_executor` (threads: bcrypt libera el GIL), que acota
+cuántos hashes corren a la vez y cuántos esperan. Con el pool lleno se
+responde 503 para que el cliente reintente.
+"""
+
+from __future__ import annotations
+
+import logging
+
+import bcrypt
+from fastapi import HTTPException
+
+import settings
+from services.offload import BoundedExecutor, PoolSaturated, password_executor
+
+logger = logging.getLogger(__name__)
+
+
+def _hash(password: str, rounds: int) -> str:
+    salt = bcrypt.gensalt(rounds=rounds)
+    return bcrypt.hashpw(password.encode("utf-8"), salt).decode("utf-8")
+
+
+def _check(password: str, hashed: str) -> bool:
+    return bcrypt.checkpw(password.encode("utf-8"), hashed.encode("utf-8"))
+
+
+class PasswordHasher:
+    """Servicio async de contraseñas con el costo de bcrypt configurable."""
+
+    def __init__(
+        self,
+        executor: BoundedExecutor = password_executor,
+        rounds: int = settings.BCRYPT_ROUNDS,
+    ) -> None:
+        self.executor = executor
+        self.rounds = rounds
+
+    async def _run(self, func, *args):
+        try:
+            return await self.executor.run(func, *args)
+        except PoolSaturated:
+            logger.warning("Pool de contraseñas saturado, se rechaza la operación")
+            raise HTTPException(
+                status_code=503,
+                detail="El servicio está saturado. Intentá de nuevo en unos segundos.",
+                headers={"Retry-After": "2"},
+            )
+
+    async def hash(self, password: str) -> str:
+        return await self._run(_hash, password, self.rounds)
+
+    async def verify(self, password: str, hashed: str) -> bool:
+        try:
+            return await self._run(_check, password, hashed)
+        except ValueError:
+            # Hash corrupto o con formato desconocido: no coincide
+            logger.warning("Hash de contraseña con formato inválido")
+            return False
+
+    def needs_rehash(self, hashed: str) -> bool:
+        """Indica si el hash se generó con un costo distinto al configurado."""
+        try:
+            return int(hashed.split("$")[2]) != self.rounds
+        except (IndexError, ValueError):
+            return True
+
+
+password_hasher = PasswordHasher()
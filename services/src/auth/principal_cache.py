@@ -0,0 +1,89 @@
+"""Caché en memoria de los usuarios autenticados, por `uid` y con TTL corto.
+
+Evita el SELECT de `users` en cada request autenticado. Se guarda una copia de
+las columnas (sin el hash de la contraseña) y cada request recibe un `User`
+nuevo en estado detached, que `get_authenticated_user` adjunta a la sesión
+del request sin consultar la base; así las relaciones many-to-one hacia el
+usuario (p. ej. `ServiceRequest.client`) se resuelven desde el identity map
+como cuando se cargaba con un SELECT.
+
+La caché es por proceso: los cambios hechos en este proceso la invalidan al
+instante y los de otros workers se ven, como mucho, al vencer el TTL. Los
+tokens revocados con `token_version` siguen ese mismo límite.
+"""
+
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from sqlalchemy import inspect as sa_inspect
+from sqlalchemy.orm import make_transient_to_detached
+
+import settings
+from models.User import User
+
+# Columnas que no hace falta tener en memoria para autorizar un request
+_EXCLUDED_COLUMNS = {"password_hash"}
+
+
+class PrincipalCache:
+    """LRU con vencimiento de los usuarios resueltos desde el token."""
+
+    def __init__(
+        self,
+        ttl: float = settings.AUTH_USER_CACHE_TTL_SECONDS,
+        max_entries: int = settings.AUTH_USER_CACHE_MAX_ENTRIES,
+    ) -> None:
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: OrderedDict[int, Tuple[float, Dict[str, Any]]] = OrderedDict()
+        self._columns = [
+            attr.key
+            for attr in sa_inspect(User).column_attrs
+            if attr.key not in _EXCLUDED_COLUMNS
+        ]
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, uid: int) -> Optional[User]:
+        entry = self._entries.get(uid)
+        if entry is None or entry[0] < time.monotonic():
+            if entry is not None:
+                del self._entries[uid]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(uid)
+        self.hits += 1
+        user = User(**entry[1])
+        # Sin historial de cambios: al adjuntarlo no genera un UPDATE
+        make_transient_to_detached(user)
+        return user
+
+    def put(self, user: User) -> None:
+        if self.ttl <= 0:
+            return
+        snapshot = {key: getattr(user, key) for key in self._columns}
+        self._entries[user.id] = (time.monotonic() + self.ttl, snapshot)
+        self._entries.move_to_end(user.id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, uid: int) -> None:
+        self._entries.pop(uid, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def metrics(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else None,
+        }
+
+
+principal_cache = PrincipalCache()
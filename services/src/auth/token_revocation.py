@@ -0,0 +1,221 @@
+"""Consulta de tokens revocados sin ir a la base en el caso común.
+
+Cada proceso mantiene un filtro de Bloom con los identificadores de
+`revoked_tokens` que siguen vigentes. Un identificador que no está en el
+filtro seguro no fue revocado (salvo revocaciones de otros procesos aún no
+sincronizadas, ver abajo); si está, se confirma contra la base y el
+resultado queda en un LRU.
+
+El filtro se completa de forma incremental por `revoked_at` cada
+`TOKEN_REVOCATION_SYNC_SECONDS`, así que una revocación hecha en otro worker
+se ve, como mucho, un ciclo después. Las hechas en este proceso se ven al
+instante. Cada `TOKEN_REVOCATION_PURGE_SECONDS` se borran las filas vencidas
+y se reconstruye el filtro, que así no crece sin fin. Esa limpieza usa una
+sesión propia: no confirma la transacción del request que la dispara.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import logging
+import math
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+import settings
+from database.database import AsyncSessionLocal
+from models.RevokedToken import RevokedToken
+
+logger = logging.getLogger(__name__)
+
+# Margen al releer por `revoked_at`: cubre filas confirmadas tarde con la
+# misma marca de tiempo (la columna tiene precisión de segundos)
+_SYNC_OVERLAP = timedelta(seconds=5)
+
+
+class BloomFilter:
+    """Filtro de Bloom sobre un bytearray con doble hashing (blake2b)."""
+
+    def __init__(self, capacity: int, error_rate: float) -> None:
+        self.capacity = max(capacity, 1)
+        self.error_rate = error_rate
+        self.size = max(
+            8, math.ceil(-self.capacity * math.log(error_rate) / math.log(2) ** 2)
+        )
+        self.hashes = max(1, round(self.size / self.capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key: str):
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.hashes):
+            yield (h1 + i * h2) % self.size
+
+    def add(self, key: str) -> None:
+        if key in self:
+            return
+        for pos in self._positions(key):
+            self._bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, key: str) -> bool:
+        return all(self._bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
+
+
+class TokenRevocationList:
+    """Revoca identificadores de token y responde si están revocados."""
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession] = AsyncSessionLocal,
+        *,
+        sync_interval: float = settings.TOKEN_REVOCATION_SYNC_SECONDS,
+        purge_interval: float = settings.TOKEN_REVOCATION_PURGE_SECONDS,
+        capacity: int = settings.TOKEN_REVOCATION_BLOOM_CAPACITY,
+        error_rate: float = settings.TOKEN_REVOCATION_BLOOM_ERROR_RATE,
+        max_confirmed: int = 10000,
+    ) -> None:
+        self.session_factory = session_factory
+        self.sync_interval = sync_interval
+        self.purge_interval = purge_interval
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.max_confirmed = max_confirmed
+        self._bloom = BloomFilter(capacity, error_rate)
+        # Resultado de las consultas a la base por positivos del filtro
+        self._confirmed: OrderedDict[str, bool] = OrderedDict()
+        self._cursor: Optional[datetime] = None
+        self._last_sync = 0.0
+        self._last_purge = 0.0
+        self._lock = asyncio.Lock()
+        self._counters = {"checks": 0, "bloom_negatives": 0, "db_lookups": 0, "syncs": 0}
+
+    async def is_revoked(self, db: AsyncSession, token_id: str) -> bool:
+        await self._maybe_sync(db)
+        self._counters["checks"] += 1
+        if token_id not in self._bloom:
+            self._counters["bloom_negatives"] += 1
+            return False
+
+        revoked = self._confirmed.get(token_id)
+        if revoked is None:
+            self._counters["db_lookups"] += 1
+            revoked = (
+                await db.execute(
+                    select(RevokedToken.token_id).where(RevokedToken.token_id == token_id)
+                )
+            ).scalar_one_or_none() is not None
+            # Sólo los positivos son definitivos; un falso positivo puede
+            # revocarse después y se vuelve a consultar
+            if not revoked:
+                return False
+            self._remember(token_id)
+        return revoked
+
+    async def revoke(
+        self,
+        db: AsyncSession,
+        token_id: str,
+        *,
+        user_id: int,
+        expires_at: datetime,
+        reason: str,
+    ) -> bool:
+        """Revoca `token_id`; devuelve False si ya estaba revocado.
+
+        Confirma la transacción de `db`: la clave primaria es la que decide,
+        entre procesos, quién usó primero un refresh token.
+        """
+        db.add(
+            RevokedToken(
+                token_id=token_id,
+                user_id=user_id,
+                reason=reason,
+                expires_at=expires_at,
+                # Mismo reloj (UTC de la app) que el cursor de sincronización
+                revoked_at=datetime.utcnow(),
+            )
+        )
+        try:
+            await db.commit()
+        except IntegrityError:
+            await db.rollback()
+            self._bloom.add(token_id)
+            self._remember(token_id)
+            return False
+        self._bloom.add(token_id)
+        self._remember(token_id)
+        return True
+
+    def _remember(self, token_id: str) -> None:
+        self._confirmed[token_id] = True
+        self._confirmed.move_to_end(token_id)
+        while len(self._confirmed) > self.max_confirmed:
+            self._confirmed.popitem(last=False)
+
+    async def _maybe_sync(self, db: AsyncSession) -> None:
+        now = time.monotonic()
+        if now - self._last_sync < self.sync_interval or self._lock.locked():
+            return
+        async with self._lock:
+            self._last_sync = now
+            try:
+                if self._cursor is None or now - self._last_purge >= self.purge_interval:
+                    await self._reload()
+                    self._last_purge = now
+                else:
+                    await self._load_since(db, self._cursor - _SYNC_OVERLAP)
+            except Exception:
+                # Sin sincronizar se sigue con el filtro actual
+                logger.exception("No se pudo sincronizar la lista de tokens revocados")
+            self._counters["syncs"] += 1
+
+    async def _reload(self) -> None:
+        """Borra las filas vencidas y reconstruye el filtro en una sesión propia."""
+        async with self.session_factory() as db:
+            result = await db.execute(
+                delete(RevokedToken).where(RevokedToken.expires_at <= datetime.utcnow())
+            )
+            await db.commit()
+            if result.rowcount:
+                logger.info("Tokens revocados vencidos eliminados: %s", result.rowcount)
+
+            vigentes = (
+                await db.execute(select(func.count()).select_from(RevokedToken))
+            ).scalar_one()
+            # Holgura para las revocaciones que lleguen hasta la próxima reconstrucción
+            self._bloom = BloomFilter(max(self.capacity, vigentes * 2), self.error_rate)
+            self._confirmed.clear()
+            self._cursor = None
+            await self._load_since(db, None)
+
+    async def _load_since(self, db: AsyncSession, since: Optional[datetime]) -> None:
+        stmt = select(RevokedToken.token_id, RevokedToken.revoked_at)
+        if since is not None:
+            stmt = stmt.where(RevokedToken.revoked_at >= since)
+        for token_id, revoked_at in (await db.execute(stmt)).all():
+            self._bloom.add(token_id)
+            if self._cursor is None or revoked_at > self._cursor:
+                self._cursor = revoked_at
+        if self._cursor is None:
+            self._cursor = datetime.utcnow()
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            **self._counters,
+            "bloom_entries": self._bloom.count,
+            "bloom_capacity": self._bloom.capacity,
+            "confirmed_cached": len(self._confirmed),
+        }
+
+
+token_revocation_list = TokenRevocationList()
@@ -4,6 +4,7 @@ from sqlalchemy import select, update
 from fastapi import HTTPException, status
 from models.Address import Address, AddressCreate, AddressUpdate, AddressResponse
 from models.User import User
+from services.match_index import match_index
 from utils.error_handler import error_handler
 
 
@@ -29,6 +30,8 @@ class AddressController:
         new_address = Address(user_id=user_id, **address_data.model_dump())
 
         db.add(new_address)
+        await db.flush()
+        await match_index.refresh_user(db, user_id)
         await db.commit()
         await db.refresh(new_address)
 
@@ -99,6 +102,7 @@ class AddressController:
                 update(Address).where(Address.id == address_id).values(**update_data)
             )
             await db.execute(update_query)
+            await match_index.refresh_user(db, user_id)
             await db.commit()
 
             await db.refresh(address)
@@ -128,6 +132,7 @@ class AddressController:
         )
 
         await db.execute(update_query)
+        await match_index.refresh_user(db, user_id)
         await db.commit()
 
         return True
@@ -160,6 +165,7 @@ class AddressController:
         )
 
         await db.execute(update_query)
+        await match_index.refresh_user(db, user_id)
         await db.commit()
         await db.refresh(address)
 
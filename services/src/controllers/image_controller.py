@@ -1,9 +1,23 @@
 import logging
+import uuid
+from datetime import datetime, timedelta
 
 from fastapi import HTTPException, UploadFile
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from utils.error_handler import error_handler
 
+import settings
+from services.image_variant_worker import image_variant_worker
 from services.s3_service import s3_service
+from services.service_request_service import SERVICE_REQUESTS_FOLDER
+from models.ImageUpload import (
+    ImageUpload,
+    ImageUploadSessionCreate,
+    ImageUploadSessionResponse,
+    ImageUploadStatus,
+)
+from models.User import User
 from models.Image import (
     ImageUploadResponse,
     ImageListResponse,
@@ -27,6 +41,13 @@ class ImageController:
         "temp": "Imágenes temporales",
     }
 
+    # Carpeta de las subidas directas según su uso. Los adjuntos quedan bajo la
+    # carpeta de solicitudes para que la clave no cambie al adjuntarlos.
+    UPLOAD_FOLDERS = {
+        "profile": "profiles",
+        "service_request": f"{SERVICE_REQUESTS_FOLDER}/uploads",
+    }
+
     @error_handler()
     async def upload_image(
         self,
@@ -50,8 +71,142 @@ class ImageController:
 
         return ImageUploadResponse(**result)
 
+    @error_handler(logger)
+    async def create_upload_session(
+        self, db: AsyncSession, user: User, data: ImageUploadSessionCreate
+    ) -> ImageUploadSessionResponse:
+        """
+        Registrar una subida directa y devolver la URL firmada para el PUT.
+
+        Los bytes van del cliente a MinIO sin pasar por la API; después el
+        cliente llama a `complete_upload_session`.
+        """
+        content_type = data.content_type.lower()
+        if content_type not in s3_service.supported_image_types:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Tipo de archivo no soportado. Tipos permitidos: {', '.join(s3_service.supported_image_types)}",
+            )
+        if data.size > s3_service.max_file_size:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Archivo muy grande. Tamaño máximo: {s3_service.max_file_size / 1024 / 1024:.1f}MB",
+            )
+
+        folder = self.UPLOAD_FOLDERS[data.purpose]
+        if data.purpose == "service_request":
+            folder = f"{folder}/{user.id}"
+        s3_key = s3_service._generate_unique_filename(data.filename, folder)
+
+        expires_in = timedelta(seconds=settings.IMAGE_UPLOAD_URL_EXPIRES_SECONDS)
+        expires_at = datetime.utcnow() + expires_in
+        upload = ImageUpload(
+            id=str(uuid.uuid4()),
+            user_id=user.id,
+            purpose=data.purpose,
+            s3_key=s3_key,
+            content_type=content_type,
+            declared_size=data.size,
+            status=ImageUploadStatus.PENDING,
+            attempts=0,
+            run_after=expires_at,
+            expires_at=expires_at,
+        )
+        db.add(upload)
+        await db.commit()
+
+        logger.info(f"📤 Sesión de subida directa {upload.id} para {s3_key}")
+        response = self._upload_session_response(upload)
+        response.upload_url = s3_service.presigned_upload_url(s3_key, expires_in)
+        response.upload_headers = {"Content-Type": content_type}
+        return response
+
+    @error_handler(logger)
+    async def complete_upload_session(
+        self, db: AsyncSession, user: User, upload_id: str
+    ) -> ImageUploadSessionResponse:
+        """
+        Verificar con `stat_object` el archivo subido y encolar sus variantes.
+
+        Es idempotente: si la sesión ya se confirmó devuelve su estado actual.
+        """
+        upload = await self._get_upload(db, user, upload_id, for_update=True)
+        if upload.status != ImageUploadStatus.PENDING:
+            return self._upload_session_response(upload)
+        if upload.expires_at < datetime.utcnow():
+            raise HTTPException(status_code=410, detail="La sesión de subida expiró")
+
+        stat = await s3_service.stat_image(upload.s3_key)
+        if stat is None:
+            raise HTTPException(
+                status_code=400, detail="El archivo todavía no se subió"
+            )
+
+        content_type = (stat.content_type or "").split(";")[0].strip().lower()
+        error = None
+        if stat.size != upload.declared_size:
+            error = "El tamaño del archivo no coincide con el declarado"
+        elif stat.size > s3_service.max_file_size:
+            error = "Archivo muy grande"
+        elif content_type != upload.content_type:
+            error = "El tipo del archivo no coincide con el declarado"
+
+        if error:
+            await s3_service.delete_images([upload.s3_key])
+            upload.status = ImageUploadStatus.FAILED
+            upload.last_error = error
+            await db.commit()
+            raise HTTPException(status_code=400, detail=error)
+
+        upload.status = ImageUploadStatus.UPLOADED
+        upload.size = stat.size
+        upload.completed_at = datetime.utcnow()
+        upload.run_after = upload.completed_at
+        await db.commit()
+        image_variant_worker.notify()
+
+        return self._upload_session_response(upload)
+
+    @error_handler(logger)
+    async def get_upload_session(
+        self, db: AsyncSession, user: User, upload_id: str
+    ) -> ImageUploadSessionResponse:
+        """Estado de una sesión; `variants` se completa cuando llega a READY."""
+        upload = await self._get_upload(db, user, upload_id)
+        return self._upload_session_response(upload)
+
+    @staticmethod
+    async def _get_upload(
+        db: AsyncSession, user: User, upload_id: str, for_update: bool = False
+    ) -> ImageUpload:
+        stmt = select(ImageUpload).where(
+            ImageUpload.id == upload_id, ImageUpload.user_id == user.id
+        )
+        if for_update:
+            stmt = stmt.with_for_update()
+        upload = (await db.execute(stmt)).scalar_one_or_none()
+        if upload is None:
+            raise HTTPException(status_code=404, detail="Sesión de subida no encontrada")
+        return upload
+
+    @staticmethod
+    def _upload_session_response(upload: ImageUpload) -> ImageUploadSessionResponse:
+        return ImageUploadSessionResponse(
+            upload_id=upload.id,
+            status=upload.status,
+            s3_key=upload.s3_key,
+            public_url=s3_service.get_image_url(upload.s3_key),
+            content_type=upload.content_type,
+            size=upload.size,
+            expires_at=upload.expires_at,
+            variants=upload.variants or [],
+            error=upload.last_error
+            if upload.status == ImageUploadStatus.FAILED
+            else None,
+        )
+
     @classmethod
-    def delete_image(cls, s3_key: str) -> DeleteImageResponse:
+    async def delete_image(cls, s3_key: str) -> DeleteImageResponse:
         """
         Eliminar una imagen de S3.
 
@@ -70,11 +225,11 @@ class ImageController:
             logger.info(f"🗑️ Eliminando imagen: {s3_key}")
 
             # Verificar que existe
-            if not s3_service.image_exists(s3_key):
+            if not await s3_service.image_exists(s3_key):
                 raise HTTPException(status_code=404, detail="La imagen no existe")
 
             # Eliminar usando el servicio
-            success = s3_service.delete_image(s3_key)
+            success = await s3_service.delete_image(s3_key)
 
             if success:
                 return DeleteImageResponse(
@@ -94,7 +249,7 @@ class ImageController:
             )
 
     @classmethod
-    def list_images_in_folder(cls, folder: str, limit: int = 50) -> FolderListResponse:
+    async def list_images_in_folder(cls, folder: str, limit: int = 50) -> FolderListResponse:
         """
         Listar imágenes en una carpeta específica.
 
@@ -122,7 +277,7 @@ class ImageController:
             logger.info(f"📁 Listando imágenes en carpeta: {folder or 'root'}")
 
             # Obtener archivos usando el servicio
-            files_data = s3_service.list_images_in_folder(folder, limit)
+            files_data = await s3_service.list_images_in_folder(folder, limit)
 
             # Convertir a modelos Pydantic
             files = [ImageListResponse(**file_data) for file_data in files_data]
@@ -140,7 +295,7 @@ class ImageController:
             )
 
     @classmethod
-    def get_image_url(cls, s3_key: str) -> ImageUrlResponse:
+    async def get_image_url(cls, s3_key: str) -> ImageUrlResponse:
         """
         Obtener URL pública de una imagen.
 
@@ -157,7 +312,7 @@ class ImageController:
                 )
 
             # Verificar si existe
-            exists = s3_service.image_exists(s3_key)
+            exists = await s3_service.image_exists(s3_key)
 
             if not exists:
                 raise HTTPException(status_code=404, detail="La imagen no existe")
@@ -1,6 +1,7 @@
 import json
 from typing import List
 
+from services.llm_cache import llm_response_cache, vocabulary_version
 from services.openai import OpenAIService
 from templates.prompts import (
     GENERATE_TAGS_FOR_LICENCE_DESCRIPTION,
@@ -10,33 +11,51 @@ from templates.prompts import (
 )
 
 
+def _is_json_list(value: str) -> bool:
+    try:
+        return isinstance(json.loads(value), list)
+    except (TypeError, ValueError):
+        return False
+
+
+def _is_json_object(value: str) -> bool:
+    try:
+        return isinstance(json.loads(value), dict)
+    except (TypeError, ValueError):
+        return False
+
+
 class LLMController:
     def __init__(self):
         self.openai_service = OpenAIService()
 
-    def create_tag_of_licences(self, description: str, existing_tags: List[str] = None):
+    async def create_tag_of_licences(self, description: str, existing_tags: List[str] = None):
         """Genera tags para una licencia, considerando tags existentes."""
         tags_context = self._format_existing_tags(existing_tags)
         system_prompt = GENERATE_TAGS_FOR_LICENCE_DESCRIPTION.format(
             existing_tags=tags_context
         )
-        response = self.openai_service.run(
-            role_system=system_prompt,
-            message=f"{description}",
+        return await self._run_cached(
+            "tags_licence",
+            system_prompt,
+            f"{description}",
+            vocabulary=vocabulary_version(existing_tags),
+            validate=_is_json_list,
         )
-        return response
 
-    def create_tags_for_request(self, payload: str, existing_tags: List[str] = None):
+    async def create_tags_for_request(self, payload: str, existing_tags: List[str] = None):
         """Genera tags para una solicitud, considerando tags existentes."""
         tags_context = self._format_existing_tags(existing_tags)
         system_prompt = GENERATE_TAGS_FOR_REQUEST_DESCRIPTION.format(
             existing_tags=tags_context
         )
-        response = self.openai_service.run(
-            role_system=system_prompt,
-            message=f"{payload}",
+        return await self._run_cached(
+            "tags_request",
+            system_prompt,
+            f"{payload}",
+            vocabulary=vocabulary_version(existing_tags),
+            validate=_is_json_list,
         )
-        return response
 
     def _format_existing_tags(self, tags: List[str] = None) -> str:
         """Formatea la lista de tags para incluir en el prompt."""
@@ -44,19 +63,41 @@ class LLMController:
             return "No hay tags existentes aún. Puedes crear los que consideres apropiados."
         return f"[{', '.join(tags)}]"
 
-    def rewrite_service_request(self, title: str, description: str) -> dict:
+    async def _run_cached(
+        self,
+        template: str,
+        system_prompt: str,
+        message: str,
+        *,
+        vocabulary: str = "",
+        validate=_is_json_object,
+    ) -> str:
+        """Ejecuta el prompt pasando por la caché de respuestas del LLM."""
+        return await llm_response_cache.get_or_compute(
+            template=template,
+            model=self.openai_service.model,
+            temperature=self.openai_service.temperature,
+            system_prompt=system_prompt,
+            message=message,
+            vocabulary=vocabulary,
+            validate=validate,
+            compute=lambda: self.openai_service.run(
+                role_system=system_prompt, message=message
+            ),
+        )
+
+    async def rewrite_service_request(self, title: str, description: str) -> dict:
         """Reescribe el título y descripción de una solicitud para hacerlos más claros."""
         message = f"Título: {title}\n\nDescripción: {description}"
-        response = self.openai_service.run(
-            role_system=REWRITE_SERVICE_REQUEST,
-            message=message,
+        response = await self._run_cached(
+            "rewrite_request", REWRITE_SERVICE_REQUEST, message
         )
         try:
             return json.loads(response)
         except json.JSONDecodeError:
             return {"title": title, "description": description}
 
-    def rewrite_proposal_notes(
+    async def rewrite_proposal_notes(
         self, request_title: str, request_description: str, notes: str
     ) -> dict:
         """Reescribe las notas de un presupuesto para hacerlas más claras."""
@@ -64,9 +105,8 @@ class LLMController:
             request_title=request_title or "Sin título",
             request_description=request_description or "Sin descripción",
         )
-        response = self.openai_service.run(
-            role_system=prompt,
-            message=f"Notas del prestador:\n{notes}",
+        response = await self._run_cached(
+            "rewrite_proposal", prompt, f"Notas del prestador:\n{notes}"
         )
         try:
             return json.loads(response)
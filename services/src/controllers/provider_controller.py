@@ -3,8 +3,8 @@ from datetime import datetime, timedelta, timezone
 from decimal import Decimal, ROUND_HALF_UP
 from typing import Optional, List
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, case, or_, and_, func
-from sqlalchemy.orm import selectinload, aliased
+from sqlalchemy import select, case, or_, and_
+from sqlalchemy.orm import selectinload
 from fastapi import HTTPException, status
 from models.User import User, UserRole
 from models.ProviderProfile import (
@@ -40,10 +40,9 @@ from models.ServiceRequest import (
     ServiceStatusHistory,
     ProposalStatus,
     Currency,
-    ServiceReview,
 )
 from models.Tag import ServiceRequestTag
-from models.Address import Address
+from models.ProviderRequestMatch import ProviderRequestMatch
 from models.ServiceRequestSchemas import (
     ServiceRequestResponse,
     CurrencyResponse,
@@ -52,9 +51,19 @@ from models.ServiceRequestSchemas import (
 from controllers.service_request_controller import ServiceRequestController
 from auth.auth_utils import get_password_hash
 from utils.error_handler import error_handler
+from utils.pagination import (
+    Page,
+    decode_cursor,
+    encode_cursor,
+    keyset_after,
+    resolve_page_size,
+)
 from controllers.tags_controllers import TagsController
 from controllers.llm_controller import LLMController
+from services.match_index import match_index
+from services.notification_dispatcher import notification_dispatcher
 from services.notification_service import notification_service
+from services.provider_kpis import ProviderKpiTotals, now_ar, provider_kpis
 
 logger = logging.getLogger(__name__)
 
@@ -85,7 +94,7 @@ class ProviderController:
     async def create_provider(
         db: AsyncSession, provider_data: ProviderRegisterRequest
     ) -> ProviderResponse:
-        password_hash = get_password_hash(provider_data.password)
+        password_hash = await get_password_hash(provider_data.password)
 
         new_user = User(
             role=UserRole.PROVIDER,
@@ -223,13 +232,12 @@ class ProviderController:
 
         await db.commit()
 
-        for license_model in new_licenses:
-            await db.refresh(license_model)
-
         if new_licenses:
             await TagsController.generate_tags_for_licenses(
                 db, new_licenses, llm_controller.create_tag_of_licences
             )
+            await match_index.refresh_provider(db, profile.id)
+            await db.commit()
 
         user = await ProviderController._load_provider_with_relations(db, user_id)
         profile = getattr(user, "provider_profile", None)
@@ -286,6 +294,7 @@ class ProviderController:
             profile_image_url=getattr(user, "profile_image_url", None),
             profile_image_s3_key=getattr(user, "profile_image_s3_key", None),
             profile_image_uploaded_at=getattr(user, "profile_image_uploaded_at", None),
+            profile_image_variants=getattr(user, "profile_image_variants", None),
             provider_profile=profile_response,
         )
 
@@ -376,12 +385,58 @@ class ProviderController:
 
         return await ProviderController._build_provider_response(user)
 
+    @staticmethod
+    def _feed_relation_options() -> tuple:
+        """Relaciones que necesita el feed del proveedor para armar cada respuesta."""
+        return (
+            selectinload(ServiceRequest.client),
+            selectinload(ServiceRequest.images),
+            selectinload(ServiceRequest.tag_links).selectinload(ServiceRequestTag.tag),
+            selectinload(ServiceRequest.proposals).options(
+                selectinload(ServiceRequestProposal.provider).options(
+                    selectinload(ProviderProfile.user)
+                )
+            ),
+            selectinload(ServiceRequest.service).options(
+                selectinload(Service.provider).options(
+                    selectinload(ProviderProfile.user)
+                ),
+                selectinload(Service.proposal),
+                selectinload(Service.status_history),
+            ),
+            selectinload(ServiceRequest.address),
+            selectinload(ServiceRequest.parent_service),
+        )
+
     @staticmethod
     @error_handler(logger)
     async def list_matching_service_requests(
-        db: AsyncSession, user_id: int
-    ) -> List[ServiceRequestResponse]:
-        user = await ProviderController._load_provider_with_relations(db, user_id)
+        db: AsyncSession,
+        user_id: int,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+    ) -> Page[ServiceRequestResponse]:
+        """Feed del proveedor: recontrataciones dirigidas y luego solicitudes por tags.
+
+        Se lee de `provider_request_matches`, que se mantiene al crear o cerrar
+        solicitudes, ofertar, cargar licencias o cambiar direcciones. El orden
+        es: recontrataciones (más nuevas primero) y después FAST antes que
+        LICITACION, mayor confianza del tag, más cercanas, más antiguas
+        primero. Cada solicitud trae `distance_km` si hay coordenadas. Con
+        `limit`/`cursor` se pagina por keyset sobre ese orden; sin ellos se
+        devuelve el feed completo como antes, hasta el tope de
+        `resolve_page_size`.
+        """
+        result = await db.execute(
+            select(User)
+            .options(selectinload(User.provider_profile))
+            .where(
+                User.id == user_id,
+                User.role == UserRole.PROVIDER,
+                User.is_active,
+            )
+        )
+        user = result.scalar_one_or_none()
 
         if not user:
             raise HTTPException(
@@ -393,187 +448,79 @@ class ProviderController:
         if not profile:
             profile = await ProviderController._ensure_provider_profile(db, user_id)
 
-        provider_city = None
-        provider_state = None
-
-        address_stmt = (
-            select(Address)
-            .where(Address.user_id == user.id, Address.is_active.is_(True))
-            .order_by(Address.is_default.desc(), Address.created_at.desc())
-            .limit(1)
-        )
-        provider_address_result = await db.execute(address_stmt)
-        provider_address = provider_address_result.scalar_one_or_none()
-        if provider_address:
-            if provider_address.city:
-                provider_city = provider_address.city.strip() or None
-            if provider_address.state:
-                provider_state = provider_address.state.strip() or None
-
-        licenses = getattr(profile, "licenses", []) or []
-        tag_ids = {
-            link.tag_id
-            for license in licenses
-            for link in getattr(license, "tag_links", []) or []
-            if getattr(link, "tag_id", None) is not None
-        }
-
-        # Primero obtenemos recontrataciones dirigidas a este proveedor
-        rehire_stmt = (
-            select(ServiceRequest)
-            .options(
-                selectinload(ServiceRequest.client),
-                selectinload(ServiceRequest.images),
-                selectinload(ServiceRequest.tag_links).selectinload(
-                    ServiceRequestTag.tag
-                ),
-                selectinload(ServiceRequest.proposals).options(
-                    selectinload(ServiceRequestProposal.provider).options(
-                        selectinload(ProviderProfile.user)
-                    )
-                ),
-                selectinload(ServiceRequest.service).options(
-                    selectinload(Service.provider).options(
-                        selectinload(ProviderProfile.user)
-                    ),
-                    selectinload(Service.proposal),
-                    selectinload(Service.status_history),
-                ),
-                selectinload(ServiceRequest.address),
-                selectinload(ServiceRequest.parent_service),
-            )
-            .where(
-                ServiceRequest.status == ServiceRequestStatus.PUBLISHED,
-                ServiceRequest.request_type == ServiceRequestType.RECONTRATACION,
-                ServiceRequest.target_provider_profile_id == profile.id,
-            )
-            .order_by(ServiceRequest.created_at.desc())
-        )
-
-        # Filtrar recontrataciones que ya tienen propuesta del proveedor
-        provider_proposal_alias_rehire = aliased(ServiceRequestProposal)
-        rehire_stmt = (
-            rehire_stmt
-            .outerjoin(
-                provider_proposal_alias_rehire,
-                and_(
-                    provider_proposal_alias_rehire.request_id == ServiceRequest.id,
-                    provider_proposal_alias_rehire.provider_profile_id == profile.id,
-                ),
-            )
-            .where(provider_proposal_alias_rehire.id.is_(None))
+        rank_columns = (
+            ProviderRequestMatch.segment,
+            ProviderRequestMatch.type_rank,
+            ProviderRequestMatch.score_rank,
+            ProviderRequestMatch.distance_rank,
+            ProviderRequestMatch.created_rank,
+            ProviderRequestMatch.request_id,
         )
-
-        rehire_result = await db.execute(rehire_stmt)
-        rehire_requests = list(rehire_result.scalars().unique().all())
-
-        # Si no hay tags, solo devolvemos recontrataciones
-        if not tag_ids:
-            return [
-                ServiceRequestController._build_response(request)
-                for request in rehire_requests
-            ]
-
-        provider_proposal_alias = aliased(ServiceRequestProposal)
-        request_address_alias = aliased(Address)
-
-        # Query para solicitudes FAST y LICITACION matcheadas por tags
         stmt = (
-            select(ServiceRequest)
-            .join(
-                ServiceRequestTag,
-                ServiceRequestTag.request_id == ServiceRequest.id,
-            )
-            .outerjoin(
-                provider_proposal_alias,
-                and_(
-                    provider_proposal_alias.request_id == ServiceRequest.id,
-                    provider_proposal_alias.provider_profile_id == profile.id,
-                ),
-            )
-            .outerjoin(
-                request_address_alias,
-                request_address_alias.id == ServiceRequest.address_id,
-            )
-            .options(
-                selectinload(ServiceRequest.client),
-                selectinload(ServiceRequest.images),
-                selectinload(ServiceRequest.tag_links).selectinload(
-                    ServiceRequestTag.tag
-                ),
-                selectinload(ServiceRequest.proposals).options(
-                    selectinload(ServiceRequestProposal.provider).options(
-                        selectinload(ProviderProfile.user)
-                    )
-                ),
-                selectinload(ServiceRequest.service).options(
-                    selectinload(Service.provider).options(
-                        selectinload(ProviderProfile.user)
-                    ),
-                    selectinload(Service.proposal),
-                    selectinload(Service.status_history),
-                ),
-                selectinload(ServiceRequest.address),
-            )
-            .where(
-                ServiceRequest.status == ServiceRequestStatus.PUBLISHED,
-                ServiceRequest.request_type.in_([ServiceRequestType.FAST, ServiceRequestType.LICITACION]),
-                ServiceRequestTag.tag_id.in_(tag_ids),
-                provider_proposal_alias.id.is_(None),
-            )
-            .order_by(
-                case(
-                    (ServiceRequest.request_type == ServiceRequestType.FAST, 0),
-                    else_=1,
-                ),
-                case(
-                    (ServiceRequestTag.confidence.is_(None), 1),
-                    else_=0,
-                ),
-                ServiceRequestTag.confidence.desc(),
-                ServiceRequest.created_at.asc(),
-            )
+            select(*rank_columns, ProviderRequestMatch.distance_km)
+            .where(ProviderRequestMatch.provider_profile_id == profile.id)
+            .order_by(*rank_columns)
         )
 
-        normalized_city = provider_city.lower() if provider_city else None
-        normalized_state = provider_state.lower() if provider_state else None
-
-        if normalized_city:
-            city_expr = func.lower(
-                func.coalesce(
-                    func.nullif(func.trim(request_address_alias.city), ""),
-                    func.nullif(func.trim(ServiceRequest.city_snapshot), ""),
-                )
+        if cursor:
+            last = decode_cursor(
+                cursor, required_keys=tuple(column.key for column in rank_columns)
             )
-            stmt = stmt.where(city_expr == normalized_city)
-
-        if normalized_state:
-            state_expr = func.lower(
-                func.nullif(func.trim(request_address_alias.state), "")
+            try:
+                values = [int(last[column.key]) for column in rank_columns]
+            except (TypeError, ValueError):
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Cursor de paginación inválido",
+                )
+            stmt = stmt.where(
+                keyset_after(
+                    [
+                        (column, True, value)
+                        for column, value in zip(rank_columns, values)
+                    ]
+                )
             )
-            stmt = stmt.where(state_expr == normalized_state)
 
-        result = await db.execute(stmt)
-        tag_matched_requests = list(result.scalars().unique().all())
+        page_size = resolve_page_size(limit, cursor)
+        stmt = stmt.limit(page_size + 1)
 
-        # Combinar: recontrataciones primero, luego las matcheadas por tag
-        # Eliminar duplicados por ID
-        seen_ids = set()
-        combined_requests = []
+        rows = (await db.execute(stmt)).all()
+        next_cursor: Optional[str] = None
+        if len(rows) > page_size:
+            rows = rows[:page_size]
+            next_cursor = encode_cursor(
+                {column.key: int(value) for column, value in zip(rank_columns, rows[-1])}
+            )
 
-        for request in rehire_requests:
-            if request.id not in seen_ids:
-                seen_ids.add(request.id)
-                combined_requests.append(request)
+        page_ids = [row.request_id for row in rows]
+        distances = {row.request_id: row.distance_km for row in rows}
+        if not page_ids:
+            return Page(items=[], next_cursor=next_cursor)
 
-        for request in tag_matched_requests:
-            if request.id not in seen_ids:
-                seen_ids.add(request.id)
-                combined_requests.append(request)
+        # Cargar relaciones sólo para la página
+        result = await db.execute(
+            select(ServiceRequest)
+            .options(*ProviderController._feed_relation_options())
+            .where(ServiceRequest.id.in_(page_ids))
+        )
+        by_id = {request.id: request for request in result.scalars().all()}
+
+        items: List[ServiceRequestResponse] = []
+        for request_id in page_ids:
+            service_request = by_id.get(request_id)
+            # Resguardo ante filas del índice que quedaron atrás de un cambio de estado
+            if (
+                service_request is None
+                or service_request.status != ServiceRequestStatus.PUBLISHED
+            ):
+                continue
+            item = ServiceRequestController._build_response(service_request)
+            distance_km = distances.get(request_id)
+            item.distance_km = float(distance_km) if distance_km is not None else None
+            items.append(item)
 
-        return [
-            ServiceRequestController._build_response(request) for request in combined_requests
-        ]
+        return Page(items=items, next_cursor=next_cursor)
 
     @staticmethod
     @error_handler(logger)
@@ -937,6 +884,7 @@ class ProviderController:
         if normalized_status == ServiceStatus.COMPLETED.value:
             return ProviderController._map_service_to_provider_response(service)
 
+        first_completion = await provider_kpis.is_first_completion(db, service.id)
         previous_status = normalized_status
         service.status = ServiceStatus.COMPLETED
 
@@ -944,6 +892,7 @@ class ProviderController:
         now = datetime.now(timezone(timedelta(hours=-3))).replace(tzinfo=None)
         warranty_expiration = now + timedelta(days=30)
         service.warranty_expires_at = warranty_expiration
+        service.warranty_closed_at = None
 
         history_entry = ServiceStatusHistory(
             service_id=service.id,
@@ -953,6 +902,14 @@ class ProviderController:
             changed_at=now,
         )
         db.add(history_entry)
+        await provider_kpis.service_status_changed(
+            db,
+            service,
+            previous_status,
+            service.status,
+            at=now,
+            first_completion=first_completion,
+        )
 
         root_service = None
         # Si es un servicio WARRANTY, actualizar también el warranty_expires_at del servicio raíz
@@ -964,34 +921,34 @@ class ProviderController:
             root_service = root_result.scalar_one_or_none()
             if root_service:
                 root_service.warranty_expires_at = warranty_expiration
-
-        await db.commit()
+                # La garantía extendida vuelve a quedar pendiente de vencimiento
+                root_service.warranty_closed_at = None
 
         # Notificar al cliente
-        try:
-            request_title = service.request.title if service.request else "tu servicio"
-            notification_body = f"El prestador ha marcado como finalizado el servicio '{request_title}'."
-            
-            # Si es WARRANTY, agregar info de garantía
-            if service.service_type == ServiceType.WARRANTY.value:
-                notification_body = f"El prestador ha completado la visita de garantía para '{request_title}'. Tu garantía se renovó por 30 días más."
-            
-            notification_request_id = service.request_id
-            if notification_request_id is None and root_service is not None:
-                notification_request_id = getattr(root_service, "request_id", None)
-
-            await notification_service.send_notification_to_user(
-                db,
-                user_id=service.client_id,
-                title="¡Servicio finalizado!",
-                body=notification_body,
-                data={
-                    "requestId": notification_request_id,
-                    "type": "service_completed",
-                },
-            )
-        except Exception as e:
-            logger.error(f"Error enviando notificacion push: {e}")
+        request_title = service.request.title if service.request else "tu servicio"
+        notification_body = f"El prestador ha marcado como finalizado el servicio '{request_title}'."
+
+        # Si es WARRANTY, agregar info de garantía
+        if service.service_type == ServiceType.WARRANTY.value:
+            notification_body = f"El prestador ha completado la visita de garantía para '{request_title}'. Tu garantía se renovó por 30 días más."
+
+        notification_request_id = service.request_id
+        if notification_request_id is None and root_service is not None:
+            notification_request_id = getattr(root_service, "request_id", None)
+
+        notification_service.enqueue(
+            db,
+            user_id=service.client_id,
+            title="¡Servicio finalizado!",
+            body=notification_body,
+            data={
+                "requestId": notification_request_id,
+                "type": "service_completed",
+            },
+        )
+
+        await db.commit()
+        notification_dispatcher.notify()
 
         refreshed_result = await db.execute(stmt)
         refreshed_service = refreshed_result.scalar_one()
@@ -1186,10 +1143,28 @@ class ProviderController:
             proposed_end_at=normalized_end,
             valid_until=normalized_valid_until,
             notes=payload.notes,
+            # Fija el mes del rollup de KPIs (ver services.provider_kpis)
+            created_at=now_ar(),
         )
 
         db.add(new_proposal)
+        await provider_kpis.proposal_status_changed(
+            db, new_proposal, None, ProposalStatus.PENDING
+        )
+        await match_index.remove_pair(db, profile.id, service_request.id)
+
+        # Notificar al cliente
+        title_preview = (service_request.title or "")[:30]
+        notification_service.enqueue(
+            db,
+            user_id=service_request.client_id,
+            title="Nueva propuesta recibida",
+            body=f"Recibiste una oferta para '{title_preview}'",
+            data={"requestId": service_request.id, "type": "proposal_received"},
+        )
+
         await db.commit()
+        notification_dispatcher.notify()
 
         proposal_stmt = (
             select(ServiceRequestProposal)
@@ -1207,19 +1182,6 @@ class ProviderController:
         refreshed_result = await db.execute(proposal_stmt)
         persisted = refreshed_result.scalar_one()
 
-        # Notificar al cliente
-        try:
-            title_preview = (service_request.title or "")[:30]
-            await notification_service.send_notification_to_user(
-                db,
-                user_id=service_request.client_id,
-                title="Nueva propuesta recibida",
-                body=f"Recibiste una oferta para '{title_preview}'",
-                data={"requestId": service_request.id, "type": "proposal_received"},
-            )
-        except Exception as e:
-            logger.error(f"Error enviando notificacion push: {e}")
-
         return ProviderController._map_proposal_to_provider_response(persisted)
 
     @staticmethod
@@ -1297,9 +1259,14 @@ class ProviderController:
             status=ProposalStatus.REJECTED,
             notes="Rechazada por el proveedor (oculta)",
             # proposed_start_at, valid_until pueden ser null
+            created_at=now_ar(),
         )
 
         db.add(rejected_proposal)
+        await provider_kpis.proposal_status_changed(
+            db, rejected_proposal, None, ProposalStatus.REJECTED
+        )
+        await match_index.remove_pair(db, profile.id, request_id)
         await db.commit()
         return
 
@@ -1463,91 +1430,6 @@ class ProviderController:
         if not profile:
             profile = await ProviderController._ensure_provider_profile(db, user_id)
 
-        profile_id = profile.id
-
-        services_stmt = select(
-            func.sum(
-                case(
-                    (Service.status != ServiceStatus.CANCELED, 1),
-                    else_=0,
-                )
-            ).label("total_services"),
-            func.sum(
-                case(
-                    (Service.status == ServiceStatus.COMPLETED, 1),
-                    else_=0,
-                )
-            ).label("completed_services"),
-        ).where(Service.provider_profile_id == profile_id)
-
-        proposal_stmt = select(
-            func.count(ServiceRequestProposal.id).label("total"),
-            func.sum(
-                case(
-                    (ServiceRequestProposal.status == ProposalStatus.ACCEPTED, 1),
-                    else_=0,
-                )
-            ).label("accepted"),
-        ).where(ServiceRequestProposal.provider_profile_id == profile_id)
-
-        reviews_stmt = select(
-            func.count(ServiceReview.id).label("total_reviews"),
-            func.avg(ServiceReview.rating).label("avg_rating"),
-        ).where(ServiceReview.ratee_provider_profile_id == profile_id)
-
-        completed_history_subq = (
-            select(
-                ServiceStatusHistory.service_id.label("service_id"),
-                func.min(ServiceStatusHistory.changed_at).label("completed_at"),
-            )
-            .where(ServiceStatusHistory.to_status == ServiceStatus.COMPLETED.value)
-            .group_by(ServiceStatusHistory.service_id)
-            .subquery()
-        )
-
-        # Calcular ingresos netos (sin el 2% de fee de gestión que es para la plataforma)
-        net_price_expr = Service.total_price / PROVIDER_NET_DIVISOR
-        revenue_base = (
-            select(func.coalesce(func.sum(net_price_expr), 0).label("amount"))
-            .join(
-                completed_history_subq,
-                completed_history_subq.c.service_id == Service.id,
-            )
-            .where(
-                Service.provider_profile_id == profile_id,
-                Service.total_price.isnot(None),
-            )
-        )
-
-        if currency:
-            currency_code = currency.upper()
-        else:
-            currency_stmt = (
-                select(Service.currency)
-                .join(
-                    completed_history_subq,
-                    completed_history_subq.c.service_id == Service.id,
-                )
-                .where(
-                    Service.provider_profile_id == profile_id,
-                    Service.total_price.isnot(None),
-                    Service.currency.isnot(None),
-                )
-                .order_by(completed_history_subq.c.completed_at.desc())
-                .limit(1)
-            )
-
-            currency_result = await db.execute(currency_stmt)
-            db_currency = currency_result.scalar_one_or_none()
-            currency_code = db_currency or getattr(profile, "currency", None) or "ARS"
-
-        # Filter metrics by currency to ensure consistency
-        revenue_base = revenue_base.where(Service.currency == currency_code)
-        services_stmt = services_stmt.where(Service.currency == currency_code)
-        proposal_stmt = proposal_stmt.where(
-            ServiceRequestProposal.currency == currency_code
-        )
-
         # Usar hora actual Argentina (UTC-3) para KPIs
         now_utc = datetime.now(timezone(timedelta(hours=-3)))
         current_month_start = now_utc.replace(
@@ -1566,54 +1448,50 @@ class ProviderController:
                 month=current_month_start.month - 1
             )
 
-        if current_month_start.month == 12:
-            next_month_start = current_month_start.replace(
-                year=current_month_start.year + 1, month=1
-            )
-        else:
-            next_month_start = current_month_start.replace(
-                month=current_month_start.month + 1
-            )
-
         current_month_start_naive = current_month_start.replace(tzinfo=None)
         previous_month_start_naive = previous_month_start.replace(tzinfo=None)
-        next_month_start_naive = next_month_start.replace(tzinfo=None)
 
-        revenue_total_stmt = revenue_base
-
-        revenue_current_stmt = revenue_base.where(
-            completed_history_subq.c.completed_at >= current_month_start_naive,
-            completed_history_subq.c.completed_at < next_month_start_naive,
+        # Los contadores salen del rollup mensual que se mantiene en cada
+        # transición de servicios, propuestas y reseñas
+        totals_by_currency = await provider_kpis.totals(
+            db,
+            profile.id,
+            current_month=current_month_start_naive.date(),
+            previous_month=previous_month_start_naive.date(),
         )
 
-        revenue_previous_stmt = revenue_base.where(
-            completed_history_subq.c.completed_at >= previous_month_start_naive,
-            completed_history_subq.c.completed_at < current_month_start_naive,
+        if currency:
+            currency_code = currency.upper()
+        else:
+            # Moneda del servicio completado más reciente
+            completed_currencies = [
+                (totals.last_completed_at, code)
+                for code, totals in totals_by_currency.items()
+                if code and totals.revenue_services and totals.last_completed_at
+            ]
+            currency_code = (
+                max(completed_currencies)[1]
+                if completed_currencies
+                else getattr(profile, "currency", None) or "ARS"
+            )
+
+        kpis = totals_by_currency.get(currency_code) or ProviderKpiTotals()
+        total_services = kpis.services_total
+        completed_services = kpis.services_completed
+        total_proposals = kpis.proposals_total
+        accepted_proposals = kpis.proposals_accepted
+
+        # Las reseñas no se filtran por moneda
+        total_reviews = sum(t.reviews_count for t in totals_by_currency.values())
+        rating_sum = sum(t.rating_sum for t in totals_by_currency.values())
+        avg_rating_raw = (
+            Decimal(rating_sum) / Decimal(total_reviews) if total_reviews else None
         )
 
-        services_result = await db.execute(services_stmt)
-        services_row = services_result.one()
-        total_services = int(services_row.total_services or 0)
-        completed_services = int(services_row.completed_services or 0)
-
-        proposals_result = await db.execute(proposal_stmt)
-        proposals_row = proposals_result.one()
-        total_proposals = int(proposals_row.total or 0)
-        accepted_proposals = int(proposals_row.accepted or 0)
-
-        reviews_result = await db.execute(reviews_stmt)
-        reviews_row = reviews_result.one()
-        total_reviews = int(reviews_row.total_reviews or 0)
-        avg_rating_raw = reviews_row.avg_rating
-
-        revenue_total_result = await db.execute(revenue_total_stmt)
-        total_revenue_raw = revenue_total_result.scalar() or 0
-
-        revenue_current_result = await db.execute(revenue_current_stmt)
-        current_revenue_raw = revenue_current_result.scalar() or 0
-
-        revenue_previous_result = await db.execute(revenue_previous_stmt)
-        previous_revenue_raw = revenue_previous_result.scalar() or 0
+        # Ingresos netos (sin el 2% de fee de gestión que es para la plataforma)
+        total_revenue_raw = kpis.revenue_net
+        current_revenue_raw = kpis.revenue_net_current_month
+        previous_revenue_raw = kpis.revenue_net_previous_month
 
         def to_decimal(value: object) -> Decimal:
             if value is None:
@@ -1717,79 +1595,23 @@ class ProviderController:
         start_month = _add_months(current_month_start, -(normalized_months - 1))
         start_month_naive = start_month.replace(tzinfo=None)
 
-        completed_history_subq = (
-            select(
-                ServiceStatusHistory.service_id.label("service_id"),
-                func.min(ServiceStatusHistory.changed_at).label("completed_at"),
-            )
-            .where(ServiceStatusHistory.to_status == ServiceStatus.COMPLETED.value)
-            .group_by(ServiceStatusHistory.service_id)
-            .subquery()
-        )
-
-        period_expr = func.date_format(
-            completed_history_subq.c.completed_at, "%Y-%m-01"
-        )
-
         if currency:
             currency_code = currency.upper()
         else:
-            currency_stmt = (
-                select(Service.currency)
-                .join(
-                    completed_history_subq,
-                    completed_history_subq.c.service_id == Service.id,
-                )
-                .where(
-                    Service.provider_profile_id == profile_id,
-                    Service.total_price.isnot(None),
-                    Service.currency.isnot(None),
-                )
-                .order_by(completed_history_subq.c.completed_at.desc())
-                .limit(1)
-            )
-
-            currency_result = await db.execute(currency_stmt)
-            db_currency = currency_result.scalar_one_or_none()
+            db_currency = await provider_kpis.latest_revenue_currency(db, profile_id)
             currency_code = db_currency or getattr(profile, "currency", None) or "ARS"
 
-        # Calcular ingresos netos (sin el 2% de fee de gestión que es para la plataforma)
-        net_price_expr = Service.total_price / PROVIDER_NET_DIVISOR
-        revenue_stmt = (
-            select(
-                period_expr.label("period"),
-                func.count(Service.id).label("completed_services"),
-                func.coalesce(func.sum(net_price_expr), 0).label("total_revenue"),
-                func.avg(net_price_expr).label("avg_ticket"),
-            )
-            .select_from(Service)
-            .join(
-                completed_history_subq,
-                completed_history_subq.c.service_id == Service.id,
-            )
-            .where(
-                Service.provider_profile_id == profile_id,
-                Service.total_price.isnot(None),
-                completed_history_subq.c.completed_at >= start_month_naive,
-                Service.currency == currency_code,
-            )
-            .group_by(period_expr)
-            .order_by(period_expr)
+        # Serie leída del rollup mensual (ingresos netos, sin el 2% de fee de gestión)
+        series = await provider_kpis.revenue_series(
+            db, profile_id, currency_code, since=start_month_naive.date()
         )
 
-        revenue_result = await db.execute(revenue_stmt)
-        revenue_rows = revenue_result.fetchall()
-
         points_map: dict[str, dict[str, object]] = {}
-        for row in revenue_rows:
-            period = row.period
-            if period is None:
-                continue
-            period_str = str(period)
-            points_map[period_str] = {
-                "total_revenue": row.total_revenue,
-                "avg_ticket": row.avg_ticket,
-                "completed_services": int(row.completed_services or 0),
+        for point in series:
+            points_map[point.month.strftime("%Y-%m-01")] = {
+                "total_revenue": point.revenue_net,
+                "avg_ticket": point.revenue_net / point.completed_services,
+                "completed_services": point.completed_services,
             }
 
         points: List[ProviderRevenuePoint] = []
@@ -1888,54 +1710,14 @@ class ProviderController:
         start_month = _add_months(current_month_start, -(normalized_months - 1))
         start_month_naive = start_month.replace(tzinfo=None)
 
-        period_expr = func.date_format(ServiceReview.created_at, "%Y-%m-01")
-
-        ratings_stmt = (
-            select(
-                period_expr.label("period"),
-                ServiceReview.rating.label("rating"),
-                func.count(ServiceReview.id).label("count"),
-            )
-            .where(
-                ServiceReview.ratee_provider_profile_id == profile_id,
-                ServiceReview.created_at >= start_month_naive,
-            )
-            .group_by(period_expr, ServiceReview.rating)
-            .order_by(period_expr, ServiceReview.rating)
+        # Histograma mensual precalculado en el rollup de KPIs
+        rating_months = await provider_kpis.rating_series(
+            db, profile_id, since=start_month_naive.date()
         )
-
-        ratings_result = await db.execute(ratings_stmt)
-        ratings_rows = ratings_result.fetchall()
-
-        distribution_map: dict[str, dict[str, object]] = {}
-
-        for row in ratings_rows:
-            period = row.period
-            rating_value = row.rating
-
-            if period is None or rating_value is None:
-                continue
-
-            rating_int = int(rating_value)
-            if rating_int < 1 or rating_int > 5:
-                continue
-
-            period_str = str(period)
-
-            entry = distribution_map.get(period_str)
-            if entry is None:
-                entry = {
-                    "counts": {score: 0 for score in range(1, 6)},
-                    "total": 0,
-                    "sum": Decimal("0"),
-                }
-                distribution_map[period_str] = entry
-
-            count = int(row.count or 0)
-            entry_counts: dict[int, int] = entry["counts"]  # type: ignore[assignment]
-            entry_counts[rating_int] = entry_counts.get(rating_int, 0) + count
-            entry["total"] = int(entry["total"]) + count  # type: ignore[index]
-            entry["sum"] = entry["sum"] + (Decimal(str(rating_int)) * Decimal(count))  # type: ignore[index]
+        distribution_map = {
+            rating_month.month.strftime("%Y-%m-01"): rating_month
+            for rating_month in rating_months
+        }
 
         points: List[ProviderRatingDistributionPoint] = []
         month_cursor = start_month
@@ -1947,25 +1729,17 @@ class ProviderController:
             if entry is None:
                 counts = {score: 0 for score in range(1, 6)}
                 total_reviews = 0
-                rating_sum = Decimal("0")
+                average_rating: Optional[Decimal] = None
             else:
-                counts = dict(entry["counts"])  # type: ignore[assignment]
-                total_reviews = int(entry["total"])  # type: ignore[arg-type]
-                rating_sum = entry["sum"]  # type: ignore[assignment]
+                counts = entry.counts
+                total_reviews = entry.total_reviews
+                average_rating = entry.average_rating
 
             buckets = [
                 ProviderRatingBucket(rating=score, count=counts.get(score, 0))
                 for score in range(5, 0, -1)
             ]
 
-            if total_reviews > 0:
-                average_decimal = (rating_sum / Decimal(total_reviews)).quantize(
-                    Decimal("0.01"), rounding=ROUND_HALF_UP
-                )
-                average_rating: Optional[Decimal] = average_decimal
-            else:
-                average_rating = None
-
             points.append(
                 ProviderRatingDistributionPoint(
                     month=month_key,
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 import logging
-from typing import List
+from typing import List, Optional
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -26,6 +26,7 @@ from models.ServiceRequestSchemas import (
 from models.User import User
 from services.service_request_service import ServiceRequestService
 from utils.error_handler import error_handler
+from utils.pagination import Page
 
 logger = logging.getLogger(__name__)
 
@@ -44,26 +45,40 @@ class ServiceRequestController:
     @staticmethod
     @error_handler(logger)
     async def list_active_without_service(
-        db: AsyncSession, current_user: User
-    ) -> List[ServiceRequestResponse]:
-        requests = await ServiceRequestService.list_active_without_service(
-            db, client_id=current_user.id
+        db: AsyncSession,
+        current_user: User,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+    ) -> Page[ServiceRequestResponse]:
+        page = await ServiceRequestService.list_active_without_service(
+            db, client_id=current_user.id, limit=limit, cursor=cursor
+        )
+        return Page(
+            items=[
+                ServiceRequestController._build_response(request)
+                for request in page.items
+            ],
+            next_cursor=page.next_cursor,
         )
-        return [
-            ServiceRequestController._build_response(request) for request in requests
-        ]
 
     @staticmethod
     @error_handler(logger)
     async def list_all_for_client(
-        db: AsyncSession, current_user: User
-    ) -> List[ServiceRequestResponse]:
-        requests = await ServiceRequestService.list_all_for_client(
-            db, client_id=current_user.id
+        db: AsyncSession,
+        current_user: User,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+    ) -> Page[ServiceRequestResponse]:
+        page = await ServiceRequestService.list_all_for_client(
+            db, client_id=current_user.id, limit=limit, cursor=cursor
+        )
+        return Page(
+            items=[
+                ServiceRequestController._build_response(request)
+                for request in page.items
+            ],
+            next_cursor=page.next_cursor,
         )
-        return [
-            ServiceRequestController._build_response(request) for request in requests
-        ]
 
     @staticmethod
     @error_handler(logger)
@@ -1,14 +1,22 @@
 from __future__ import annotations
 
+import asyncio
 import json
 import logging
 import re
-from typing import Callable, Iterable, List, Sequence
+from collections import defaultdict
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, Iterable, List, Sequence, Tuple
 
 from sqlalchemy import select
+from sqlalchemy.dialects.mysql import insert as mysql_insert
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
+from sqlalchemy.orm.attributes import set_committed_value
 
-from models import ProviderLicenseTag, ServiceRequestTag, Tag
+from models import ProviderLicenseTag, ServiceRequestTag
+from settings import LICENSE_TAGGING_CONCURRENCY
+from services.tag_registry import tag_registry
 
 logger = logging.getLogger(__name__)
 
@@ -18,16 +26,15 @@ class TagsController:
 
     @classmethod
     async def _get_all_tag_names(cls, db: AsyncSession) -> List[str]:
-        """Obtiene todos los nombres de tags existentes en la BD."""
-        result = await db.execute(select(Tag.name))
-        return [row[0] for row in result.fetchall()]
+        """Obtiene los nombres de tags existentes desde el registro en memoria."""
+        return await tag_registry.names(db)
 
     @classmethod
     async def generate_tags_for_licenses(
         cls,
         db: AsyncSession,
         licenses: Sequence,
-        raw_tag_generator: Callable[[str, List[str]], str],
+        raw_tag_generator: Callable[[str, List[str]], Awaitable[str]],
     ) -> None:
         if not licenses:
             return
@@ -36,33 +43,38 @@ class TagsController:
         existing_tags = await cls._get_all_tag_names(db)
         logger.info(f"Tags existentes para contexto: {len(existing_tags)}")
 
+        # Límite propio del lote para que una carga grande no acapare el cupo global del LLM
+        semaphore = asyncio.Semaphore(LICENSE_TAGGING_CONCURRENCY)
+
+        async def suggest(license_model, prompt: str):
+            async with semaphore:
+                try:
+                    raw_response = await raw_tag_generator(prompt, existing_tags)
+                except Exception:  # pragma: no cover - solo logueamos
+                    logger.exception(
+                        "No se pudo obtener la sugerencia de tags del LLM para la licencia %s",
+                        getattr(license_model, "id", "?"),
+                    )
+                    return license_model, []
+            return license_model, cls._parse_llm_response(raw_response)
+
+        pending = []
         for license_model in licenses:
-            await db.refresh(license_model, attribute_names=["tag_links"])
             prompt = cls._compose_prompt(license_model)
-            if not prompt:
-                continue
-
-            try:
-                raw_response = raw_tag_generator(prompt, existing_tags)
-            except Exception:  # pragma: no cover - solo logueamos
-                logger.exception(
-                    "No se pudo obtener la sugerencia de tags del LLM para la licencia %s",
-                    getattr(license_model, "id", "?"),
-                )
-                continue
-
-            tag_entries = cls._parse_llm_response(raw_response)
-            if not tag_entries:
-                continue
+            if prompt:
+                pending.append(suggest(license_model, prompt))
 
-            await cls._attach_tags(db, license_model, tag_entries)
+        results = await asyncio.gather(*pending)
+        items = [(license_model, entries) for license_model, entries in results if entries]
+        if items:
+            await cls._bulk_attach(db, ProviderLicenseTag, "license_id", items)
 
     @classmethod
     async def generate_tags_for_service_request(
         cls,
         db: AsyncSession,
         service_request,
-        raw_tag_generator: Callable[[str, List[str]], str],
+        raw_tag_generator: Callable[[str, List[str]], Awaitable[str]],
     ) -> None:
         if service_request is None:
             return
@@ -78,14 +90,8 @@ class TagsController:
         if not prompt:
             return
 
-        try:
-            raw_response = raw_tag_generator(prompt, existing_tags)
-        except Exception:  # pragma: no cover - solo logueamos
-            logger.exception(
-                "No se pudo obtener la sugerencia de tags del LLM para la solicitud %s",
-                getattr(service_request, "id", "?"),
-            )
-            return
+        # Los errores del LLM se propagan para que el worker reintente el trabajo
+        raw_response = await raw_tag_generator(prompt, existing_tags)
 
         tag_entries = cls._parse_llm_response(raw_response)
         if not tag_entries:
@@ -177,103 +183,88 @@ class TagsController:
     async def _attach_tags(
         cls, db: AsyncSession, license_model, tag_entries: Iterable[dict]
     ) -> None:
-        existing_tag_ids = {
-            link.tag_id
-            for link in getattr(license_model, "tag_links", [])
-            if link.tag_id
-        }
-
-        created_links: List[ProviderLicenseTag] = []
-
-        for entry in tag_entries:
-            slug = cls._slugify(entry["profession"])
-            if not slug:
-                continue
-
-            tag = await cls._get_or_create_tag(
-                db,
-                slug,
-                entry["profession"],
-                entry.get("description"),
-            )
-            if tag.id in existing_tag_ids:
-                continue
-
-            link = ProviderLicenseTag(
-                license_id=license_model.id,
-                tag_id=tag.id,
-                confidence=entry["confidence"],
-                source="llm",
-            )
-            db.add(link)
-            created_links.append(link)
-            existing_tag_ids.add(tag.id)
-
-        if created_links:
-            await db.commit()
-            await db.refresh(license_model, attribute_names=["tag_links"])
-            for link in created_links:
-                await db.refresh(link, attribute_names=["tag"])
+        await cls._bulk_attach(
+            db, ProviderLicenseTag, "license_id", [(license_model, tag_entries)]
+        )
 
     @classmethod
     async def _attach_request_tags(
         cls, db: AsyncSession, service_request, tag_entries: Iterable[dict]
     ) -> None:
-        existing_tag_ids = {
-            link.tag_id
-            for link in getattr(service_request, "tag_links", [])
-            if link.tag_id
-        }
-
-        created_links: List[ServiceRequestTag] = []
+        await cls._bulk_attach(
+            db, ServiceRequestTag, "request_id", [(service_request, tag_entries)]
+        )
 
-        for entry in tag_entries:
-            slug = cls._slugify(entry["profession"])
-            if not slug:
-                continue
-
-            tag = await cls._get_or_create_tag(
-                db,
-                slug,
-                entry["profession"],
-                entry.get("description"),
-            )
-            if tag.id in existing_tag_ids:
-                continue
+    @classmethod
+    async def _bulk_attach(
+        cls,
+        db: AsyncSession,
+        link_model,
+        parent_column: str,
+        items: Sequence[Tuple[object, Iterable[dict]]],
+    ) -> None:
+        """Vincula tags a uno o más registros con una cantidad fija de consultas.
+
+        Resuelve todos los slugs de una vez, inserta todos los vínculos en un
+        único INSERT multi-fila y deja `tag_links` de cada registro hidratado
+        con un solo SELECT, sin refrescos por vínculo.
+        """
+        prepared = [(parent, cls._with_slugs(entries)) for parent, entries in items]
+        all_entries = [entry for _, entries in prepared for entry in entries]
+        if not all_entries:
+            return
 
-            link = ServiceRequestTag(
-                request_id=service_request.id,
-                tag_id=tag.id,
-                confidence=entry["confidence"],
-                source="llm",
-            )
-            db.add(link)
-            created_links.append(link)
-            existing_tag_ids.add(tag.id)
+        tag_ids = await tag_registry.resolve(db, all_entries)
+
+        now = datetime.utcnow()
+        rows: List[dict] = []
+        for parent, entries in prepared:
+            seen: set[int] = set()
+            for entry in entries:
+                tag_id = tag_ids[entry["slug"]]
+                if tag_id in seen:
+                    continue
+                seen.add(tag_id)
+                rows.append(
+                    {
+                        parent_column: parent.id,
+                        "tag_id": tag_id,
+                        "confidence": entry["confidence"],
+                        "source": "llm",
+                        "created_at": now,
+                    }
+                )
 
-        if created_links:
-            await db.commit()
-            await db.refresh(service_request, attribute_names=["tag_links"])
-            for link in created_links:
-                await db.refresh(link, attribute_names=["tag"])
+        stmt = mysql_insert(link_model).values(rows)
+        # Los vínculos existentes se conservan tal cual (mismo criterio que antes)
+        stmt = stmt.on_duplicate_key_update(tag_id=link_model.tag_id)
+        await db.execute(stmt)
+        await db.commit()
+
+        parent_ids = [parent.id for parent, _ in prepared]
+        parent_fk = getattr(link_model, parent_column)
+        result = await db.execute(
+            select(link_model)
+            .options(joinedload(link_model.tag))
+            .where(parent_fk.in_(parent_ids))
+            .order_by(link_model.id)
+            .execution_options(populate_existing=True)
+        )
+        grouped: Dict[int, list] = defaultdict(list)
+        for link in result.scalars().all():
+            grouped[getattr(link, parent_column)].append(link)
+        for parent, _ in prepared:
+            set_committed_value(parent, "tag_links", grouped.get(parent.id, []))
 
     @classmethod
-    async def _get_or_create_tag(
-        cls, db: AsyncSession, slug: str, name: str, description: str | None
-    ) -> Tag:
-        result = await db.execute(select(Tag).where(Tag.slug == slug))
-        tag = result.scalar_one_or_none()
-        if tag:
-            # Actualizar descripción si está vacía y ahora recibimos una nueva
-            if not tag.description and description:
-                tag.description = description
-                await db.flush()
-            return tag
-
-        tag = Tag(slug=slug, name=name, description=description)
-        db.add(tag)
-        await db.flush()
-        return tag
+    def _with_slugs(cls, tag_entries: Iterable[dict]) -> List[dict]:
+        """Agrega el slug a cada entrada y descarta las que no generan uno."""
+        entries: List[dict] = []
+        for entry in tag_entries:
+            slug = cls._slugify(entry["profession"])
+            if slug:
+                entries.append({**entry, "slug": slug})
+        return entries
 
     @staticmethod
     def _slugify(value: str) -> str:
@@ -1,20 +1,27 @@
 import logging
+import uuid
 from typing import Optional, List
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from fastapi import HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from datetime import datetime, timedelta
+from models.Image import ImageVariant
+from models.ImageUpload import ImageUpload, ImageUploadStatus
 from models.User import User, UserCreate, UserRole, UserUpdate
 from models.Token import Token
 from auth.auth_utils import (
     authenticate_user,
     create_access_token,
+    create_refresh_token,
     get_password_hash,
+    get_user_by_id,
     verify_password,
     decode_token,
 )
-from settings import JWT_EXPIRE_MINUTES
+from auth.principal_cache import principal_cache
+from auth.token_revocation import token_revocation_list
+from settings import JWT_EXPIRE_MINUTES, REFRESH_TOKEN_EXPIRE_DAYS
 from utils.error_handler import error_handler
 
 logger = logging.getLogger(__name__)
@@ -43,20 +50,99 @@ class UserController:
                 detail="Email o contraseña incorrectos",
             )
 
-        access_token_expires = timedelta(minutes=JWT_EXPIRE_MINUTES)
+        return self._issue_tokens(user, session_id=str(uuid.uuid4()))
+
+    @error_handler(
+        {
+            "internal": "Error renovando la sesión",
+        }
+    )
+    async def refresh_access_token(self, db: AsyncSession, refresh_token: str) -> Token:
+        """Rota el refresh token y emite un access token nuevo sin pedir la contraseña.
+
+        Cada refresh token sirve una sola vez. Si llega uno ya rotado se asume
+        que fue robado y se revoca la sesión entera.
+        """
+        payload = decode_token(refresh_token)
+        uid = payload.get("uid")
+        session_id = payload.get("sid")
+        token_id = payload.get("jti")
+        if payload.get("typ") != "refresh" or not (uid and session_id and token_id):
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Refresh token inválido",
+            )
+
+        if await token_revocation_list.is_revoked(db, session_id):
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="La sesión fue cerrada",
+            )
+
+        user = await get_user_by_id(uid, db)
+        if user is None or user.token_version != payload.get("ver", 0):
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="La sesión ya no es válida",
+            )
+
+        rotated = await token_revocation_list.revoke(
+            db,
+            token_id,
+            user_id=uid,
+            expires_at=datetime.utcfromtimestamp(payload["exp"]),
+            reason="rotated",
+        )
+        if not rotated:
+            await token_revocation_list.revoke(
+                db,
+                session_id,
+                user_id=uid,
+                expires_at=datetime.utcnow() + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS),
+                reason="reuse",
+            )
+            logger.warning(
+                "Refresh token reusado para usuario %s; sesión %s revocada",
+                uid,
+                session_id,
+            )
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="La sesión ya no es válida",
+            )
+
+        return self._issue_tokens(user, session_id=session_id)
+
+    @staticmethod
+    def _issue_tokens(user: User, session_id: str) -> Token:
+        """Access token corto más refresh token, ambos atados a la sesión."""
+        role = getattr(user.role, "value", user.role)
         access_token = create_access_token(
             data={
                 "sub": user.email,
-                "role": getattr(user.role, "value", user.role),
+                "role": role,
                 "uid": user.id,
+                "ver": user.token_version,
+                "sid": session_id,
             },
-            expires_delta=access_token_expires,
+            expires_delta=timedelta(minutes=JWT_EXPIRE_MINUTES),
+        )
+        refresh_token = create_refresh_token(
+            data={
+                "sub": user.email,
+                "uid": user.id,
+                "ver": user.token_version,
+                "sid": session_id,
+            },
+            expires_delta=timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS),
         )
         return Token(
             access_token=access_token,
             token_type="bearer",
-            role=getattr(user.role, "value", user.role),
+            role=role,
             user_id=user.id,
+            refresh_token=refresh_token,
+            expires_in=JWT_EXPIRE_MINUTES * 60,
         )
 
     @staticmethod
@@ -69,7 +155,7 @@ class UserController:
         }
     )
     async def create_user(db: AsyncSession, user_data: UserCreate) -> User:
-        password_hash = get_password_hash(user_data.password)
+        password_hash = await get_password_hash(user_data.password)
 
         new_user = User(
             role=user_data.role.value,
@@ -120,7 +206,11 @@ class UserController:
 
         if user:
             user.is_active = is_active
+            if not is_active:
+                # Los tokens ya emitidos dejan de valer al desactivar
+                user.token_version = (user.token_version or 0) + 1
             await db.commit()
+            principal_cache.invalidate(user_id)
             return True
         return False
 
@@ -159,6 +249,7 @@ class UserController:
                 setattr(user, field, value)
 
         await db.commit()
+        principal_cache.invalidate(user_id)
         await db.refresh(user)
         return user
 
@@ -182,14 +273,17 @@ class UserController:
                 detail="Usuario no encontrado",
             )
 
-        if not verify_password(current_password, user.password_hash):
+        if not await verify_password(current_password, user.password_hash):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="La contraseña actual es incorrecta",
             )
 
-        user.password_hash = get_password_hash(new_password)
+        user.password_hash = await get_password_hash(new_password)
+        # Cierra las sesiones abiertas con la contraseña anterior
+        user.token_version = (user.token_version or 0) + 1
         await db.commit()
+        principal_cache.invalidate(user_id)
         return True
 
     @error_handler()
@@ -199,6 +293,7 @@ class UserController:
         user: User,
         s3_key: str,
         public_url: str,
+        variants: Optional[List[ImageVariant]] = None,
     ) -> User:
         from services.s3_service import s3_service
 
@@ -206,12 +301,25 @@ class UserController:
             getattr(user, "profile_image_s3_key", None)
             and user.profile_image_s3_key != s3_key
         ):
-            s3_service.delete_image(user.profile_image_s3_key)
+            await s3_service.delete_images(self._profile_image_keys(user))
+
+        if variants is None:
+            # Subida directa: las variantes pueden estar listas o llegar después
+            variants = (
+                await db.execute(
+                    select(ImageUpload.variants).where(
+                        ImageUpload.s3_key == s3_key,
+                        ImageUpload.user_id == user.id,
+                        ImageUpload.status == ImageUploadStatus.READY,
+                    )
+                )
+            ).scalar_one_or_none()
 
         update_data = UserUpdate(
             profile_image_s3_key=s3_key,
             profile_image_url=public_url,
             profile_image_uploaded_at=datetime.now(),
+            profile_image_variants=variants,
         )
 
         updated_user = await self.update_user_profile(db, user.id, update_data)
@@ -235,7 +343,9 @@ class UserController:
                 detail="El usuario no tiene imagen de perfil para eliminar",
             )
 
-        success = s3_service.delete_image(current_user.profile_image_s3_key)
+        success = await s3_service.delete_images(
+            self._profile_image_keys(current_user)
+        )
         if not success:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -249,13 +359,23 @@ class UserController:
                 profile_image_s3_key=None,
                 profile_image_url=None,
                 profile_image_uploaded_at=None,
+                profile_image_variants=None,
             ),
         )
 
         return updated_user
 
-    async def logout(self, token: Optional[str]) -> None:
-        """Registra la salida de sesión; la invalidación se completa en el cliente."""
+    @staticmethod
+    def _profile_image_keys(user: User) -> List[str]:
+        """Clave principal de la imagen de perfil más las de sus variantes."""
+        keys = [user.profile_image_s3_key]
+        keys.extend(
+            variant.get("s3_key") for variant in user.profile_image_variants or []
+        )
+        return [key for key in keys if key]
+
+    async def logout(self, db: AsyncSession, token: Optional[str]) -> None:
+        """Cierra la sesión del token: sus access y refresh tokens dejan de valer."""
 
         if not token:
             logger.info("Logout solicitado sin token adjunto; se omite validación")
@@ -275,6 +395,19 @@ class UserController:
 
         subject = payload.get("sub")
         uid = payload.get("uid")
+        session_id = payload.get("sid")
+        if uid and session_id:
+            try:
+                await token_revocation_list.revoke(
+                    db,
+                    session_id,
+                    user_id=uid,
+                    expires_at=datetime.utcnow()
+                    + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS),
+                    reason="logout",
+                )
+            except Exception:
+                logger.exception("No se pudo revocar la sesión %s", session_id)
         logger.info("Sesión finalizada para usuario %s (uid=%s)", subject, uid)
 
 
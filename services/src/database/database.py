@@ -2,18 +2,44 @@ from sqlalchemy.ext.asyncio import (
     create_async_engine,
     async_sessionmaker,
     AsyncAttrs,
+    AsyncEngine,
     AsyncSession,
 )
 from sqlalchemy.orm import DeclarativeBase
 from typing import AsyncGenerator
 import settings
+from database.pool import PRE_PING_POLICIES, install_idle_ping, metered_pool_class
 
 
 class Base(AsyncAttrs, DeclarativeBase):
     pass
 
 
-engine = create_async_engine(settings.CONNECTION_STRING, echo=False, pool_pre_ping=True)
+if settings.DB_POOL_PRE_PING not in PRE_PING_POLICIES:
+    raise ValueError(
+        f"DB_POOL_PRE_PING debe ser uno de {PRE_PING_POLICIES}, "
+        f"no {settings.DB_POOL_PRE_PING!r}"
+    )
+
+
+def create_pooled_engine(url: str, name: str) -> AsyncEngine:
+    """Crea un engine async con el pool y la política de pre-ping de settings."""
+    pooled_engine = create_async_engine(
+        url,
+        echo=False,
+        poolclass=metered_pool_class(name),
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+        pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+        pool_pre_ping=settings.DB_POOL_PRE_PING == "always",
+    )
+    if settings.DB_POOL_PRE_PING == "idle":
+        install_idle_ping(pooled_engine, settings.DB_POOL_PRE_PING_IDLE_SECONDS)
+    return pooled_engine
+
+
+engine = create_pooled_engine(settings.CONNECTION_STRING, "primary")
 AsyncSessionLocal = async_sessionmaker(engine, expire_on_commit=False)
 
 
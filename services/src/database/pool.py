@@ -0,0 +1,101 @@
+"""Pool de conexiones a MySQL con métricas y pre-ping configurable.
+
+`pool_pre_ping=True` hace un ping en cada checkout, o sea un round-trip más
+por request. Con la política "idle" sólo se hace ping a las conexiones que
+estuvieron ociosas en el pool más de `DB_POOL_PRE_PING_IDLE_SECONDS`, que
+son las que pudo haber cerrado el servidor o un proxy; `pool_recycle`
+descarta además las que superan cierta edad.
+"""
+
+from __future__ import annotations
+
+import time
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Type
+
+from sqlalchemy import event
+from sqlalchemy.exc import DisconnectionError
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+PRE_PING_POLICIES = ("always", "idle", "never")
+
+
+@dataclass
+class PoolStats:
+    checkouts: int = 0
+    timeouts: int = 0
+    total_wait_seconds: float = 0.0
+    max_wait_seconds: float = 0.0
+    pings: int = 0
+    ping_failures: int = 0
+
+
+class MeteredAsyncPool(AsyncAdaptedQueuePool):
+    """QueuePool async que mide cuánto se espera por una conexión libre.
+
+    Las métricas viven en la clase (ver `metered_pool_class`): `engine.dispose()`
+    recrea el pool con `self.__class__` y así no se pierde lo medido.
+    """
+
+    stats: PoolStats = PoolStats()
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except Exception:
+            self.stats.timeouts += 1
+            raise
+        waited = time.perf_counter() - started
+        self.stats.checkouts += 1
+        self.stats.total_wait_seconds += waited
+        self.stats.max_wait_seconds = max(self.stats.max_wait_seconds, waited)
+        return connection
+
+
+def metered_pool_class(name: str) -> Type[MeteredAsyncPool]:
+    """Subclase de `MeteredAsyncPool` con métricas propias para un engine."""
+    return type(f"MeteredAsyncPool_{name}", (MeteredAsyncPool,), {"stats": PoolStats()})
+
+
+def install_idle_ping(engine: AsyncEngine, idle_seconds: float) -> None:
+    """Hace ping al sacar del pool una conexión ociosa por más de `idle_seconds`.
+
+    Si el ping falla se lanza `DisconnectionError` y el pool descarta la
+    conexión y reintenta con otra, igual que el pre-ping de SQLAlchemy.
+    """
+    sync_engine = engine.sync_engine
+    stats = engine.pool.stats
+
+    @event.listens_for(sync_engine, "checkin")
+    def _mark_idle(dbapi_connection, connection_record):
+        connection_record.info["checked_in_at"] = time.monotonic()
+
+    @event.listens_for(sync_engine, "checkout")
+    def _ping_if_idle(dbapi_connection, connection_record, connection_proxy):
+        checked_in_at = connection_record.info.get("checked_in_at")
+        # Conexión recién abierta: no hace falta comprobarla
+        if checked_in_at is None or time.monotonic() - checked_in_at < idle_seconds:
+            return
+        stats.pings += 1
+        try:
+            sync_engine.dialect.do_ping(dbapi_connection)
+        except Exception as exc:
+            stats.ping_failures += 1
+            raise DisconnectionError(f"Conexión ociosa caída: {exc}") from exc
+
+
+def pool_metrics(engine: AsyncEngine) -> Dict[str, Any]:
+    pool = engine.pool
+    stats = pool.stats
+    checkouts = stats.checkouts
+    return {
+        "driver": engine.dialect.driver,
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        "overflow": pool.overflow(),
+        "avg_wait_seconds": stats.total_wait_seconds / checkouts if checkouts else 0.0,
+        **asdict(stats),
+    }
@@ -0,0 +1,250 @@
+"""Ruteo de lecturas a la réplica de MySQL.
+
+Los endpoints de listados y estadísticas usan `get_read_db`, que entrega una
+sesión contra la réplica salvo que:
+
+- no haya réplica configurada,
+- la réplica esté caída, sin replicar o con más demora que
+  `DB_REPLICA_MAX_LAG_SECONDS` (lo mide un task en segundo plano), o
+- el cliente haya hecho un POST/PUT/PATCH/DELETE en los últimos
+  `DB_READ_YOUR_WRITES_SECONDS`, para que vea lo que acaba de escribir.
+
+En esos casos se usa el primario. La marca de la última escritura viaja con
+el cliente y no en memoria del proceso: cada respuesta a una escritura trae
+la hora en el header `X-Last-Write` y en una cookie del mismo valor, y
+cualquier worker la lee del header (si la app lo reenvía) o de la cookie.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import math
+import time
+from typing import Any, AsyncGenerator, Callable, Dict, Optional
+
+from fastapi import Depends, Request
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, AsyncSession, async_sessionmaker
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.dml import UpdateBase
+from sqlalchemy.sql.elements import TextClause
+
+import settings
+from auth.auth_utils import get_current_user
+from database.database import AsyncSessionLocal, create_pooled_engine, engine
+from models.User import User
+
+logger = logging.getLogger(__name__)
+
+SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+LAST_WRITE_HEADER = "X-Last-Write"
+LAST_WRITE_COOKIE = "fs_last_write"
+# Diferencia de reloj tolerada entre workers; una marca más adelantada se ignora
+_MAX_CLOCK_SKEW_SECONDS = 2.0
+
+replica_engine: Optional[AsyncEngine] = (
+    create_pooled_engine(settings.REPLICA_CONNECTION_STRING, "replica")
+    if settings.REPLICA_CONNECTION_STRING
+    else None
+)
+
+
+class ReplicaSession(Session):
+    """Lee de la réplica; desde la primera escritura toda la sesión usa el primario.
+
+    Así lo que el request escribe, y lo que relee después (por ejemplo con
+    `refresh`), no depende de la demora de la réplica.
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if (
+            self._flushing
+            or isinstance(clause, (UpdateBase, TextClause))
+            or getattr(clause, "_for_update_arg", None) is not None
+        ):
+            self.info["primary"] = True
+        if self.info.get("primary") or replica_engine is None:
+            return engine.sync_engine
+        return replica_engine.sync_engine
+
+
+ReplicaSessionLocal = async_sessionmaker(
+    sync_session_class=ReplicaSession, expire_on_commit=False
+)
+
+
+async def _replica_lag(conn: AsyncConnection) -> Optional[float]:
+    """Segundos de demora de la réplica; None si la replicación está detenida."""
+    if conn.dialect.name != "mysql":
+        # Réplicas de prueba (p. ej. SQLite): sólo se comprueba que respondan
+        await conn.execute(text("SELECT 1"))
+        return 0.0
+
+    try:
+        row = (await conn.execute(text("SHOW REPLICA STATUS"))).mappings().first()
+    except DBAPIError:
+        # MySQL < 8.0.22 y MariaDB
+        row = (await conn.execute(text("SHOW SLAVE STATUS"))).mappings().first()
+    if row is None:
+        # El servidor no replica de nadie: sus datos son los del primario
+        return 0.0
+    lag = row.get("Seconds_Behind_Source", row.get("Seconds_Behind_Master"))
+    return None if lag is None else float(lag)
+
+
+class ReplicaRouter:
+    """Decide por request si se lee de la réplica y vigila su demora."""
+
+    def __init__(
+        self,
+        replica: Optional[AsyncEngine] = replica_engine,
+        *,
+        max_lag: float = settings.DB_REPLICA_MAX_LAG_SECONDS,
+        check_interval: float = settings.DB_REPLICA_CHECK_SECONDS,
+        sticky_seconds: float = settings.DB_READ_YOUR_WRITES_SECONDS,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.replica = replica
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self.sticky_seconds = sticky_seconds
+        # Hora de pared: la marca se compara entre workers y hosts distintos
+        self.clock = clock
+        # Hasta la primera medición se lee del primario
+        self.healthy = False
+        self.lag: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self._task: asyncio.Task | None = None
+        self._counters = {"replica_reads": 0, "primary_reads": 0, "sticky_reads": 0}
+
+    @property
+    def enabled(self) -> bool:
+        return self.replica is not None
+
+    @staticmethod
+    def last_write_at(request: Request) -> Optional[float]:
+        """Marca de la última escritura que envía el cliente (header o cookie)."""
+        value = request.headers.get(LAST_WRITE_HEADER) or request.cookies.get(
+            LAST_WRITE_COOKIE
+        )
+        if not value:
+            return None
+        try:
+            last_write = float(value)
+        except ValueError:
+            return None
+        return last_write if math.isfinite(last_write) else None
+
+    def is_sticky(self, last_write_at: Optional[float]) -> bool:
+        if last_write_at is None:
+            return False
+        now = self.clock()
+        return now - self.sticky_seconds < last_write_at <= now + _MAX_CLOCK_SKEW_SECONDS
+
+    def use_replica(self, last_write_at: Optional[float] = None) -> bool:
+        if not self.enabled or not self.healthy:
+            self._counters["primary_reads"] += 1
+            return False
+        if self.is_sticky(last_write_at):
+            self._counters["sticky_reads"] += 1
+            return False
+        self._counters["replica_reads"] += 1
+        return True
+
+    async def track_writes(self, request: Request, call_next):
+        """Middleware: devuelve la hora de cada request que puede escribir."""
+        response = await call_next(request)
+        if request.method in SAFE_METHODS:
+            return response
+
+        stamp = f"{self.clock():.3f}"
+        response.headers[LAST_WRITE_HEADER] = stamp
+        response.set_cookie(
+            LAST_WRITE_COOKIE,
+            stamp,
+            max_age=math.ceil(self.sticky_seconds),
+            httponly=True,
+            samesite="lax",
+        )
+        return response
+
+    async def start(self) -> None:
+        if not self.enabled:
+            return
+        if self._task is None or self._task.done():
+            await self.check_lag()
+            self._task = asyncio.create_task(self._run(), name="replica-monitor")
+            logger.info("Monitor de la réplica de lectura iniciado")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            logger.info("Monitor de la réplica de lectura detenido")
+        if self.replica is not None:
+            await self.replica.dispose()
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.check_interval)
+            await self.check_lag()
+
+    async def check_lag(self) -> None:
+        """Mide la demora y habilita o no las lecturas en la réplica."""
+        try:
+            async with self.replica.connect() as conn:
+                self.lag = await _replica_lag(conn)
+            self.last_error = None
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            self.lag = None
+            self.last_error = f"{type(exc).__name__}: {exc}"[:500]
+
+        healthy = self.lag is not None and self.lag <= self.max_lag
+        if healthy != self.healthy:
+            if healthy:
+                logger.info("Réplica de lectura habilitada (demora %.1fs)", self.lag)
+            else:
+                logger.warning(
+                    "Réplica de lectura deshabilitada, se lee del primario (demora %s, error %s)",
+                    self.lag,
+                    self.last_error,
+                )
+        self.healthy = healthy
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "healthy": self.healthy,
+            "lag_seconds": self.lag,
+            "last_error": self.last_error,
+            **self._counters,
+        }
+
+
+replica_router = ReplicaRouter()
+
+
+async def get_read_db(
+    request: Request,
+    current_user: User = Depends(get_current_user),
+) -> AsyncGenerator[AsyncSession, None]:
+    """Sesión para endpoints autenticados de sólo lectura (réplica o primario)."""
+    use_replica = replica_router.use_replica(ReplicaRouter.last_write_at(request))
+    session_factory = ReplicaSessionLocal if use_replica else AsyncSessionLocal
+    async with session_factory() as session:
+        # Igual que en la sesión de auth: las relaciones hacia el usuario
+        # (p. ej. `ServiceRequest.client`) se resuelven desde el identity map.
+        # El identity map guarda referencias débiles, así que se retiene acá
+        session.info["current_user"] = await session.merge(current_user, load=False)
+        try:
+            yield session
+        finally:
+            await session.close()
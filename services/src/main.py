@@ -4,11 +4,29 @@ Sistema de gestión de servicios con autenticación JWT.
 """
 
 import logging
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from routers import router
+from database.replica import LAST_WRITE_HEADER, replica_router
+from routers import health_router, router
 from utils import global_exception_handler, log
-from settings import LOG_LEVEL
+from settings import (
+    IMAGE_VARIANT_WORKER_ENABLED,
+    LOG_LEVEL,
+    NOTIFICATION_DISPATCHER_ENABLED,
+    PUSH_RECEIPT_WORKER_ENABLED,
+    SCHEDULER_ENABLED,
+    TAG_WORKER_ENABLED,
+)
+from services.expiration_scheduler import expiration_scheduler
+from services.http_client import outbound_http
+from services.image_variant_worker import image_variant_worker
+from services.llm_cache import llm_response_cache
+from services.notification_dispatcher import notification_dispatcher
+from services.offload import shutdown_executors
+from services.push_receipt_worker import push_receipt_worker
+from services.tag_generation_worker import tag_generation_worker
+from utils.pagination import NEXT_CURSOR_HEADER
 
 logging.basicConfig(
     level=getattr(logging, LOG_LEVEL.upper()),
@@ -18,6 +36,35 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Arranca y detiene los procesos en segundo plano de la API."""
+    await outbound_http.start()
+    await replica_router.start()
+    if NOTIFICATION_DISPATCHER_ENABLED:
+        await notification_dispatcher.start()
+    if PUSH_RECEIPT_WORKER_ENABLED:
+        await push_receipt_worker.start()
+    if TAG_WORKER_ENABLED:
+        await tag_generation_worker.start()
+    if SCHEDULER_ENABLED:
+        await expiration_scheduler.start()
+    if IMAGE_VARIANT_WORKER_ENABLED:
+        await image_variant_worker.start()
+    try:
+        yield
+    finally:
+        await image_variant_worker.stop()
+        await expiration_scheduler.stop()
+        await tag_generation_worker.stop()
+        await push_receipt_worker.stop()
+        await notification_dispatcher.stop()
+        await llm_response_cache.flush_hits()
+        shutdown_executors()
+        await replica_router.stop()
+        await outbound_http.stop()
+
+
 def create_app() -> FastAPI:
     """
     Crear y configurar la aplicación FastAPI.
@@ -31,6 +78,7 @@ def create_app() -> FastAPI:
         version="1.0.0",
         docs_url="/docs",
         redoc_url="/redoc",
+        lifespan=lifespan,
     )
 
     app.add_exception_handler(Exception, global_exception_handler)
@@ -41,11 +89,15 @@ def create_app() -> FastAPI:
         allow_credentials=True,
         allow_methods=["GET", "POST", "PUT", "DELETE"],
         allow_headers=["*"],
+        expose_headers=[NEXT_CURSOR_HEADER, LAST_WRITE_HEADER],
     )
 
     app.middleware("http")(log.log_requests)
+    if replica_router.enabled:
+        app.middleware("http")(replica_router.track_writes)
 
     app.include_router(router.router)
+    app.include_router(health_router.router, tags=["health"], include_in_schema=False)
 
     @app.get("/health", tags=["health"])
     async def health_check():
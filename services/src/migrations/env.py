@@ -33,6 +33,14 @@ from models.ServiceRequest import (
     ServiceStatusHistory,
 )  # noqa
 from models.Tag import Tag, ServiceRequestTag, ProviderLicenseTag
+from models.TagGenerationJob import TagGenerationJob  # noqa
+from models.LLMResponseCache import LLMResponseCache  # noqa
+from models.ProviderRequestMatch import ProviderRequestMatch  # noqa
+from models.ProviderKpiMonthly import ProviderKpiMonthly  # noqa
+from models.NotificationOutbox import NotificationOutbox  # noqa
+from models.PushTicket import PushTicket  # noqa
+from models.ImageUpload import ImageUpload  # noqa
+from models.RevokedToken import RevokedToken  # noqa
 # Agregá aquí cualquier modelo nuevo que crees en el futuro
 
 # this is the Alembic Config object
@@ -83,8 +91,8 @@ def run_migrations_online() -> None:
 
     # Crear engine síncrono para Alembic (Alembic no soporta async aún)
     connectable = create_engine(
-        settings.CONNECTION_STRING.replace(
-            "+aiomysql", "+pymysql"
+        settings.CONNECTION_STRING.replace("+aiomysql", "+pymysql").replace(
+            "+asyncmy", "+pymysql"
         ),  # Usar pymysql para sincronía
         poolclass=pool.NullPool,
     )
@@ -0,0 +1,36 @@
+"""add_client_listing_indexes
+
+Revision ID: add_client_list_idx
+Revises: add_llm_cache
+Create Date: 2026-10-17 12:00:00.000000
+
+Índices para la paginación keyset de los listados del cliente.
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_client_list_idx'
+down_revision = 'add_llm_cache'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Crear índices por cliente para historial y solicitudes activas."""
+    op.create_index(
+        'ix_service_requests_client_updated',
+        'service_requests',
+        ['client_id', 'updated_at'],
+    )
+    op.create_index(
+        'ix_service_requests_client_status_created',
+        'service_requests',
+        ['client_id', 'status', 'created_at'],
+    )
+
+
+def downgrade() -> None:
+    """Eliminar los índices de listados del cliente."""
+    op.drop_index('ix_service_requests_client_status_created', table_name='service_requests')
+    op.drop_index('ix_service_requests_client_updated', table_name='service_requests')
@@ -0,0 +1,55 @@
+"""add_expiration_due_indexes
+
+Revision ID: add_expiration_due_indexes
+Revises: add_rating_histograms
+Create Date: 2026-10-17 18:00:00.000000
+
+Índices por fecha de vencimiento para el scheduler de licitaciones,
+presupuestos y garantías, y la marca `warranty_closed_at` de garantías ya
+procesadas.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_expiration_due_indexes'
+down_revision = 'add_rating_histograms'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Agregar warranty_closed_at y los índices de vencimiento."""
+    op.add_column(
+        'services',
+        sa.Column(
+            'warranty_closed_at',
+            sa.DateTime(),
+            nullable=True,
+            comment='Cuándo el scheduler procesó el vencimiento de la garantía',
+        ),
+    )
+    op.create_index(
+        'ix_service_requests_bidding_due',
+        'service_requests',
+        ['status', 'request_type', 'bidding_deadline'],
+    )
+    op.create_index(
+        'ix_proposals_status_valid_until',
+        'service_request_proposals',
+        ['status', 'valid_until'],
+    )
+    op.create_index(
+        'ix_services_warranty_due',
+        'services',
+        ['warranty_closed_at', 'warranty_expires_at'],
+    )
+
+
+def downgrade() -> None:
+    """Eliminar los índices de vencimiento y warranty_closed_at."""
+    op.drop_index('ix_services_warranty_due', table_name='services')
+    op.drop_index('ix_proposals_status_valid_until', table_name='service_request_proposals')
+    op.drop_index('ix_service_requests_bidding_due', table_name='service_requests')
+    op.drop_column('services', 'warranty_closed_at')
@@ -0,0 +1,69 @@
+"""add_image_uploads
+
+Revision ID: add_image_uploads
+Revises: add_image_variants
+Create Date: 2026-10-17 22:00:00.000000
+
+Sesiones de subida directa a MinIO con URLs firmadas. También indexa
+service_request_images.s3_key para que el worker de variantes complete las
+imágenes ya adjuntas.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_image_uploads'
+down_revision = 'add_image_variants'
+branch_labels = None
+depends_on = None
+
+IMAGE_UPLOAD_STATUS = sa.Enum(
+    'PENDING',
+    'UPLOADED',
+    'PROCESSING',
+    'READY',
+    'FAILED',
+    'EXPIRED',
+    name='image_upload_status',
+)
+
+
+def upgrade() -> None:
+    """Crear image_uploads y el índice por clave de service_request_images."""
+    op.create_table(
+        'image_uploads',
+        sa.Column('id', sa.String(length=36), nullable=False),
+        sa.Column('user_id', sa.BigInteger(), nullable=False),
+        sa.Column('purpose', sa.String(length=20), nullable=False),
+        sa.Column('s3_key', sa.String(length=255), nullable=False),
+        sa.Column('content_type', sa.String(length=50), nullable=False),
+        sa.Column('declared_size', sa.Integer(), nullable=False),
+        sa.Column('size', sa.Integer(), nullable=True),
+        sa.Column('status', IMAGE_UPLOAD_STATUS, nullable=False),
+        sa.Column('variants', sa.JSON(), nullable=True),
+        sa.Column('attempts', sa.SmallInteger(), nullable=False, server_default='0'),
+        sa.Column('last_error', sa.String(length=500), nullable=True),
+        sa.Column('run_after', sa.DateTime(), nullable=False),
+        sa.Column('locked_at', sa.DateTime(), nullable=True),
+        sa.Column('expires_at', sa.DateTime(), nullable=False),
+        sa.Column('completed_at', sa.DateTime(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('s3_key'),
+    )
+    op.create_index(
+        'ix_image_uploads_status_run_after', 'image_uploads', ['status', 'run_after']
+    )
+    op.create_index(
+        'ix_service_request_images_s3_key', 'service_request_images', ['s3_key']
+    )
+
+
+def downgrade() -> None:
+    """Eliminar image_uploads y el índice por clave."""
+    op.drop_index('ix_service_request_images_s3_key', table_name='service_request_images')
+    op.drop_index('ix_image_uploads_status_run_after', table_name='image_uploads')
+    op.drop_table('image_uploads')
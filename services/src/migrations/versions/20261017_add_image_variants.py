@@ -0,0 +1,38 @@
+"""add_image_variants
+
+Revision ID: add_image_variants
+Revises: add_push_tickets
+Create Date: 2026-10-17 21:00:00.000000
+
+Guarda las variantes (miniatura, tarjeta y completa en WebP/AVIF) de las
+imágenes de perfil y de las imágenes de solicitudes.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_image_variants'
+down_revision = 'add_push_tickets'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Agregar users.profile_image_variants y service_request_images.variants."""
+    op.add_column(
+        'users',
+        sa.Column(
+            'profile_image_variants',
+            sa.JSON(),
+            nullable=True,
+            comment='Variantes de la imagen de perfil (tamaños y formatos)',
+        ),
+    )
+    op.add_column('service_request_images', sa.Column('variants', sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    """Eliminar las columnas de variantes."""
+    op.drop_column('service_request_images', 'variants')
+    op.drop_column('users', 'profile_image_variants')
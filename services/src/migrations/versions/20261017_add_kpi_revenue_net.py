@@ -0,0 +1,33 @@
+"""add_kpi_revenue_net
+
+Revision ID: add_kpi_revenue_net
+Revises: add_provider_kpis
+Create Date: 2026-10-17 16:00:00.000000
+
+Agrega al rollup de KPIs la suma de precios netos para servir la serie
+mensual de ingresos. Después de aplicar la migración hay que recalcularlo:
+
+    python -m services.provider_kpis rebuild
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_kpi_revenue_net'
+down_revision = 'add_provider_kpis'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Agregar la columna revenue_net."""
+    op.add_column(
+        'provider_kpi_monthly',
+        sa.Column('revenue_net', sa.Numeric(precision=18, scale=6), nullable=False, server_default='0'),
+    )
+
+
+def downgrade() -> None:
+    """Eliminar la columna revenue_net."""
+    op.drop_column('provider_kpi_monthly', 'revenue_net')
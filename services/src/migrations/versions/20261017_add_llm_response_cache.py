@@ -0,0 +1,44 @@
+"""add_llm_response_cache
+
+Revision ID: add_llm_cache
+Revises: add_tag_gen_jobs
+Create Date: 2026-10-17 11:00:00.000000
+
+Crea la tabla de caché persistente de respuestas del LLM.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_llm_cache'
+down_revision = 'add_tag_gen_jobs'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Crear la tabla llm_response_cache."""
+    op.create_table(
+        'llm_response_cache',
+        sa.Column('cache_key', sa.CHAR(length=64), nullable=False),
+        sa.Column('template', sa.String(length=64), nullable=False),
+        sa.Column('model', sa.String(length=64), nullable=False),
+        sa.Column('response', sa.Text(), nullable=False),
+        sa.Column('hit_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('expires_at', sa.DateTime(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=True),
+        sa.PrimaryKeyConstraint('cache_key'),
+    )
+    op.create_index(
+        'ix_llm_response_cache_expires_at',
+        'llm_response_cache',
+        ['expires_at'],
+    )
+
+
+def downgrade() -> None:
+    """Eliminar la tabla llm_response_cache."""
+    op.drop_index('ix_llm_response_cache_expires_at', table_name='llm_response_cache')
+    op.drop_table('llm_response_cache')
@@ -0,0 +1,52 @@
+"""add_match_distance
+
+Revision ID: add_match_distance
+Revises: add_match_index
+Create Date: 2026-10-17 14:00:00.000000
+
+Agrega la distancia prestador→solicitud al índice de matching y la suma al
+orden del feed. Después de aplicar la migración hay que recalcularlo:
+
+    python -m services.match_index rebuild
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_match_distance'
+down_revision = 'add_match_index'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Agregar columnas de distancia y rehacer el índice del feed."""
+    op.add_column(
+        'provider_request_matches',
+        sa.Column('distance_rank', sa.Integer(), nullable=False, server_default='0'),
+    )
+    op.add_column(
+        'provider_request_matches',
+        sa.Column('distance_km', sa.Numeric(precision=7, scale=2), nullable=True),
+    )
+    # El índice del feed empieza con provider_profile_id y sirve a su FK,
+    # así que se crea el nuevo antes de eliminar el anterior.
+    op.create_index(
+        'ix_provider_request_matches_feed_geo',
+        'provider_request_matches',
+        ['provider_profile_id', 'segment', 'type_rank', 'score_rank', 'distance_rank', 'created_rank', 'request_id'],
+    )
+    op.drop_index('ix_provider_request_matches_feed', table_name='provider_request_matches')
+
+
+def downgrade() -> None:
+    """Quitar columnas de distancia y restaurar el índice del feed."""
+    op.create_index(
+        'ix_provider_request_matches_feed',
+        'provider_request_matches',
+        ['provider_profile_id', 'segment', 'type_rank', 'score_rank', 'created_rank', 'request_id'],
+    )
+    op.drop_index('ix_provider_request_matches_feed_geo', table_name='provider_request_matches')
+    op.drop_column('provider_request_matches', 'distance_km')
+    op.drop_column('provider_request_matches', 'distance_rank')
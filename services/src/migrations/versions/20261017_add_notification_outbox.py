@@ -0,0 +1,55 @@
+"""add_notification_outbox
+
+Revision ID: add_notification_outbox
+Revises: add_expiration_due_indexes
+Create Date: 2026-10-17 19:00:00.000000
+
+Crea el outbox de notificaciones push que procesa el dispatcher.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_notification_outbox'
+down_revision = 'add_expiration_due_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Crear la tabla notification_outbox."""
+    op.create_table(
+        'notification_outbox',
+        sa.Column('id', sa.BigInteger(), autoincrement=True, nullable=False),
+        sa.Column('user_id', sa.BigInteger(), nullable=False),
+        sa.Column('title', sa.String(length=255), nullable=False),
+        sa.Column('body', sa.Text(), nullable=False),
+        sa.Column('data', sa.JSON(), nullable=True),
+        sa.Column('sound', sa.String(length=20), nullable=True),
+        sa.Column(
+            'status',
+            sa.Enum('PENDING', 'RUNNING', 'SENT', 'FAILED', name='notification_status'),
+            nullable=False,
+        ),
+        sa.Column('attempts', sa.SmallInteger(), nullable=False, server_default='0'),
+        sa.Column('last_error', sa.String(length=500), nullable=True),
+        sa.Column('run_after', sa.DateTime(), nullable=False),
+        sa.Column('locked_at', sa.DateTime(), nullable=True),
+        sa.Column('sent_at', sa.DateTime(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(
+        'ix_notification_outbox_status_run_after',
+        'notification_outbox',
+        ['status', 'run_after'],
+    )
+
+
+def downgrade() -> None:
+    """Eliminar la tabla notification_outbox."""
+    op.drop_index('ix_notification_outbox_status_run_after', table_name='notification_outbox')
+    op.drop_table('notification_outbox')
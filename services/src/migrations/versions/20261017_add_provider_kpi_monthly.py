@@ -0,0 +1,47 @@
+"""add_provider_kpi_monthly
+
+Revision ID: add_provider_kpis
+Revises: add_match_distance
+Create Date: 2026-10-17 15:00:00.000000
+
+Crea el rollup mensual de KPIs por prestador y moneda. Después de aplicar la
+migración hay que poblarlo desde las tablas de origen:
+
+    python -m services.provider_kpis rebuild
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_provider_kpis'
+down_revision = 'add_match_distance'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Crear la tabla provider_kpi_monthly."""
+    op.create_table(
+        'provider_kpi_monthly',
+        sa.Column('provider_profile_id', sa.BigInteger(), nullable=False),
+        sa.Column('currency', sa.String(length=3), nullable=False, server_default=''),
+        sa.Column('month', sa.Date(), nullable=False),
+        sa.Column('services_total', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('services_completed', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('proposals_total', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('proposals_accepted', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('revenue_services', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('revenue_gross', sa.Numeric(precision=14, scale=2), nullable=False, server_default='0'),
+        sa.Column('reviews_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('rating_sum', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('last_completed_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=True),
+        sa.ForeignKeyConstraint(['provider_profile_id'], ['provider_profiles.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('provider_profile_id', 'currency', 'month'),
+    )
+
+
+def downgrade() -> None:
+    """Eliminar la tabla provider_kpi_monthly."""
+    op.drop_table('provider_kpi_monthly')
@@ -0,0 +1,55 @@
+"""add_provider_request_matches
+
+Revision ID: add_match_index
+Revises: add_client_list_idx
+Create Date: 2026-10-17 13:00:00.000000
+
+Crea el índice materializado prestador→solicitud que sirve el feed de
+solicitudes compatibles. Después de aplicar la migración hay que poblarlo:
+
+    python -m services.match_index rebuild
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_match_index'
+down_revision = 'add_client_list_idx'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Crear la tabla provider_request_matches."""
+    op.create_table(
+        'provider_request_matches',
+        sa.Column('provider_profile_id', sa.BigInteger(), nullable=False),
+        sa.Column('request_id', sa.BigInteger(), nullable=False),
+        sa.Column('segment', sa.SmallInteger(), nullable=False),
+        sa.Column('type_rank', sa.SmallInteger(), nullable=False),
+        sa.Column('score_rank', sa.Integer(), nullable=False),
+        sa.Column('created_rank', sa.BigInteger(), nullable=False),
+        sa.Column('score', sa.Numeric(precision=5, scale=4), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=True),
+        sa.ForeignKeyConstraint(['provider_profile_id'], ['provider_profiles.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['request_id'], ['service_requests.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('provider_profile_id', 'request_id'),
+    )
+    op.create_index(
+        'ix_provider_request_matches_feed',
+        'provider_request_matches',
+        ['provider_profile_id', 'segment', 'type_rank', 'score_rank', 'created_rank', 'request_id'],
+    )
+    op.create_index(
+        'ix_provider_request_matches_request',
+        'provider_request_matches',
+        ['request_id'],
+    )
+
+
+def downgrade() -> None:
+    """Eliminar la tabla provider_request_matches."""
+    op.drop_index('ix_provider_request_matches_request', table_name='provider_request_matches')
+    op.drop_index('ix_provider_request_matches_feed', table_name='provider_request_matches')
+    op.drop_table('provider_request_matches')
@@ -0,0 +1,36 @@
+"""add_push_ticket_lock
+
+Revision ID: add_push_ticket_lock
+Revises: add_revoked_tokens
+Create Date: 2026-10-18 10:00:00.000000
+
+Marca de reclamo de los tickets de Expo: con varios procesos, cada ticket lo
+consulta un único worker de recibos por vez.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_push_ticket_lock'
+down_revision = 'add_revoked_tokens'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Agregar push_tickets.locked_at."""
+    op.add_column(
+        'push_tickets',
+        sa.Column(
+            'locked_at',
+            sa.DateTime(),
+            nullable=True,
+            comment='Momento en que un worker reclamó el ticket para consultar su recibo',
+        ),
+    )
+
+
+def downgrade() -> None:
+    """Eliminar push_tickets.locked_at."""
+    op.drop_column('push_tickets', 'locked_at')
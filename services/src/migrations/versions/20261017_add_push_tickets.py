@@ -0,0 +1,43 @@
+"""add_push_tickets
+
+Revision ID: add_push_tickets
+Revises: add_notification_outbox
+Create Date: 2026-10-17 20:00:00.000000
+
+Guarda los tickets de Expo para consultar sus recibos y agrega la plataforma
+del dispositivo a los tokens push.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_push_tickets'
+down_revision = 'add_notification_outbox'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Crear push_tickets y agregar push_tokens.platform."""
+    op.add_column('push_tokens', sa.Column('platform', sa.String(length=20), nullable=True))
+    op.create_table(
+        'push_tickets',
+        sa.Column('id', sa.BigInteger(), autoincrement=True, nullable=False),
+        sa.Column('ticket_id', sa.String(length=64), nullable=False),
+        sa.Column('token', sa.String(length=255), nullable=False),
+        sa.Column('platform', sa.String(length=20), nullable=True),
+        sa.Column('notification_id', sa.BigInteger(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['notification_id'], ['notification_outbox.id'], ondelete='SET NULL'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('ticket_id'),
+    )
+    op.create_index('ix_push_tickets_created_at', 'push_tickets', ['created_at', 'id'])
+
+
+def downgrade() -> None:
+    """Eliminar push_tickets y push_tokens.platform."""
+    op.drop_index('ix_push_tickets_created_at', table_name='push_tickets')
+    op.drop_table('push_tickets')
+    op.drop_column('push_tokens', 'platform')
@@ -0,0 +1,61 @@
+"""add_rating_histograms
+
+Revision ID: add_rating_histograms
+Revises: add_kpi_revenue_net
+Create Date: 2026-10-17 17:00:00.000000
+
+Agrega el histograma de estrellas al perfil del prestador y al rollup mensual
+de KPIs. El perfil se completa acá desde `service_reviews` (y con él
+`rating_avg`/`total_reviews`); el rollup se recalcula con:
+
+    python -m services.provider_kpis rebuild
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_rating_histograms'
+down_revision = 'add_kpi_revenue_net'
+branch_labels = None
+depends_on = None
+
+
+_STARS = range(1, 6)
+
+
+def upgrade() -> None:
+    """Agregar las columnas rating_N_count y completar el perfil."""
+    for table in ('provider_profiles', 'provider_kpi_monthly'):
+        for star in _STARS:
+            op.add_column(
+                table,
+                sa.Column(f'rating_{star}_count', sa.Integer(), nullable=False, server_default='0'),
+            )
+
+    counts = ', '.join(
+        f'SUM(rating = {star}) AS rating_{star}_count' for star in _STARS
+    )
+    assignments = ', '.join(
+        f'p.rating_{star}_count = r.rating_{star}_count' for star in _STARS
+    )
+    op.execute(
+        f"""
+        UPDATE provider_profiles p
+        JOIN (
+            SELECT ratee_provider_profile_id, COUNT(*) AS total, SUM(rating) AS rating_sum, {counts}
+            FROM service_reviews
+            GROUP BY ratee_provider_profile_id
+        ) r ON r.ratee_provider_profile_id = p.id
+        SET {assignments},
+            p.total_reviews = r.total,
+            p.rating_avg = ROUND(r.rating_sum / r.total, 2)
+        """
+    )
+
+
+def downgrade() -> None:
+    """Eliminar las columnas rating_N_count."""
+    for table in ('provider_kpi_monthly', 'provider_profiles'):
+        for star in _STARS:
+            op.drop_column(table, f'rating_{star}_count')
@@ -0,0 +1,57 @@
+"""add_tag_generation_jobs
+
+Revision ID: add_tag_gen_jobs
+Revises: fix_bidding_constraint
+Create Date: 2026-10-17 10:00:00.000000
+
+Crea la cola persistente de trabajos de generación de tags.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_tag_gen_jobs'
+down_revision = 'fix_bidding_constraint'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Crear la tabla tag_generation_jobs."""
+    op.create_table(
+        'tag_generation_jobs',
+        sa.Column('id', sa.BigInteger(), autoincrement=True, nullable=False),
+        sa.Column('request_id', sa.BigInteger(), nullable=False),
+        sa.Column(
+            'status',
+            sa.Enum('PENDING', 'RUNNING', 'DONE', 'FAILED', name='tag_job_status'),
+            nullable=False,
+        ),
+        sa.Column('attempts', sa.SmallInteger(), nullable=False, server_default='0'),
+        sa.Column('last_error', sa.String(length=500), nullable=True),
+        sa.Column('run_after', sa.DateTime(), nullable=False),
+        sa.Column('locked_at', sa.DateTime(), nullable=True),
+        sa.Column('finished_at', sa.DateTime(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=True),
+        sa.ForeignKeyConstraint(['request_id'], ['service_requests.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(
+        'ix_tag_generation_jobs_status_run_after',
+        'tag_generation_jobs',
+        ['status', 'run_after'],
+    )
+    op.create_index(
+        'ix_tag_generation_jobs_request',
+        'tag_generation_jobs',
+        ['request_id'],
+    )
+
+
+def downgrade() -> None:
+    """Eliminar la tabla tag_generation_jobs."""
+    op.drop_index('ix_tag_generation_jobs_request', table_name='tag_generation_jobs')
+    op.drop_index('ix_tag_generation_jobs_status_run_after', table_name='tag_generation_jobs')
+    op.drop_table('tag_generation_jobs')
@@ -0,0 +1,38 @@
+"""add_user_token_version
+
+Revision ID: add_user_token_version
+Revises: add_image_uploads
+Create Date: 2026-10-17 23:00:00.000000
+
+Versión de los tokens de cada usuario: los JWT llevan la versión vigente al
+emitirse y dejan de valer cuando se incrementa (cambio de contraseña o
+desactivación).
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_user_token_version'
+down_revision = 'add_image_uploads'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Agregar users.token_version."""
+    op.add_column(
+        'users',
+        sa.Column(
+            'token_version',
+            sa.Integer(),
+            nullable=False,
+            server_default='0',
+            comment='Se incrementa para revocar los tokens emitidos',
+        ),
+    )
+
+
+def downgrade() -> None:
+    """Eliminar users.token_version."""
+    op.drop_column('users', 'token_version')
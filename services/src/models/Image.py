@@ -2,10 +2,26 @@
 Modelos Pydantic para gestión de archivos e imágenes.
 """
 
-from typing import List
+from typing import List, Optional
 from pydantic import BaseModel, Field
 
 
+class ImageVariant(BaseModel):
+    """Una versión redimensionada de la imagen (tipo srcset).
+
+    El cliente elige la variante más chica cuyo `width` alcance para mostrarla
+    y, si lo soporta, el formato más liviano (AVIF antes que WebP).
+    """
+
+    variant: str = Field(..., description="Nombre de la variante: thumb, card o full")
+    format: str = Field(..., description="Formato del archivo: webp o avif")
+    width: int = Field(..., description="Ancho en píxeles")
+    height: int = Field(..., description="Alto en píxeles")
+    size: Optional[int] = Field(None, description="Tamaño del archivo en bytes")
+    s3_key: str = Field(..., description="Clave S3 de la variante")
+    public_url: str = Field(..., description="URL pública de la variante")
+
+
 class ImageUploadResponse(BaseModel):
     """Respuesta de upload de imagen."""
 
@@ -17,6 +33,10 @@ class ImageUploadResponse(BaseModel):
     size: int = Field(..., description="Tamaño del archivo en bytes")
     content_type: str = Field(..., description="Tipo de contenido")
     upload_date: str = Field(..., description="Fecha y hora de upload")
+    variants: List[ImageVariant] = Field(
+        default_factory=list,
+        description="Variantes generadas al optimizar (vacío si no se optimizó)",
+    )
 
 
 class ImageListResponse(BaseModel):
@@ -0,0 +1,120 @@
+"""Sesiones de subida directa de imágenes a MinIO con URLs firmadas."""
+
+from datetime import datetime
+from enum import Enum
+from typing import List, Literal, Optional
+
+from pydantic import BaseModel, Field
+from sqlalchemy import (
+    JSON,
+    BigInteger,
+    Column,
+    DateTime,
+    Enum as SAEnum,
+    ForeignKey,
+    Index,
+    Integer,
+    SmallInteger,
+    String,
+    func,
+)
+
+from database.database import Base
+from models.Image import ImageVariant
+
+
+class ImageUploadStatus(str, Enum):
+    """Estados de una sesión de subida."""
+
+    PENDING = "PENDING"  # URL emitida, esperando el PUT del cliente
+    UPLOADED = "UPLOADED"  # archivo verificado, variantes en cola
+    PROCESSING = "PROCESSING"
+    READY = "READY"
+    FAILED = "FAILED"
+    EXPIRED = "EXPIRED"
+
+
+class ImageUpload(Base):
+    """Archivo que el cliente sube directo al almacenamiento.
+
+    `run_after` indica cuándo vence la URL mientras la sesión está PENDING y
+    cuándo toca (re)intentar generar las variantes una vez UPLOADED, así el
+    worker usa un solo índice para ambas cosas.
+    """
+
+    __tablename__ = "image_uploads"
+    __table_args__ = (
+        Index("ix_image_uploads_status_run_after", "status", "run_after"),
+    )
+
+    id = Column(String(36), primary_key=True)
+    user_id = Column(
+        BigInteger, ForeignKey("users.id", ondelete="CASCADE"), nullable=False
+    )
+    purpose = Column(String(20), nullable=False)
+    s3_key = Column(String(255), nullable=False, unique=True)
+    content_type = Column(String(50), nullable=False)
+    declared_size = Column(Integer, nullable=False)
+    size = Column(Integer, nullable=True)
+    status = Column(
+        SAEnum(ImageUploadStatus, name="image_upload_status"),
+        nullable=False,
+        default=ImageUploadStatus.PENDING,
+    )
+    variants = Column(JSON, nullable=True)
+    attempts = Column(SmallInteger, nullable=False, default=0)
+    last_error = Column(String(500), nullable=True)
+    run_after = Column(DateTime, nullable=False)
+    locked_at = Column(DateTime, nullable=True)
+    expires_at = Column(DateTime, nullable=False)
+    completed_at = Column(DateTime, nullable=True)
+    created_at = Column(DateTime, server_default=func.current_timestamp())
+    updated_at = Column(
+        DateTime,
+        server_default=func.current_timestamp(),
+        onupdate=func.current_timestamp(),
+    )
+
+    def __repr__(self) -> str:  # pragma: no cover - representación auxiliar
+        return f"<ImageUpload(id={self.id}, s3_key='{self.s3_key}', status='{self.status}')>"
+
+
+class ImageUploadSessionCreate(BaseModel):
+    """Pedido de una URL firmada para subir una imagen."""
+
+    purpose: Literal["profile", "service_request"] = Field(
+        ..., description="Uso de la imagen: perfil o adjunto de solicitud"
+    )
+    filename: str = Field(..., min_length=1, max_length=255)
+    content_type: str = Field(..., description="Tipo MIME que se enviará en el PUT")
+    size: int = Field(..., gt=0, description="Tamaño exacto del archivo en bytes")
+
+
+class ImageUploadSessionResponse(BaseModel):
+    """Estado de una sesión de subida."""
+
+    upload_id: str
+    status: ImageUploadStatus
+    s3_key: str
+    public_url: str
+    content_type: str
+    size: Optional[int] = None
+    expires_at: datetime
+    upload_url: Optional[str] = Field(
+        None, description="URL firmada para el PUT (sólo al crear la sesión)"
+    )
+    upload_headers: dict = Field(
+        default_factory=dict, description="Headers que el PUT debe enviar"
+    )
+    variants: List[ImageVariant] = Field(
+        default_factory=list, description="Variantes disponibles cuando el estado es READY"
+    )
+    error: Optional[str] = None
+
+
+__all__ = [
+    "ImageUploadStatus",
+    "ImageUpload",
+    "ImageUploadSessionCreate",
+    "ImageUploadSessionResponse",
+]
@@ -0,0 +1,31 @@
+"""Caché persistente de respuestas del LLM."""
+
+from sqlalchemy import CHAR, Column, DateTime, Index, Integer, String, Text, func
+
+from database.database import Base
+
+
+class LLMResponseCache(Base):
+    """Respuesta del LLM indexada por el hash del prompt normalizado."""
+
+    __tablename__ = "llm_response_cache"
+    __table_args__ = (Index("ix_llm_response_cache_expires_at", "expires_at"),)
+
+    cache_key = Column(CHAR(64), primary_key=True)
+    template = Column(String(64), nullable=False)
+    model = Column(String(64), nullable=False)
+    response = Column(Text, nullable=False)
+    hit_count = Column(Integer, nullable=False, default=0)
+    expires_at = Column(DateTime, nullable=False)
+    created_at = Column(DateTime, server_default=func.current_timestamp())
+    updated_at = Column(
+        DateTime,
+        server_default=func.current_timestamp(),
+        onupdate=func.current_timestamp(),
+    )
+
+    def __repr__(self) -> str:  # pragma: no cover - representación auxiliar
+        return f"<LLMResponseCache(key='{self.cache_key}', template='{self.template}')>"
+
+
+__all__ = ["LLMResponseCache"]
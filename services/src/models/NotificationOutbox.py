@@ -0,0 +1,73 @@
+"""Outbox transaccional de notificaciones push."""
+
+from datetime import datetime
+from enum import Enum
+
+from sqlalchemy import (
+    JSON,
+    BigInteger,
+    Column,
+    DateTime,
+    Enum as SAEnum,
+    ForeignKey,
+    Index,
+    SmallInteger,
+    String,
+    Text,
+    func,
+)
+
+from database.database import Base
+
+
+class NotificationStatus(str, Enum):
+    """Estados de una notificación en el outbox."""
+
+    PENDING = "PENDING"
+    RUNNING = "RUNNING"
+    SENT = "SENT"
+    FAILED = "FAILED"
+
+
+class NotificationOutbox(Base):
+    """Notificación escrita junto con el cambio de estado que la origina.
+
+    El dispatcher en segundo plano la envía a Expo después del `commit`, así
+    que el request HTTP no espera la llamada externa.
+    """
+
+    __tablename__ = "notification_outbox"
+    __table_args__ = (
+        Index("ix_notification_outbox_status_run_after", "status", "run_after"),
+    )
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    user_id = Column(
+        BigInteger, ForeignKey("users.id", ondelete="CASCADE"), nullable=False
+    )
+    title = Column(String(255), nullable=False)
+    body = Column(Text, nullable=False)
+    data = Column(JSON, nullable=True)
+    sound = Column(String(20), nullable=True, default="default")
+    status = Column(
+        SAEnum(NotificationStatus, name="notification_status"),
+        nullable=False,
+        default=NotificationStatus.PENDING,
+    )
+    attempts = Column(SmallInteger, nullable=False, default=0)
+    last_error = Column(String(500), nullable=True)
+    run_after = Column(DateTime, nullable=False, default=datetime.utcnow)
+    locked_at = Column(DateTime, nullable=True)
+    sent_at = Column(DateTime, nullable=True)
+    created_at = Column(DateTime, server_default=func.current_timestamp())
+    updated_at = Column(
+        DateTime,
+        server_default=func.current_timestamp(),
+        onupdate=func.current_timestamp(),
+    )
+
+    def __repr__(self) -> str:  # pragma: no cover - representación auxiliar
+        return f"<NotificationOutbox(id={self.id}, user_id={self.user_id}, status='{self.status}')>"
+
+
+__all__ = ["NotificationStatus", "NotificationOutbox"]
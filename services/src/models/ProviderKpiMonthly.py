@@ -0,0 +1,69 @@
+"""Rollup mensual de KPIs por prestador y moneda."""
+
+from sqlalchemy import (
+    BigInteger,
+    Column,
+    Date,
+    DateTime,
+    ForeignKey,
+    Integer,
+    Numeric,
+    String,
+    func,
+)
+
+from database.database import Base
+
+
+class ProviderKpiMonthly(Base):
+    """Contadores del dashboard del prestador, uno por (prestador, moneda, mes).
+
+    Se actualiza en la misma transacción que el cambio que lo origina. Los
+    contadores de servicios y propuestas son deltas netos sobre el mes de
+    creación del servicio o la propuesta (su suma da el estado vigente); los
+    de ingresos usan el mes de la primera finalización y los de reseñas el
+    mes de la reseña. `currency` vacío agrupa servicios sin moneda.
+    """
+
+    __tablename__ = "provider_kpi_monthly"
+
+    provider_profile_id = Column(
+        BigInteger,
+        ForeignKey("provider_profiles.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    currency = Column(String(3), primary_key=True, default="")
+    month = Column(Date, primary_key=True)
+
+    services_total = Column(Integer, nullable=False, default=0)
+    services_completed = Column(Integer, nullable=False, default=0)
+    proposals_total = Column(Integer, nullable=False, default=0)
+    proposals_accepted = Column(Integer, nullable=False, default=0)
+    revenue_services = Column(Integer, nullable=False, default=0)
+    revenue_gross = Column(Numeric(14, 2), nullable=False, default=0)
+    # Suma de precios netos (sin fee de gestión) con la misma escala que el cálculo en SQL
+    revenue_net = Column(Numeric(18, 6), nullable=False, default=0)
+    reviews_count = Column(Integer, nullable=False, default=0)
+    rating_sum = Column(Integer, nullable=False, default=0)
+    # Histograma de estrellas de las reseñas del mes
+    rating_1_count = Column(Integer, nullable=False, default=0)
+    rating_2_count = Column(Integer, nullable=False, default=0)
+    rating_3_count = Column(Integer, nullable=False, default=0)
+    rating_4_count = Column(Integer, nullable=False, default=0)
+    rating_5_count = Column(Integer, nullable=False, default=0)
+    last_completed_at = Column(DateTime, nullable=True)
+
+    updated_at = Column(
+        DateTime,
+        server_default=func.current_timestamp(),
+        onupdate=func.current_timestamp(),
+    )
+
+    def __repr__(self) -> str:  # pragma: no cover - representación auxiliar
+        return (
+            f"<ProviderKpiMonthly(provider={self.provider_profile_id}, "
+            f"currency={self.currency}, month={self.month})>"
+        )
+
+
+__all__ = ["ProviderKpiMonthly"]
@@ -20,6 +20,7 @@ from sqlalchemy.orm import relationship
 from pydantic import BaseModel, Field, ConfigDict, field_validator, model_validator
 
 from database.database import Base
+from .Image import ImageVariant
 from .Tag import ProviderLicenseTagResponse
 from .ServiceRequest import (
     ServiceRequestType,
@@ -49,6 +50,12 @@ class ProviderProfile(Base):
     bio = Column(Text, nullable=True)
     rating_avg = Column(DECIMAL(3, 2), nullable=False, default=0.0)
     total_reviews = Column(Integer, nullable=False, default=0)
+    # Histograma de estrellas; rating_avg y total_reviews se derivan de él
+    rating_1_count = Column(Integer, nullable=False, default=0)
+    rating_2_count = Column(Integer, nullable=False, default=0)
+    rating_3_count = Column(Integer, nullable=False, default=0)
+    rating_4_count = Column(Integer, nullable=False, default=0)
+    rating_5_count = Column(Integer, nullable=False, default=0)
     created_at = Column(
         DateTime, nullable=False, server_default=func.current_timestamp()
     )
@@ -299,6 +306,7 @@ class ProviderResponse(BaseModel):
     profile_image_url: Optional[str]
     profile_image_s3_key: Optional[str]
     profile_image_uploaded_at: Optional[datetime]
+    profile_image_variants: Optional[List[ImageVariant]] = None
 
     # Datos del perfil
     provider_profile: ProviderProfileResponse
@@ -0,0 +1,75 @@
+"""Índice materializado de solicitudes compatibles por prestador."""
+
+from sqlalchemy import (
+    BigInteger,
+    Column,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    Numeric,
+    SmallInteger,
+    func,
+)
+
+from database.database import Base
+
+
+class ProviderRequestMatch(Base):
+    """Par prestador/solicitud visible en el feed, con sus claves de orden.
+
+    Todas las columnas de ranking son ascendentes para que el feed sea un único
+    recorrido del índice `ix_provider_request_matches_feed_geo`:
+    segment (0 recontratación, 1 por tags), type_rank (FAST antes que
+    LICITACION), score_rank (mayor confianza primero, nulos al final),
+    distance_rank (metros al prestador, sin coordenadas al final) y
+    created_rank (segundos epoch; negativos en recontrataciones para que las
+    más nuevas vayan primero).
+    """
+
+    __tablename__ = "provider_request_matches"
+    __table_args__ = (
+        Index(
+            "ix_provider_request_matches_feed_geo",
+            "provider_profile_id",
+            "segment",
+            "type_rank",
+            "score_rank",
+            "distance_rank",
+            "created_rank",
+            "request_id",
+        ),
+        Index("ix_provider_request_matches_request", "request_id"),
+    )
+
+    provider_profile_id = Column(
+        BigInteger,
+        ForeignKey("provider_profiles.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    request_id = Column(
+        BigInteger,
+        ForeignKey("service_requests.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    segment = Column(SmallInteger, nullable=False)
+    type_rank = Column(SmallInteger, nullable=False)
+    score_rank = Column(Integer, nullable=False)
+    distance_rank = Column(Integer, nullable=False, default=0)
+    created_rank = Column(BigInteger, nullable=False)
+    score = Column(Numeric(5, 4), nullable=True)
+    distance_km = Column(Numeric(7, 2), nullable=True)
+    updated_at = Column(
+        DateTime,
+        server_default=func.current_timestamp(),
+        onupdate=func.current_timestamp(),
+    )
+
+    def __repr__(self) -> str:  # pragma: no cover - representación auxiliar
+        return (
+            f"<ProviderRequestMatch(provider={self.provider_profile_id}, "
+            f"request={self.request_id}, segment={self.segment})>"
+        )
+
+
+__all__ = ["ProviderRequestMatch"]
@@ -0,0 +1,37 @@
+"""Tickets de Expo pendientes de consultar su recibo de entrega."""
+
+from datetime import datetime
+
+from sqlalchemy import BigInteger, Column, DateTime, ForeignKey, Index, String
+
+from database.database import Base
+
+
+class PushTicket(Base):
+    """Ticket devuelto por Expo al aceptar un mensaje.
+
+    El recibo con el resultado real de la entrega se consulta más tarde; la
+    fila se borra cuando llega el recibo o cuando Expo ya no lo conserva.
+    """
+
+    __tablename__ = "push_tickets"
+    __table_args__ = (Index("ix_push_tickets_created_at", "created_at", "id"),)
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    ticket_id = Column(String(64), nullable=False, unique=True)
+    token = Column(String(255), nullable=False)
+    platform = Column(String(20), nullable=True)
+    notification_id = Column(
+        BigInteger,
+        ForeignKey("notification_outbox.id", ondelete="SET NULL"),
+        nullable=True,
+    )
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    # Reclamo del worker de recibos; vencido el lock otro proceso lo retoma
+    locked_at = Column(DateTime, nullable=True)
+
+    def __repr__(self) -> str:  # pragma: no cover - representación auxiliar
+        return f"<PushTicket(ticket_id='{self.ticket_id}', platform='{self.platform}')>"
+
+
+__all__ = ["PushTicket"]
@@ -1,6 +1,8 @@
+from typing import Literal
+
 from sqlalchemy import Column, BigInteger, String, DateTime, ForeignKey, func
 from sqlalchemy.orm import relationship
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, field_validator
 from database.database import Base
 
 
@@ -13,6 +15,8 @@ class PushToken(Base):
     )
     token = Column(String(255), unique=True, nullable=False, index=True)
     device_name = Column(String(100), nullable=True)
+    # ios / android / web; agrupa las métricas de entrega
+    platform = Column(String(20), nullable=True)
     created_at = Column(DateTime, default=func.current_timestamp())
     updated_at = Column(
         DateTime, default=func.current_timestamp(), onupdate=func.current_timestamp()
@@ -25,5 +29,14 @@ class PushToken(Base):
 
 
 class PushTokenCreate(BaseModel):
-    token: str
-    device_name: str | None = None
+    token: str = Field(max_length=255)
+    device_name: str | None = Field(default=None, max_length=100)
+    # Valores de `Platform.OS`; cualquier otro llenaría las métricas de claves
+    platform: Literal["ios", "android", "web"] | None = None
+
+    @field_validator("platform", mode="before")
+    @classmethod
+    def normalize_platform(cls, value):
+        if isinstance(value, str):
+            return value.strip().lower() or None
+        return value
@@ -0,0 +1,35 @@
+"""Lista de revocación de refresh tokens y sesiones."""
+
+from sqlalchemy import BigInteger, Column, DateTime, ForeignKey, Index, String, func
+
+from database.database import Base
+
+
+class RevokedToken(Base):
+    """Identificador revocado: el `jti` de un refresh token o el `sid` de una sesión.
+
+    Un refresh token usado para rotar queda revocado por su `jti`; revocar el
+    `sid` invalida la sesión entera (access y refresh tokens) al hacer logout
+    o al detectar que se reusó un refresh token ya rotado. La fila puede
+    borrarse cuando vence `expires_at`, porque el token ya no valdría igual.
+    """
+
+    __tablename__ = "revoked_tokens"
+    __table_args__ = (
+        Index("ix_revoked_tokens_revoked_at", "revoked_at"),
+        Index("ix_revoked_tokens_expires_at", "expires_at"),
+    )
+
+    token_id = Column(String(36), primary_key=True)
+    user_id = Column(
+        BigInteger, ForeignKey("users.id", ondelete="CASCADE"), nullable=False
+    )
+    reason = Column(String(20), nullable=False)
+    expires_at = Column(DateTime, nullable=False)
+    revoked_at = Column(DateTime, nullable=False, server_default=func.current_timestamp())
+
+    def __repr__(self) -> str:  # pragma: no cover - representación auxiliar
+        return f"<RevokedToken(token_id='{self.token_id}', reason='{self.reason}')>"
+
+
+__all__ = ["RevokedToken"]
@@ -88,6 +88,20 @@ class ServiceRequest(Base):
             "created_at",
         ),
         Index("ix_service_requests_target_provider", "target_provider_profile_id"),
+        Index("ix_service_requests_client_updated", "client_id", "updated_at"),
+        Index(
+            "ix_service_requests_client_status_created",
+            "client_id",
+            "status",
+            "created_at",
+        ),
+        # Licitaciones publicadas por vencimiento (scheduler de vencimientos)
+        Index(
+            "ix_service_requests_bidding_due",
+            "status",
+            "request_type",
+            "bidding_deadline",
+        ),
     )
 
     id = Column(BigInteger, primary_key=True, autoincrement=True)
@@ -170,6 +184,10 @@ class ServiceRequestImage(Base):
     """Imágenes asociadas a la solicitud."""
 
     __tablename__ = "service_request_images"
+    __table_args__ = (
+        # El worker de variantes completa las imágenes por clave
+        Index("ix_service_request_images_s3_key", "s3_key"),
+    )
 
     id = Column(BigInteger, primary_key=True, autoincrement=True)
     request_id = Column(
@@ -181,6 +199,8 @@ class ServiceRequestImage(Base):
     public_url = Column(String(500), nullable=True)
     caption = Column(String(150), nullable=True)
     sort_order = Column(SmallInteger, nullable=False, default=0)
+    # Variantes generadas al subir la imagen (ver models.Image.ImageVariant)
+    variants = Column(JSON, nullable=True)
     uploaded_at = Column(DateTime, server_default=func.current_timestamp())
 
     request = relationship("ServiceRequest", back_populates="images")
@@ -199,6 +219,7 @@ class ServiceRequestProposal(Base):
         ),
         Index("ix_proposals_req_status", "request_id", "status"),
         Index("ix_proposals_provider_status", "provider_profile_id", "status"),
+        Index("ix_proposals_status_valid_until", "status", "valid_until"),
     )
 
     id = Column(BigInteger, primary_key=True, autoincrement=True)
@@ -252,6 +273,7 @@ class Service(Base):
         Index("ix_services_client_status", "client_id", "status"),
         Index("ix_services_scheduled_start", "scheduled_start_at"),
         Index("ix_services_parent_service_id", "parent_service_id"),
+        Index("ix_services_warranty_due", "warranty_closed_at", "warranty_expires_at"),
     )
 
     id = Column(BigInteger, primary_key=True, autoincrement=True)
@@ -298,6 +320,11 @@ class Service(Base):
         nullable=True,
         comment="Fecha de expiración de la garantía",
     )
+    warranty_closed_at = Column(
+        DateTime,
+        nullable=True,
+        comment="Cuándo el scheduler procesó el vencimiento de la garantía",
+    )
     warranty_claim_description = Column(
         Text,
         nullable=True,
@@ -14,6 +14,7 @@ from models.ServiceRequest import (
     ServiceRequestType,
     ServiceStatus,
 )
+from models.Image import ImageVariant
 from models.Tag import ServiceRequestTagResponse
 
 MAX_ATTACHMENTS = 6
@@ -41,6 +42,9 @@ class ServiceRequestAttachment(BaseModel):
     sort_order: Optional[int] = Field(
         None, ge=0, le=MAX_ATTACHMENTS - 1, description="Orden de aparición"
     )
+    variants: Optional[List[ImageVariant]] = Field(
+        None, description="Variantes devueltas por el upload de la imagen"
+    )
 
     @field_validator("s3_key")
     @classmethod
@@ -125,6 +129,7 @@ class ServiceRequestImageResponse(BaseModel):
     public_url: Optional[str]
     caption: Optional[str]
     sort_order: int
+    variants: Optional[List[ImageVariant]] = None
 
     model_config = dict(from_attributes=True)
 
@@ -242,6 +247,10 @@ class ServiceRequestResponse(BaseModel):
     target_provider: Optional[TargetProviderResponse] = Field(
         default=None, description="Datos del proveedor objetivo (solo para recontrataciones)"
     )
+    distance_km: Optional[float] = Field(
+        default=None,
+        description="Distancia al prestador en km (solo en el feed de solicitudes compatibles)",
+    )
     created_at: datetime
     updated_at: datetime
 
@@ -0,0 +1,69 @@
+"""Cola persistente de trabajos de generación de tags."""
+
+from datetime import datetime
+from enum import Enum
+
+from sqlalchemy import (
+    BigInteger,
+    Column,
+    DateTime,
+    Enum as SAEnum,
+    ForeignKey,
+    Index,
+    SmallInteger,
+    String,
+    func,
+)
+from sqlalchemy.orm import relationship
+
+from database.database import Base
+
+
+class TagJobStatus(str, Enum):
+    """Estados de un trabajo de generación de tags."""
+
+    PENDING = "PENDING"
+    RUNNING = "RUNNING"
+    DONE = "DONE"
+    FAILED = "FAILED"
+
+
+class TagGenerationJob(Base):
+    """Trabajo pendiente para etiquetar una solicitud fuera del request HTTP."""
+
+    __tablename__ = "tag_generation_jobs"
+    __table_args__ = (
+        Index("ix_tag_generation_jobs_status_run_after", "status", "run_after"),
+        Index("ix_tag_generation_jobs_request", "request_id"),
+    )
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    request_id = Column(
+        BigInteger,
+        ForeignKey("service_requests.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    status = Column(
+        SAEnum(TagJobStatus, name="tag_job_status"),
+        nullable=False,
+        default=TagJobStatus.PENDING,
+    )
+    attempts = Column(SmallInteger, nullable=False, default=0)
+    last_error = Column(String(500), nullable=True)
+    run_after = Column(DateTime, nullable=False, default=datetime.utcnow)
+    locked_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+    created_at = Column(DateTime, server_default=func.current_timestamp())
+    updated_at = Column(
+        DateTime,
+        server_default=func.current_timestamp(),
+        onupdate=func.current_timestamp(),
+    )
+
+    request = relationship("ServiceRequest")
+
+    def __repr__(self) -> str:  # pragma: no cover - representación auxiliar
+        return f"<TagGenerationJob(id={self.id}, request_id={self.request_id}, status='{self.status}')>"
+
+
+__all__ = ["TagJobStatus", "TagGenerationJob"]
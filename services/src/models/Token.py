@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import Union, Optional
 
 
@@ -9,6 +9,16 @@ class Token(BaseModel):
     token_type: str
     role: Optional[str] = None
     user_id: Optional[int] = None
+    refresh_token: Optional[str] = None
+    expires_in: Optional[int] = Field(
+        None, description="Segundos de vida del access token"
+    )
+
+
+class RefreshRequest(BaseModel):
+    """Pedido de un nuevo access token a partir del refresh token."""
+
+    refresh_token: str
 
 
 class TokenData(BaseModel):
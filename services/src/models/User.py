@@ -4,7 +4,7 @@ Define la estructura del usuario y sus esquemas de validación.
 """
 
 from datetime import datetime, date
-from typing import Optional
+from typing import List, Optional
 from sqlalchemy import (
     Column,
     BigInteger,
@@ -12,12 +12,15 @@ from sqlalchemy import (
     Boolean,
     DateTime,
     Date,
+    JSON,
+    Integer,
     func,
     Enum as SAEnum,
 )
 from sqlalchemy.orm import relationship
 from pydantic import BaseModel, EmailStr, Field, field_validator
 from database.database import Base
+from models.Image import ImageVariant
 import enum
 
 
@@ -41,6 +44,13 @@ class User(Base):
     date_of_birth = Column(Date, nullable=True)
     password_hash = Column(String(60), nullable=False)
     is_active = Column(Boolean, nullable=False, default=True)
+    token_version = Column(
+        Integer,
+        nullable=False,
+        default=0,
+        server_default="0",
+        comment="Se incrementa para revocar los tokens emitidos",
+    )
 
     profile_image_s3_key = Column(
         String(255), nullable=True, comment="Clave S3 de la imagen de perfil"
@@ -51,6 +61,9 @@ class User(Base):
     profile_image_uploaded_at = Column(
         DateTime, nullable=True, comment="Fecha de subida de la imagen"
     )
+    profile_image_variants = Column(
+        JSON, nullable=True, comment="Variantes de la imagen de perfil (tamaños y formatos)"
+    )
 
     created_at = Column(DateTime, default=func.current_timestamp())
     updated_at = Column(
@@ -137,6 +150,7 @@ class UserResponse(BaseModel):
     profile_image_s3_key: Optional[str]
     profile_image_url: Optional[str]
     profile_image_uploaded_at: Optional[datetime]
+    profile_image_variants: Optional[List[ImageVariant]] = None
     created_at: datetime
     updated_at: datetime
 
@@ -179,6 +193,9 @@ class UserUpdate(BaseModel):
     profile_image_uploaded_at: Optional[datetime] = Field(
         None, description="Fecha de subida de imagen"
     )
+    profile_image_variants: Optional[List[ImageVariant]] = Field(
+        None, description="Variantes de la imagen de perfil"
+    )
 
     @field_validator("date_of_birth")
     @classmethod
@@ -34,7 +34,8 @@ from .Address import (
     AddressResponse,
     AddressListResponse,
 )
-from .Token import Token
+from .Token import Token, RefreshRequest
+from .RevokedToken import RevokedToken
 from .PushToken import PushToken, PushTokenCreate
 from .Tag import (
     Tag,
@@ -68,6 +69,18 @@ from .ServiceRequestSchemas import (
     ServiceRequestUpdate,
     ServiceCancelRequest,
 )
+from .TagGenerationJob import TagGenerationJob, TagJobStatus
+from .LLMResponseCache import LLMResponseCache
+from .ProviderRequestMatch import ProviderRequestMatch
+from .ProviderKpiMonthly import ProviderKpiMonthly
+from .NotificationOutbox import NotificationOutbox, NotificationStatus
+from .PushTicket import PushTicket
+from .ImageUpload import (
+    ImageUpload,
+    ImageUploadStatus,
+    ImageUploadSessionCreate,
+    ImageUploadSessionResponse,
+)
 from .GeneralResponse import GeneralResponse
 
 __all__ = [
@@ -86,12 +99,23 @@ __all__ = [
     "Currency",
     "ServiceReview",
     "ServiceStatusHistory",
+    "TagGenerationJob",
+    "LLMResponseCache",
+    "ProviderRequestMatch",
+    "ProviderKpiMonthly",
+    "NotificationOutbox",
+    "PushTicket",
+    "ImageUpload",
+    "RevokedToken",
     # Enums
     "UserRole",
     "ServiceRequestType",
     "ServiceRequestStatus",
     "ProposalStatus",
     "ServiceStatus",
+    "TagJobStatus",
+    "NotificationStatus",
+    "ImageUploadStatus",
     # Modelos Pydantic para User
     "UserCreate",
     "UserResponse",
@@ -132,8 +156,12 @@ __all__ = [
     "ServiceRequestConfirmPayment",
     "ServiceRequestUpdate",
     "ServiceCancelRequest",
+    # Modelos Pydantic para subidas directas de imágenes
+    "ImageUploadSessionCreate",
+    "ImageUploadSessionResponse",
     # Token
     "Token",
+    "RefreshRequest",
     "PushToken",
     "PushTokenCreate",
     "GeneralResponse",
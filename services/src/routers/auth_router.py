@@ -5,7 +5,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from controllers.user_controller import user_controller
 from database.database import get_db
-from models.Token import Token
+from models.Token import RefreshRequest, Token
 from models.User import LoginRequest
 
 router = APIRouter(prefix="/auth", tags=["auth"])
@@ -36,6 +36,18 @@ async def login_endpoint(
         raise
 
 
+@router.post(
+    "/refresh",
+    response_model=Token,
+    summary="Renovar sesión",
+    description="Emite un nuevo access token y rota el refresh token, sin pedir la contraseña",
+)
+async def refresh_endpoint(
+    refresh_data: RefreshRequest, db: AsyncSession = Depends(get_db)
+) -> Token:
+    return await user_controller.refresh_access_token(db, refresh_data.refresh_token)
+
+
 @router.post(
     "/logout",
     status_code=status.HTTP_204_NO_CONTENT,
@@ -44,6 +56,7 @@ async def login_endpoint(
 )
 async def logout_endpoint(
     token: Optional[str] = Depends(user_controller.oauth2_scheme),
+    db: AsyncSession = Depends(get_db),
 ) -> Response:
-    await user_controller.logout(token)
+    await user_controller.logout(db, token)
     return Response(status_code=status.HTTP_204_NO_CONTENT)
@@ -0,0 +1,57 @@
+"""Métricas internas de pools, cachés y workers.
+
+Exponen detalles del driver, de los pools y de la autenticación, así que
+sólo las ve un administrador y no se publican en la documentación de la API.
+El chequeo público de disponibilidad sigue siendo `/health`.
+"""
+
+from fastapi import APIRouter, Depends
+
+from auth.auth_utils import check_admin
+from auth.principal_cache import principal_cache
+from auth.token_revocation import token_revocation_list
+from database.database import engine
+from database.pool import pool_metrics
+from database.replica import replica_engine, replica_router
+from services.expiration_scheduler import expiration_scheduler
+from services.http_client import outbound_http
+from services.offload import executor_metrics
+from services.push_receipt_worker import push_receipt_worker
+
+router = APIRouter(prefix="/health", dependencies=[Depends(check_admin)])
+
+
+@router.get("/scheduler")
+async def scheduler_metrics():
+    return expiration_scheduler.metrics()
+
+
+@router.get("/push")
+async def push_delivery_metrics():
+    return push_receipt_worker.metrics()
+
+
+@router.get("/http")
+async def outbound_http_metrics():
+    return outbound_http.metrics()
+
+
+@router.get("/offload")
+async def offload_metrics():
+    return executor_metrics()
+
+
+@router.get("/db")
+async def db_pool_metrics():
+    metrics = {"primary": pool_metrics(engine), "replica": replica_router.metrics()}
+    if replica_engine is not None:
+        metrics["replica"]["pool"] = pool_metrics(replica_engine)
+    return metrics
+
+
+@router.get("/auth")
+async def auth_cache_metrics():
+    return {
+        "principal_cache": principal_cache.metrics(),
+        "token_revocation": token_revocation_list.metrics(),
+    }
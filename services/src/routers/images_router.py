@@ -1,8 +1,11 @@
 import logging
-from fastapi import APIRouter, File, UploadFile, Query, Depends
+from fastapi import APIRouter, File, UploadFile, Query, Depends, status
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from controllers.image_controller import image_controller
+from database.database import get_db
 from models.Image import ImageUploadResponse, DeleteImageResponse
+from models.ImageUpload import ImageUploadSessionCreate, ImageUploadSessionResponse
 from auth.auth_utils import get_current_user
 from models.User import User
 
@@ -37,7 +40,49 @@ async def upload_service_request_image(
     return result
 
 
+@router.post(
+    "/upload-sessions",
+    response_model=ImageUploadSessionResponse,
+    status_code=status.HTTP_201_CREATED,
+    summary="Crear subida directa",
+    description="Devuelve una URL firmada para subir la imagen con PUT directo al almacenamiento",
+)
+async def create_upload_session(
+    data: ImageUploadSessionCreate,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    return await image_controller.create_upload_session(db, current_user, data)
+
+
+@router.post(
+    "/upload-sessions/{upload_id}/complete",
+    response_model=ImageUploadSessionResponse,
+    summary="Confirmar subida directa",
+    description="Verifica el archivo subido y encola la generación de variantes",
+)
+async def complete_upload_session(
+    upload_id: str,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    return await image_controller.complete_upload_session(db, current_user, upload_id)
+
+
+@router.get(
+    "/upload-sessions/{upload_id}",
+    response_model=ImageUploadSessionResponse,
+    summary="Estado de una subida directa",
+)
+async def get_upload_session(
+    upload_id: str,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    return await image_controller.get_upload_session(db, current_user, upload_id)
+
+
 @router.delete("/{s3_key:path}", response_model=DeleteImageResponse)
 async def delete_image(s3_key: str, _: User = Depends(get_current_user)):
-    result = image_controller.delete_image(s3_key)
+    result = await image_controller.delete_image(s3_key)
     return result
@@ -24,5 +24,6 @@ async def register_token(
         user_id=current_user.id,
         token=payload.token,
         device_name=payload.device_name,
+        platform=payload.platform,
     )
     return GeneralResponse(message="Token registrado correctamente", success=True)
@@ -1,7 +1,10 @@
-from fastapi import APIRouter, HTTPException, status, Depends, Query
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, status, Depends, Query, Response
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from database.database import get_db
+from database.replica import get_read_db
 from models.ProviderProfile import (
     ProviderRegisterRequest,
     ProviderResponse,
@@ -23,6 +26,8 @@ from models.ServiceRequestSchemas import ServiceRequestResponse, CurrencyRespons
 from controllers.provider_controller import ProviderController
 from controllers.llm_controller import LLMController
 from auth.auth_utils import get_current_user
+from settings import PAGINATION_MAX_LIMIT
+from utils.pagination import NEXT_CURSOR_HEADER
 
 router = APIRouter(prefix="/providers")
 
@@ -172,7 +177,7 @@ async def rewrite_proposal_notes_endpoint(
         )
 
     llm_controller = LLMController()
-    rewritten = llm_controller.rewrite_proposal_notes(
+    rewritten = await llm_controller.rewrite_proposal_notes(
         request_title=service_request.title or "",
         request_description=service_request.description or "",
         notes=payload.notes,
@@ -209,7 +214,15 @@ async def get_provider_public_profile(
     description="Retorna solicitudes publicadas cuyos tags coinciden con las licencias del proveedor autenticado",
 )
 async def list_matching_service_requests(
-    current_user=Depends(get_current_user), db: AsyncSession = Depends(get_db)
+    response: Response,
+    limit: Optional[int] = Query(
+        None, ge=1, le=PAGINATION_MAX_LIMIT, description="Tamaño de página"
+    ),
+    cursor: Optional[str] = Query(
+        None, description="Cursor devuelto en el header X-Next-Cursor"
+    ),
+    current_user=Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db),
 ):
     current_role = getattr(current_user.role, "value", current_user.role)
     if current_role != UserRole.PROVIDER.value:
@@ -218,7 +231,12 @@ async def list_matching_service_requests(
             detail="Acceso denegado: Solo para proveedores de servicios",
         )
 
-    return await ProviderController.list_matching_service_requests(db, current_user.id)
+    page = await ProviderController.list_matching_service_requests(
+        db, current_user.id, limit=limit, cursor=cursor
+    )
+    if page.next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = page.next_cursor
+    return page.items
 
 
 @router.post(
@@ -311,7 +329,7 @@ async def list_provider_services(
 async def get_provider_overview_stats(
     currency: str = Query(None, description="Moneda para filtrar las estadísticas"),
     current_user=Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     current_role = getattr(current_user.role, "value", current_user.role)
     if current_role != UserRole.PROVIDER.value:
@@ -338,7 +356,7 @@ async def get_provider_revenue_stats_endpoint(
     months: int = Query(6, ge=1, le=12, description="Cantidad de meses a consultar"),
     currency: str = Query(None, description="Moneda para filtrar las estadísticas"),
     current_user=Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     current_role = getattr(current_user.role, "value", current_user.role)
     if current_role != UserRole.PROVIDER.value:
@@ -364,7 +382,7 @@ async def get_provider_revenue_stats_endpoint(
 async def get_provider_rating_distribution_endpoint(
     months: int = Query(6, ge=1, le=12, description="Cantidad de meses a consultar"),
     current_user=Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     current_role = getattr(current_user.role, "value", current_user.role)
     if current_role != UserRole.PROVIDER.value:
@@ -2,14 +2,15 @@
 
 from __future__ import annotations
 
-from typing import List
+from typing import List, Optional
 
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, Query, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from auth.auth_utils import check_user_login
 from controllers.service_request_controller import ServiceRequestController
 from database.database import get_db
+from database.replica import get_read_db
 from controllers.llm_controller import LLMController
 from models.ServiceRequest import ServiceRequestType
 from models.ServiceRequestSchemas import (
@@ -26,6 +27,8 @@ from models.ServiceRequestSchemas import (
     WarrantyClaimCreate,
 )
 from models.User import User
+from settings import PAGINATION_MAX_LIMIT
+from utils.pagination import NEXT_CURSOR_HEADER
 
 router = APIRouter(prefix="/service-requests", tags=["service_requests"])
 
@@ -50,10 +53,22 @@ async def create_service_request_endpoint(
     summary="Listar todas las solicitudes del cliente",
 )
 async def list_all_service_requests_endpoint(
+    response: Response,
+    limit: Optional[int] = Query(
+        None, ge=1, le=PAGINATION_MAX_LIMIT, description="Tamaño de página"
+    ),
+    cursor: Optional[str] = Query(
+        None, description="Cursor devuelto en el header X-Next-Cursor"
+    ),
     current_user: User = Depends(check_user_login),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ) -> List[ServiceRequestResponse]:
-    return await ServiceRequestController.list_all_for_client(db, current_user)
+    page = await ServiceRequestController.list_all_for_client(
+        db, current_user, limit=limit, cursor=cursor
+    )
+    if page.next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = page.next_cursor
+    return page.items
 
 
 @router.get(
@@ -62,10 +77,22 @@ async def list_all_service_requests_endpoint(
     summary="Listar solicitudes activas sin servicio asociado",
 )
 async def list_active_service_requests_endpoint(
+    response: Response,
+    limit: Optional[int] = Query(
+        None, ge=1, le=PAGINATION_MAX_LIMIT, description="Tamaño de página"
+    ),
+    cursor: Optional[str] = Query(
+        None, description="Cursor devuelto en el header X-Next-Cursor"
+    ),
     current_user: User = Depends(check_user_login),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ) -> List[ServiceRequestResponse]:
-    return await ServiceRequestController.list_active_without_service(db, current_user)
+    page = await ServiceRequestController.list_active_without_service(
+        db, current_user, limit=limit, cursor=cursor
+    )
+    if page.next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = page.next_cursor
+    return page.items
 
 
 @router.get(
@@ -75,7 +102,7 @@ async def list_active_service_requests_endpoint(
 )
 async def get_payment_history_endpoint(
     current_user: User = Depends(check_user_login),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ) -> List[PaymentHistoryItem]:
     return await ServiceRequestController.get_payment_history(db, current_user)
 
@@ -91,7 +118,7 @@ async def rewrite_service_request_endpoint(
 ) -> ServiceRequestRewriteOutput:
     """Usa AI para reescribir el título y descripción de forma más clara."""
     llm_controller = LLMController()
-    result = llm_controller.rewrite_service_request(
+    result = await llm_controller.rewrite_service_request(
         title=payload.title,
         description=payload.description,
     )
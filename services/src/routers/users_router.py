@@ -5,6 +5,7 @@ Incluye endpoints para registro, login y operaciones básicas de usuario.
 
 import logging
 from fastapi import APIRouter, Depends, HTTPException, status
+from pydantic import TypeAdapter, ValidationError
 from sqlalchemy.ext.asyncio import AsyncSession
 from controllers.user_controller import user_controller
 from database.database import get_db
@@ -17,12 +18,15 @@ from models.User import (
     ChangePasswordRequest,
 )
 from models.GeneralResponse import GeneralResponse
+from models.Image import ImageVariant
 from auth.auth_utils import check_user_login
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/users", tags=["clients"])
 
+_image_variants = TypeAdapter(list[ImageVariant])
+
 
 @router.post(
     "/register",
@@ -152,11 +156,20 @@ async def update_profile_image(
             detail="Faltan datos de la imagen (s3_key y public_url requeridos)",
         )
 
+    try:
+        variants = _image_variants.validate_python(image_data.get("variants") or [])
+    except ValidationError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Las variantes de la imagen no tienen el formato esperado",
+        )
+
     updated_user = await user_controller.update_profile_image(
         db=db,
         user=current_user,
         s3_key=image_data.get("s3_key"),
         public_url=image_data.get("public_url"),
+        variants=variants or None,
     )
 
     return UserResponse.model_validate(updated_user)
@@ -0,0 +1,392 @@
+"""Scheduler en segundo plano que procesa vencimientos.
+
+Cierra licitaciones con `bidding_deadline` vencido, expira presupuestos
+pendientes con `valid_until` vencido y marca las garantías vencidas. Cada
+tarea lee por su índice de vencimiento en lotes y actualiza los estados en una
+transacción, junto con las notificaciones que deja en el outbox.
+
+Con varios workers sólo uno procesa: el que obtiene el lock de MySQL
+`GET_LOCK(SCHEDULER_LOCK_NAME)`, que queda tomado mientras viva su conexión.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from sqlalchemy import select, text, update
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, AsyncSession, async_sessionmaker
+
+import settings
+from database.database import AsyncSessionLocal, engine
+from models.ProviderProfile import ProviderProfile
+from models.ServiceRequest import (
+    ProposalStatus,
+    Service,
+    ServiceRequest,
+    ServiceRequestProposal,
+    ServiceRequestStatus,
+    ServiceRequestType,
+)
+from services.match_index import match_index
+from services.notification_dispatcher import notification_dispatcher
+from services.notification_service import notification_service
+from services.provider_kpis import provider_kpis
+
+logger = logging.getLogger(__name__)
+
+Clock = Callable[[], datetime]
+
+
+def now_ar() -> datetime:
+    """Hora actual de Argentina (UTC-3) naive, como las fechas de vencimiento."""
+    return datetime.now(timezone(timedelta(hours=-3))).replace(tzinfo=None)
+
+
+@dataclass
+class JobMetrics:
+    """Métricas de una tarea del scheduler."""
+
+    runs: int = 0
+    processed_total: int = 0
+    errors: int = 0
+    last_run_at: Optional[datetime] = None
+    last_processed: int = 0
+    # Atraso del vencimiento más viejo procesado en la última corrida
+    last_lag_seconds: float = 0.0
+    max_lag_seconds: float = 0.0
+
+
+@dataclass
+class _BatchResult:
+    processed: int = 0
+    oldest_due: Optional[datetime] = None
+
+
+Job = Callable[[AsyncSession, datetime, int], Awaitable[_BatchResult]]
+
+
+class MySQLLeaderLock:
+    """Lock de líder con `GET_LOCK`, atado a una conexión dedicada."""
+
+    def __init__(self, bind: AsyncEngine, name: str) -> None:
+        self.bind = bind
+        self.name = name
+        self._conn: AsyncConnection | None = None
+
+    async def acquire(self) -> bool:
+        if self._conn is None:
+            self._conn = await self.bind.connect()
+        try:
+            result = await self._conn.execute(
+                text("SELECT GET_LOCK(:name, 0)"), {"name": self.name}
+            )
+            if result.scalar() == 1:
+                return True
+        except Exception:
+            await self._discard()
+            raise
+        await self._discard()
+        return False
+
+    async def held(self) -> bool:
+        """Confirma que la conexión sigue viva y es la dueña del lock."""
+        if self._conn is None:
+            return False
+        try:
+            result = await self._conn.execute(
+                text("SELECT IS_USED_LOCK(:name) = CONNECTION_ID()"), {"name": self.name}
+            )
+            if result.scalar() == 1:
+                return True
+        except Exception:
+            logger.exception("No se pudo verificar el lock del scheduler")
+        await self._discard()
+        return False
+
+    async def release(self) -> None:
+        if self._conn is None:
+            return
+        try:
+            await self._conn.execute(
+                text("SELECT RELEASE_LOCK(:name)"), {"name": self.name}
+            )
+        except Exception:
+            logger.exception("No se pudo liberar el lock del scheduler")
+        await self._discard()
+
+    async def _discard(self) -> None:
+        conn, self._conn = self._conn, None
+        if conn is not None:
+            try:
+                await conn.close()
+            except Exception:
+                pass
+
+
+class ExpirationScheduler:
+    """Ejecuta las tareas de vencimiento periódicamente mientras sea líder."""
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession] = AsyncSessionLocal,
+        *,
+        leader_lock: MySQLLeaderLock | None = None,
+        clock: Clock = now_ar,
+        poll_interval: float = settings.SCHEDULER_POLL_SECONDS,
+        batch_size: int = settings.SCHEDULER_BATCH_SIZE,
+    ) -> None:
+        self.session_factory = session_factory
+        self.leader_lock = leader_lock or MySQLLeaderLock(
+            engine, settings.SCHEDULER_LOCK_NAME
+        )
+        self.clock = clock
+        self.poll_interval = poll_interval
+        self.batch_size = batch_size
+        self.jobs: Dict[str, Job] = {
+            "bidding_deadlines": self._close_expired_biddings,
+            "proposal_expiry": self._expire_proposals,
+            "warranty_expiry": self._close_expired_warranties,
+        }
+        self.job_metrics: Dict[str, JobMetrics] = {name: JobMetrics() for name in self.jobs}
+        self.is_leader = False
+        self._task: asyncio.Task | None = None
+
+    async def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(), name="expiration-scheduler")
+            logger.info("Scheduler de vencimientos iniciado")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        logger.info("Scheduler de vencimientos detenido")
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "is_leader": self.is_leader,
+            "jobs": {name: asdict(metrics) for name, metrics in self.job_metrics.items()},
+        }
+
+    async def _run(self) -> None:
+        try:
+            while True:
+                try:
+                    if self.is_leader:
+                        self.is_leader = await self.leader_lock.held()
+                    else:
+                        self.is_leader = await self.leader_lock.acquire()
+                        if self.is_leader:
+                            logger.info("Este worker es el líder del scheduler de vencimientos")
+
+                    if self.is_leader and await self.run_once() > 0:
+                        # Lote completo: probablemente quedan vencimientos atrasados
+                        continue
+                except asyncio.CancelledError:
+                    raise
+                except Exception:
+                    logger.exception("Error inesperado en el scheduler de vencimientos")
+
+                await asyncio.sleep(self.poll_interval)
+        finally:
+            if self.is_leader:
+                self.is_leader = False
+                await self.leader_lock.release()
+
+    async def run_once(self) -> int:
+        """Ejecuta un lote de cada tarea; devuelve cuántas llenaron el lote."""
+        full_batches = 0
+        for name, job in self.jobs.items():
+            processed = await self._run_job(name, job)
+            if processed >= self.batch_size:
+                full_batches += 1
+        return full_batches
+
+    async def _run_job(self, name: str, job: Job) -> int:
+        metrics = self.job_metrics[name]
+        now = self.clock()
+        metrics.runs += 1
+        metrics.last_run_at = now
+        try:
+            async with self.session_factory() as db:
+                result = await job(db, now, self.batch_size)
+                await db.commit()
+        except Exception:
+            metrics.errors += 1
+            logger.exception("Falló la tarea %s del scheduler", name)
+            return 0
+
+        if result.processed:
+            notification_dispatcher.notify()
+        lag = (now - result.oldest_due).total_seconds() if result.oldest_due else 0.0
+        metrics.last_processed = result.processed
+        metrics.processed_total += result.processed
+        metrics.last_lag_seconds = lag
+        metrics.max_lag_seconds = max(metrics.max_lag_seconds, lag)
+        if result.processed:
+            logger.info(
+                "Scheduler %s: %s vencimientos procesados (atraso %.0fs)",
+                name,
+                result.processed,
+                lag,
+            )
+        return result.processed
+
+    @staticmethod
+    async def _close_expired_biddings(
+        db: AsyncSession, now: datetime, limit: int
+    ) -> _BatchResult:
+        """Cierra licitaciones publicadas cuyo plazo para ofertar venció."""
+        rows = (
+            await db.execute(
+                select(
+                    ServiceRequest.id,
+                    ServiceRequest.client_id,
+                    ServiceRequest.title,
+                    ServiceRequest.bidding_deadline,
+                )
+                .where(
+                    ServiceRequest.status == ServiceRequestStatus.PUBLISHED,
+                    ServiceRequest.request_type == ServiceRequestType.LICITACION,
+                    ServiceRequest.bidding_deadline <= now,
+                )
+                .order_by(ServiceRequest.bidding_deadline)
+                .limit(limit)
+                .with_for_update(skip_locked=True)
+            )
+        ).all()
+        if not rows:
+            return _BatchResult()
+
+        request_ids = [row.id for row in rows]
+        # CLOSED sin servicio sigue en /service-requests/active: el cliente
+        # todavía puede elegir un presupuesto y pagar
+        await db.execute(
+            update(ServiceRequest)
+            .where(ServiceRequest.id.in_(request_ids))
+            .values(status=ServiceRequestStatus.CLOSED)
+            .execution_options(synchronize_session=False)
+        )
+        await match_index.remove_requests(db, request_ids)
+        for row in rows:
+            notification_service.enqueue(
+                db,
+                row.client_id,
+                "Tu licitación cerró",
+                f"Terminó el plazo para ofertar en '{row.title}'. Elegí un presupuesto.",
+                {"requestId": row.id, "type": "bidding_closed"},
+            )
+
+        return _BatchResult(processed=len(rows), oldest_due=rows[0].bidding_deadline)
+
+    @staticmethod
+    async def _expire_proposals(
+        db: AsyncSession, now: datetime, limit: int
+    ) -> _BatchResult:
+        """Expira presupuestos pendientes cuya vigencia terminó."""
+        rows = (
+            await db.execute(
+                select(
+                    ServiceRequestProposal.id,
+                    ServiceRequestProposal.request_id,
+                    ServiceRequestProposal.provider_profile_id,
+                    ServiceRequestProposal.currency,
+                    ServiceRequestProposal.valid_until,
+                    ServiceRequestProposal.created_at,
+                )
+                .where(
+                    ServiceRequestProposal.status == ProposalStatus.PENDING,
+                    ServiceRequestProposal.valid_until <= now,
+                )
+                .order_by(ServiceRequestProposal.valid_until)
+                .limit(limit)
+                .with_for_update(skip_locked=True)
+            )
+        ).all()
+        if not rows:
+            return _BatchResult()
+
+        # Consulta aparte: un JOIN en el FOR UPDATE también bloquearía los perfiles
+        provider_user_ids = dict(
+            (
+                await db.execute(
+                    select(ProviderProfile.id, ProviderProfile.user_id).where(
+                        ProviderProfile.id.in_({row.provider_profile_id for row in rows})
+                    )
+                )
+            ).all()
+        )
+
+        await db.execute(
+            update(ServiceRequestProposal)
+            .where(ServiceRequestProposal.id.in_([row.id for row in rows]))
+            .values(status=ProposalStatus.EXPIRED)
+            .execution_options(synchronize_session=False)
+        )
+        for row in rows:
+            await provider_kpis.proposal_status_changed(
+                db, row, ProposalStatus.PENDING, ProposalStatus.EXPIRED
+            )
+            notification_service.enqueue(
+                db,
+                provider_user_ids[row.provider_profile_id],
+                "Tu presupuesto venció",
+                "Pasó la fecha de vigencia de tu presupuesto sin respuesta del cliente.",
+                {"requestId": row.request_id, "type": "proposal_expired"},
+            )
+
+        return _BatchResult(processed=len(rows), oldest_due=rows[0].valid_until)
+
+    @staticmethod
+    async def _close_expired_warranties(
+        db: AsyncSession, now: datetime, limit: int
+    ) -> _BatchResult:
+        """Marca las garantías vencidas y avisa al cliente."""
+        rows = (
+            await db.execute(
+                select(
+                    Service.id,
+                    Service.request_id,
+                    Service.client_id,
+                    Service.warranty_expires_at,
+                )
+                .where(
+                    Service.warranty_closed_at.is_(None),
+                    Service.warranty_expires_at <= now,
+                )
+                .order_by(Service.warranty_expires_at)
+                .limit(limit)
+                .with_for_update(skip_locked=True)
+            )
+        ).all()
+        if not rows:
+            return _BatchResult()
+
+        await db.execute(
+            update(Service)
+            .where(Service.id.in_([row.id for row in rows]))
+            .values(warranty_closed_at=now)
+            .execution_options(synchronize_session=False)
+        )
+        for row in rows:
+            notification_service.enqueue(
+                db,
+                row.client_id,
+                "Finalizó la garantía",
+                "Terminó el período de garantía de tu servicio.",
+                {"requestId": row.request_id, "type": "warranty_expired"},
+            )
+
+        return _BatchResult(processed=len(rows), oldest_due=rows[0].warranty_expires_at)
+
+
+expiration_scheduler = ExpirationScheduler()
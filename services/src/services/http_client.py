@@ -0,0 +1,187 @@
+"""Clientes HTTP salientes compartidos por todo el proceso.
+
+Cada integración usa un pool con nombre (`expo`, `openai`, `storage`) que se
+crea una sola vez y reutiliza conexiones keep-alive. Como cada pool habla con
+un único host, su límite de conexiones es el límite por host. Los clientes se
+crean en el `lifespan` de la app; si un script los pide antes, se crean al
+primer uso.
+
+MinIO usa urllib3 de forma sincrónica, así que su pool es un
+`urllib3.PoolManager` en lugar de un `httpx.AsyncClient`.
+"""
+
+from __future__ import annotations
+
+import importlib.util
+import logging
+from dataclasses import asdict, dataclass
+from typing import Any, Dict
+
+import httpx
+import urllib3
+
+import settings
+
+logger = logging.getLogger(__name__)
+
+ASYNC_POOLS = ("expo", "openai")
+STORAGE_POOL = "storage"
+
+
+def http2_available() -> bool:
+    return importlib.util.find_spec("h2") is not None
+
+
+@dataclass
+class PoolMetrics:
+    """Uso de un pool desde que arrancó el proceso."""
+
+    max_connections: int
+    requests: int = 0
+    errors: int = 0
+    in_flight: int = 0
+    peak_in_flight: int = 0
+    # Requests que arrancaron con el pool lleno y tuvieron que esperar conexión
+    saturated_requests: int = 0
+
+    @property
+    def saturation(self) -> float:
+        return self.in_flight / self.max_connections if self.max_connections else 0.0
+
+
+class _MeteredTransport(httpx.AsyncBaseTransport):
+    """Transporte que cuenta requests en vuelo para medir la saturación del pool."""
+
+    def __init__(self, transport: httpx.AsyncBaseTransport, metrics: PoolMetrics) -> None:
+        self._transport = transport
+        self._metrics = metrics
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        metrics = self._metrics
+        if metrics.in_flight >= metrics.max_connections:
+            metrics.saturated_requests += 1
+        metrics.requests += 1
+        metrics.in_flight += 1
+        metrics.peak_in_flight = max(metrics.peak_in_flight, metrics.in_flight)
+        try:
+            return await self._transport.handle_async_request(request)
+        except Exception:
+            metrics.errors += 1
+            raise
+        finally:
+            metrics.in_flight -= 1
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+
+class OutboundHttp:
+    """Registro de los pools HTTP salientes del proceso."""
+
+    def __init__(
+        self,
+        *,
+        http2: bool = settings.HTTP_CLIENT_HTTP2,
+        max_connections: int = settings.HTTP_CLIENT_MAX_CONNECTIONS_PER_HOST,
+        max_keepalive: int = settings.HTTP_CLIENT_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry: float = settings.HTTP_CLIENT_KEEPALIVE_EXPIRY_SECONDS,
+        connect_timeout: float = settings.HTTP_CLIENT_CONNECT_TIMEOUT_SECONDS,
+        read_timeout: float = settings.HTTP_CLIENT_READ_TIMEOUT_SECONDS,
+        storage_max_connections: int = settings.STORAGE_MAX_CONNECTIONS,
+    ) -> None:
+        self.http2 = http2
+        self.max_connections = max_connections
+        self.max_keepalive = max_keepalive
+        self.keepalive_expiry = keepalive_expiry
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.storage_max_connections = storage_max_connections
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+        self._metrics: Dict[str, PoolMetrics] = {}
+        self._transports: Dict[str, httpx.AsyncBaseTransport] = {}
+        self._storage_pool: urllib3.PoolManager | None = None
+
+    def use_transport(self, name: str, transport: httpx.AsyncBaseTransport) -> None:
+        """Reemplaza el transporte de un pool (por ejemplo, un stand-in local en pruebas)."""
+        self._transports[name] = transport
+        self._clients.pop(name, None)
+
+    async def start(self) -> None:
+        if self.http2 and not http2_available():
+            logger.warning("Paquete h2 no instalado: los clientes salientes usarán HTTP/1.1")
+        for name in ASYNC_POOLS:
+            self.client(name)
+        self.storage_pool()
+        logger.info("Clientes HTTP salientes iniciados: %s", ", ".join(self._clients))
+
+    async def stop(self) -> None:
+        clients, self._clients = self._clients, {}
+        for client in clients.values():
+            await client.aclose()
+        if self._storage_pool is not None:
+            self._storage_pool.clear()
+        logger.info("Clientes HTTP salientes cerrados")
+
+    def client(self, name: str) -> httpx.AsyncClient:
+        """Cliente async del pool `name`, creado al primer uso."""
+        client = self._clients.get(name)
+        if client is None or client.is_closed:
+            client = self._build_client(name)
+            self._clients[name] = client
+        return client
+
+    def _build_client(self, name: str) -> httpx.AsyncClient:
+        metrics = self._metrics.setdefault(name, PoolMetrics(self.max_connections))
+        transport = self._transports.get(name) or httpx.AsyncHTTPTransport(
+            http2=self.http2 and http2_available(),
+            limits=httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_keepalive,
+                keepalive_expiry=self.keepalive_expiry,
+            ),
+        )
+        return httpx.AsyncClient(
+            transport=_MeteredTransport(transport, metrics),
+            timeout=httpx.Timeout(self.read_timeout, connect=self.connect_timeout),
+        )
+
+    def storage_pool(self) -> urllib3.PoolManager:
+        """Pool sincrónico para MinIO, con los mismos reintentos que usa su cliente por defecto."""
+        if self._storage_pool is None:
+            self._storage_pool = urllib3.PoolManager(
+                maxsize=self.storage_max_connections,
+                timeout=urllib3.Timeout(
+                    connect=self.connect_timeout, read=self.read_timeout
+                ),
+                cert_reqs="CERT_REQUIRED",
+                retries=urllib3.Retry(
+                    total=5,
+                    backoff_factor=0.2,
+                    status_forcelist=[500, 502, 503, 504],
+                ),
+            )
+        return self._storage_pool
+
+    def metrics(self) -> Dict[str, Any]:
+        pools: Dict[str, Any] = {
+            name: {**asdict(metrics), "saturation": metrics.saturation}
+            for name, metrics in self._metrics.items()
+        }
+        if self._storage_pool is not None:
+            hosts = {}
+            for key in list(self._storage_pool.pools.keys()):
+                pool = self._storage_pool.pools.get(key)
+                if pool is None:
+                    continue
+                idle = pool.pool.qsize() if pool.pool is not None else 0
+                hosts[f"{pool.host}:{pool.port}"] = {
+                    "max_connections": self.storage_max_connections,
+                    "connections_opened": pool.num_connections,
+                    "requests": pool.num_requests,
+                    "idle": idle,
+                }
+            pools[STORAGE_POOL] = hosts
+        return pools
+
+
+outbound_http = OutboundHttp()
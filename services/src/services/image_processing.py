@@ -0,0 +1,54 @@
+"""Transformaciones de imágenes con Pillow.
+
+Se ejecutan en procesos aparte (ver `services.offload`), así que este módulo
+sólo depende de Pillow: importarlo no debe abrir conexiones ni leer settings.
+"""
+
+from io import BytesIO
+from typing import Any, Dict, List, Sequence, Tuple
+
+from PIL import Image, ImageOps
+
+# (nombre de la variante, ancho máximo)
+VariantSpec = Tuple[str, int]
+# (formato de Pillow, opciones de `Image.save`)
+FormatSpec = Tuple[str, Dict[str, Any]]
+
+
+def render_variants(
+    image_data: bytes,
+    variants: Sequence[VariantSpec],
+    formats: Sequence[FormatSpec],
+) -> List[Dict[str, Any]]:
+    """Genera todas las variantes y formatos decodificando la imagen una sola vez.
+
+    Cada variante se achica a partir de la anterior (de mayor a menor ancho) y
+    nunca se agranda. Devuelve un dict por variante y formato, en el orden de
+    `variants` y `formats`, con `variant`, `format`, `width`, `height` y `data`.
+    """
+    largest = max(width for _, width in variants)
+    with Image.open(BytesIO(image_data)) as source:
+        # En JPEG el decoder ya reduce por 2/4/8; ambos lados quedan >= largest
+        source.draft("RGB", (largest, largest))
+        img = ImageOps.exif_transpose(source)
+        # WebP y AVIF soportan transparencia: sólo se normaliza el modo
+        img = img.convert("RGBA" if img.mode in ("RGBA", "LA", "P") else "RGB")
+
+        rendered: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        current = img
+        for name, width in sorted(variants, key=lambda spec: -spec[1]):
+            if current.width > width:
+                height = max(1, round(current.height * width / current.width))
+                current = current.resize((width, height), Image.Resampling.LANCZOS)
+            for fmt, options in formats:
+                output = BytesIO()
+                current.save(output, format=fmt.upper(), **options)
+                rendered[(name, fmt)] = {
+                    "variant": name,
+                    "format": fmt,
+                    "width": current.width,
+                    "height": current.height,
+                    "data": output.getvalue(),
+                }
+
+    return [rendered[(name, fmt)] for name, _ in variants for fmt, _ in formats]
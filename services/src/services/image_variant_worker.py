@@ -0,0 +1,277 @@
+"""Worker en segundo plano que genera las variantes de las subidas directas.
+
+Las imágenes que el cliente sube con URL firmada no pasan por la API: cuando
+la subida se confirma queda en estado UPLOADED y este worker descarga el
+original, genera las variantes en el pool de procesos y las guarda en la
+sesión y en el usuario o las imágenes de solicitud que ya usen esa clave.
+
+También vence las sesiones PENDING cuya URL expiró y borra lo que se haya
+subido a medias.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import List
+
+from PIL import UnidentifiedImageError
+from sqlalchemy import and_, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+import settings
+from auth.principal_cache import principal_cache
+from database.database import AsyncSessionLocal
+from models.ImageUpload import ImageUpload, ImageUploadStatus
+from models.ServiceRequest import ServiceRequestImage
+from models.User import User
+from services.s3_service import s3_service
+
+logger = logging.getLogger(__name__)
+
+# Ancho de la variante completa según el uso, como en los endpoints de upload
+MAX_WIDTH_BY_PURPOSE = {"profile": 800, "service_request": 1200}
+
+
+class ImageVariantWorker:
+    """Procesa las sesiones de `image_uploads` con reintentos y backoff."""
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession] = AsyncSessionLocal,
+        *,
+        poll_interval: float = settings.IMAGE_VARIANT_POLL_SECONDS,
+        batch_size: int = settings.IMAGE_VARIANT_BATCH_SIZE,
+        max_attempts: int = settings.IMAGE_VARIANT_MAX_ATTEMPTS,
+        lock_timeout: float = settings.IMAGE_VARIANT_LOCK_TIMEOUT_SECONDS,
+        retry_backoff: float = settings.IMAGE_VARIANT_RETRY_BACKOFF_SECONDS,
+    ) -> None:
+        self.session_factory = session_factory
+        self.poll_interval = poll_interval
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.lock_timeout = lock_timeout
+        self.retry_backoff = retry_backoff
+        self._wakeup = asyncio.Event()
+        self._task: asyncio.Task | None = None
+
+    def notify(self) -> None:
+        """Despierta al worker para no esperar al próximo ciclo de polling."""
+        self._wakeup.set()
+
+    async def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(), name="image-variant-worker")
+            logger.info("Worker de variantes de imagen iniciado")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        logger.info("Worker de variantes de imagen detenido")
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.expire_sessions()
+                processed = await self.run_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Error inesperado en el worker de variantes de imagen")
+                processed = 0
+
+            # Si se llenó el lote probablemente quedan más imágenes pendientes
+            if processed >= self.batch_size:
+                continue
+
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def run_once(self) -> int:
+        """Reclama un lote de subidas confirmadas y genera sus variantes."""
+        upload_ids = await self._claim()
+        if upload_ids:
+            results = await asyncio.gather(
+                *(self._process(upload_id) for upload_id in upload_ids),
+                return_exceptions=True,
+            )
+            for upload_id, result in zip(upload_ids, results):
+                if isinstance(result, asyncio.CancelledError):
+                    raise result
+                if isinstance(result, Exception):
+                    logger.error(
+                        "Error inesperado procesando la subida %s",
+                        upload_id,
+                        exc_info=result,
+                    )
+                    await self._release_failed(upload_id, result)
+        return len(upload_ids)
+
+    async def expire_sessions(self) -> int:
+        """Vence sesiones PENDING con la URL expirada y borra subidas parciales."""
+        async with self.session_factory() as db:
+            uploads = (
+                await db.execute(
+                    select(ImageUpload)
+                    .where(
+                        ImageUpload.status == ImageUploadStatus.PENDING,
+                        ImageUpload.run_after <= datetime.utcnow(),
+                    )
+                    .order_by(ImageUpload.run_after)
+                    .limit(100)
+                    .with_for_update(skip_locked=True)
+                )
+            ).scalars().all()
+            if not uploads:
+                return 0
+
+            await s3_service.delete_images(upload.s3_key for upload in uploads)
+            for upload in uploads:
+                upload.status = ImageUploadStatus.EXPIRED
+            await db.commit()
+
+        logger.info("Subidas directas vencidas: %s", len(uploads))
+        return len(uploads)
+
+    async def _claim(self) -> List[str]:
+        now = datetime.utcnow()
+        stale_before = now - timedelta(seconds=self.lock_timeout)
+
+        async with self.session_factory() as db:
+            stmt = (
+                select(ImageUpload)
+                .where(
+                    or_(
+                        and_(
+                            ImageUpload.status == ImageUploadStatus.UPLOADED,
+                            ImageUpload.run_after <= now,
+                        ),
+                        # Subidas abandonadas por un proceso que murió a mitad
+                        and_(
+                            ImageUpload.status == ImageUploadStatus.PROCESSING,
+                            ImageUpload.locked_at < stale_before,
+                        ),
+                    )
+                )
+                .order_by(ImageUpload.run_after)
+                .limit(self.batch_size)
+                .with_for_update(skip_locked=True)
+            )
+            uploads = (await db.execute(stmt)).scalars().all()
+            for upload in uploads:
+                upload.status = ImageUploadStatus.PROCESSING
+                upload.locked_at = now
+                upload.attempts = (upload.attempts or 0) + 1
+            upload_ids = [upload.id for upload in uploads]
+            await db.commit()
+        return upload_ids
+
+    async def _process(self, upload_id: str) -> None:
+        async with self.session_factory() as db:
+            upload = await db.get(ImageUpload, upload_id)
+            if upload is None:
+                return
+
+            try:
+                image_data = await s3_service.download_image(upload.s3_key)
+                variants = await s3_service.store_variants(
+                    upload.s3_key,
+                    image_data,
+                    MAX_WIDTH_BY_PURPOSE.get(upload.purpose, 1200),
+                )
+            except Exception as exc:
+                await self._mark_failed(db, upload, exc)
+                return
+
+            try:
+                upload.status = ImageUploadStatus.READY
+                upload.variants = variants
+                upload.last_error = None
+                upload.locked_at = None
+                # Si el cliente ya usó la clave, se completan sus variantes
+                profile = await db.execute(
+                    update(User)
+                    .where(
+                        User.id == upload.user_id,
+                        User.profile_image_s3_key == upload.s3_key,
+                    )
+                    .values(profile_image_variants=variants)
+                    .execution_options(synchronize_session=False)
+                )
+                await db.execute(
+                    update(ServiceRequestImage)
+                    .where(ServiceRequestImage.s3_key == upload.s3_key)
+                    .values(variants=variants)
+                    .execution_options(synchronize_session=False)
+                )
+                await db.commit()
+            except Exception as exc:
+                # Las variantes ya están en S3: reintentar sólo las vuelve a generar
+                await db.rollback()
+                logger.exception(
+                    "Falló el guardado de las variantes de la subida %s", upload_id
+                )
+                upload = await db.get(ImageUpload, upload_id)
+                if upload is not None:
+                    await self._mark_failed(db, upload, exc)
+                return
+            if profile.rowcount:
+                principal_cache.invalidate(upload.user_id)
+            logger.info(
+                "Variantes generadas para %s (intento %s)", upload.s3_key, upload.attempts
+            )
+
+    async def _release_failed(self, upload_id: str, exc: Exception) -> None:
+        """Devuelve a la cola (o da por fallida) una subida que lanzó una excepción."""
+        try:
+            async with self.session_factory() as db:
+                upload = await db.get(ImageUpload, upload_id)
+                if upload is not None:
+                    await self._mark_failed(db, upload, exc)
+        except Exception:
+            logger.exception("No se pudo liberar la subida %s", upload_id)
+
+    async def _mark_failed(
+        self, db: AsyncSession, upload: ImageUpload, exc: Exception
+    ) -> None:
+        upload.last_error = f"{type(exc).__name__}: {exc}"[:500]
+        upload.locked_at = None
+        # Un archivo que Pillow no reconoce no se arregla reintentando; el
+        # error_handler de S3Service lo deja como contexto de la HTTPException
+        not_an_image = any(
+            isinstance(error, UnidentifiedImageError) for error in (exc, exc.__context__)
+        )
+        if not_an_image or upload.attempts >= self.max_attempts:
+            upload.status = ImageUploadStatus.FAILED
+            logger.error(
+                "Variantes de %s fallaron tras %s intentos: %s",
+                upload.s3_key,
+                upload.attempts,
+                upload.last_error,
+            )
+        else:
+            delay = self.retry_backoff * (2 ** (upload.attempts - 1))
+            upload.status = ImageUploadStatus.UPLOADED
+            upload.run_after = datetime.utcnow() + timedelta(seconds=delay)
+            logger.warning(
+                "Variantes de %s fallaron (intento %s/%s), reintento en %.0fs: %s",
+                upload.s3_key,
+                upload.attempts,
+                self.max_attempts,
+                delay,
+                upload.last_error,
+            )
+        await db.commit()
+
+
+image_variant_worker = ImageVariantWorker()
@@ -0,0 +1,284 @@
+"""Caché de dos niveles (memoria + base de datos) para respuestas del LLM."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import re
+import time
+import unicodedata
+from collections import OrderedDict, defaultdict
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, Iterable, Optional
+
+from sqlalchemy import delete, select, update
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+import settings
+from database.database import AsyncSessionLocal
+from models.LLMResponseCache import LLMResponseCache
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_text(value: str | None) -> str:
+    """Normaliza unicode y espacios para que entradas equivalentes compartan clave."""
+    if not value:
+        return ""
+    value = unicodedata.normalize("NFC", value)
+    return _WHITESPACE_RE.sub(" ", value).strip()
+
+
+def vocabulary_version(tags: Iterable[str] | None) -> str:
+    """Huella del vocabulario de tags usado como contexto del prompt."""
+    if not tags:
+        return "empty"
+    # El registro de tags ya trae la huella precalculada para su versión
+    fingerprint = getattr(tags, "fingerprint", None)
+    if fingerprint:
+        return fingerprint
+    digest = hashlib.sha1("\n".join(sorted(tags)).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def is_json_response(value: str) -> bool:
+    try:
+        json.loads(value)
+    except (TypeError, ValueError):
+        return False
+    return True
+
+
+class LLMResponseCacheService:
+    """LRU en memoria con TTL respaldado por la tabla `llm_response_cache`."""
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession] = AsyncSessionLocal,
+        *,
+        enabled: bool = settings.LLM_CACHE_ENABLED,
+        ttl_seconds: int = settings.LLM_CACHE_TTL_SECONDS,
+        max_entries: int = settings.LLM_CACHE_MAX_ENTRIES,
+        purge_interval: int = settings.LLM_CACHE_PURGE_INTERVAL_SECONDS,
+        hit_flush_interval: int = settings.LLM_CACHE_HIT_FLUSH_SECONDS,
+    ) -> None:
+        self.session_factory = session_factory
+        self.enabled = enabled
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.purge_interval = purge_interval
+        self._entries: "OrderedDict[str, tuple[float, str]]" = OrderedDict()
+        self.hit_flush_interval = hit_flush_interval
+        self._last_purge = time.monotonic()
+        # Aciertos por clave pendientes de sumar a `hit_count`
+        self._pending_hits: Dict[str, int] = {}
+        self._last_hit_flush = time.monotonic()
+        self._counters: Dict[str, int] = {
+            "memory_hits": 0,
+            "db_hits": 0,
+            "misses": 0,
+            "stores": 0,
+            "evictions": 0,
+            "errors": 0,
+        }
+
+    @staticmethod
+    def make_key(
+        *,
+        template: str,
+        model: str,
+        temperature: float,
+        system_prompt: str,
+        message: str,
+        vocabulary: str = "",
+    ) -> str:
+        parts = [
+            template,
+            model,
+            f"{temperature:.3f}",
+            vocabulary,
+            normalize_text(system_prompt),
+            normalize_text(message),
+        ]
+        return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+    def stats(self) -> Dict[str, int]:
+        """Contadores de aciertos y fallos desde el arranque del proceso."""
+        return {
+            **self._counters,
+            "memory_entries": len(self._entries),
+            "pending_hit_keys": len(self._pending_hits),
+        }
+
+    async def get_or_compute(
+        self,
+        *,
+        template: str,
+        model: str,
+        temperature: float,
+        system_prompt: str,
+        message: str,
+        compute: Callable[[], Awaitable[str]],
+        vocabulary: str = "",
+        validate: Callable[[str], bool] = is_json_response,
+    ) -> str:
+        """Devuelve la respuesta cacheada o la calcula y la guarda si es válida."""
+        if not self.enabled:
+            return await compute()
+
+        key = self.make_key(
+            template=template,
+            model=model,
+            temperature=temperature,
+            system_prompt=system_prompt,
+            message=message,
+            vocabulary=vocabulary,
+        )
+
+        cached = await self.get(key)
+        if cached is not None:
+            return cached
+
+        self._counters["misses"] += 1
+        response = await compute()
+        # No guardamos respuestas malformadas para no fijar un error por todo el TTL
+        if validate(response):
+            await self.set(key, response, template=template, model=model)
+        return response
+
+    async def get(self, key: str) -> Optional[str]:
+        value = self._get_from_memory(key)
+        if value is not None:
+            self._counters["memory_hits"] += 1
+            await self._record_hit(key)
+            return value
+
+        try:
+            async with self.session_factory() as db:
+                row = (
+                    await db.execute(
+                        select(
+                            LLMResponseCache.response, LLMResponseCache.expires_at
+                        ).where(
+                            LLMResponseCache.cache_key == key,
+                            LLMResponseCache.expires_at > datetime.utcnow(),
+                        )
+                    )
+                ).first()
+        except Exception:
+            self._counters["errors"] += 1
+            logger.warning("No se pudo leer la caché de LLM en BD", exc_info=True)
+            return None
+        if row is None:
+            return None
+
+        self._counters["db_hits"] += 1
+        remaining = (row.expires_at - datetime.utcnow()).total_seconds()
+        self._put_in_memory(key, row.response, remaining)
+        await self._record_hit(key)
+        return row.response
+
+    async def flush_hits(self) -> int:
+        """Suma a `hit_count` los aciertos acumulados; devuelve cuántas claves escribió."""
+        self._last_hit_flush = time.monotonic()
+        if not self._pending_hits:
+            return 0
+        pending, self._pending_hits = self._pending_hits, {}
+
+        # Un UPDATE por cada incremento distinto en vez de uno por acierto
+        keys_by_count: Dict[int, list] = defaultdict(list)
+        for key, count in pending.items():
+            keys_by_count[count].append(key)
+        try:
+            async with self.session_factory() as db:
+                for count, keys in keys_by_count.items():
+                    await db.execute(
+                        update(LLMResponseCache)
+                        .where(LLMResponseCache.cache_key.in_(keys))
+                        .values(hit_count=LLMResponseCache.hit_count + count)
+                    )
+                await db.commit()
+        except Exception:
+            self._counters["errors"] += 1
+            logger.warning(
+                "No se pudieron guardar los aciertos de la caché de LLM", exc_info=True
+            )
+            # Se reintentan en el próximo volcado
+            for key, count in pending.items():
+                self._pending_hits[key] = self._pending_hits.get(key, 0) + count
+            return 0
+        return len(pending)
+
+    async def set(self, key: str, value: str, *, template: str, model: str) -> None:
+        self._put_in_memory(key, value, self.ttl_seconds)
+        self._counters["stores"] += 1
+
+        expires_at = datetime.utcnow() + timedelta(seconds=self.ttl_seconds)
+        stmt = mysql_insert(LLMResponseCache).values(
+            cache_key=key,
+            template=template[:64],
+            model=model[:64],
+            response=value,
+            hit_count=0,
+            expires_at=expires_at,
+        )
+        stmt = stmt.on_duplicate_key_update(
+            response=stmt.inserted.response,
+            expires_at=stmt.inserted.expires_at,
+        )
+        try:
+            async with self.session_factory() as db:
+                await db.execute(stmt)
+                await self._maybe_purge(db)
+                await db.commit()
+        except Exception:
+            self._counters["errors"] += 1
+            logger.warning("No se pudo guardar la caché de LLM en BD", exc_info=True)
+
+    async def _record_hit(self, key: str) -> None:
+        self._pending_hits[key] = self._pending_hits.get(key, 0) + 1
+        if time.monotonic() - self._last_hit_flush >= self.hit_flush_interval:
+            await self.flush_hits()
+
+    def clear_memory(self) -> None:
+        self._entries.clear()
+
+    def _get_from_memory(self, key: str) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def _put_in_memory(self, key: str, value: str, ttl: float) -> None:
+        if ttl <= 0 or self.max_entries <= 0:
+            return
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._counters["evictions"] += 1
+
+    async def _maybe_purge(self, db: AsyncSession) -> None:
+        now = time.monotonic()
+        if now - self._last_purge < self.purge_interval:
+            return
+        self._last_purge = now
+        result = await db.execute(
+            delete(LLMResponseCache).where(
+                LLMResponseCache.expires_at <= datetime.utcnow()
+            )
+        )
+        if result.rowcount:
+            logger.info("Caché de LLM: %s entradas vencidas eliminadas", result.rowcount)
+
+
+llm_response_cache = LLMResponseCacheService()
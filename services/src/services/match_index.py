@@ -0,0 +1,508 @@
+"""Mantenimiento incremental del índice prestador→solicitud del feed.
+
+Las funciones no confirman la transacción: se llaman antes del `commit` de la
+operación que cambió los datos para que el índice quede consistente con ella.
+
+Reconstrucción completa (por ejemplo tras aplicar la migración):
+    python -m services.match_index rebuild
+"""
+
+from __future__ import annotations
+
+import asyncio
+import calendar
+import logging
+import sys
+from datetime import datetime
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import delete, exists, func, or_, select, union_all
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+import settings
+from database.database import AsyncSessionLocal
+from models.Address import Address
+from models.ProviderProfile import ProviderLicense, ProviderProfile
+from models.ProviderRequestMatch import ProviderRequestMatch
+from models.ServiceRequest import (
+    ServiceRequest,
+    ServiceRequestProposal,
+    ServiceRequestStatus,
+    ServiceRequestType,
+)
+from models.Tag import ProviderLicenseTag, ServiceRequestTag
+from utils.geo import as_point, bounding_box, haversine_km
+
+logger = logging.getLogger(__name__)
+
+REHIRE_SEGMENT = 0
+TAG_SEGMENT = 1
+_NULL_SCORE_RANK = 20000
+# Sin distancia conocida (faltan coordenadas) se ordena al final del empate
+_NULL_DISTANCE_RANK = 100_000_000
+_INSERT_CHUNK = 1000
+
+
+def _normalize(value: Optional[str]) -> Optional[str]:
+    if not value:
+        return None
+    return value.strip().lower() or None
+
+
+def _score_rank(score) -> int:
+    if score is None:
+        return _NULL_SCORE_RANK
+    return 10000 - int((Decimal(score) * 10000).to_integral_value())
+
+
+def _created_rank(created_at: Optional[datetime], segment: int) -> int:
+    seconds = calendar.timegm(created_at.timetuple()) if created_at else 0
+    return -seconds if segment == REHIRE_SEGMENT else seconds
+
+
+def _distance_rank(distance_km: Optional[float]) -> int:
+    if distance_km is None:
+        return _NULL_DISTANCE_RANK
+    return int(round(distance_km * 1000))
+
+
+def _type_rank(request_type) -> int:
+    return 0 if request_type == ServiceRequestType.FAST else 1
+
+
+def _match_row(
+    provider_profile_id: int,
+    request_id: int,
+    *,
+    segment: int,
+    request_type,
+    created_at: Optional[datetime],
+    score=None,
+    distance_km: Optional[float] = None,
+) -> dict:
+    rehire = segment == REHIRE_SEGMENT
+    return {
+        "provider_profile_id": provider_profile_id,
+        "request_id": request_id,
+        "segment": segment,
+        "type_rank": 0 if rehire else _type_rank(request_type),
+        "score_rank": 0 if rehire else _score_rank(score),
+        "distance_rank": 0 if rehire else _distance_rank(distance_km),
+        "created_rank": _created_rank(created_at, segment),
+        "score": score,
+        "distance_km": None if distance_km is None else round(distance_km, 2),
+    }
+
+
+def _provider_point(address: Optional[Address]) -> Optional[Tuple[float, float]]:
+    if address is None:
+        return None
+    return as_point(address.latitude, address.longitude)
+
+
+def _distance(
+    provider_point: Optional[Tuple[float, float]],
+    request_point: Optional[Tuple[float, float]],
+) -> Optional[float]:
+    if provider_point is None or request_point is None:
+        return None
+    return haversine_km(*provider_point, *request_point)
+
+
+def _row_point(row) -> Optional[Tuple[float, float]]:
+    """Coordenadas de la solicitud: snapshot o, si falta, las de su dirección."""
+    return as_point(row.lat_snapshot, row.lon_snapshot) or as_point(
+        row.latitude, row.longitude
+    )
+
+
+def _location_matches(
+    provider_address: Optional[Address],
+    request_city: Optional[str],
+    request_state: Optional[str],
+    distance_km: Optional[float],
+) -> bool:
+    """Con coordenadas de ambos lados decide el radio; si no, ciudad/provincia exactas."""
+    if provider_address is None:
+        return True
+    if distance_km is not None and settings.MATCH_RADIUS_KM > 0:
+        return distance_km <= settings.MATCH_RADIUS_KM
+    provider_city = _normalize(provider_address.city)
+    provider_state = _normalize(provider_address.state)
+    if provider_city and provider_city != request_city:
+        return False
+    if provider_state and provider_state != request_state:
+        return False
+    return True
+
+
+def _request_location(
+    request: ServiceRequest, address: Optional[Address]
+) -> Tuple[Optional[str], Optional[str], Optional[Tuple[float, float]]]:
+    city = _normalize(address.city) if address else None
+    city = city or _normalize(request.city_snapshot)
+    state = _normalize(address.state) if address else None
+    point = as_point(request.lat_snapshot, request.lon_snapshot)
+    if point is None and address is not None:
+        point = as_point(address.latitude, address.longitude)
+    return city, state, point
+
+
+async def _provider_addresses(
+    db: AsyncSession, user_ids: Iterable[int]
+) -> Dict[int, Address]:
+    """Dirección principal de cada usuario (la default o, si no, la más reciente)."""
+    ids = set(user_ids)
+    if not ids:
+        return {}
+    result = await db.execute(
+        select(Address)
+        .where(Address.user_id.in_(ids), Address.is_active.is_(True))
+        .order_by(
+            Address.user_id, Address.is_default.desc(), Address.created_at.desc()
+        )
+    )
+    addresses: Dict[int, Address] = {}
+    for address in result.scalars().all():
+        addresses.setdefault(address.user_id, address)
+    return addresses
+
+
+async def _insert_rows(db: AsyncSession, rows: Sequence[dict]) -> None:
+    for start in range(0, len(rows), _INSERT_CHUNK):
+        chunk = rows[start : start + _INSERT_CHUNK]
+        stmt = mysql_insert(ProviderRequestMatch).values(list(chunk))
+        stmt = stmt.on_duplicate_key_update(
+            segment=stmt.inserted.segment,
+            type_rank=stmt.inserted.type_rank,
+            score_rank=stmt.inserted.score_rank,
+            distance_rank=stmt.inserted.distance_rank,
+            created_rank=stmt.inserted.created_rank,
+            score=stmt.inserted.score,
+            distance_km=stmt.inserted.distance_km,
+        )
+        await db.execute(stmt)
+
+
+class ProviderMatchIndex:
+    """Mantiene la tabla `provider_request_matches` que sirve el feed de prestadores."""
+
+    async def remove_request(self, db: AsyncSession, request_id: int) -> None:
+        """Quita la solicitud de todos los feeds (cerrada, cancelada, etc.)."""
+        await db.execute(
+            delete(ProviderRequestMatch).where(ProviderRequestMatch.request_id == request_id)
+        )
+
+    async def remove_requests(self, db: AsyncSession, request_ids: Sequence[int]) -> None:
+        """Versión por lote de `remove_request`."""
+        if not request_ids:
+            return
+        await db.execute(
+            delete(ProviderRequestMatch).where(
+                ProviderRequestMatch.request_id.in_(list(request_ids))
+            )
+        )
+
+    async def remove_pair(
+        self, db: AsyncSession, provider_profile_id: int, request_id: int
+    ) -> None:
+        """Quita la solicitud del feed de un prestador (ya ofertó o la ocultó)."""
+        await db.execute(
+            delete(ProviderRequestMatch).where(
+                ProviderRequestMatch.provider_profile_id == provider_profile_id,
+                ProviderRequestMatch.request_id == request_id,
+            )
+        )
+
+    async def refresh_request(self, db: AsyncSession, request_id: int) -> None:
+        """Recalcula qué prestadores ven la solicitud."""
+        await self.remove_request(db, request_id)
+
+        row = (
+            await db.execute(
+                select(ServiceRequest, Address)
+                .outerjoin(Address, Address.id == ServiceRequest.address_id)
+                .where(ServiceRequest.id == request_id)
+            )
+        ).first()
+        if row is None:
+            return
+        request, address = row
+        if request.status != ServiceRequestStatus.PUBLISHED:
+            return
+
+        proposed = set(
+            (
+                await db.execute(
+                    select(ServiceRequestProposal.provider_profile_id).where(
+                        ServiceRequestProposal.request_id == request_id
+                    )
+                )
+            ).scalars()
+        )
+
+        city, state, point = _request_location(request, address)
+        rows: List[dict] = []
+        if request.request_type == ServiceRequestType.RECONTRATACION:
+            target = request.target_provider_profile_id
+            if target and target not in proposed:
+                target_user_id = (
+                    await db.execute(
+                        select(ProviderProfile.user_id).where(ProviderProfile.id == target)
+                    )
+                ).scalar_one_or_none()
+                target_address = (
+                    await _provider_addresses(db, [target_user_id])
+                ).get(target_user_id)
+                rows.append(
+                    _match_row(
+                        target,
+                        request.id,
+                        segment=REHIRE_SEGMENT,
+                        request_type=request.request_type,
+                        created_at=request.created_at,
+                        distance_km=_distance(_provider_point(target_address), point),
+                    )
+                )
+        else:
+            candidates = (
+                await db.execute(
+                    select(
+                        ProviderLicense.provider_profile_id,
+                        ProviderProfile.user_id,
+                        func.max(ServiceRequestTag.confidence),
+                    )
+                    .select_from(ServiceRequestTag)
+                    .join(
+                        ProviderLicenseTag,
+                        ProviderLicenseTag.tag_id == ServiceRequestTag.tag_id,
+                    )
+                    .join(ProviderLicense, ProviderLicense.id == ProviderLicenseTag.license_id)
+                    .join(
+                        ProviderProfile,
+                        ProviderProfile.id == ProviderLicense.provider_profile_id,
+                    )
+                    .where(ServiceRequestTag.request_id == request_id)
+                    .group_by(ProviderLicense.provider_profile_id, ProviderProfile.user_id)
+                )
+            ).all()
+
+            addresses = await _provider_addresses(db, (user_id for _, user_id, _ in candidates))
+            for provider_profile_id, user_id, score in candidates:
+                if provider_profile_id in proposed:
+                    continue
+                provider_address = addresses.get(user_id)
+                distance_km = _distance(_provider_point(provider_address), point)
+                if not _location_matches(provider_address, city, state, distance_km):
+                    continue
+                rows.append(
+                    _match_row(
+                        provider_profile_id,
+                        request.id,
+                        segment=TAG_SEGMENT,
+                        request_type=request.request_type,
+                        created_at=request.created_at,
+                        score=score,
+                        distance_km=distance_km,
+                    )
+                )
+
+        await _insert_rows(db, rows)
+
+    async def refresh_provider(self, db: AsyncSession, provider_profile_id: int) -> None:
+        """Recalcula el feed completo de un prestador (cambió licencias o dirección)."""
+        await db.execute(
+            delete(ProviderRequestMatch).where(
+                ProviderRequestMatch.provider_profile_id == provider_profile_id
+            )
+        )
+
+        user_id = (
+            await db.execute(
+                select(ProviderProfile.user_id).where(ProviderProfile.id == provider_profile_id)
+            )
+        ).scalar_one_or_none()
+        if user_id is None:
+            return
+
+        already_proposed = exists().where(
+            ServiceRequestProposal.request_id == ServiceRequest.id,
+            ServiceRequestProposal.provider_profile_id == provider_profile_id,
+        )
+
+        provider_address = (await _provider_addresses(db, [user_id])).get(user_id)
+        provider_point = _provider_point(provider_address)
+
+        request_columns = (
+            ServiceRequest.id,
+            ServiceRequest.request_type,
+            ServiceRequest.created_at,
+            ServiceRequest.city_snapshot,
+            ServiceRequest.lat_snapshot,
+            ServiceRequest.lon_snapshot,
+            Address.city,
+            Address.state,
+            Address.latitude,
+            Address.longitude,
+        )
+
+        rows: List[dict] = []
+        rehires = await db.execute(
+            select(*request_columns)
+            .outerjoin(Address, Address.id == ServiceRequest.address_id)
+            .where(
+                ServiceRequest.status == ServiceRequestStatus.PUBLISHED,
+                ServiceRequest.request_type == ServiceRequestType.RECONTRATACION,
+                ServiceRequest.target_provider_profile_id == provider_profile_id,
+                ~already_proposed,
+            )
+        )
+        for row in rehires.all():
+            rows.append(
+                _match_row(
+                    provider_profile_id,
+                    row.id,
+                    segment=REHIRE_SEGMENT,
+                    request_type=row.request_type,
+                    created_at=row.created_at,
+                    distance_km=_distance(provider_point, _row_point(row)),
+                )
+            )
+
+        provider_tags = (
+            select(ProviderLicenseTag.tag_id)
+            .join(ProviderLicense, ProviderLicense.id == ProviderLicenseTag.license_id)
+            .where(ProviderLicense.provider_profile_id == provider_profile_id)
+        )
+        # Cada solicitud queda con la confianza de su tag más fuerte en común
+        scores = (
+            select(
+                ServiceRequestTag.request_id.label("request_id"),
+                func.max(ServiceRequestTag.confidence).label("score"),
+            )
+            .where(ServiceRequestTag.tag_id.in_(provider_tags))
+            .group_by(ServiceRequestTag.request_id)
+            .subquery()
+        )
+        match_stmt = (
+            select(*request_columns, scores.c.score)
+            .join(scores, scores.c.request_id == ServiceRequest.id)
+            .outerjoin(Address, Address.id == ServiceRequest.address_id)
+            .where(
+                ServiceRequest.status == ServiceRequestStatus.PUBLISHED,
+                ServiceRequest.request_type.in_(
+                    [ServiceRequestType.FAST, ServiceRequestType.LICITACION]
+                ),
+                ~already_proposed,
+            )
+        )
+        if provider_point is not None and settings.MATCH_RADIUS_KM > 0:
+            # Prefiltro por rango sobre ix_service_requests_point; la distancia
+            # exacta se calcula abajo. Las solicitudes sin coordenadas se
+            # resuelven por ciudad/provincia y van en una consulta aparte: un
+            # OR con IS NULL en la misma condición impide el range scan.
+            lat_min, lat_max, lon_min, lon_max = bounding_box(
+                *provider_point, settings.MATCH_RADIUS_KM
+            )
+            match_stmt = union_all(
+                match_stmt.where(
+                    ServiceRequest.lat_snapshot.between(lat_min, lat_max),
+                    ServiceRequest.lon_snapshot.between(lon_min, lon_max),
+                ),
+                match_stmt.where(
+                    or_(
+                        ServiceRequest.lat_snapshot.is_(None),
+                        ServiceRequest.lon_snapshot.is_(None),
+                    )
+                ),
+            )
+
+        for row in (await db.execute(match_stmt)).all():
+            distance_km = _distance(provider_point, _row_point(row))
+            request_city = _normalize(row.city) or _normalize(row.city_snapshot)
+            if not _location_matches(
+                provider_address, request_city, _normalize(row.state), distance_km
+            ):
+                continue
+            rows.append(
+                _match_row(
+                    provider_profile_id,
+                    row.id,
+                    segment=TAG_SEGMENT,
+                    request_type=row.request_type,
+                    created_at=row.created_at,
+                    score=row.score,
+                    distance_km=distance_km,
+                )
+            )
+
+        await _insert_rows(db, rows)
+
+    async def refresh_user(self, db: AsyncSession, user_id: int) -> None:
+        """Recalcula lo que depende de las direcciones de un usuario.
+
+        Si es prestador cambia su propio feed; si es cliente cambia la ubicación
+        de sus solicitudes publicadas.
+        """
+        provider_profile_id = (
+            await db.execute(
+                select(ProviderProfile.id).where(ProviderProfile.user_id == user_id)
+            )
+        ).scalar_one_or_none()
+        if provider_profile_id is not None:
+            await self.refresh_provider(db, provider_profile_id)
+
+        request_ids = (
+            await db.execute(
+                select(ServiceRequest.id).where(
+                    ServiceRequest.client_id == user_id,
+                    ServiceRequest.status == ServiceRequestStatus.PUBLISHED,
+                )
+            )
+        ).scalars().all()
+        for request_id in request_ids:
+            await self.refresh_request(db, request_id)
+
+    async def provider_user_ids(self, db: AsyncSession, request_id: int) -> List[int]:
+        """Usuarios prestadores que ven la solicitud por coincidencia de tags."""
+        result = await db.execute(
+            select(ProviderProfile.user_id)
+            .join(
+                ProviderRequestMatch,
+                ProviderRequestMatch.provider_profile_id == ProviderProfile.id,
+            )
+            .where(
+                ProviderRequestMatch.request_id == request_id,
+                ProviderRequestMatch.segment == TAG_SEGMENT,
+            )
+        )
+        return list(result.scalars().all())
+
+    async def rebuild(
+        self,
+        session_factory: async_sessionmaker[AsyncSession] = AsyncSessionLocal,
+    ) -> int:
+        """Reconstruye el índice de todos los prestadores, uno por transacción."""
+        async with session_factory() as db:
+            provider_ids = (await db.execute(select(ProviderProfile.id))).scalars().all()
+
+        for provider_profile_id in provider_ids:
+            async with session_factory() as db:
+                await self.refresh_provider(db, provider_profile_id)
+                await db.commit()
+
+        logger.info("Índice de matching reconstruido para %s prestadores", len(provider_ids))
+        return len(provider_ids)
+
+
+match_index = ProviderMatchIndex()
+
+
+if __name__ == "__main__":  # pragma: no cover - uso manual
+    logging.basicConfig(level=logging.INFO)
+    if sys.argv[1:] != ["rebuild"]:
+        print("Uso: python -m services.match_index rebuild")
+        sys.exit(1)
+    asyncio.run(match_index.rebuild())
@@ -0,0 +1,379 @@
+"""Dispatcher en segundo plano que envía el outbox de notificaciones a Expo."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections import defaultdict
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Sequence, Tuple
+
+from sqlalchemy import and_, delete, insert, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+import settings
+from database.database import AsyncSessionLocal
+from models.NotificationOutbox import NotificationOutbox, NotificationStatus
+from models.PushTicket import PushTicket
+from models.PushToken import PushToken
+from services.http_client import outbound_http
+
+logger = logging.getLogger(__name__)
+
+# Expo acepta hasta 100 mensajes por request
+EXPO_CHUNK_SIZE = 100
+INVALID_TOKEN_ERRORS = {"DeviceNotRegistered", "InvalidCredentials"}
+UNKNOWN_PLATFORM = "unknown"
+EXPO_HEADERS = {
+    "Accept": "application/json",
+    "Accept-Encoding": "gzip, deflate",
+    "Content-Type": "application/json",
+}
+
+# (id del outbox, mensaje para Expo)
+OutboxMessage = Tuple[int, Dict[str, Any]]
+
+
+@dataclass
+class PlatformDeliveryMetrics:
+    """Resultados de entrega de una plataforma desde que arrancó el proceso."""
+
+    tickets_ok: int = 0
+    tickets_error: int = 0
+    receipts_ok: int = 0
+    receipts_error: int = 0
+    receipts_expired: int = 0
+    tokens_purged: int = 0
+
+    @property
+    def delivery_rate(self) -> float | None:
+        """Entregados sobre intentos con resultado conocido (ticket o recibo con error)."""
+        attempted = self.tickets_error + self.receipts_ok + self.receipts_error
+        return self.receipts_ok / attempted if attempted else None
+
+
+class DeliveryMetrics:
+    """Métricas de entrega por plataforma, compartidas por dispatcher y recibos."""
+
+    def __init__(self) -> None:
+        self.platforms: Dict[str, PlatformDeliveryMetrics] = defaultdict(
+            PlatformDeliveryMetrics
+        )
+
+    def __getitem__(self, platform: str | None) -> PlatformDeliveryMetrics:
+        return self.platforms[platform or UNKNOWN_PLATFORM]
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        return {
+            platform: {**asdict(metrics), "delivery_rate": metrics.delivery_rate}
+            for platform, metrics in sorted(self.platforms.items())
+        }
+
+
+delivery_metrics = DeliveryMetrics()
+
+
+def chunk_messages(
+    messages_by_notification: Dict[int, List[Dict[str, Any]]],
+    size: int = EXPO_CHUNK_SIZE,
+) -> List[List[OutboxMessage]]:
+    """Agrupa mensajes de distintos usuarios en lotes de hasta `size`.
+
+    Los mensajes de una misma notificación van juntos siempre que entren en un
+    lote, para que un reintento no reenvíe lo que ya salió en otro.
+    """
+    chunks: List[List[OutboxMessage]] = []
+    current: List[OutboxMessage] = []
+    for outbox_id, messages in messages_by_notification.items():
+        if current and len(current) + len(messages) > size:
+            chunks.append(current)
+            current = []
+        for message in messages:
+            if len(current) >= size:
+                chunks.append(current)
+                current = []
+            current.append((outbox_id, message))
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+class NotificationDispatcher:
+    """Procesa `notification_outbox` con lotes hacia Expo, reintentos y backoff."""
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession] = AsyncSessionLocal,
+        *,
+        push_url: str = settings.EXPO_PUSH_API_URL,
+        timeout: float = settings.EXPO_PUSH_TIMEOUT_SECONDS,
+        poll_interval: float = settings.NOTIFICATION_POLL_SECONDS,
+        batch_size: int = settings.NOTIFICATION_BATCH_SIZE,
+        max_attempts: int = settings.NOTIFICATION_MAX_ATTEMPTS,
+        lock_timeout: float = settings.NOTIFICATION_LOCK_TIMEOUT_SECONDS,
+        retry_backoff: float = settings.NOTIFICATION_RETRY_BACKOFF_SECONDS,
+    ) -> None:
+        self.session_factory = session_factory
+        self.push_url = push_url
+        self.timeout = timeout
+        self.poll_interval = poll_interval
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.lock_timeout = lock_timeout
+        self.retry_backoff = retry_backoff
+        self._wakeup = asyncio.Event()
+        self._task: asyncio.Task | None = None
+
+    def notify(self) -> None:
+        """Despierta al dispatcher para no esperar al próximo ciclo de polling."""
+        self._wakeup.set()
+
+    async def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(), name="notification-dispatcher")
+            logger.info("Dispatcher de notificaciones iniciado")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            logger.info("Dispatcher de notificaciones detenido")
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                processed = await self.run_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Error inesperado en el dispatcher de notificaciones")
+                processed = 0
+
+            # Si se llenó el lote probablemente quedan más notificaciones pendientes
+            if processed >= self.batch_size:
+                continue
+
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def run_once(self) -> int:
+        """Reclama un lote del outbox y lo envía a Expo."""
+        notifications = await self._claim()
+        if notifications:
+            try:
+                await self._dispatch(notifications)
+            except Exception as exc:
+                # Sin esto el lote queda RUNNING hasta que venza el lock
+                logger.exception(
+                    "Error inesperado despachando %s notificaciones", len(notifications)
+                )
+                await self._release_failed([n.id for n in notifications], exc)
+        return len(notifications)
+
+    async def _claim(self) -> List[NotificationOutbox]:
+        now = datetime.utcnow()
+        stale_before = now - timedelta(seconds=self.lock_timeout)
+
+        async with self.session_factory() as db:
+            stmt = (
+                select(NotificationOutbox)
+                .where(
+                    or_(
+                        and_(
+                            NotificationOutbox.status == NotificationStatus.PENDING,
+                            NotificationOutbox.run_after <= now,
+                        ),
+                        # Notificaciones abandonadas por un proceso que murió a mitad
+                        and_(
+                            NotificationOutbox.status == NotificationStatus.RUNNING,
+                            NotificationOutbox.locked_at < stale_before,
+                        ),
+                    )
+                )
+                .order_by(NotificationOutbox.run_after, NotificationOutbox.id)
+                .limit(self.batch_size)
+                .with_for_update(skip_locked=True)
+            )
+            notifications = (await db.execute(stmt)).scalars().all()
+            for notification in notifications:
+                notification.status = NotificationStatus.RUNNING
+                notification.locked_at = now
+                notification.attempts = (notification.attempts or 0) + 1
+            await db.commit()
+        return list(notifications)
+
+    async def _dispatch(self, notifications: Sequence[NotificationOutbox]) -> None:
+        async with self.session_factory() as db:
+            token_rows = await db.execute(
+                select(PushToken.user_id, PushToken.token, PushToken.platform).where(
+                    PushToken.user_id.in_({n.user_id for n in notifications})
+                )
+            )
+            tokens_by_user: Dict[int, List[str]] = defaultdict(list)
+            platform_by_token: Dict[str, str | None] = {}
+            for user_id, token, platform in token_rows.all():
+                tokens_by_user[user_id].append(token)
+                platform_by_token[token] = platform
+
+        messages_by_notification = {
+            notification.id: [
+                {
+                    "to": token,
+                    "sound": notification.sound,
+                    "title": notification.title,
+                    "body": notification.body,
+                    "data": notification.data or {},
+                }
+                for token in tokens_by_user.get(notification.user_id, [])
+            ]
+            for notification in notifications
+        }
+
+        sent_ids = {
+            outbox_id
+            for outbox_id, messages in messages_by_notification.items()
+            if not messages
+        }
+        errors: Dict[int, str] = {}
+        invalid_tokens: List[str] = []
+        tickets: List[Dict[str, Any]] = []
+
+        chunks = chunk_messages(
+            {key: value for key, value in messages_by_notification.items() if value}
+        )
+        results = await asyncio.gather(
+            *(self._send_chunk(chunk) for chunk in chunks), return_exceptions=True
+        )
+        for chunk, result in zip(chunks, results):
+            chunk_ids = {outbox_id for outbox_id, _ in chunk}
+            if isinstance(result, BaseException):
+                error = f"{type(result).__name__}: {result}"[:500]
+                for outbox_id in chunk_ids:
+                    errors[outbox_id] = error
+                continue
+            sent_ids |= chunk_ids
+            for (outbox_id, message), ticket in zip(chunk, result):
+                token = message["to"]
+                platform = platform_by_token.get(token)
+                if ticket.get("status") == "ok":
+                    delivery_metrics[platform].tickets_ok += 1
+                    if ticket.get("id"):
+                        tickets.append(
+                            {
+                                "ticket_id": ticket["id"],
+                                "token": token,
+                                "platform": platform,
+                                "notification_id": outbox_id,
+                                "created_at": datetime.utcnow(),
+                            }
+                        )
+                    continue
+                delivery_metrics[platform].tickets_error += 1
+                error = (ticket.get("details") or {}).get("error") or ticket.get("message")
+                logger.error("Expo devolvió error para token %s: %s", token, error)
+                if error in INVALID_TOKEN_ERRORS:
+                    invalid_tokens.append(token)
+                    delivery_metrics[platform].tokens_purged += 1
+
+        # Una notificación repartida entre lotes se reintenta si falló alguno
+        sent_ids -= set(errors)
+
+        async with self.session_factory() as db:
+            if invalid_tokens:
+                logger.info(
+                    "Eliminando %s tokens inválidos reportados por Expo",
+                    len(invalid_tokens),
+                )
+                await db.execute(delete(PushToken).where(PushToken.token.in_(invalid_tokens)))
+            if tickets:
+                # Se consultan después con push_receipt_worker
+                await db.execute(insert(PushTicket), tickets)
+            if sent_ids:
+                await db.execute(
+                    update(NotificationOutbox)
+                    .where(NotificationOutbox.id.in_(sent_ids))
+                    .values(
+                        status=NotificationStatus.SENT,
+                        locked_at=None,
+                        last_error=None,
+                        sent_at=datetime.utcnow(),
+                    )
+                    .execution_options(synchronize_session=False)
+                )
+            await self._mark_failed(db, errors.items())
+            await db.commit()
+
+        logger.info(
+            "Outbox: %s notificaciones enviadas en %s lotes, %s con error",
+            len(sent_ids),
+            len(chunks),
+            len(errors),
+        )
+
+    async def _send_chunk(self, chunk: List[OutboxMessage]) -> List[Dict[str, Any]]:
+        """Envía un lote a Expo y devuelve sus tickets, en el orden de los mensajes."""
+        response = await outbound_http.client("expo").post(
+            self.push_url,
+            json=[message for _, message in chunk],
+            headers=EXPO_HEADERS,
+            timeout=self.timeout,
+        )
+        response.raise_for_status()
+        return response.json().get("data", [])
+
+    async def _release_failed(self, outbox_ids: List[int], exc: Exception) -> None:
+        """Devuelve a la cola con backoff (o da por fallidas) las notificaciones del lote."""
+        error = f"{type(exc).__name__}: {exc}"[:500]
+        try:
+            async with self.session_factory() as db:
+                await self._mark_failed(db, ((outbox_id, error) for outbox_id in outbox_ids))
+                await db.commit()
+        except Exception:
+            logger.exception("No se pudieron liberar las notificaciones %s", outbox_ids)
+
+    async def _mark_failed(
+        self, db: AsyncSession, errors: Iterable[Tuple[int, str]]
+    ) -> None:
+        errors = dict(errors)
+        if not errors:
+            return
+
+        notifications = (
+            await db.execute(
+                select(NotificationOutbox).where(NotificationOutbox.id.in_(errors))
+            )
+        ).scalars().all()
+        for notification in notifications:
+            notification.last_error = errors[notification.id]
+            notification.locked_at = None
+            if notification.attempts >= self.max_attempts:
+                notification.status = NotificationStatus.FAILED
+                logger.error(
+                    "Notificación %s agotó %s intentos: %s",
+                    notification.id,
+                    notification.attempts,
+                    notification.last_error,
+                )
+            else:
+                delay = self.retry_backoff * (2 ** (notification.attempts - 1))
+                notification.status = NotificationStatus.PENDING
+                notification.run_after = datetime.utcnow() + timedelta(seconds=delay)
+                logger.warning(
+                    "Notificación %s falló (intento %s/%s), reintento en %.0fs: %s",
+                    notification.id,
+                    notification.attempts,
+                    self.max_attempts,
+                    delay,
+                    notification.last_error,
+                )
+
+
+notification_dispatcher = NotificationDispatcher()
@@ -1,21 +1,24 @@
 import logging
-from typing import List, Any, Dict
+from datetime import datetime
+from typing import Any, Dict
 
-import httpx
 from sqlalchemy import select, delete
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from models.NotificationOutbox import NotificationOutbox, NotificationStatus
 from models.PushToken import PushToken
 
 logger = logging.getLogger(__name__)
 
-EXPO_PUSH_API_URL = "https://exp.host/--/api/v2/push/send"
-
 
 class NotificationService:
     @staticmethod
     async def register_token(
-        db: AsyncSession, user_id: int, token: str, device_name: str | None = None
+        db: AsyncSession,
+        user_id: int,
+        token: str,
+        device_name: str | None = None,
+        platform: str | None = None,
     ) -> PushToken:
         """Registra o actualiza un token de notificación para un usuario."""
         if not token.startswith("ExponentPushToken") and not token.startswith(
@@ -24,6 +27,8 @@ class NotificationService:
             # Basic validation, though Expo SDK handles more
             logger.warning(f"Token invalido intentando registrarse: {token}")
 
+        platform = (platform or "").strip().lower() or None
+
         # Check if token exists
         stmt = select(PushToken).where(PushToken.token == token)
         result = await db.execute(stmt)
@@ -34,6 +39,7 @@ class NotificationService:
                 # Token changed owner (rare but possible on device switch/logout)
                 existing_token.user_id = user_id
             existing_token.device_name = device_name or existing_token.device_name
+            existing_token.platform = platform or existing_token.platform
             await db.commit()
             await db.refresh(existing_token)
             logger.info(
@@ -43,7 +49,9 @@ class NotificationService:
             )
             return existing_token
 
-        new_token = PushToken(user_id=user_id, token=token, device_name=device_name)
+        new_token = PushToken(
+            user_id=user_id, token=token, device_name=device_name, platform=platform
+        )
         db.add(new_token)
         await db.commit()
         await db.refresh(new_token)
@@ -62,97 +70,30 @@ class NotificationService:
         await db.commit()
 
     @staticmethod
-    async def send_notification_to_user(
+    def enqueue(
         db: AsyncSession,
         user_id: int,
         title: str,
         body: str,
         data: Dict[str, Any] | None = None,
         sound: str = "default",
-    ) -> None:
-        """Envía una notificación a todos los dispositivos de un usuario."""
-
-        # Get all tokens for user
-        stmt = select(PushToken.token).where(PushToken.user_id == user_id)
-        result = await db.execute(stmt)
-        tokens = result.scalars().all()
-
-        if not tokens:
-            logger.info(f"El usuario {user_id} no tiene tokens registrados.")
-            return
-
-        logger.info(
-            "Enviando notificación user_id=%s a %s dispositivos",
-            user_id,
-            len(tokens),
+    ) -> NotificationOutbox:
+        """Agrega la notificación al outbox; se confirma junto con el cambio que la origina.
+
+        El envío a Expo lo hace `notification_dispatcher` después del commit.
+        """
+        notification = NotificationOutbox(
+            user_id=user_id,
+            title=title,
+            body=body,
+            data=data or {},
+            sound=sound,
+            status=NotificationStatus.PENDING,
+            attempts=0,
+            run_after=datetime.utcnow(),
         )
-
-        messages = []
-        for token in tokens:
-            messages.append(
-                {
-                    "to": token,
-                    "sound": sound,
-                    "title": title,
-                    "body": body,
-                    "data": data or {},
-                }
-            )
-
-        await NotificationService._send_push_chunk(db, messages)
-
-    @staticmethod
-    async def _send_push_chunk(
-        db: AsyncSession, messages: List[Dict[str, Any]]
-    ) -> None:
-        """Envía un lote de mensajes a la API de Expo."""
-        # Expo supports batches of up to 100 messages
-        # For simplicity here we send one batch, but ideally should chunk if len > 100
-
-        chunk_size = 100
-        for i in range(0, len(messages), chunk_size):
-            chunk = messages[i : i + chunk_size]
-            try:
-                async with httpx.AsyncClient() as client:
-                    response = await client.post(
-                        EXPO_PUSH_API_URL,
-                        json=chunk,
-                        headers={
-                            "Accept": "application/json",
-                            "Accept-Encoding": "gzip, deflate",
-                            "Content-Type": "application/json",
-                        },
-                    )
-                    response.raise_for_status()
-                    payload = response.json()
-                    invalid_tokens: List[str] = []
-                    tickets = payload.get("data", [])
-                    for message, ticket in zip(chunk, tickets):
-                        status = ticket.get("status")
-                        if status == "ok":
-                            continue
-                        error_detail = ticket.get("details", {})
-                        error = error_detail.get("error") or ticket.get("message")
-                        logger.error(
-                            "Expo devolvió error para token %s: %s",
-                            message["to"],
-                            error,
-                        )
-                        if error in {"DeviceNotRegistered", "InvalidCredentials"}:
-                            invalid_tokens.append(message["to"])
-
-                    if invalid_tokens:
-                        logger.info(
-                            "Eliminando %s tokens inválidos reportados por Expo",
-                            len(invalid_tokens),
-                        )
-                        stmt = delete(PushToken).where(
-                            PushToken.token.in_(invalid_tokens)
-                        )
-                        await db.execute(stmt)
-                        await db.commit()
-            except Exception as e:
-                logger.error(f"Error enviando notificaciones a Expo: {e}")
+        db.add(notification)
+        return notification
 
 
 notification_service = NotificationService()
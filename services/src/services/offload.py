@@ -0,0 +1,154 @@
+"""Pools acotados para sacar trabajo bloqueante del event loop.
+
+- `image_executor`: procesos para el trabajo de CPU de Pillow.
+- `storage_executor`: threads para las llamadas sincrónicas a MinIO.
+- `password_executor`: threads para bcrypt (libera el GIL mientras calcula).
+
+Cada pool deja correr hasta `workers` tareas a la vez y acepta hasta
+`max_pending` en total (corriendo + en espera). Pasado ese límite rechaza con
+`PoolSaturated` en lugar de encolar sin fin, para que el llamador responda 503
+y el cliente reintente.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+import logging
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Dict, TypeVar
+
+import settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class PoolSaturated(Exception):
+    """El pool ya tiene `max_pending` tareas aceptadas."""
+
+
+@dataclass
+class OffloadMetrics:
+    submitted: int = 0
+    rejected: int = 0
+    errors: int = 0
+    running: int = 0
+    pending: int = 0
+    peak_pending: int = 0
+    total_wait_seconds: float = 0.0
+    total_run_seconds: float = 0.0
+
+
+class BoundedExecutor:
+    """Executor con concurrencia y cola acotadas, usable desde corrutinas."""
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        workers: int,
+        max_pending: int,
+        processes: bool = False,
+    ) -> None:
+        self.name = name
+        self.workers = workers
+        self.max_pending = max(max_pending, workers)
+        self.processes = processes
+        self.stats = OffloadMetrics()
+        self._executor: Executor | None = None
+        self._slots: asyncio.Semaphore | None = None
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.processes:
+                # spawn: un fork con los threads del servidor vivos no es seguro
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix=self.name
+                )
+        return self._executor
+
+    async def run(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Ejecuta `func` en el pool; lanza `PoolSaturated` si la cola está llena."""
+        stats = self.stats
+        if stats.pending >= self.max_pending:
+            stats.rejected += 1
+            raise PoolSaturated(f"Pool {self.name} saturado ({stats.pending} tareas)")
+
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.workers)
+        loop = asyncio.get_running_loop()
+        stats.submitted += 1
+        stats.pending += 1
+        stats.peak_pending = max(stats.peak_pending, stats.pending)
+        queued_at = loop.time()
+        try:
+            # El executor nunca recibe más tareas que workers: la espera queda acá
+            async with self._slots:
+                started_at = loop.time()
+                stats.total_wait_seconds += started_at - queued_at
+                stats.running += 1
+                try:
+                    return await loop.run_in_executor(
+                        self._get_executor(), functools.partial(func, *args, **kwargs)
+                    )
+                except Exception:
+                    stats.errors += 1
+                    raise
+                finally:
+                    stats.running -= 1
+                    stats.total_run_seconds += loop.time() - started_at
+        finally:
+            stats.pending -= 1
+
+    def shutdown(self) -> None:
+        executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+            logger.info("Pool %s detenido", self.name)
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "workers": self.workers,
+            "max_pending": self.max_pending,
+            **asdict(self.stats),
+        }
+
+
+image_executor = BoundedExecutor(
+    "image",
+    workers=settings.IMAGE_PROCESS_WORKERS,
+    max_pending=settings.IMAGE_MAX_PENDING,
+    processes=True,
+)
+storage_executor = BoundedExecutor(
+    "storage",
+    workers=settings.STORAGE_THREAD_WORKERS,
+    max_pending=settings.STORAGE_MAX_PENDING,
+)
+password_executor = BoundedExecutor(
+    "password",
+    workers=settings.PASSWORD_HASH_WORKERS,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING,
+)
+
+
+def shutdown_executors() -> None:
+    image_executor.shutdown()
+    storage_executor.shutdown()
+    password_executor.shutdown()
+
+
+def executor_metrics() -> Dict[str, Any]:
+    return {
+        pool.name: pool.metrics()
+        for pool in (image_executor, storage_executor, password_executor)
+    }
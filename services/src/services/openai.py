@@ -1,6 +1,39 @@
 # pip install openai>=1.40
-from openai import OpenAI
-from settings import OPENAI_API_KEY
+import asyncio
+import logging
+import random
+
+import httpx
+from openai import (
+    APIConnectionError,
+    APITimeoutError,
+    AsyncOpenAI,
+    InternalServerError,
+    RateLimitError,
+)
+
+from settings import (
+    OPENAI_API_KEY,
+    OPENAI_BASE_URL,
+    OPENAI_MAX_CONCURRENCY,
+    OPENAI_MAX_RETRIES,
+    OPENAI_RETRY_BACKOFF_SECONDS,
+    OPENAI_TIMEOUT_SECONDS,
+)
+from services.http_client import outbound_http
+
+logger = logging.getLogger(__name__)
+
+# Errores transitorios que vale la pena reintentar
+RETRYABLE_ERRORS = (
+    APIConnectionError,
+    APITimeoutError,
+    InternalServerError,
+    RateLimitError,
+)
+
+# Límite global de llamadas en vuelo, compartido por todas las instancias del proceso
+_llm_semaphore = asyncio.Semaphore(OPENAI_MAX_CONCURRENCY)
 
 
 class OpenAIService:
@@ -9,17 +42,54 @@ class OpenAIService:
         model: str = "gpt-3.5-turbo",
         temperature: float = 0.2,
         api_key: str = OPENAI_API_KEY,
+        base_url: str | None = OPENAI_BASE_URL,
+        timeout: float = OPENAI_TIMEOUT_SECONDS,
+        max_retries: int = OPENAI_MAX_RETRIES,
+        retry_backoff: float = OPENAI_RETRY_BACKOFF_SECONDS,
+        http_client: httpx.AsyncClient | None = None,
+        semaphore: asyncio.Semaphore | None = None,
     ):
-        self.client = OpenAI(api_key=api_key)
+        # Los reintentos los maneja run() para respetar el semáforo y el backoff.
+        # Por defecto todas las instancias comparten el pool de conexiones
+        # "openai" y el semáforo del proceso.
+        self.client = AsyncOpenAI(
+            api_key=api_key,
+            base_url=base_url,
+            timeout=timeout,
+            max_retries=0,
+            http_client=http_client or outbound_http.client("openai"),
+        )
         self.model = model
         self.temperature = temperature
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.semaphore = semaphore or _llm_semaphore
 
-    def run(self, role_system: str, message: str) -> str:
+    async def run(self, role_system: str, message: str) -> str:
         messages = [
             {"role": "system", "content": role_system},
             {"role": "user", "content": f"{message}"},
         ]
-        rsp = self.client.responses.create(
-            model=self.model, temperature=self.temperature, input=messages
-        )
-        return rsp.output_text.strip()
+
+        attempt = 0
+        while True:
+            try:
+                async with self.semaphore:
+                    rsp = await self.client.responses.create(
+                        model=self.model, temperature=self.temperature, input=messages
+                    )
+                return rsp.output_text.strip()
+            except RETRYABLE_ERRORS as exc:
+                if attempt >= self.max_retries:
+                    raise
+                delay = self.retry_backoff * (2**attempt)
+                delay += random.uniform(0, delay / 2)
+                attempt += 1
+                logger.warning(
+                    "Error transitorio del LLM (%s), reintento %s/%s en %.2fs",
+                    type(exc).__name__,
+                    attempt,
+                    self.max_retries,
+                    delay,
+                )
+                await asyncio.sleep(delay)
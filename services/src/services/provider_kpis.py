@@ -0,0 +1,700 @@
+"""Mantenimiento del rollup mensual de KPIs de prestadores.
+
+Los métodos no confirman la transacción: se llaman antes del `commit` de la
+operación que cambia servicios, propuestas o reseñas. Las reseñas además
+actualizan el histograma de estrellas del perfil, del que se derivan
+`rating_avg` y `total_reviews`.
+
+Cada contador va al mes de la fecha guardada en su fila de origen, la misma
+que usa la reconstrucción: servicios por `Service.created_at`, ingresos por el
+primer paso a COMPLETED del historial, propuestas por
+`ServiceRequestProposal.created_at` y reseñas por `ServiceReview.created_at`.
+Los cambios de estado posteriores corrigen el mes de creación. Las filas
+nuevas se crean con `created_at = now_ar()` para que el mes se conozca antes
+del flush.
+
+Reconstrucción completa y verificación contra las tablas de origen:
+    python -m services.provider_kpis rebuild
+    python -m services.provider_kpis check
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import sys
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
+from decimal import ROUND_HALF_UP, Decimal
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import case, delete, exists, func, select, update
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from database.database import AsyncSessionLocal
+from models.ProviderKpiMonthly import ProviderKpiMonthly
+from models.ProviderProfile import ProviderProfile
+from models.ServiceRequest import (
+    ProposalStatus,
+    Service,
+    ServiceRequestProposal,
+    ServiceReview,
+    ServiceStatus,
+    ServiceStatusHistory,
+)
+
+logger = logging.getLogger(__name__)
+
+_COUNTERS = (
+    "services_total",
+    "services_completed",
+    "proposals_total",
+    "proposals_accepted",
+    "revenue_services",
+    "revenue_gross",
+    "revenue_net",
+    "reviews_count",
+    "rating_sum",
+    "rating_1_count",
+    "rating_2_count",
+    "rating_3_count",
+    "rating_4_count",
+    "rating_5_count",
+)
+
+_STARS = range(1, 6)
+_TWO_DECIMALS = Decimal("0.01")
+
+# Fee de gestión (2%) que se cobra al cliente; el ingreso del proveedor es el neto
+MANAGEMENT_FEE_RATE = Decimal("0.02")
+PROVIDER_NET_DIVISOR = Decimal("1") + MANAGEMENT_FEE_RATE  # 1.02
+# Misma escala que MySQL para DECIMAL(12,2) / 1.02 (div_precision_increment = 4)
+_NET_SCALE = Decimal("0.000001")
+
+
+def net_price(total_price) -> Decimal:
+    return (Decimal(total_price) / PROVIDER_NET_DIVISOR).quantize(
+        _NET_SCALE, rounding=ROUND_HALF_UP
+    )
+
+
+def now_ar() -> datetime:
+    """Hora actual de Argentina (UTC-3) naive, como el resto de los timestamps."""
+    return datetime.now(timezone(timedelta(hours=-3))).replace(tzinfo=None)
+
+
+def month_start(value: datetime | date) -> date:
+    return date(value.year, value.month, 1)
+
+
+def _created_at(source) -> datetime:
+    """Fecha de creación de la fila de origen; `now_ar()` si todavía no la tiene."""
+    return getattr(source, "created_at", None) or now_ar()
+
+
+def _value(status) -> Optional[str]:
+    return getattr(status, "value", status)
+
+
+def _currency(value: Optional[str]) -> str:
+    return (value or "").upper()
+
+
+def _star_counter(rating) -> str:
+    star = int(rating)
+    if star not in _STARS:
+        raise ValueError(f"Calificación fuera de rango: {rating}")
+    return f"rating_{star}_count"
+
+
+def rating_average(counts: Dict[int, int]) -> Optional[Decimal]:
+    """Promedio redondeado a dos decimales de un histograma {estrella: cantidad}."""
+    total = sum(counts.values())
+    if not total:
+        return None
+    rating_sum = sum(star * count for star, count in counts.items())
+    return (Decimal(rating_sum) / Decimal(total)).quantize(
+        _TWO_DECIMALS, rounding=ROUND_HALF_UP
+    )
+
+
+@dataclass
+class RevenueMonth:
+    """Punto de la serie mensual de ingresos."""
+
+    month: date
+    completed_services: int
+    revenue_net: Decimal
+
+
+@dataclass
+class RatingMonth:
+    """Histograma de estrellas de las reseñas de un mes."""
+
+    month: date
+    counts: Dict[int, int]
+
+    @property
+    def total_reviews(self) -> int:
+        return sum(self.counts.values())
+
+    @property
+    def average_rating(self) -> Optional[Decimal]:
+        return rating_average(self.counts)
+
+
+@dataclass
+class KpiMismatch:
+    """Diferencia entre el rollup y lo recalculado desde las tablas de origen."""
+
+    provider_profile_id: int
+    currency: str
+    month: Optional[date]
+    counter: str
+    stored: object
+    expected: object
+
+
+@dataclass
+class ProviderKpiTotals:
+    """Totales de una moneda para el dashboard."""
+
+    services_total: int = 0
+    services_completed: int = 0
+    proposals_total: int = 0
+    proposals_accepted: int = 0
+    revenue_services: int = 0
+    revenue_gross: Decimal = Decimal("0")
+    revenue_net: Decimal = Decimal("0")
+    revenue_net_current_month: Decimal = Decimal("0")
+    revenue_net_previous_month: Decimal = Decimal("0")
+    reviews_count: int = 0
+    rating_sum: int = 0
+    rating_1_count: int = 0
+    rating_2_count: int = 0
+    rating_3_count: int = 0
+    rating_4_count: int = 0
+    rating_5_count: int = 0
+    last_completed_at: Optional[datetime] = None
+
+
+class ProviderKpiRollup:
+    """Escribe y lee la tabla `provider_kpi_monthly`."""
+
+    async def add(
+        self,
+        db: AsyncSession,
+        provider_profile_id: int,
+        currency: Optional[str],
+        *,
+        at: Optional[datetime] = None,
+        last_completed_at: Optional[datetime] = None,
+        **deltas,
+    ) -> None:
+        """Suma los deltas a la fila (prestador, moneda, mes de `at`)."""
+        unknown = set(deltas) - set(_COUNTERS)
+        if unknown:
+            raise ValueError(f"Contadores desconocidos: {sorted(unknown)}")
+        if not any(deltas.values()) and last_completed_at is None:
+            return
+
+        values = {counter: deltas.get(counter) or 0 for counter in _COUNTERS}
+        stmt = mysql_insert(ProviderKpiMonthly).values(
+            provider_profile_id=provider_profile_id,
+            currency=_currency(currency),
+            month=month_start(at or now_ar()),
+            last_completed_at=last_completed_at,
+            **values,
+        )
+        updates = {
+            counter: getattr(ProviderKpiMonthly, counter) + getattr(stmt.inserted, counter)
+            for counter in _COUNTERS
+        }
+        updates["last_completed_at"] = func.greatest(
+            func.coalesce(
+                ProviderKpiMonthly.last_completed_at, stmt.inserted.last_completed_at
+            ),
+            func.coalesce(
+                stmt.inserted.last_completed_at, ProviderKpiMonthly.last_completed_at
+            ),
+        )
+        await db.execute(stmt.on_duplicate_key_update(**updates))
+
+    @staticmethod
+    async def is_first_completion(db: AsyncSession, service_id: int) -> bool:
+        """True si el servicio nunca pasó por COMPLETED (llamar antes de registrar el historial)."""
+        already = await db.execute(
+            select(
+                exists().where(
+                    ServiceStatusHistory.service_id == service_id,
+                    ServiceStatusHistory.to_status == ServiceStatus.COMPLETED.value,
+                )
+            )
+        )
+        return not already.scalar()
+
+    async def service_status_changed(
+        self,
+        db: AsyncSession,
+        service: Service,
+        from_status,
+        to_status,
+        *,
+        at: Optional[datetime] = None,
+        first_completion: bool = False,
+    ) -> None:
+        """Registra una transición de estado; `from_status=None` es la creación.
+
+        Los conteos van al mes de creación del servicio y los ingresos al de
+        `at`, que debe ser el `changed_at` del historial de la transición.
+        """
+        before, after = _value(from_status), _value(to_status)
+        canceled = ServiceStatus.CANCELED.value
+        completed = ServiceStatus.COMPLETED.value
+
+        await self.add(
+            db,
+            service.provider_profile_id,
+            service.currency,
+            at=_created_at(service),
+            services_total=int(after not in (None, canceled))
+            - int(before not in (None, canceled)),
+            services_completed=int(after == completed) - int(before == completed),
+        )
+
+        if first_completion and after == completed and service.total_price is not None:
+            completed_at = at or now_ar()
+            await self.add(
+                db,
+                service.provider_profile_id,
+                service.currency,
+                at=completed_at,
+                last_completed_at=completed_at,
+                revenue_services=1,
+                revenue_gross=Decimal(service.total_price),
+                revenue_net=net_price(service.total_price),
+            )
+
+    async def proposal_status_changed(
+        self,
+        db: AsyncSession,
+        proposal: ServiceRequestProposal,
+        from_status,
+        to_status,
+    ) -> None:
+        """Registra una transición de propuesta en su mes de creación.
+
+        `from_status=None` es la creación.
+        """
+        before, after = _value(from_status), _value(to_status)
+        accepted = ProposalStatus.ACCEPTED.value
+        await self.add(
+            db,
+            proposal.provider_profile_id,
+            proposal.currency,
+            at=_created_at(proposal),
+            proposals_total=1 if before is None else 0,
+            proposals_accepted=int(after == accepted) - int(before == accepted),
+        )
+
+    async def review_added(
+        self,
+        db: AsyncSession,
+        review: ServiceReview,
+        currency: Optional[str],
+    ) -> None:
+        """Suma la reseña al rollup de su mes de creación y al histograma del perfil."""
+        star_counter = _star_counter(review.rating)
+        rating = int(review.rating)
+        await self.add(
+            db,
+            review.ratee_provider_profile_id,
+            currency,
+            at=_created_at(review),
+            reviews_count=1,
+            rating_sum=rating,
+            **{star_counter: 1},
+        )
+
+        # Un único UPDATE atómico: el promedio y el total se calculan con los
+        # contadores previos más la nueva reseña. Se asignan antes que los
+        # contadores porque MySQL evalúa el SET de izquierda a derecha.
+        P = ProviderProfile
+        counts = {star: getattr(P, f"rating_{star}_count") for star in _STARS}
+        counts[rating] = counts[rating] + 1
+        total = sum(counts.values())
+        rating_sum = sum(star * count for star, count in counts.items())
+        await db.execute(
+            update(P)
+            .where(P.id == review.ratee_provider_profile_id)
+            .ordered_values(
+                (P.rating_avg, func.round(rating_sum / total, 2)),
+                (P.total_reviews, total),
+                (getattr(P, star_counter), getattr(P, star_counter) + 1),
+            )
+            .execution_options(synchronize_session=False)
+        )
+
+    async def totals(
+        self,
+        db: AsyncSession,
+        provider_profile_id: int,
+        *,
+        current_month: date,
+        previous_month: date,
+    ) -> Dict[str, ProviderKpiTotals]:
+        """Totales por moneda en una sola lectura del rango del prestador."""
+        T = ProviderKpiMonthly
+        result = await db.execute(
+            select(
+                T.currency,
+                *(func.sum(getattr(T, counter)).label(counter) for counter in _COUNTERS),
+                func.sum(
+                    case((T.month == current_month, T.revenue_net), else_=0)
+                ).label("revenue_net_current_month"),
+                func.sum(
+                    case((T.month == previous_month, T.revenue_net), else_=0)
+                ).label("revenue_net_previous_month"),
+                func.max(T.last_completed_at).label("last_completed_at"),
+            )
+            .where(T.provider_profile_id == provider_profile_id)
+            .group_by(T.currency)
+        )
+
+        totals: Dict[str, ProviderKpiTotals] = {}
+        for row in result.all():
+            data = row._mapping
+            totals[row.currency] = ProviderKpiTotals(
+                **{
+                    key: (
+                        Decimal(str(data[key] or 0))
+                        if key.startswith(("revenue_gross", "revenue_net"))
+                        else int(data[key] or 0)
+                    )
+                    for key in (
+                        *_COUNTERS,
+                        "revenue_net_current_month",
+                        "revenue_net_previous_month",
+                    )
+                },
+                last_completed_at=data["last_completed_at"],
+            )
+        return totals
+
+    async def revenue_series(
+        self,
+        db: AsyncSession,
+        provider_profile_id: int,
+        currency: str,
+        *,
+        since: date,
+    ) -> List[RevenueMonth]:
+        """Meses con ingresos desde `since`: lectura por rango de la clave primaria."""
+        T = ProviderKpiMonthly
+        result = await db.execute(
+            select(T.month, T.revenue_services, T.revenue_net)
+            .where(
+                T.provider_profile_id == provider_profile_id,
+                T.currency == _currency(currency),
+                T.month >= since,
+                T.revenue_services > 0,
+            )
+            .order_by(T.month)
+        )
+        return [
+            RevenueMonth(
+                month=month,
+                completed_services=int(count),
+                revenue_net=Decimal(str(net)),
+            )
+            for month, count, net in result.all()
+        ]
+
+    async def latest_revenue_currency(
+        self, db: AsyncSession, provider_profile_id: int
+    ) -> Optional[str]:
+        """Moneda del servicio completado más reciente del prestador."""
+        T = ProviderKpiMonthly
+        result = await db.execute(
+            select(T.currency)
+            .where(
+                T.provider_profile_id == provider_profile_id,
+                T.currency != "",
+                T.revenue_services > 0,
+                T.last_completed_at.isnot(None),
+            )
+            .order_by(T.last_completed_at.desc())
+            .limit(1)
+        )
+        return result.scalar_one_or_none()
+
+    async def rating_series(
+        self,
+        db: AsyncSession,
+        provider_profile_id: int,
+        *,
+        since: date,
+    ) -> List[RatingMonth]:
+        """Histograma mensual de estrellas desde `since`, sumando todas las monedas."""
+        T = ProviderKpiMonthly
+        result = await db.execute(
+            select(
+                T.month,
+                *(
+                    func.sum(getattr(T, f"rating_{star}_count")).label(f"rating_{star}_count")
+                    for star in _STARS
+                ),
+            )
+            .where(
+                T.provider_profile_id == provider_profile_id,
+                T.month >= since,
+                T.reviews_count > 0,
+            )
+            .group_by(T.month)
+            .order_by(T.month)
+        )
+        return [
+            RatingMonth(
+                month=row.month,
+                counts={
+                    star: int(row._mapping[f"rating_{star}_count"] or 0)
+                    for star in _STARS
+                },
+            )
+            for row in result.all()
+        ]
+
+    async def _expected_buckets(
+        self, db: AsyncSession, provider_profile_id: int
+    ) -> Dict[Tuple[str, date], Dict[str, object]]:
+        """Filas del rollup recalculadas desde servicios, propuestas, historial y reseñas."""
+        buckets: Dict[Tuple[str, date], Dict[str, object]] = defaultdict(
+            lambda: {counter: 0 for counter in _COUNTERS} | {"last_completed_at": None}
+        )
+
+        def bucket(currency: Optional[str], when: Optional[datetime]) -> Dict[str, object]:
+            return buckets[(_currency(currency), month_start(when or now_ar()))]
+
+        services = (
+            await db.execute(
+                select(
+                    Service.id,
+                    Service.status,
+                    Service.currency,
+                    Service.total_price,
+                    Service.created_at,
+                ).where(Service.provider_profile_id == provider_profile_id)
+            )
+        ).all()
+        for service in services:
+            row = bucket(service.currency, service.created_at)
+            status_value = _value(service.status)
+            if status_value != ServiceStatus.CANCELED.value:
+                row["services_total"] += 1
+            if status_value == ServiceStatus.COMPLETED.value:
+                row["services_completed"] += 1
+
+        completions = await db.execute(
+            select(
+                ServiceStatusHistory.service_id,
+                func.min(ServiceStatusHistory.changed_at),
+            )
+            .join(Service, Service.id == ServiceStatusHistory.service_id)
+            .where(
+                Service.provider_profile_id == provider_profile_id,
+                ServiceStatusHistory.to_status == ServiceStatus.COMPLETED.value,
+            )
+            .group_by(ServiceStatusHistory.service_id)
+        )
+        by_id = {service.id: service for service in services}
+        for service_id, completed_at in completions.all():
+            service = by_id.get(service_id)
+            if service is None or service.total_price is None:
+                continue
+            row = bucket(service.currency, completed_at)
+            row["revenue_services"] += 1
+            row["revenue_gross"] += Decimal(service.total_price)
+            row["revenue_net"] += net_price(service.total_price)
+            if row["last_completed_at"] is None or completed_at > row["last_completed_at"]:
+                row["last_completed_at"] = completed_at
+
+        proposals = await db.execute(
+            select(
+                ServiceRequestProposal.status,
+                ServiceRequestProposal.currency,
+                ServiceRequestProposal.created_at,
+            ).where(ServiceRequestProposal.provider_profile_id == provider_profile_id)
+        )
+        for status_value, currency, created_at in proposals.all():
+            row = bucket(currency, created_at)
+            row["proposals_total"] += 1
+            if _value(status_value) == ProposalStatus.ACCEPTED.value:
+                row["proposals_accepted"] += 1
+
+        reviews = await db.execute(
+            select(ServiceReview.rating, ServiceReview.created_at, Service.currency)
+            .join(Service, Service.id == ServiceReview.service_id)
+            .where(ServiceReview.ratee_provider_profile_id == provider_profile_id)
+        )
+        for rating, created_at, currency in reviews.all():
+            row = bucket(currency, created_at)
+            row["reviews_count"] += 1
+            row["rating_sum"] += int(rating)
+            row[_star_counter(rating)] += 1
+
+        return buckets
+
+    @staticmethod
+    def _profile_rating(
+        buckets: Dict[Tuple[str, date], Dict[str, object]]
+    ) -> Dict[str, object]:
+        """Histograma, total y promedio del perfil a partir de las filas del rollup."""
+        counts = {
+            star: sum(int(values[f"rating_{star}_count"]) for values in buckets.values())
+            for star in _STARS
+        }
+        return {
+            **{f"rating_{star}_count": counts[star] for star in _STARS},
+            "total_reviews": sum(counts.values()),
+            "rating_avg": rating_average(counts) or Decimal("0"),
+        }
+
+    async def rebuild_provider(self, db: AsyncSession, provider_profile_id: int) -> int:
+        """Reemplaza las filas de un prestador por las recalculadas."""
+        buckets = await self._expected_buckets(db, provider_profile_id)
+        await db.execute(
+            update(ProviderProfile)
+            .where(ProviderProfile.id == provider_profile_id)
+            .values(**self._profile_rating(buckets))
+            .execution_options(synchronize_session=False)
+        )
+        await db.execute(
+            delete(ProviderKpiMonthly).where(
+                ProviderKpiMonthly.provider_profile_id == provider_profile_id
+            )
+        )
+        if buckets:
+            await db.execute(
+                mysql_insert(ProviderKpiMonthly).values(
+                    [
+                        {
+                            "provider_profile_id": provider_profile_id,
+                            "currency": currency,
+                            "month": month,
+                            **values,
+                        }
+                        for (currency, month), values in buckets.items()
+                    ]
+                )
+            )
+        return len(buckets)
+
+    async def rebuild(
+        self,
+        session_factory: async_sessionmaker[AsyncSession] = AsyncSessionLocal,
+    ) -> int:
+        """Reconstruye el rollup de todos los prestadores, uno por transacción."""
+        async with session_factory() as db:
+            provider_ids = (await db.execute(select(ProviderProfile.id))).scalars().all()
+
+        for provider_profile_id in provider_ids:
+            async with session_factory() as db:
+                await self.rebuild_provider(db, provider_profile_id)
+                await db.commit()
+
+        logger.info("Rollup de KPIs reconstruido para %s prestadores", len(provider_ids))
+        return len(provider_ids)
+
+    async def check_provider(
+        self, db: AsyncSession, provider_profile_id: int
+    ) -> List[KpiMismatch]:
+        """Compara el rollup guardado con lo recalculado desde las tablas de origen.
+
+        Todos los contadores se comparan por moneda y mes. El histograma del
+        perfil se informa con moneda y mes vacíos.
+        """
+        expected = await self._expected_buckets(db, provider_profile_id)
+        mismatches: List[KpiMismatch] = []
+
+        profile_rating = self._profile_rating(expected)
+        profile = (
+            await db.execute(
+                select(
+                    *(getattr(ProviderProfile, field) for field in profile_rating)
+                ).where(ProviderProfile.id == provider_profile_id)
+            )
+        ).one()._mapping
+        for field, want in profile_rating.items():
+            have = profile[field]
+            if Decimal(str(have or 0)) != Decimal(str(want)):
+                mismatches.append(
+                    KpiMismatch(provider_profile_id, "", None, field, have, want)
+                )
+
+        stored_rows = (
+            await db.execute(
+                select(ProviderKpiMonthly).where(
+                    ProviderKpiMonthly.provider_profile_id == provider_profile_id
+                )
+            )
+        ).scalars().all()
+        stored = {
+            (row.currency, row.month): {
+                counter: getattr(row, counter) or 0 for counter in _COUNTERS
+            }
+            for row in stored_rows
+        }
+
+        for currency, month in sorted(set(expected) | set(stored)):
+            want = expected.get((currency, month), {})
+            have = stored.get((currency, month), {})
+            for counter in _COUNTERS:
+                if Decimal(str(have.get(counter, 0))) != Decimal(str(want.get(counter, 0))):
+                    mismatches.append(
+                        KpiMismatch(
+                            provider_profile_id,
+                            currency,
+                            month,
+                            counter,
+                            have.get(counter, 0),
+                            want.get(counter, 0),
+                        )
+                    )
+        return mismatches
+
+    async def check(
+        self,
+        session_factory: async_sessionmaker[AsyncSession] = AsyncSessionLocal,
+    ) -> List[KpiMismatch]:
+        """Verifica el rollup de todos los prestadores."""
+        async with session_factory() as db:
+            provider_ids = (await db.execute(select(ProviderProfile.id))).scalars().all()
+            mismatches: List[KpiMismatch] = []
+            for provider_profile_id in provider_ids:
+                mismatches.extend(await self.check_provider(db, provider_profile_id))
+
+        for mismatch in mismatches:
+            logger.warning("Rollup de KPIs inconsistente: %s", mismatch)
+        logger.info(
+            "Rollup de KPIs verificado para %s prestadores: %s diferencias",
+            len(provider_ids),
+            len(mismatches),
+        )
+        return mismatches
+
+
+provider_kpis = ProviderKpiRollup()
+
+
+if __name__ == "__main__":  # pragma: no cover - uso manual
+    logging.basicConfig(level=logging.INFO)
+    command = sys.argv[1:]
+    if command == ["rebuild"]:
+        asyncio.run(provider_kpis.rebuild())
+    elif command == ["check"]:
+        sys.exit(1 if asyncio.run(provider_kpis.check()) else 0)
+    else:
+        print("Uso: python -m services.provider_kpis rebuild|check")
+        sys.exit(1)
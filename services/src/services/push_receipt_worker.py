@@ -0,0 +1,214 @@
+"""Worker en segundo plano que consulta los recibos de entrega de Expo.
+
+Los tickets que guarda el dispatcher se consultan pasado
+`PUSH_RECEIPT_DELAY_SECONDS`, en llamadas de hasta 1000 ids. Los errores de
+todas las llamadas del ciclo se juntan y los tokens inválidos se borran con un
+único DELETE.
+
+Cada ciclo reclama sus tickets con `FOR UPDATE SKIP LOCKED` y `locked_at`,
+igual que el dispatcher: con varios procesos, ningún recibo se consulta ni se
+cuenta en las métricas dos veces. Los que siguen pendientes se liberan al
+terminar el ciclo.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Sequence, Set
+
+from sqlalchemy import delete, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+import settings
+from database.database import AsyncSessionLocal
+from models.PushTicket import PushTicket
+from models.PushToken import PushToken
+from services.http_client import outbound_http
+from services.notification_dispatcher import (
+    EXPO_HEADERS,
+    INVALID_TOKEN_ERRORS,
+    delivery_metrics,
+)
+
+logger = logging.getLogger(__name__)
+
+# Máximo de ids por llamada a getReceipts según Expo
+EXPO_RECEIPTS_CHUNK_SIZE = 1000
+
+
+class PushReceiptWorker:
+    """Consulta recibos pendientes y depura los tokens que Expo rechaza."""
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession] = AsyncSessionLocal,
+        *,
+        receipts_url: str = settings.EXPO_PUSH_RECEIPTS_URL,
+        timeout: float = settings.EXPO_PUSH_TIMEOUT_SECONDS,
+        poll_interval: float = settings.PUSH_RECEIPT_POLL_SECONDS,
+        receipt_delay: float = settings.PUSH_RECEIPT_DELAY_SECONDS,
+        receipt_ttl: float = settings.PUSH_RECEIPT_TTL_SECONDS,
+        max_batches: int = settings.PUSH_RECEIPT_MAX_BATCHES,
+        lock_timeout: float = settings.PUSH_RECEIPT_LOCK_TIMEOUT_SECONDS,
+    ) -> None:
+        self.session_factory = session_factory
+        self.receipts_url = receipts_url
+        self.timeout = timeout
+        self.poll_interval = poll_interval
+        self.receipt_delay = receipt_delay
+        self.receipt_ttl = receipt_ttl
+        self.max_batches = max_batches
+        self.lock_timeout = lock_timeout
+        self._task: asyncio.Task | None = None
+
+    async def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(), name="push-receipt-worker")
+            logger.info("Worker de recibos push iniciado")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            logger.info("Worker de recibos push detenido")
+
+    def metrics(self) -> Dict[str, Any]:
+        return {"platforms": delivery_metrics.snapshot()}
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                processed = await self.run_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Error inesperado en el worker de recibos push")
+                processed = 0
+
+            # Se llenaron todas las llamadas del ciclo: probablemente hay atraso
+            if processed >= self.max_batches * EXPO_RECEIPTS_CHUNK_SIZE:
+                continue
+            await asyncio.sleep(self.poll_interval)
+
+    async def run_once(self) -> int:
+        """Consulta un ciclo de recibos; devuelve cuántos tickets se resolvieron."""
+        now = datetime.utcnow()
+        tickets = await self._claim(now)
+        if not tickets:
+            return 0
+
+        chunks = [
+            tickets[i : i + EXPO_RECEIPTS_CHUNK_SIZE]
+            for i in range(0, len(tickets), EXPO_RECEIPTS_CHUNK_SIZE)
+        ]
+        results = await asyncio.gather(
+            *(self._fetch_receipts([t.ticket_id for t in chunk]) for chunk in chunks),
+            return_exceptions=True,
+        )
+
+        expired_before = now - timedelta(seconds=self.receipt_ttl)
+        done_ids: List[int] = []
+        invalid_tokens: Set[str] = set()
+        for chunk, receipts in zip(chunks, results):
+            if isinstance(receipts, BaseException):
+                # Los tickets del lote se vuelven a consultar en el próximo ciclo
+                logger.error(f"Error consultando recibos de Expo: {receipts}")
+                continue
+            for ticket in chunk:
+                metrics = delivery_metrics[ticket.platform]
+                receipt = receipts.get(ticket.ticket_id)
+                if receipt is None:
+                    # Recibo todavía no disponible, salvo que Expo ya lo haya descartado
+                    if ticket.created_at < expired_before:
+                        metrics.receipts_expired += 1
+                        done_ids.append(ticket.id)
+                    continue
+
+                done_ids.append(ticket.id)
+                if receipt.get("status") == "ok":
+                    metrics.receipts_ok += 1
+                    continue
+                metrics.receipts_error += 1
+                error = (receipt.get("details") or {}).get("error") or receipt.get("message")
+                logger.warning("Recibo de Expo con error para token %s: %s", ticket.token, error)
+                if error in INVALID_TOKEN_ERRORS and ticket.token not in invalid_tokens:
+                    invalid_tokens.add(ticket.token)
+                    metrics.tokens_purged += 1
+
+        pending_ids = {ticket.id for ticket in tickets}.difference(done_ids)
+        async with self.session_factory() as db:
+            if invalid_tokens:
+                await db.execute(delete(PushToken).where(PushToken.token.in_(invalid_tokens)))
+            if done_ids:
+                await db.execute(delete(PushTicket).where(PushTicket.id.in_(done_ids)))
+            if pending_ids:
+                await db.execute(
+                    update(PushTicket)
+                    .where(PushTicket.id.in_(pending_ids))
+                    .values(locked_at=None)
+                )
+            await db.commit()
+
+        logger.info(
+            "Recibos push: %s tickets consultados en %s llamadas, %s resueltos, %s tokens eliminados",
+            len(tickets),
+            len(chunks),
+            len(done_ids),
+            len(invalid_tokens),
+        )
+        return len(done_ids)
+
+    async def _claim(self, now: datetime) -> List[Any]:
+        """Reclama los tickets listos para consultar que no tiene otro proceso."""
+        stale_before = now - timedelta(seconds=self.lock_timeout)
+        async with self.session_factory() as db:
+            tickets = (
+                await db.execute(
+                    select(
+                        PushTicket.id,
+                        PushTicket.ticket_id,
+                        PushTicket.token,
+                        PushTicket.platform,
+                        PushTicket.created_at,
+                    )
+                    .where(
+                        PushTicket.created_at
+                        <= now - timedelta(seconds=self.receipt_delay),
+                        or_(
+                            PushTicket.locked_at.is_(None),
+                            # Tickets abandonados por un proceso que murió a mitad
+                            PushTicket.locked_at < stale_before,
+                        ),
+                    )
+                    .order_by(PushTicket.created_at, PushTicket.id)
+                    .limit(self.max_batches * EXPO_RECEIPTS_CHUNK_SIZE)
+                    .with_for_update(skip_locked=True)
+                )
+            ).all()
+            if tickets:
+                await db.execute(
+                    update(PushTicket)
+                    .where(PushTicket.id.in_([ticket.id for ticket in tickets]))
+                    .values(locked_at=now)
+                )
+            await db.commit()
+        return tickets
+
+    async def _fetch_receipts(self, ticket_ids: Sequence[str]) -> Dict[str, Dict[str, Any]]:
+        response = await outbound_http.client("expo").post(
+            self.receipts_url,
+            json={"ids": list(ticket_ids)},
+            headers=EXPO_HEADERS,
+            timeout=self.timeout,
+        )
+        response.raise_for_status()
+        return response.json().get("data") or {}
+
+
+push_receipt_worker = PushReceiptWorker()
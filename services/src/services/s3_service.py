@@ -1,22 +1,41 @@
+import asyncio
 import os
 import uuid
-from datetime import datetime
-from typing import List
+from datetime import datetime, timedelta
+from typing import Any, Callable, Iterable, List, Optional, Tuple, TypeVar
 from io import BytesIO
 import logging
 
 from minio import Minio
-from PIL import Image
+from minio.datatypes import Object
+from minio.deleteobjects import DeleteObject
+from minio.error import S3Error
+from PIL import features
 from fastapi import HTTPException, UploadFile
 from utils.error_handler import error_handler
 
 import settings
+from services.http_client import outbound_http
+from services.image_processing import render_variants
+from services.offload import (
+    BoundedExecutor,
+    PoolSaturated,
+    image_executor,
+    storage_executor,
+)
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
 
 class S3Service:
-    """Servicio para gestionar archivos en MinIO S3."""
+    """Servicio para gestionar archivos en MinIO S3.
+
+    El cliente de MinIO es sincrónico: sus llamadas corren en
+    `storage_executor` y la optimización con Pillow en `image_executor`, para
+    no bloquear el event loop.
+    """
 
     def __init__(self):
         endpoint = settings.S3_ENDPOINT.replace("https://", "").replace("http://", "")
@@ -27,6 +46,17 @@ class S3Service:
             access_key=settings.S3_ACCESS_KEY,
             secret_key=settings.S3_SECRET_KEY,
             secure=secure,
+            http_client=outbound_http.storage_pool(),
+        )
+        # Las URLs firmadas apuntan al endpoint que ven los clientes; con la
+        # región fija el SDK firma sin consultar la ubicación del bucket
+        presign_endpoint = settings.S3_PRESIGNED_ENDPOINT
+        self.presign_client = Minio(
+            presign_endpoint.replace("https://", "").replace("http://", ""),
+            access_key=settings.S3_ACCESS_KEY,
+            secret_key=settings.S3_SECRET_KEY,
+            secure=presign_endpoint.startswith("https://"),
+            region=settings.S3_REGION,
         )
         self.bucket_name = settings.S3_BUCKET_NAME
         self.public_url_base = settings.S3_PUBLIC_URL_BASE
@@ -39,6 +69,16 @@ class S3Service:
             "image/gif",
         }
         self.max_file_size = 10 * 1024 * 1024
+        self.image_formats = [
+            ("webp", {"quality": settings.IMAGE_WEBP_QUALITY, "method": 4})
+        ]
+        if settings.IMAGE_AVIF_ENABLED:
+            if features.check("avif"):
+                self.image_formats.append(
+                    ("avif", {"quality": settings.IMAGE_AVIF_QUALITY, "speed": 8})
+                )
+            else:
+                logger.warning("⚠️ Pillow sin soporte AVIF: las variantes se generan sólo en WebP")
         self.available = False
         self._try_connect()
 
@@ -56,10 +96,25 @@ class S3Service:
                 f"⚠️ S3/MinIO no disponible: {e}. El servidor continuará sin almacenamiento de archivos."
             )
 
-    def _ensure_available(self):
+    @staticmethod
+    async def _offload(
+        executor: BoundedExecutor, func: Callable[..., T], *args: Any, **kwargs: Any
+    ) -> T:
+        """Ejecuta `func` en un pool; si está saturado responde 503 para que el cliente reintente."""
+        try:
+            return await executor.run(func, *args, **kwargs)
+        except PoolSaturated:
+            logger.warning(f"⚠️ Pool {executor.name} saturado, se rechaza la operación")
+            raise HTTPException(
+                status_code=503,
+                detail="El servicio de imágenes está saturado. Intentá de nuevo en unos segundos.",
+                headers={"Retry-After": "5"},
+            )
+
+    async def _ensure_available(self):
         """Verifica que S3 esté disponible, si no intenta reconectar."""
         if not self.available:
-            self._try_connect()
+            await self._offload(storage_executor, self._try_connect)
         if not self.available:
             raise HTTPException(
                 status_code=503,
@@ -99,28 +154,35 @@ class S3Service:
             return f"{folder.strip('/')}/{filename}"
         return filename
 
-    @error_handler({"default": "Error al optimizar la imagen."})
-    def _optimize_image(
-        self, image_data: bytes, max_width: int = 1200, quality: int = 85
-    ) -> bytes:
-        with Image.open(BytesIO(image_data)) as img:
-            if img.mode in ("RGBA", "LA", "P"):
-                background = Image.new("RGB", img.size, (255, 255, 255))
-                if img.mode == "P":
-                    img = img.convert("RGBA")
-                background.paste(
-                    img, mask=img.split()[-1] if img.mode == "RGBA" else None
-                )
-                img = background
+    def _variant_specs(self, max_width: int) -> List[Tuple[str, int]]:
+        return [
+            ("thumb", min(settings.IMAGE_THUMB_WIDTH, max_width)),
+            ("card", min(settings.IMAGE_CARD_WIDTH, max_width)),
+            ("full", max_width),
+        ]
 
-            if img.width > max_width:
-                ratio = max_width / img.width
-                new_height = int(img.height * ratio)
-                img = img.resize((max_width, new_height), Image.Resampling.LANCZOS)
+    @error_handler({"default": "Error al optimizar la imagen."})
+    async def _render_variants(
+        self, image_data: bytes, max_width: int = 1200
+    ) -> List[dict]:
+        return await self._offload(
+            image_executor,
+            render_variants,
+            image_data,
+            self._variant_specs(max_width),
+            self.image_formats,
+        )
 
-            output = BytesIO()
-            img.save(output, format="JPEG", quality=quality, optimize=True)
-            return output.getvalue()
+    async def _put_object(self, s3_key: str, data: bytes, content_type: str) -> None:
+        await self._offload(
+            storage_executor,
+            self.client.put_object,
+            bucket_name=self.bucket_name,
+            object_name=s3_key,
+            data=BytesIO(data),
+            length=len(data),
+            content_type=content_type,
+        )
 
     @error_handler({"default": "Error al subir la imagen al almacenamiento."})
     async def upload_image(
@@ -130,7 +192,7 @@ class S3Service:
         optimize: bool = True,
         max_width: int = 1200,
     ) -> dict:
-        self._ensure_available()
+        await self._ensure_available()
         self._validate_image(file)
 
         if not file.filename:
@@ -142,43 +204,140 @@ class S3Service:
         if original_size == 0:
             raise HTTPException(status_code=400, detail="El archivo está vacío")
 
-        if optimize:
-            image_data = self._optimize_image(image_data, max_width)
-
         s3_key = self._generate_unique_filename(file.filename, folder)
 
-        final_size = len(image_data)
-        content_type = "image/jpeg" if optimize else (file.content_type or "image/jpeg")
+        if not optimize:
+            content_type = file.content_type or "image/jpeg"
+            await self._put_object(s3_key, image_data, content_type)
+            return self._upload_result(
+                s3_key, folder, len(image_data), content_type, variants=[]
+            )
 
-        image_buffer = BytesIO(image_data)
+        variants = await self.store_variants(s3_key, image_data, max_width)
 
-        self.client.put_object(
-            bucket_name=self.bucket_name,
-            object_name=s3_key,
-            data=image_buffer,
-            length=final_size,
-            content_type=content_type,
+        # La principal es la completa en el primer formato (WebP)
+        primary = next(v for v in variants if v["variant"] == "full")
+        return self._upload_result(
+            primary["s3_key"],
+            folder,
+            primary["size"],
+            f"image/{primary['format']}",
+            variants=variants,
         )
 
-        public_url = f"{self.public_url_base}/{s3_key}"
+    async def store_variants(
+        self, s3_key: str, image_data: bytes, max_width: int = 1200
+    ) -> List[dict]:
+        """Genera y sube las variantes de una imagen junto a `s3_key`."""
+        rendered = await self._render_variants(image_data, max_width)
+        base_key = os.path.splitext(s3_key)[0]
+        variants = []
+        for item in rendered:
+            key = f"{base_key}_{item['variant']}.{item['format']}"
+            variants.append(
+                {
+                    "variant": item["variant"],
+                    "format": item["format"],
+                    "width": item["width"],
+                    "height": item["height"],
+                    "size": len(item["data"]),
+                    "s3_key": key,
+                    "public_url": self.get_image_url(key),
+                }
+            )
+        await asyncio.gather(
+            *(
+                self._put_object(
+                    variant["s3_key"], item["data"], f"image/{item['format']}"
+                )
+                for variant, item in zip(variants, rendered)
+            )
+        )
+        return variants
+
+    def presigned_upload_url(self, s3_key: str, expires: timedelta) -> str:
+        """URL para que el cliente suba el archivo con PUT directo a MinIO.
+
+        La firma se calcula localmente (la región está configurada), sin
+        llamadas de red.
+        """
+        return self.presign_client.presigned_put_object(
+            self.bucket_name, s3_key, expires=expires
+        )
+
+    async def stat_image(self, s3_key: str) -> Optional[Object]:
+        """Metadatos del objeto, o None si todavía no se subió."""
+        await self._ensure_available()
+        try:
+            return await self._offload(
+                storage_executor, self.client.stat_object, self.bucket_name, s3_key
+            )
+        except S3Error as exc:
+            if exc.code in ("NoSuchKey", "NoSuchObject"):
+                return None
+            raise
+
+    async def download_image(self, s3_key: str) -> bytes:
+        await self._ensure_available()
+        return await self._offload(storage_executor, self._read_object, s3_key)
+
+    def _read_object(self, s3_key: str) -> bytes:
+        response = self.client.get_object(self.bucket_name, s3_key)
+        try:
+            return response.read()
+        finally:
+            response.close()
+            response.release_conn()
 
+    def _upload_result(
+        self,
+        s3_key: str,
+        folder: str,
+        size: int,
+        content_type: str,
+        variants: List[dict],
+    ) -> dict:
         return {
             "success": True,
             "filename": os.path.basename(s3_key),
             "s3_key": s3_key,
-            "public_url": public_url,
+            "public_url": self.get_image_url(s3_key),
             "folder": folder,
-            "size": len(image_data),
-            "content_type": "image/jpeg" if optimize else file.content_type,
+            "size": size,
+            "content_type": content_type,
             "upload_date": datetime.now().isoformat(),
+            "variants": variants,
         }
 
+    @error_handler({"default": "No se pudieron eliminar las imágenes del almacenamiento."})
+    async def delete_images(self, s3_keys: Iterable[str]) -> bool:
+        """Elimina varias claves (por ejemplo, todas las variantes) en una llamada."""
+        keys = sorted({key for key in s3_keys if key})
+        if not keys:
+            return True
+
+        await self._ensure_available()
+        return await self._offload(storage_executor, self._delete_objects, keys)
+
+    def _delete_objects(self, s3_keys: List[str]) -> bool:
+        errors = list(
+            self.client.remove_objects(
+                self.bucket_name, [DeleteObject(key) for key in s3_keys]
+            )
+        )
+        for error in errors:
+            logger.error(f"❌ Error eliminando {error.name}: {error.message}")
+        return not errors
+
     @error_handler({"default": "No se pudo eliminar la imagen del almacenamiento."})
-    def delete_image(self, s3_key: str) -> bool:
+    async def delete_image(self, s3_key: str) -> bool:
         if not s3_key:
             return True
 
-        self._ensure_available()
+        await self._ensure_available()
+        return await self._offload(storage_executor, self._delete_object, s3_key)
+
+    def _delete_object(self, s3_key: str) -> bool:
         exists = False
         for obj in self.client.list_objects(
             bucket_name=self.bucket_name, prefix=s3_key, recursive=False
@@ -199,8 +358,15 @@ class S3Service:
     @error_handler(
         {"default": "No se pudieron listar las imágenes del almacenamiento."}
     )
-    def list_images_in_folder(self, folder: str = "", limit: int = 100) -> List[dict]:
-        self._ensure_available()
+    async def list_images_in_folder(
+        self, folder: str = "", limit: int = 100
+    ) -> List[dict]:
+        await self._ensure_available()
+        return await self._offload(
+            storage_executor, self._list_objects, folder, limit
+        )
+
+    def _list_objects(self, folder: str, limit: int) -> List[dict]:
         prefix = f"{folder.strip('/')}/" if folder else ""
 
         objects = self.client.list_objects(
@@ -235,9 +401,11 @@ class S3Service:
             "default": "No se pudo verificar la existencia de la imagen en el almacenamiento."
         }
     )
-    def image_exists(self, s3_key: str) -> bool:
-        self._ensure_available()
-        self.client.stat_object(self.bucket_name, s3_key)
+    async def image_exists(self, s3_key: str) -> bool:
+        await self._ensure_available()
+        await self._offload(
+            storage_executor, self.client.stat_object, self.bucket_name, s3_key
+        )
         return True
 
 
@@ -6,12 +6,13 @@ from decimal import Decimal, ROUND_HALF_UP
 from typing import Iterable, Sequence, List, Optional
 
 from fastapi import HTTPException, status
-from sqlalchemy import Select, select, or_, case
+from sqlalchemy import Select, select, or_, and_, case
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
 from models.Address import Address
+from models.ImageUpload import ImageUpload, ImageUploadStatus
 from models.ProviderProfile import ProviderProfile
 from models.ServiceRequest import (
     ProposalStatus,
@@ -26,7 +27,7 @@ from models.ServiceRequest import (
     ServiceReview,
     ServiceStatusHistory,
 )
-from models.Tag import Tag, ServiceRequestTag
+from models.Tag import ServiceRequestTag
 from models.ServiceRequestSchemas import (
     MAX_ATTACHMENTS,
     ServiceRequestAttachment,
@@ -40,14 +41,16 @@ from models.ServiceRequestSchemas import (
 )
 from models.User import User, UserRole
 from utils.error_handler import error_handler
-from controllers.tags_controllers import TagsController
-from controllers.llm_controller import LLMController
+from utils.pagination import Page, decode_cursor, encode_cursor, resolve_page_size
+from services.match_index import match_index
+from services.notification_dispatcher import notification_dispatcher
 from services.notification_service import notification_service
+from services.provider_kpis import now_ar, provider_kpis
+from services.tag_generation_worker import tag_generation_worker
+from services.tag_registry import tag_registry
 
 logger = logging.getLogger(__name__)
 
-llm_controller = LLMController()
-
 SERVICE_REQUESTS_FOLDER = "service-requests"
 MANAGEMENT_FEE_RATE = Decimal("0.02")
 TWO_DECIMALS = Decimal("0.01")
@@ -124,13 +127,12 @@ class ServiceRequestService:
             tag_ids=payload.tag_ids,
         )
 
-        await TagsController.generate_tags_for_service_request(
-            db,
-            new_request,
-            llm_controller.create_tags_for_request,
-        )
+        # El etiquetado con LLM corre en segundo plano para no bloquear la respuesta
+        tag_generation_worker.enqueue(db, new_request.id)
+        await match_index.refresh_request(db, new_request.id)
 
         await db.commit()
+        tag_generation_worker.notify()
 
         request_with_relations = (
             await ServiceRequestService._fetch_request_with_relations(
@@ -161,11 +163,7 @@ class ServiceRequestService:
         if not unique_ids:
             return
 
-        stmt: Select[tuple[int]] = select(Tag.id).where(Tag.id.in_(unique_ids))
-        result = await db.execute(stmt)
-        existing_ids = {row[0] for row in result.all()}
-
-        missing = unique_ids - existing_ids
+        missing = await tag_registry.missing_ids(db, unique_ids)
         if missing:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -275,11 +273,29 @@ class ServiceRequestService:
         request_id: int,
         attachments: Sequence[ServiceRequestAttachment],
     ) -> None:
-        for index, attachment in enumerate(attachments):
-            normalized_key = ServiceRequestService._normalize_attachment_key(
-                attachment.s3_key, request_id
+        normalized_keys = [
+            ServiceRequestService._normalize_attachment_key(attachment.s3_key, request_id)
+            for attachment in attachments
+        ]
+        # Subidas directas cuyas variantes ya se generaron; las que sigan en
+        # proceso las completa image_variant_worker al terminar
+        ready_variants = {}
+        if normalized_keys:
+            ready_variants = dict(
+                (
+                    await db.execute(
+                        select(ImageUpload.s3_key, ImageUpload.variants).where(
+                            ImageUpload.s3_key.in_(normalized_keys),
+                            ImageUpload.status == ImageUploadStatus.READY,
+                        )
+                    )
+                ).all()
             )
 
+        for index, (attachment, normalized_key) in enumerate(
+            zip(attachments, normalized_keys)
+        ):
+
             image = ServiceRequestImage(
                 request_id=request_id,
                 s3_key=normalized_key,
@@ -288,6 +304,9 @@ class ServiceRequestService:
                 sort_order=attachment.sort_order
                 if attachment.sort_order is not None
                 else index,
+                variants=[variant.model_dump() for variant in attachment.variants]
+                if attachment.variants
+                else ready_variants.get(normalized_key),
             )
             db.add(image)
 
@@ -360,80 +379,141 @@ class ServiceRequestService:
         return service_request
 
     @staticmethod
-    async def list_active_without_service(
-        db: AsyncSession, *, client_id: int
+    def _list_relation_options() -> tuple:
+        """Relaciones que necesitan los listados del cliente para armar la respuesta."""
+        return (
+            selectinload(ServiceRequest.images),
+            selectinload(ServiceRequest.tag_links).selectinload(ServiceRequestTag.tag),
+            selectinload(ServiceRequest.proposals).options(
+                selectinload(ServiceRequestProposal.provider).options(
+                    selectinload(ProviderProfile.user)
+                )
+            ),
+            selectinload(ServiceRequest.service).options(
+                selectinload(Service.provider).options(
+                    selectinload(ProviderProfile.user)
+                ),
+                selectinload(Service.proposal),
+                selectinload(Service.status_history),
+                selectinload(Service.reviews),
+            ),
+            selectinload(ServiceRequest.address),
+            selectinload(ServiceRequest.target_provider).selectinload(
+                ProviderProfile.user
+            ),
+        )
+
+    @staticmethod
+    async def _load_requests_in_order(
+        db: AsyncSession, request_ids: Sequence[int]
     ) -> List[ServiceRequest]:
+        """Carga las relaciones sólo para los ids de la página, respetando su orden."""
+        if not request_ids:
+            return []
         stmt: Select[ServiceRequest] = (
             select(ServiceRequest)
-            .options(
-                selectinload(ServiceRequest.images),
-                selectinload(ServiceRequest.tag_links).selectinload(
-                    ServiceRequestTag.tag
-                ),
-                selectinload(ServiceRequest.proposals).options(
-                    selectinload(ServiceRequestProposal.provider).options(
-                        selectinload(ProviderProfile.user)
-                    )
-                ),
-                selectinload(ServiceRequest.service).options(
-                    selectinload(Service.provider).options(
-                        selectinload(ProviderProfile.user)
-                    ),
-                    selectinload(Service.proposal),
-                    selectinload(Service.status_history),
-                    selectinload(Service.reviews),
-                ),
-                selectinload(ServiceRequest.address),
-                selectinload(ServiceRequest.target_provider).selectinload(
-                    ProviderProfile.user
-                ),
-            )
+            .options(*ServiceRequestService._list_relation_options())
+            .where(ServiceRequest.id.in_(request_ids))
+        )
+        result = await db.execute(stmt)
+        by_id = {request.id: request for request in result.scalars().all()}
+        return [by_id[request_id] for request_id in request_ids if request_id in by_id]
+
+    @staticmethod
+    async def list_active_without_service(
+        db: AsyncSession,
+        *,
+        client_id: int,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+    ) -> Page[ServiceRequest]:
+        """Solicitudes sin servicio, de la más nueva a la más vieja.
+
+        Incluye las licitaciones CLOSED por vencimiento del plazo: el cliente
+        todavía tiene que elegir un presupuesto y pagar. Sin `limit` ni
+        `cursor` devuelve la lista completa hasta el tope de
+        `resolve_page_size` (comportamiento histórico).
+        """
+        stmt = (
+            select(ServiceRequest.id, ServiceRequest.created_at)
             .where(
                 ServiceRequest.client_id == client_id,
-                ServiceRequest.status == ServiceRequestStatus.PUBLISHED,
+                ServiceRequest.status.in_(
+                    [ServiceRequestStatus.PUBLISHED, ServiceRequestStatus.CLOSED]
+                ),
                 ServiceRequest.service == None,  # noqa: E711
             )
-            .order_by(ServiceRequest.created_at.desc())
+            .order_by(ServiceRequest.created_at.desc(), ServiceRequest.id.desc())
         )
 
-        result = await db.execute(stmt)
-        return list(result.scalars().all())
+        if cursor:
+            last = decode_cursor(
+                cursor, required_keys=("created_at", "id"), datetime_keys=("created_at",)
+            )
+            stmt = stmt.where(
+                or_(
+                    ServiceRequest.created_at < last["created_at"],
+                    and_(
+                        ServiceRequest.created_at == last["created_at"],
+                        ServiceRequest.id < last["id"],
+                    ),
+                )
+            )
+        page_size = resolve_page_size(limit, cursor)
+        stmt = stmt.limit(page_size + 1)
+
+        rows = (await db.execute(stmt)).all()
+        next_cursor = None
+        if len(rows) > page_size:
+            rows = rows[:page_size]
+            last_row = rows[-1]
+            next_cursor = encode_cursor(
+                {"created_at": last_row.created_at, "id": last_row.id}
+            )
+
+        items = await ServiceRequestService._load_requests_in_order(
+            db, [row.id for row in rows]
+        )
+        return Page(items=items, next_cursor=next_cursor)
 
     @staticmethod
     async def list_all_for_client(
-        db: AsyncSession, *, client_id: int
-    ) -> List[ServiceRequest]:
+        db: AsyncSession,
+        *,
+        client_id: int,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+    ) -> Page[ServiceRequest]:
+        """Historial del cliente: canceladas al final y luego por actualización.
+
+        La paginación es keyset sobre (bucket de cancelación, updated_at, id).
+        Sin `limit` ni `cursor` devuelve la lista completa hasta el tope de
+        `resolve_page_size` (comportamiento histórico).
+        """
         # Calcular el límite de 24 horas para servicios cancelados
         cutoff_time = datetime.now(timezone(timedelta(hours=-3))).replace(
             tzinfo=None
         ) - timedelta(hours=24)
 
-        stmt: Select[ServiceRequest] = (
-            select(ServiceRequest)
-            .outerjoin(Service, ServiceRequest.id == Service.request_id)
-            .options(
-                selectinload(ServiceRequest.images),
-                selectinload(ServiceRequest.tag_links).selectinload(
-                    ServiceRequestTag.tag
-                ),
-                selectinload(ServiceRequest.proposals).options(
-                    selectinload(ServiceRequestProposal.provider).options(
-                        selectinload(ProviderProfile.user)
-                    )
-                ),
-                selectinload(ServiceRequest.service).options(
-                    selectinload(Service.provider).options(
-                        selectinload(ProviderProfile.user)
-                    ),
-                    selectinload(Service.proposal),
-                    selectinload(Service.status_history),
-                    selectinload(Service.reviews),
-                ),
-                selectinload(ServiceRequest.address),
-                selectinload(ServiceRequest.target_provider).selectinload(
-                    ProviderProfile.user
+        # 0 = no cancelada, 1 = cancelada (van al final)
+        cancel_bucket = case(
+            (
+                or_(
+                    ServiceRequest.status == ServiceRequestStatus.CANCELLED,
+                    Service.status == ServiceStatus.CANCELED,
                 ),
+                1,
+            ),
+            else_=0,
+        )
+
+        stmt = (
+            select(
+                ServiceRequest.id,
+                ServiceRequest.updated_at,
+                cancel_bucket.label("bucket"),
             )
+            .outerjoin(Service, ServiceRequest.id == Service.request_id)
             .where(
                 ServiceRequest.client_id == client_id,
                 # Filtrar solicitudes canceladas (CANCELLED) de más de 24hs
@@ -449,24 +529,53 @@ class ServiceRequestService:
                 ),
             )
             .order_by(
-                # 1) Canceladas al final (0 = no cancelada, 1 = cancelada)
-                case(
-                    (
+                cancel_bucket,
+                ServiceRequest.updated_at.desc(),
+                ServiceRequest.id.desc(),
+            )
+        )
+
+        if cursor:
+            last = decode_cursor(
+                cursor,
+                required_keys=("bucket", "updated_at", "id"),
+                datetime_keys=("updated_at",),
+            )
+            stmt = stmt.where(
+                or_(
+                    cancel_bucket > last["bucket"],
+                    and_(
+                        cancel_bucket == last["bucket"],
                         or_(
-                            ServiceRequest.status == ServiceRequestStatus.CANCELLED,
-                            Service.status == ServiceStatus.CANCELED,
+                            ServiceRequest.updated_at < last["updated_at"],
+                            and_(
+                                ServiceRequest.updated_at == last["updated_at"],
+                                ServiceRequest.id < last["id"],
+                            ),
                         ),
-                        1,
                     ),
-                    else_=0,
-                ),
-                # 2) Más recientes primero
-                ServiceRequest.updated_at.desc(),
+                )
+            )
+        page_size = resolve_page_size(limit, cursor)
+        stmt = stmt.limit(page_size + 1)
+
+        rows = (await db.execute(stmt)).all()
+        next_cursor = None
+        if len(rows) > page_size:
+            rows = rows[:page_size]
+            last_row = rows[-1]
+            next_cursor = encode_cursor(
+                {
+                    "bucket": int(last_row.bucket),
+                    "updated_at": last_row.updated_at,
+                    "id": last_row.id,
+                }
             )
-        )
 
-        result = await db.execute(stmt)
-        return list(result.scalars().unique().all())
+        items = await ServiceRequestService._load_requests_in_order(
+            db, [row.id for row in rows]
+        )
+        return Page(items=items, next_cursor=next_cursor)
 
     @staticmethod
     async def get_request_for_client(
@@ -535,6 +644,7 @@ class ServiceRequestService:
                     service_request.bidding_deadline = None
 
         if has_changes:
+            await match_index.refresh_request(db, service_request.id)
             await db.commit()
 
         return await ServiceRequestService._fetch_request_with_relations(
@@ -621,10 +731,14 @@ class ServiceRequestService:
         for proposal in proposals:
             if proposal in orphan_proposals:
                 continue
+            previous_proposal_status = proposal.status
             if proposal.id == selected_proposal.id:
                 proposal.status = ProposalStatus.ACCEPTED
             else:
                 proposal.status = ProposalStatus.REJECTED
+            await provider_kpis.proposal_status_changed(
+                db, proposal, previous_proposal_status, proposal.status
+            )
 
         # Marcar la solicitud como cerrada
         service_request.status = ServiceRequestStatus.CLOSED
@@ -642,6 +756,8 @@ class ServiceRequestService:
             status=ServiceStatus.CONFIRMED,
             total_price=total_with_fee,
             currency=selected_proposal.currency,
+            # Fija el mes del rollup de KPIs (ver services.provider_kpis)
+            created_at=now_ar(),
         )
 
         # Adjuntar snapshot de dirección si está disponible
@@ -674,6 +790,9 @@ class ServiceRequestService:
 
         db.add(service_entity)
         await db.flush()
+        await provider_kpis.service_status_changed(
+            db, service_entity, None, ServiceStatus.CONFIRMED
+        )
 
         # Crear registro inicial de historial con hora Argentina (UTC-3)
         initial_history = ServiceStatusHistory(
@@ -683,22 +802,21 @@ class ServiceRequestService:
             changed_at=datetime.now(timezone(timedelta(hours=-3))).replace(tzinfo=None),
         )
         db.add(initial_history)
-
-        await db.commit()
+        await match_index.remove_request(db, service_request.id)
 
         # Notificar al prestador
-        try:
-            provider_user_id = selected_proposal.provider.user_id
-            if provider_user_id:
-                await notification_service.send_notification_to_user(
-                    db,
-                    user_id=provider_user_id,
-                    title="¡Presupuesto Aceptado!",
-                    body=f"El cliente confirmó tu presupuesto para '{service_request.title}'.",
-                    data={"requestId": service_request.id, "type": "proposal_accepted"},
-                )
-        except Exception as e:
-            logger.error(f"Error enviando notificacion push: {e}")
+        provider_user_id = selected_proposal.provider.user_id
+        if provider_user_id:
+            notification_service.enqueue(
+                db,
+                user_id=provider_user_id,
+                title="¡Presupuesto Aceptado!",
+                body=f"El cliente confirmó tu presupuesto para '{service_request.title}'.",
+                data={"requestId": service_request.id, "type": "proposal_accepted"},
+            )
+
+        await db.commit()
+        notification_dispatcher.notify()
 
         return await ServiceRequestService._fetch_request_with_relations(
             db, service_request.id, client_id=client_id
@@ -732,9 +850,14 @@ class ServiceRequestService:
                 ProposalStatus.WITHDRAWN,
                 ProposalStatus.EXPIRED,
             }:
+                previous_proposal_status = proposal.status
                 proposal.status = ProposalStatus.REJECTED
+                await provider_kpis.proposal_status_changed(
+                    db, proposal, previous_proposal_status, proposal.status
+                )
 
         service_request.status = ServiceRequestStatus.CANCELLED
+        await match_index.remove_request(db, service_request.id)
 
         await db.commit()
 
@@ -769,8 +892,13 @@ class ServiceRequestService:
         # Si el estado es CONFIRMED o ON_ROUTE, se puede cancelar
         # (el estado ya indica si el servicio realmente comenzó o no)
 
+        previous_service_status = service.status
         service.status = ServiceStatus.CANCELED
         service_request.status = ServiceRequestStatus.CANCELLED
+        await provider_kpis.service_status_changed(
+            db, service, previous_service_status, service.status
+        )
+        await match_index.remove_request(db, service_request.id)
 
         await db.commit()
 
@@ -836,6 +964,8 @@ class ServiceRequestService:
             ratee_provider_profile_id=provider_profile.id,
             rating=payload.rating,
             comment=payload.comment,
+            # Fija el mes del rollup de KPIs (ver services.provider_kpis)
+            created_at=now_ar(),
         )
         db.add(new_review)
 
@@ -848,36 +978,30 @@ class ServiceRequestService:
                 detail="Ya calificaste este servicio",
             ) from exc
 
-        current_total = provider_profile.total_reviews or 0
-        current_avg_value = provider_profile.rating_avg
-        current_avg = (
-            Decimal(current_avg_value)
-            if current_avg_value is not None
-            else Decimal("0")
+        # Histograma, promedio y total del perfil se actualizan en SQL
+        await provider_kpis.review_added(db, new_review, service.currency)
+        await db.refresh(
+            provider_profile,
+            attribute_names=[
+                "rating_avg",
+                "total_reviews",
+                *(f"rating_{star}_count" for star in range(1, 6)),
+            ],
         )
 
-        new_total = current_total + 1
-        aggregated = (current_avg * current_total) + Decimal(payload.rating)
-        provider_profile.total_reviews = new_total
-        provider_profile.rating_avg = (aggregated / Decimal(new_total)).quantize(
-            TWO_DECIMALS, rounding=ROUND_HALF_UP
-        )
+        # Notificar al prestador
+        provider_user_id = provider_profile.user_id
+        if provider_user_id:
+            notification_service.enqueue(
+                db,
+                user_id=provider_user_id,
+                title="¡Nueva calificación recibida!",
+                body=f"Un cliente calificó tu servicio con {payload.rating} estrellas.",
+                data={"requestId": service_request.id, "type": "service_reviewed"},
+            )
 
         await db.commit()
-
-        # Notificar al prestador
-        try:
-            provider_user_id = provider_profile.user_id
-            if provider_user_id:
-                await notification_service.send_notification_to_user(
-                    db,
-                    user_id=provider_user_id,
-                    title="¡Nueva calificación recibida!",
-                    body=f"Un cliente calificó tu servicio con {payload.rating} estrellas.",
-                    data={"requestId": service_request.id, "type": "service_reviewed"},
-                )
-        except Exception as e:
-            logger.error(f"Error enviando notificacion push: {e}")
+        notification_dispatcher.notify()
 
         return await ServiceRequestService._fetch_request_with_relations(
             db, service_request.id, client_id=client_id
@@ -912,19 +1036,17 @@ class ServiceRequestService:
 
         service.status = ServiceStatus.ON_ROUTE
 
-        await db.commit()
-
         # Notificar al cliente
-        try:
-            await notification_service.send_notification_to_user(
-                db,
-                user_id=client_id,
-                title="¡Prestador en camino!",
-                body=f"El prestador ya está yendo a tu domicilio para el servicio '{service_request.title}'.",
-                data={"requestId": service_request.id, "type": "service_on_route"},
-            )
-        except Exception as e:
-            logger.error(f"Error enviando notificacion push: {e}")
+        notification_service.enqueue(
+            db,
+            user_id=client_id,
+            title="¡Prestador en camino!",
+            body=f"El prestador ya está yendo a tu domicilio para el servicio '{service_request.title}'.",
+            data={"requestId": service_request.id, "type": "service_on_route"},
+        )
+
+        await db.commit()
+        notification_dispatcher.notify()
 
         return await ServiceRequestService._fetch_request_with_relations(
             db, service_request.id, client_id=client_id
@@ -971,19 +1093,17 @@ class ServiceRequestService:
 
         service.status = ServiceStatus.IN_PROGRESS
 
-        await db.commit()
-
         # Notificar al cliente
-        try:
-            await notification_service.send_notification_to_user(
-                db,
-                user_id=client_id,
-                title="¡Servicio iniciado!",
-                body=f"El prestador ha comenzado a trabajar en '{service_request.title}'.",
-                data={"requestId": service_request.id, "type": "service_in_progress"},
-            )
-        except Exception as e:
-            logger.error(f"Error enviando notificacion push: {e}")
+        notification_service.enqueue(
+            db,
+            user_id=client_id,
+            title="¡Servicio iniciado!",
+            body=f"El prestador ha comenzado a trabajar en '{service_request.title}'.",
+            data={"requestId": service_request.id, "type": "service_in_progress"},
+        )
+
+        await db.commit()
+        notification_dispatcher.notify()
 
         return await ServiceRequestService._fetch_request_with_relations(
             db, service_request.id, client_id=client_id
@@ -1146,25 +1266,24 @@ class ServiceRequestService:
         await ServiceRequestService._attach_images(
             db, request_id=new_request.id, attachments=payload.attachments
         )
-
-        await db.commit()
+        await match_index.refresh_request(db, new_request.id)
 
         # Notificar al proveedor
-        try:
-            provider_user_id = provider_profile.user_id
-            if provider_user_id:
-                provider_name = "Cliente"
-                if current_user.first_name:
-                    provider_name = current_user.first_name
-                await notification_service.send_notification_to_user(
-                    db,
-                    user_id=provider_user_id,
-                    title="¡Nueva solicitud de recontratación!",
-                    body=f"{provider_name} quiere volver a contratarte para un nuevo trabajo.",
-                    data={"requestId": new_request.id, "type": "rehire_request"},
-                )
-        except Exception as e:
-            logger.error(f"Error enviando notificacion push de recontratación: {e}")
+        provider_user_id = provider_profile.user_id
+        if provider_user_id:
+            provider_name = "Cliente"
+            if current_user.first_name:
+                provider_name = current_user.first_name
+            notification_service.enqueue(
+                db,
+                user_id=provider_user_id,
+                title="¡Nueva solicitud de recontratación!",
+                body=f"{provider_name} quiere volver a contratarte para un nuevo trabajo.",
+                data={"requestId": new_request.id, "type": "rehire_request"},
+            )
+
+        await db.commit()
+        notification_dispatcher.notify()
 
         return await ServiceRequestService._fetch_request_with_relations(
             db, new_request.id
@@ -1271,26 +1390,27 @@ class ServiceRequestService:
             changed_at=now,
         )
         db.add(history_entry)
-
-        await db.commit()
+        await provider_kpis.service_status_changed(
+            db, service, previous_status, service.status, at=now
+        )
 
         # Notificar al proveedor
-        try:
-            provider_user_id = provider_profile.user_id
-            if provider_user_id:
-                request_title = (
-                    service.request.title if service.request else "tu servicio"
-                )
+        provider_user_id = provider_profile.user_id
+        if provider_user_id:
+            request_title = (
+                service.request.title if service.request else "tu servicio"
+            )
 
-                await notification_service.send_notification_to_user(
-                    db,
-                    user_id=provider_user_id,
-                    title="¡Solicitud de garantía!",
-                    body=f"Un cliente ha solicitado garantía para '{request_title}'. Coordiná la visita sin costo.",
-                    data={"requestId": service.request_id, "type": "warranty_claim"},
-                )
-        except Exception as e:
-            logger.error(f"Error enviando notificacion push de garantía: {e}")
+            notification_service.enqueue(
+                db,
+                user_id=provider_user_id,
+                title="¡Solicitud de garantía!",
+                body=f"Un cliente ha solicitado garantía para '{request_title}'. Coordiná la visita sin costo.",
+                data={"requestId": service.request_id, "type": "warranty_claim"},
+            )
+
+        await db.commit()
+        notification_dispatcher.notify()
 
         # Retornar el ServiceRequest con el servicio reabierto
         return await ServiceRequestService._fetch_request_with_relations(
@@ -0,0 +1,300 @@
+"""Worker en segundo plano que genera tags para solicitudes nuevas."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, List
+
+from sqlalchemy import and_, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+import settings
+from database.database import AsyncSessionLocal
+from models.ServiceRequest import ServiceRequest, ServiceRequestStatus
+from models.TagGenerationJob import TagGenerationJob, TagJobStatus
+from services.match_index import match_index
+from services.notification_dispatcher import notification_dispatcher
+from services.notification_service import notification_service
+
+logger = logging.getLogger(__name__)
+
+CompletionHook = Callable[[AsyncSession, ServiceRequest], Awaitable[None]]
+
+
+async def notify_matching_providers(
+    db: AsyncSession, service_request: ServiceRequest
+) -> None:
+    """Avisa a los prestadores que ven la solicitud en su feed por coincidencia de tags."""
+
+    if service_request.status != ServiceRequestStatus.PUBLISHED:
+        return
+
+    # El índice de matching ya aplica tags, ubicación y propuestas existentes
+    provider_user_ids = [
+        user_id
+        for user_id in await match_index.provider_user_ids(db, service_request.id)
+        if user_id != service_request.client_id
+    ]
+    if not provider_user_ids:
+        return
+
+    logger.info(
+        "Notificando solicitud %s a %s prestadores compatibles",
+        service_request.id,
+        len(provider_user_ids),
+    )
+    for user_id in provider_user_ids:
+        notification_service.enqueue(
+            db,
+            user_id,
+            "Nueva solicitud disponible",
+            service_request.title,
+            {"type": "new_request", "request_id": service_request.id},
+        )
+    await db.commit()
+    notification_dispatcher.notify()
+
+
+class TagGenerationWorker:
+    """Procesa la cola `tag_generation_jobs` con reintentos y backoff."""
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession] = AsyncSessionLocal,
+        *,
+        poll_interval: float = settings.TAG_WORKER_POLL_SECONDS,
+        batch_size: int = settings.TAG_WORKER_BATCH_SIZE,
+        max_attempts: int = settings.TAG_JOB_MAX_ATTEMPTS,
+        lock_timeout: float = settings.TAG_JOB_LOCK_TIMEOUT_SECONDS,
+        retry_backoff: float = settings.TAG_JOB_RETRY_BACKOFF_SECONDS,
+    ) -> None:
+        self.session_factory = session_factory
+        self.poll_interval = poll_interval
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.lock_timeout = lock_timeout
+        self.retry_backoff = retry_backoff
+        self.completion_hooks: List[CompletionHook] = [notify_matching_providers]
+        self._llm_controller = None
+        self._wakeup = asyncio.Event()
+        self._task: asyncio.Task | None = None
+
+    @staticmethod
+    def enqueue(db: AsyncSession, request_id: int) -> TagGenerationJob:
+        """Agrega un trabajo a la sesión; se confirma junto con la solicitud."""
+        job = TagGenerationJob(
+            request_id=request_id,
+            status=TagJobStatus.PENDING,
+            attempts=0,
+            run_after=datetime.utcnow(),
+        )
+        db.add(job)
+        return job
+
+    def notify(self) -> None:
+        """Despierta al worker para no esperar al próximo ciclo de polling."""
+        self._wakeup.set()
+
+    async def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(), name="tag-generation-worker")
+            logger.info("Worker de generación de tags iniciado")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        logger.info("Worker de generación de tags detenido")
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                processed = await self.run_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Error inesperado en el worker de tags")
+                processed = 0
+
+            # Si se llenó el lote probablemente quedan más trabajos pendientes
+            if processed >= self.batch_size:
+                continue
+
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def run_once(self) -> int:
+        """Reclama un lote de trabajos y los procesa en paralelo."""
+        job_ids = await self._claim_jobs()
+        if job_ids:
+            # Un trabajo que falla no cancela al resto del lote ni queda RUNNING
+            results = await asyncio.gather(
+                *(self._process_job(job_id) for job_id in job_ids),
+                return_exceptions=True,
+            )
+            for job_id, result in zip(job_ids, results):
+                if isinstance(result, asyncio.CancelledError):
+                    raise result
+                if isinstance(result, Exception):
+                    logger.error(
+                        "Error inesperado procesando el trabajo de tags %s",
+                        job_id,
+                        exc_info=result,
+                    )
+                    await self._release_failed(job_id, result)
+        return len(job_ids)
+
+    async def _claim_jobs(self) -> List[int]:
+        now = datetime.utcnow()
+        stale_before = now - timedelta(seconds=self.lock_timeout)
+
+        async with self.session_factory() as db:
+            stmt = (
+                select(TagGenerationJob)
+                .where(
+                    or_(
+                        and_(
+                            TagGenerationJob.status == TagJobStatus.PENDING,
+                            TagGenerationJob.run_after <= now,
+                        ),
+                        # Trabajos abandonados por un proceso que murió a mitad
+                        and_(
+                            TagGenerationJob.status == TagJobStatus.RUNNING,
+                            TagGenerationJob.locked_at < stale_before,
+                        ),
+                    )
+                )
+                .order_by(TagGenerationJob.run_after, TagGenerationJob.id)
+                .limit(self.batch_size)
+                .with_for_update(skip_locked=True)
+            )
+            jobs = (await db.execute(stmt)).scalars().all()
+            for job in jobs:
+                job.status = TagJobStatus.RUNNING
+                job.locked_at = now
+                job.attempts = (job.attempts or 0) + 1
+            job_ids = [job.id for job in jobs]
+            await db.commit()
+        return job_ids
+
+    def _get_llm_controller(self):
+        # Import diferido: el paquete controllers importa este módulo indirectamente
+        if self._llm_controller is None:
+            from controllers.llm_controller import LLMController
+
+            self._llm_controller = LLMController()
+        return self._llm_controller
+
+    async def _process_job(self, job_id: int) -> None:
+        from controllers.tags_controllers import TagsController
+
+        async with self.session_factory() as db:
+            job = await db.get(TagGenerationJob, job_id)
+            if job is None:
+                return
+
+            service_request = await db.get(ServiceRequest, job.request_id)
+            if service_request is None:
+                job.status = TagJobStatus.FAILED
+                job.last_error = "La solicitud ya no existe"
+                job.finished_at = datetime.utcnow()
+                await db.commit()
+                return
+
+            try:
+                await TagsController.generate_tags_for_service_request(
+                    db,
+                    service_request,
+                    self._get_llm_controller().create_tags_for_request,
+                )
+            except Exception as exc:
+                await db.rollback()
+                await self._mark_failed(db, job_id, exc)
+                return
+
+            try:
+                await match_index.refresh_request(db, service_request.id)
+                job = await db.get(TagGenerationJob, job_id)
+                job.status = TagJobStatus.DONE
+                job.last_error = None
+                job.locked_at = None
+                job.finished_at = datetime.utcnow()
+                await db.commit()
+            except Exception as exc:
+                # Los tags ya están guardados: reintentar volvería a llamar al LLM
+                await db.rollback()
+                logger.exception(
+                    "Falló el cierre del trabajo de tags %s de la solicitud %s",
+                    job_id,
+                    service_request.id,
+                )
+                await self._mark_failed(db, job_id, exc, retry=False)
+                return
+            logger.info(
+                "Tags generados para la solicitud %s (intento %s)",
+                service_request.id,
+                job.attempts,
+            )
+
+            for hook in self.completion_hooks:
+                try:
+                    await hook(db, service_request)
+                except Exception:
+                    logger.exception(
+                        "Falló el hook %s para la solicitud %s",
+                        getattr(hook, "__name__", hook),
+                        service_request.id,
+                    )
+
+    async def _release_failed(self, job_id: int, exc: Exception) -> None:
+        """Devuelve a la cola (o da por fallido) un trabajo que lanzó una excepción."""
+        try:
+            async with self.session_factory() as db:
+                await self._mark_failed(db, job_id, exc)
+        except Exception:
+            logger.exception("No se pudo liberar el trabajo de tags %s", job_id)
+
+    async def _mark_failed(
+        self, db: AsyncSession, job_id: int, exc: Exception, *, retry: bool = True
+    ) -> None:
+        job = await db.get(TagGenerationJob, job_id)
+        if job is None:
+            return
+
+        job.last_error = f"{type(exc).__name__}: {exc}"[:500]
+        job.locked_at = None
+        if not retry or job.attempts >= self.max_attempts:
+            job.status = TagJobStatus.FAILED
+            job.finished_at = datetime.utcnow()
+            logger.error(
+                "Trabajo de tags %s fallido tras %s intentos: %s",
+                job_id,
+                job.attempts,
+                job.last_error,
+            )
+        else:
+            delay = self.retry_backoff * (2 ** (job.attempts - 1))
+            job.status = TagJobStatus.PENDING
+            job.run_after = datetime.utcnow() + timedelta(seconds=delay)
+            logger.warning(
+                "Trabajo de tags %s falló (intento %s/%s), reintento en %.0fs: %s",
+                job_id,
+                job.attempts,
+                self.max_attempts,
+                delay,
+                job.last_error,
+            )
+        await db.commit()
+
+
+tag_generation_worker = TagGenerationWorker()
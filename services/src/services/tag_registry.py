@@ -0,0 +1,213 @@
+"""Registro en memoria del vocabulario de tags compartido por todo el proceso."""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import logging
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Iterable, Optional, Set
+
+from sqlalchemy import func, select
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+import settings
+from models.Tag import Tag
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class TagEntry:
+    id: int
+    slug: str
+    name: str
+    has_description: bool
+
+
+class TagVocabulary(list):
+    """Lista de nombres de tags con la huella de la versión que la generó."""
+
+    fingerprint: str = ""
+
+
+class TagRegistry:
+    """Índices slug→tag e id→tag con refresco incremental por marca de agua.
+
+    Los tags nunca se eliminan ni se renombran desde la API, así que el
+    refresco trae las filas con `id` mayor al último visto. Dos procesos pueden
+    confirmar sus INSERT en otro orden que el de los ids: un tag con id menor
+    confirmado tarde queda debajo de la marca de agua, así que `missing_ids`
+    busca por id los que no encuentra. Igualmente se hace una recarga completa
+    periódica, que también cubre cambios hechos a mano en la tabla.
+    """
+
+    def __init__(
+        self,
+        *,
+        refresh_interval: float = settings.TAG_REGISTRY_REFRESH_SECONDS,
+        full_reload_interval: float = settings.TAG_REGISTRY_FULL_RELOAD_SECONDS,
+    ) -> None:
+        self.refresh_interval = refresh_interval
+        self.full_reload_interval = full_reload_interval
+        self.version = 0
+        self._by_slug: Dict[str, TagEntry] = {}
+        self._by_id: Dict[int, TagEntry] = {}
+        self._max_id = 0
+        self._loaded = False
+        self._last_refresh = 0.0
+        self._last_full_reload = 0.0
+        self._vocabulary: Optional[TagVocabulary] = None
+        self._lock = asyncio.Lock()
+
+    async def ensure_fresh(self, db: AsyncSession, *, force: bool = False) -> None:
+        now = time.monotonic()
+        if not force and self._loaded and now - self._last_refresh < self.refresh_interval:
+            return
+
+        async with self._lock:
+            now = time.monotonic()
+            if not force and self._loaded and now - self._last_refresh < self.refresh_interval:
+                return
+
+            full = not self._loaded or now - self._last_full_reload >= self.full_reload_interval
+            stmt = select(Tag.id, Tag.slug, Tag.name, Tag.description)
+            if not full:
+                stmt = stmt.where(Tag.id > self._max_id)
+            rows = (await db.execute(stmt)).all()
+
+            if full:
+                self._by_slug.clear()
+                self._by_id.clear()
+                self._max_id = 0
+                self._last_full_reload = now
+                self._bump()
+            self._index_rows(rows)
+            self._loaded = True
+            self._last_refresh = now
+
+            if full:
+                logger.info("Registro de tags cargado: %s tags", len(self._by_id))
+
+    async def names(self, db: AsyncSession) -> TagVocabulary:
+        """Nombres de todos los tags; la lista se reutiliza mientras no cambie la versión."""
+        await self.ensure_fresh(db)
+        if self._vocabulary is None:
+            names = sorted(entry.name for entry in self._by_id.values())
+            vocabulary = TagVocabulary(names)
+            vocabulary.fingerprint = hashlib.sha1(
+                "\n".join(names).encode("utf-8")
+            ).hexdigest()
+            self._vocabulary = vocabulary
+        return self._vocabulary
+
+    async def missing_ids(self, db: AsyncSession, tag_ids: Iterable[int]) -> Set[int]:
+        """Devuelve los ids que no existen, consultando la BD sólo si hace falta."""
+        wanted = {tag_id for tag_id in tag_ids if tag_id is not None}
+        await self.ensure_fresh(db)
+        missing = wanted - self._by_id.keys()
+        if missing:
+            # Por id y no por marca de agua: pueden ser tags confirmados fuera de orden
+            rows = (
+                await db.execute(
+                    select(Tag.id, Tag.slug, Tag.name, Tag.description).where(
+                        Tag.id.in_(missing)
+                    )
+                )
+            ).all()
+            self._index_rows(rows)
+            missing -= self._by_id.keys()
+        return missing
+
+    async def resolve(
+        self, db: AsyncSession, entries: Iterable[dict]
+    ) -> Dict[str, int]:
+        """Resuelve (y crea si falta) el id de cada tag sugerido, indexado por slug.
+
+        Cada entrada debe traer `slug`, `profession` y opcionalmente `description`.
+        """
+        by_slug: Dict[str, dict] = {}
+        for entry in entries:
+            slug = entry.get("slug")
+            if slug and slug not in by_slug:
+                by_slug[slug] = entry
+        if not by_slug:
+            return {}
+
+        await self.ensure_fresh(db)
+
+        unknown = [slug for slug in by_slug if slug not in self._by_slug]
+        backfill = [
+            slug
+            for slug in by_slug
+            if slug in self._by_slug
+            and not self._by_slug[slug].has_description
+            and by_slug[slug].get("description")
+        ]
+
+        if unknown or backfill:
+            # Un único INSERT multi-fila crea los faltantes (tolerando que otro
+            # proceso los haya creado en paralelo) y completa descripciones vacías.
+            now = datetime.utcnow()
+            stmt = mysql_insert(Tag).values(
+                [
+                    {
+                        "slug": slug,
+                        "name": by_slug[slug]["profession"],
+                        "description": by_slug[slug].get("description"),
+                        "created_at": now,
+                        "updated_at": now,
+                    }
+                    for slug in unknown + backfill
+                ]
+            )
+            stmt = stmt.on_duplicate_key_update(
+                description=func.coalesce(Tag.description, stmt.inserted.description)
+            )
+            await db.execute(stmt)
+
+        for slug in backfill:
+            current = self._by_slug[slug]
+            self._by_slug[slug] = self._by_id[current.id] = TagEntry(
+                id=current.id, slug=slug, name=current.name, has_description=True
+            )
+
+        resolved = {
+            slug: self._by_slug[slug].id for slug in by_slug if slug in self._by_slug
+        }
+        if unknown:
+            # Los tags recién creados no se indexan hasta que la transacción se
+            # confirme: el próximo refresco incremental los incorpora.
+            rows = await db.execute(
+                select(Tag.slug, Tag.id).where(Tag.slug.in_(unknown))
+            )
+            resolved.update({slug: tag_id for slug, tag_id in rows.all()})
+        return resolved
+
+    def _index_rows(self, rows) -> None:
+        changed = False
+        for tag_id, slug, name, description in rows:
+            entry = TagEntry(
+                id=tag_id, slug=slug, name=name, has_description=bool(description)
+            )
+            previous = self._by_id.get(tag_id)
+            if previous is not None and previous.name == name:
+                self._by_slug[slug] = entry
+                self._by_id[tag_id] = entry
+                continue
+            self._by_slug[slug] = entry
+            self._by_id[tag_id] = entry
+            self._max_id = max(self._max_id, tag_id)
+            changed = True
+        if changed:
+            self._bump()
+
+    def _bump(self) -> None:
+        self.version += 1
+        self._vocabulary = None
+
+
+tag_registry = TagRegistry()
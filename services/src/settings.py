@@ -16,16 +16,69 @@ DB_HOST = os.getenv("DB_HOST", "127.0.0.1")
 DB_PORT = os.getenv("DB_PORT", "3307")
 DB_NAME = os.getenv("DB_NAME", "fastservices")
 
-# Connection string con driver asíncrono para SQLAlchemy
-CONNECTION_STRING = os.getenv(
-    "CONNECTION_STRING",
-    f"mysql+aiomysql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}?charset=utf8mb4",
+# Driver asíncrono de MySQL: aiomysql o asyncmy (ambos están instalados)
+DB_DRIVER = os.getenv("DB_DRIVER", "aiomysql")
+
+# Connection string con driver asíncrono para SQLAlchemy; si se define, su
+# driver tiene prioridad sobre DB_DRIVER
+CONNECTION_STRING = (
+    os.getenv("CONNECTION_STRING")
+    or f"mysql+{DB_DRIVER}://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}?charset=utf8mb4"
+)
+
+# Configuración de la réplica de lectura (opcional). Sin host ni connection
+# string todas las lecturas van al primario
+DB_REPLICA_HOST = os.getenv("DB_REPLICA_HOST", "")
+DB_REPLICA_PORT = os.getenv("DB_REPLICA_PORT", DB_PORT)
+REPLICA_CONNECTION_STRING = os.getenv("REPLICA_CONNECTION_STRING") or (
+    f"mysql+{DB_DRIVER}://{DB_USER}:{DB_PASSWORD}@{DB_REPLICA_HOST}:{DB_REPLICA_PORT}/{DB_NAME}?charset=utf8mb4"
+    if DB_REPLICA_HOST
+    else ""
+)
+# Con más demora que esto (o sin replicación) se lee del primario
+DB_REPLICA_MAX_LAG_SECONDS = float(os.getenv("DB_REPLICA_MAX_LAG_SECONDS", "5"))
+DB_REPLICA_CHECK_SECONDS = float(os.getenv("DB_REPLICA_CHECK_SECONDS", "5"))
+# Tras una escritura, el cliente lee del primario durante este lapso (también
+# es la vigencia de la cookie con la marca, ver database.replica)
+DB_READ_YOUR_WRITES_SECONDS = float(os.getenv("DB_READ_YOUR_WRITES_SECONDS", "5"))
+
+# Configuración del pool de conexiones
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+# Menor que el wait_timeout de MySQL (y de cualquier proxy intermedio)
+DB_POOL_RECYCLE_SECONDS = int(os.getenv("DB_POOL_RECYCLE_SECONDS", "1800"))
+# Espera máxima por una conexión libre antes de fallar el request
+DB_POOL_TIMEOUT_SECONDS = float(os.getenv("DB_POOL_TIMEOUT_SECONDS", "10"))
+# always: ping en cada checkout; idle: sólo a conexiones ociosas; never
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "idle").lower()
+DB_POOL_PRE_PING_IDLE_SECONDS = float(
+    os.getenv("DB_POOL_PRE_PING_IDLE_SECONDS", "30")
 )
 
 # Configuración JWT para autenticación
 JWT_EXPIRE_MINUTES = int(os.getenv("JWT_EXPIRE_MINUTES", "30"))
 JWT_SECRET_KEY = os.getenv("JWT_SECRET_KEY", "MUY_SECRETO_CAMBIAR_EN_PRODUCCION")
 JWT_ALGORITHM = os.getenv("JWT_ALGORITHM", "HS256")
+# Los refresh tokens rotan en cada uso; la sesión vence si no se usa en este plazo
+REFRESH_TOKEN_EXPIRE_DAYS = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", "30"))
+# Costo de bcrypt; al cambiarlo los hashes viejos se regeneran en el próximo login
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+
+# Configuración de la lista de tokens revocados (filtro de Bloom por proceso)
+TOKEN_REVOCATION_SYNC_SECONDS = float(os.getenv("TOKEN_REVOCATION_SYNC_SECONDS", "5"))
+TOKEN_REVOCATION_PURGE_SECONDS = float(
+    os.getenv("TOKEN_REVOCATION_PURGE_SECONDS", "3600")
+)
+TOKEN_REVOCATION_BLOOM_CAPACITY = int(
+    os.getenv("TOKEN_REVOCATION_BLOOM_CAPACITY", "100000")
+)
+TOKEN_REVOCATION_BLOOM_ERROR_RATE = float(
+    os.getenv("TOKEN_REVOCATION_BLOOM_ERROR_RATE", "0.001")
+)
+
+# Configuración de la caché de usuarios autenticados (por proceso)
+AUTH_USER_CACHE_TTL_SECONDS = float(os.getenv("AUTH_USER_CACHE_TTL_SECONDS", "30"))
+AUTH_USER_CACHE_MAX_ENTRIES = int(os.getenv("AUTH_USER_CACHE_MAX_ENTRIES", "10000"))
 
 # Configuración de logging
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
@@ -39,8 +92,161 @@ S3_ACCESS_KEY = os.getenv("S3_ACCESS_KEY")
 S3_SECRET_KEY = os.getenv("S3_SECRET_KEY")
 S3_BUCKET_NAME = os.getenv("S3_BUCKET_NAME")
 S3_REGION = os.getenv("S3_REGION", "us-east-1")
+# Endpoint que ven los clientes para subir con URLs firmadas (si difiere del interno)
+S3_PRESIGNED_ENDPOINT = os.getenv("S3_PRESIGNED_ENDPOINT", S3_ENDPOINT or "")
 
 # URL pública base para las imágenes
 S3_PUBLIC_URL_BASE = os.getenv("S3_PUBLIC_URL_BASE", f"{S3_ENDPOINT}/{S3_BUCKET_NAME}")
 
+# Configuración OpenAI
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+# Base URL alternativa (ej. servidor LLM local o falso para pruebas)
+OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL") or None
+# Límite de llamadas concurrentes al LLM por proceso
+OPENAI_MAX_CONCURRENCY = int(os.getenv("OPENAI_MAX_CONCURRENCY", "4"))
+OPENAI_TIMEOUT_SECONDS = float(os.getenv("OPENAI_TIMEOUT_SECONDS", "20"))
+OPENAI_MAX_RETRIES = int(os.getenv("OPENAI_MAX_RETRIES", "2"))
+OPENAI_RETRY_BACKOFF_SECONDS = float(os.getenv("OPENAI_RETRY_BACKOFF_SECONDS", "0.5"))
+
+# Configuración del worker de generación de tags
+TAG_WORKER_ENABLED = os.getenv("TAG_WORKER_ENABLED", "true").lower() == "true"
+TAG_WORKER_POLL_SECONDS = float(os.getenv("TAG_WORKER_POLL_SECONDS", "5"))
+TAG_WORKER_BATCH_SIZE = int(os.getenv("TAG_WORKER_BATCH_SIZE", "8"))
+TAG_JOB_MAX_ATTEMPTS = int(os.getenv("TAG_JOB_MAX_ATTEMPTS", "5"))
+# Tiempo tras el cual un trabajo RUNNING se considera abandonado y se reclama
+TAG_JOB_LOCK_TIMEOUT_SECONDS = float(os.getenv("TAG_JOB_LOCK_TIMEOUT_SECONDS", "300"))
+TAG_JOB_RETRY_BACKOFF_SECONDS = float(os.getenv("TAG_JOB_RETRY_BACKOFF_SECONDS", "30"))
+# Llamadas simultáneas al LLM al etiquetar un lote de licencias
+LICENSE_TAGGING_CONCURRENCY = int(os.getenv("LICENSE_TAGGING_CONCURRENCY", "4"))
+
+# Configuración de la caché de respuestas del LLM
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+LLM_CACHE_TTL_SECONDS = int(os.getenv("LLM_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+# Entradas máximas del LRU en memoria por proceso
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "1024"))
+LLM_CACHE_PURGE_INTERVAL_SECONDS = int(
+    os.getenv("LLM_CACHE_PURGE_INTERVAL_SECONDS", "3600")
+)
+# Cada cuánto se vuelcan a la BD los aciertos contados en memoria
+LLM_CACHE_HIT_FLUSH_SECONDS = int(os.getenv("LLM_CACHE_HIT_FLUSH_SECONDS", "60"))
+
+# Configuración del registro de tags en memoria
+TAG_REGISTRY_REFRESH_SECONDS = float(os.getenv("TAG_REGISTRY_REFRESH_SECONDS", "30"))
+TAG_REGISTRY_FULL_RELOAD_SECONDS = float(
+    os.getenv("TAG_REGISTRY_FULL_RELOAD_SECONDS", "3600")
+)
+
+# Configuración de paginación por cursor
+PAGINATION_DEFAULT_LIMIT = int(os.getenv("PAGINATION_DEFAULT_LIMIT", "20"))
+PAGINATION_MAX_LIMIT = int(os.getenv("PAGINATION_MAX_LIMIT", "100"))
+# Tope de los listados pedidos sin `limit` ni `cursor` (la app móvil no pagina)
+PAGINATION_UNPAGINATED_LIMIT = int(os.getenv("PAGINATION_UNPAGINATED_LIMIT", "500"))
+
+# Configuración de matching geográfico
+# Radio máximo entre prestador y solicitud cuando ambos tienen coordenadas (0 = sólo ciudad/provincia)
+MATCH_RADIUS_KM = float(os.getenv("MATCH_RADIUS_KM", "30"))
+
+# Configuración del scheduler de vencimientos (licitaciones, presupuestos, garantías)
+SCHEDULER_ENABLED = os.getenv("SCHEDULER_ENABLED", "true").lower() == "true"
+SCHEDULER_POLL_SECONDS = float(os.getenv("SCHEDULER_POLL_SECONDS", "30"))
+SCHEDULER_BATCH_SIZE = int(os.getenv("SCHEDULER_BATCH_SIZE", "200"))
+# Lock de MySQL (GET_LOCK) que elige un único líder entre los workers
+SCHEDULER_LOCK_NAME = os.getenv("SCHEDULER_LOCK_NAME", "fastservices_expiration_scheduler")
+
+# Configuración del outbox de notificaciones push (Expo)
+NOTIFICATION_DISPATCHER_ENABLED = (
+    os.getenv("NOTIFICATION_DISPATCHER_ENABLED", "true").lower() == "true"
+)
+NOTIFICATION_POLL_SECONDS = float(os.getenv("NOTIFICATION_POLL_SECONDS", "2"))
+# Notificaciones reclamadas por ciclo; se agrupan en envíos de 100 mensajes a Expo
+NOTIFICATION_BATCH_SIZE = int(os.getenv("NOTIFICATION_BATCH_SIZE", "500"))
+NOTIFICATION_MAX_ATTEMPTS = int(os.getenv("NOTIFICATION_MAX_ATTEMPTS", "5"))
+NOTIFICATION_LOCK_TIMEOUT_SECONDS = float(
+    os.getenv("NOTIFICATION_LOCK_TIMEOUT_SECONDS", "120")
+)
+NOTIFICATION_RETRY_BACKOFF_SECONDS = float(
+    os.getenv("NOTIFICATION_RETRY_BACKOFF_SECONDS", "10")
+)
+# URL de la API de Expo (se puede apuntar a un stand-in local)
+EXPO_PUSH_API_URL = os.getenv("EXPO_PUSH_API_URL", "https://exp.host/--/api/v2/push/send")
+EXPO_PUSH_TIMEOUT_SECONDS = float(os.getenv("EXPO_PUSH_TIMEOUT_SECONDS", "15"))
+
+# Configuración de la consulta de recibos de Expo
+PUSH_RECEIPT_WORKER_ENABLED = (
+    os.getenv("PUSH_RECEIPT_WORKER_ENABLED", "true").lower() == "true"
+)
+PUSH_RECEIPT_POLL_SECONDS = float(os.getenv("PUSH_RECEIPT_POLL_SECONDS", "300"))
+# Expo recomienda esperar unos 15 minutos antes de pedir el recibo
+PUSH_RECEIPT_DELAY_SECONDS = float(os.getenv("PUSH_RECEIPT_DELAY_SECONDS", "900"))
+# Expo descarta los recibos pasadas 24 horas
+PUSH_RECEIPT_TTL_SECONDS = float(os.getenv("PUSH_RECEIPT_TTL_SECONDS", str(24 * 3600)))
+# Llamadas a getReceipts por ciclo (hasta 1000 tickets cada una)
+PUSH_RECEIPT_MAX_BATCHES = int(os.getenv("PUSH_RECEIPT_MAX_BATCHES", "10"))
+# Pasado este lapso, los tickets reclamados por un proceso caído se retoman
+PUSH_RECEIPT_LOCK_TIMEOUT_SECONDS = float(
+    os.getenv("PUSH_RECEIPT_LOCK_TIMEOUT_SECONDS", "600")
+)
+EXPO_PUSH_RECEIPTS_URL = os.getenv(
+    "EXPO_PUSH_RECEIPTS_URL", "https://exp.host/--/api/v2/push/getReceipts"
+)
+
+# Configuración de los clientes HTTP salientes compartidos (Expo, OpenAI, MinIO)
+# HTTP/2 requiere el paquete opcional `h2` (httpx[http2]); sin él se usa HTTP/1.1
+HTTP_CLIENT_HTTP2 = os.getenv("HTTP_CLIENT_HTTP2", "true").lower() == "true"
+# Cada pool habla con un solo host, así que el límite es por host
+HTTP_CLIENT_MAX_CONNECTIONS_PER_HOST = int(
+    os.getenv("HTTP_CLIENT_MAX_CONNECTIONS_PER_HOST", "20")
+)
+HTTP_CLIENT_MAX_KEEPALIVE_CONNECTIONS = int(
+    os.getenv("HTTP_CLIENT_MAX_KEEPALIVE_CONNECTIONS", "10")
+)
+HTTP_CLIENT_KEEPALIVE_EXPIRY_SECONDS = float(
+    os.getenv("HTTP_CLIENT_KEEPALIVE_EXPIRY_SECONDS", "30")
+)
+HTTP_CLIENT_CONNECT_TIMEOUT_SECONDS = float(
+    os.getenv("HTTP_CLIENT_CONNECT_TIMEOUT_SECONDS", "5")
+)
+HTTP_CLIENT_READ_TIMEOUT_SECONDS = float(
+    os.getenv("HTTP_CLIENT_READ_TIMEOUT_SECONDS", "30")
+)
+STORAGE_MAX_CONNECTIONS = int(os.getenv("STORAGE_MAX_CONNECTIONS", "10"))
+
+# Configuración de los pools que sacan trabajo bloqueante del event loop
+# Procesos para optimizar imágenes con Pillow (trabajo de CPU)
+IMAGE_PROCESS_WORKERS = int(os.getenv("IMAGE_PROCESS_WORKERS", "2"))
+# Imágenes aceptadas a la vez (procesando + en espera); el resto recibe 503
+IMAGE_MAX_PENDING = int(os.getenv("IMAGE_MAX_PENDING", "16"))
+# Threads para las llamadas sincrónicas a MinIO; no tiene sentido superar su pool
+STORAGE_THREAD_WORKERS = int(
+    os.getenv("STORAGE_THREAD_WORKERS", str(STORAGE_MAX_CONNECTIONS))
+)
+STORAGE_MAX_PENDING = int(os.getenv("STORAGE_MAX_PENDING", "64"))
+# Threads para bcrypt; cada hash ocupa un núcleo, no conviene superar los del host
+PASSWORD_HASH_WORKERS = int(
+    os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1)))
+)
+PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", "32"))
+
+# Configuración de las variantes de imagen (miniatura, tarjeta y completa en WebP/AVIF)
+IMAGE_THUMB_WIDTH = int(os.getenv("IMAGE_THUMB_WIDTH", "160"))
+IMAGE_CARD_WIDTH = int(os.getenv("IMAGE_CARD_WIDTH", "480"))
+IMAGE_WEBP_QUALITY = int(os.getenv("IMAGE_WEBP_QUALITY", "80"))
+# AVIF pesa menos pero es más lento de codificar; requiere Pillow con libavif
+IMAGE_AVIF_ENABLED = os.getenv("IMAGE_AVIF_ENABLED", "false").lower() == "true"
+IMAGE_AVIF_QUALITY = int(os.getenv("IMAGE_AVIF_QUALITY", "55"))
+
+# Configuración de las subidas directas a MinIO con URLs firmadas
+IMAGE_UPLOAD_URL_EXPIRES_SECONDS = int(os.getenv("IMAGE_UPLOAD_URL_EXPIRES_SECONDS", "900"))
+IMAGE_VARIANT_WORKER_ENABLED = (
+    os.getenv("IMAGE_VARIANT_WORKER_ENABLED", "true").lower() == "true"
+)
+IMAGE_VARIANT_POLL_SECONDS = float(os.getenv("IMAGE_VARIANT_POLL_SECONDS", "5"))
+# Imágenes procesadas a la vez; conviene no superar IMAGE_PROCESS_WORKERS
+IMAGE_VARIANT_BATCH_SIZE = int(os.getenv("IMAGE_VARIANT_BATCH_SIZE", "2"))
+IMAGE_VARIANT_MAX_ATTEMPTS = int(os.getenv("IMAGE_VARIANT_MAX_ATTEMPTS", "3"))
+IMAGE_VARIANT_LOCK_TIMEOUT_SECONDS = float(
+    os.getenv("IMAGE_VARIANT_LOCK_TIMEOUT_SECONDS", "300")
+)
+IMAGE_VARIANT_RETRY_BACKOFF_SECONDS = float(
+    os.getenv("IMAGE_VARIANT_RETRY_BACKOFF_SECONDS", "30")
+)
@@ -0,0 +1,43 @@
+"""Utilidades geográficas para el matching por radio."""
+
+import math
+from typing import Optional, Tuple
+
+EARTH_RADIUS_KM = 6371.0088
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Distancia de gran círculo entre dos puntos, en kilómetros."""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(lon2 - lon1)
+    a = (
+        math.sin(d_phi / 2) ** 2
+        + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def bounding_box(
+    lat: float, lon: float, radius_km: float
+) -> Tuple[float, float, float, float]:
+    """Rectángulo (lat_min, lat_max, lon_min, lon_max) que contiene el círculo.
+
+    Sirve como prefiltro por rango sobre un índice (lat, lon); la distancia
+    exacta se verifica después con `haversine_km`.
+    """
+    d_lat = math.degrees(radius_km / EARTH_RADIUS_KM)
+    lat_min, lat_max = max(lat - d_lat, -90.0), min(lat + d_lat, 90.0)
+    if lat_min <= -90.0 or lat_max >= 90.0:
+        return lat_min, lat_max, -180.0, 180.0
+    d_lon = math.degrees(
+        math.asin(min(1.0, math.sin(radius_km / EARTH_RADIUS_KM) / math.cos(math.radians(lat))))
+    )
+    return lat_min, lat_max, lon - d_lon, lon + d_lon
+
+
+def as_point(lat, lon) -> Optional[Tuple[float, float]]:
+    """Convierte un par lat/lon (Decimal, float o None) en una tupla de floats."""
+    if lat is None or lon is None:
+        return None
+    return float(lat), float(lon)
@@ -0,0 +1,111 @@
+"""Utilidades para paginación por cursor (keyset)."""
+
+import base64
+import binascii
+import json
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, Generic, List, Optional, Sequence, Tuple, TypeVar
+
+from fastapi import HTTPException, status
+from sqlalchemy import and_, or_, tuple_
+
+from settings import (
+    PAGINATION_DEFAULT_LIMIT,
+    PAGINATION_MAX_LIMIT,
+    PAGINATION_UNPAGINATED_LIMIT,
+)
+
+T = TypeVar("T")
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+@dataclass
+class Page(Generic[T]):
+    """Página de resultados con el cursor para pedir la siguiente."""
+
+    items: List[T] = field(default_factory=list)
+    next_cursor: Optional[str] = None
+
+
+def clamp_limit(limit: Optional[int]) -> int:
+    """Aplica el tamaño por defecto y el tope máximo de página."""
+    if limit is None or limit <= 0:
+        return PAGINATION_DEFAULT_LIMIT
+    return min(limit, PAGINATION_MAX_LIMIT)
+
+
+def resolve_page_size(limit: Optional[int], cursor: Optional[str]) -> int:
+    """Tamaño de página de un listado.
+
+    Sin `limit` ni `cursor` el cliente espera la lista completa: se devuelve
+    hasta `PAGINATION_UNPAGINATED_LIMIT` filas (y el cursor si quedaron más)
+    para que la consulta nunca quede sin tope.
+    """
+    if limit is None and cursor is None:
+        return PAGINATION_UNPAGINATED_LIMIT
+    return clamp_limit(limit)
+
+
+def encode_cursor(values: Dict[str, Any]) -> str:
+    """Serializa las claves de orden de la última fila en un cursor opaco."""
+    payload = {
+        key: value.isoformat() if isinstance(value, datetime) else value
+        for key, value in values.items()
+    }
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(
+    cursor: str, *, required_keys: tuple = (), datetime_keys: tuple = ()
+) -> Dict[str, Any]:
+    """Decodifica un cursor generado por `encode_cursor`.
+
+    Un cursor mal formado o sin alguna de `required_keys` responde 400.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        if not isinstance(payload, dict):
+            raise ValueError("cursor no es un objeto")
+        for key in required_keys:
+            if payload.get(key) is None:
+                raise ValueError(f"falta la clave {key} en el cursor")
+        for key in datetime_keys:
+            if payload.get(key) is not None:
+                payload[key] = datetime.fromisoformat(payload[key])
+        return payload
+    except (ValueError, TypeError, binascii.Error, UnicodeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cursor de paginación inválido",
+        )
+
+
+def keyset_after(keys: Sequence[Tuple[Any, bool, Any]]):
+    """Condición "fila posterior al cursor" para un orden lexicográfico.
+
+    Cada clave es (expresión, ascendente, valor de la última fila). Para
+    (a asc, b desc) genera: a > va OR (a = va AND b < vb).
+
+    Si todas las claves van en la misma dirección se agrega además la
+    comparación de filas (a, b) > (va, vb): MySQL arma el rango del índice con
+    la forma expandida y no con la de filas, y SQLite al revés.
+    """
+    condition = None
+    for expr, ascending, value in reversed(keys):
+        strictly_after = expr > value if ascending else expr < value
+        if condition is None:
+            condition = strictly_after
+        else:
+            condition = or_(strictly_after, and_(expr == value, condition))
+
+    directions = {ascending for _, ascending, _ in keys}
+    if len(keys) > 1 and len(directions) == 1:
+        columns = tuple_(*(expr for expr, _, _ in keys))
+        values = tuple_(*(value for _, _, value in keys))
+        row_after = columns > values if directions.pop() else columns < values
+        condition = and_(row_after, condition)
+    return condition
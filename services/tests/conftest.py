@@ -0,0 +1,15 @@
+"""Configuración común de los tests.
+
+Los módulos leen la configuración al importarse, así que las variables
+obligatorias se definen antes de cualquier import del código de `src`.
+Los tests no necesitan MinIO, OpenAI ni MySQL: usan servidores falsos y
+bases SQLite en memoria.
+"""
+
+import os
+
+os.environ.setdefault("S3_ENDPOINT", "http://127.0.0.1:1")
+os.environ.setdefault("S3_BUCKET_NAME", "fastservices")
+os.environ.setdefault("S3_ACCESS_KEY", "test")
+os.environ.setdefault("S3_SECRET_KEY", "test")
+os.environ.setdefault("OPENAI_API_KEY", "test")
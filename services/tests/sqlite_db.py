@@ -0,0 +1,46 @@
+"""Base SQLite en memoria con el esquema completo, para tests de servicios."""
+
+from __future__ import annotations
+
+from sqlalchemy import BigInteger
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.pool import StaticPool
+
+import models  # noqa: F401  (registra todas las tablas en Base.metadata)
+from database.database import Base
+from models.User import User, UserRole
+
+
+@compiles(BigInteger, "sqlite")
+def _bigint_as_integer(type_, compiler, **kw):
+    # En SQLite sólo INTEGER PRIMARY KEY es autoincremental
+    return "INTEGER"
+
+
+async def create_database() -> tuple[AsyncEngine, async_sessionmaker[AsyncSession]]:
+    """Crea una base en memoria compartida por todas las sesiones del engine."""
+    engine = create_async_engine(
+        "sqlite+aiosqlite://",
+        poolclass=StaticPool,
+        connect_args={"check_same_thread": False},
+    )
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    return engine, async_sessionmaker(engine, expire_on_commit=False)
+
+
+async def create_user(db: AsyncSession, suffix: str = "1", **kwargs) -> User:
+    user = User(
+        role=kwargs.pop("role", UserRole.CLIENT),
+        first_name="Test",
+        last_name=suffix,
+        email=f"user{suffix}@example.com",
+        phone=f"+54911000{suffix}",
+        password_hash=kwargs.pop("password_hash", "x" * 60),
+        is_active=True,
+        **kwargs,
+    )
+    db.add(user)
+    await db.flush()
+    return user
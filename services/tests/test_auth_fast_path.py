@@ -0,0 +1,151 @@
+"""Tests de la autenticación por `uid` con la caché de usuarios."""
+
+import asyncio
+from datetime import timedelta
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import event, update
+
+from auth import auth_utils
+from auth.auth_utils import create_access_token, get_authenticated_user, get_password_hash
+from auth.principal_cache import PrincipalCache
+from auth.token_revocation import TokenRevocationList
+from controllers.user_controller import UserController
+from models.User import User, UserUpdate
+from sqlite_db import create_database, create_user
+
+
+class StatementLog(list):
+    """SELECTs sobre `users` ejecutados por el engine."""
+
+    def __init__(self, engine):
+        super().__init__()
+
+        @event.listens_for(engine.sync_engine, "before_cursor_execute")
+        def _record(conn, cursor, statement, parameters, context, executemany):
+            if statement.lstrip().upper().startswith("SELECT") and "FROM users" in statement:
+                self.append(statement)
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    cache = PrincipalCache(ttl=60, max_entries=100)
+    monkeypatch.setattr(auth_utils, "principal_cache", cache)
+    # Los controladores invalidan la misma instancia que lee auth_utils
+    monkeypatch.setattr("controllers.user_controller.principal_cache", cache)
+    return cache
+
+
+async def _setup(monkeypatch):
+    engine, session_factory = await create_database()
+    monkeypatch.setattr(
+        auth_utils, "token_revocation_list", TokenRevocationList(session_factory)
+    )
+    async with session_factory() as db:
+        user = await create_user(db, password_hash=await get_password_hash("vieja-clave"))
+        await db.commit()
+    return engine, session_factory, user
+
+
+def _token(user: User) -> str:
+    return create_access_token(
+        {
+            "sub": user.email,
+            "uid": user.id,
+            "ver": user.token_version or 0,
+            "sid": "sesion-1",
+        },
+        timedelta(minutes=5),
+    )
+
+
+async def _authenticate(session_factory, token):
+    async with session_factory() as db:
+        return await get_authenticated_user(token, db)
+
+
+def test_cache_hit_skips_the_users_select(cache, monkeypatch):
+    async def scenario():
+        engine, session_factory, user = await _setup(monkeypatch)
+        token = _token(user)
+        selects = StatementLog(engine)
+
+        assert (await _authenticate(session_factory, token)).id == user.id
+        assert len(selects) == 1
+        assert (await _authenticate(session_factory, token)).email == user.email
+        assert len(selects) == 1
+        assert cache.metrics()["hits"] == 1
+        await engine.dispose()
+
+    asyncio.run(scenario())
+
+
+def test_token_with_old_version_is_rejected(cache, monkeypatch):
+    async def scenario():
+        engine, session_factory, user = await _setup(monkeypatch)
+        token = _token(user)
+        async with session_factory() as db:
+            await db.execute(update(User).where(User.id == user.id).values(token_version=1))
+            await db.commit()
+
+        with pytest.raises(HTTPException) as exc_info:
+            await _authenticate(session_factory, token)
+        assert exc_info.value.status_code == 401
+        await engine.dispose()
+
+    asyncio.run(scenario())
+
+
+def test_profile_update_invalidates_the_cached_user(cache, monkeypatch):
+    async def scenario():
+        engine, session_factory, user = await _setup(monkeypatch)
+        token = _token(user)
+        await _authenticate(session_factory, token)
+
+        async with session_factory() as db:
+            await UserController.update_user_profile(
+                db, user.id, UserUpdate(first_name="Renombrado")
+            )
+        assert (await _authenticate(session_factory, token)).first_name == "Renombrado"
+        await engine.dispose()
+
+    asyncio.run(scenario())
+
+
+def test_deactivation_rejects_cached_tokens(cache, monkeypatch):
+    async def scenario():
+        engine, session_factory, user = await _setup(monkeypatch)
+        token = _token(user)
+        await _authenticate(session_factory, token)
+
+        async with session_factory() as db:
+            assert await UserController.update_user_status(db, user.id, False)
+        with pytest.raises(HTTPException) as exc_info:
+            await _authenticate(session_factory, token)
+        assert exc_info.value.status_code == 401
+        await engine.dispose()
+
+    asyncio.run(scenario())
+
+
+def test_password_change_rejects_tokens_issued_before(cache, monkeypatch):
+    async def scenario():
+        engine, session_factory, user = await _setup(monkeypatch)
+        old_token = _token(user)
+        await _authenticate(session_factory, old_token)
+
+        async with session_factory() as db:
+            assert await UserController.change_user_password(
+                db, user.id, "vieja-clave", "nueva-clave"
+            )
+        with pytest.raises(HTTPException) as exc_info:
+            await _authenticate(session_factory, old_token)
+        assert exc_info.value.detail == "Token has been revoked"
+
+        async with session_factory() as db:
+            refreshed = await db.get(User, user.id)
+        assert (await _authenticate(session_factory, _token(refreshed))).id == user.id
+        await engine.dispose()
+
+    asyncio.run(scenario())
@@ -0,0 +1,286 @@
+"""Tests del scheduler de vencimientos con un reloj falso que avanza a mano."""
+
+import asyncio
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import select
+
+from models.NotificationOutbox import NotificationOutbox
+from models.ProviderProfile import ProviderProfile
+from models.ServiceRequest import (
+    ProposalStatus,
+    Service,
+    ServiceRequest,
+    ServiceRequestProposal,
+    ServiceRequestStatus,
+    ServiceRequestType,
+    ServiceStatus,
+)
+from models.User import UserRole
+from services import expiration_scheduler as scheduler_module
+from services.expiration_scheduler import ExpirationScheduler
+from services.service_request_service import ServiceRequestService
+from sqlite_db import create_database, create_user
+
+DEADLINE = datetime(2026, 10, 10, 12, 0)
+
+
+class FakeClock:
+    """Reloj inyectable: devuelve `now` hasta que el test lo avanza."""
+
+    def __init__(self, now: datetime) -> None:
+        self.now = now
+
+    def __call__(self) -> datetime:
+        return self.now
+
+    def advance(self, **kwargs) -> None:
+        self.now += timedelta(**kwargs)
+
+
+@pytest.fixture(autouse=True)
+def recorded_kpis(monkeypatch):
+    """El upsert de KPIs es de MySQL; acá sólo se registran las llamadas."""
+    calls = []
+
+    async def add(db, provider_profile_id, currency, **deltas):
+        calls.append((provider_profile_id, deltas))
+
+    monkeypatch.setattr(scheduler_module.provider_kpis, "add", add)
+    return calls
+
+
+async def _setup(clock, *, batch_size=10):
+    engine, session_factory = await create_database()
+    async with session_factory() as db:
+        client = await create_user(db, "1")
+        provider_user = await create_user(db, "2", role=UserRole.PROVIDER)
+        profile = ProviderProfile(user_id=provider_user.id)
+        db.add(profile)
+        await db.commit()
+        ids = {
+            "client": client.id,
+            "provider_user": provider_user.id,
+            "profile": profile.id,
+        }
+    scheduler = ExpirationScheduler(session_factory, clock=clock, batch_size=batch_size)
+    return engine, session_factory, scheduler, ids
+
+
+async def _add_bidding(session_factory, client_id, deadline, title="Licitación"):
+    async with session_factory() as db:
+        request = ServiceRequest(
+            client_id=client_id,
+            title=title,
+            description="Pintura de fachada",
+            request_type=ServiceRequestType.LICITACION,
+            status=ServiceRequestStatus.PUBLISHED,
+            bidding_deadline=deadline,
+        )
+        db.add(request)
+        await db.commit()
+        return request.id
+
+
+async def _notifications(session_factory):
+    async with session_factory() as db:
+        rows = (await db.execute(select(NotificationOutbox))).scalars().all()
+        return [(row.user_id, row.data["type"]) for row in rows]
+
+
+def test_bidding_closes_at_deadline_and_stays_in_active_listing():
+    async def scenario():
+        clock = FakeClock(DEADLINE - timedelta(minutes=1))
+        engine, session_factory, scheduler, ids = await _setup(clock)
+        request_id = await _add_bidding(session_factory, ids["client"], DEADLINE)
+
+        assert await scheduler.run_once() == 0
+        async with session_factory() as db:
+            request = await db.get(ServiceRequest, request_id)
+            assert request.status == ServiceRequestStatus.PUBLISHED
+        assert await _notifications(session_factory) == []
+
+        clock.advance(minutes=2)
+        await scheduler.run_once()
+
+        async with session_factory() as db:
+            request = await db.get(ServiceRequest, request_id)
+            assert request.status == ServiceRequestStatus.CLOSED
+            # El cliente todavía tiene que elegir un presupuesto
+            page = await ServiceRequestService.list_active_without_service(
+                db, client_id=ids["client"]
+            )
+            assert [item.id for item in page.items] == [request_id]
+        assert await _notifications(session_factory) == [
+            (ids["client"], "bidding_closed")
+        ]
+
+        metrics = scheduler.job_metrics["bidding_deadlines"]
+        assert metrics.processed_total == 1
+        assert metrics.last_lag_seconds == 60
+        assert metrics.last_run_at == clock.now
+
+        # Una segunda corrida no vuelve a notificar
+        await scheduler.run_once()
+        assert len(await _notifications(session_factory)) == 1
+        await engine.dispose()
+
+    asyncio.run(scenario())
+
+
+def test_closed_request_with_service_leaves_active_listing():
+    async def scenario():
+        clock = FakeClock(DEADLINE + timedelta(minutes=1))
+        engine, session_factory, scheduler, ids = await _setup(clock)
+        request_id = await _add_bidding(session_factory, ids["client"], DEADLINE)
+        await scheduler.run_once()
+
+        async with session_factory() as db:
+            proposal = ServiceRequestProposal(
+                request_id=request_id,
+                provider_profile_id=ids["profile"],
+                quoted_price=Decimal("1000.00"),
+                currency="ARS",
+                status=ProposalStatus.ACCEPTED,
+            )
+            db.add(proposal)
+            await db.flush()
+            db.add(
+                Service(
+                    request_id=request_id,
+                    proposal_id=proposal.id,
+                    client_id=ids["client"],
+                    provider_profile_id=ids["profile"],
+                    status=ServiceStatus.CONFIRMED,
+                    total_price=Decimal("1020.00"),
+                    currency="ARS",
+                )
+            )
+            await db.commit()
+
+        async with session_factory() as db:
+            page = await ServiceRequestService.list_active_without_service(
+                db, client_id=ids["client"]
+            )
+            assert page.items == []
+        await engine.dispose()
+
+    asyncio.run(scenario())
+
+
+def test_full_batch_is_drained_on_the_next_run():
+    async def scenario():
+        clock = FakeClock(DEADLINE - timedelta(hours=1))
+        engine, session_factory, scheduler, ids = await _setup(clock, batch_size=2)
+        request_ids = [
+            await _add_bidding(
+                session_factory, ids["client"], DEADLINE + timedelta(minutes=i), f"L{i}"
+            )
+            for i in range(3)
+        ]
+
+        clock.advance(hours=2)
+        # Lote completo: el loop vuelve a correr sin esperar el polling
+        assert await scheduler.run_once() == 1
+        assert await scheduler.run_once() == 0
+
+        async with session_factory() as db:
+            statuses = (
+                await db.execute(
+                    select(ServiceRequest.status).where(ServiceRequest.id.in_(request_ids))
+                )
+            ).scalars().all()
+        assert statuses == [ServiceRequestStatus.CLOSED] * 3
+        # El atraso de la primera corrida es el del vencimiento más viejo
+        assert scheduler.job_metrics["bidding_deadlines"].max_lag_seconds == 3600
+        await engine.dispose()
+
+    asyncio.run(scenario())
+
+
+def test_pending_proposal_expires_when_clock_passes_valid_until(recorded_kpis):
+    async def scenario():
+        valid_until = DEADLINE + timedelta(days=3)
+        clock = FakeClock(valid_until - timedelta(seconds=1))
+        engine, session_factory, scheduler, ids = await _setup(clock)
+        async with session_factory() as db:
+            request = ServiceRequest(
+                client_id=ids["client"],
+                description="Arreglo de enchufe",
+                status=ServiceRequestStatus.PUBLISHED,
+            )
+            db.add(request)
+            await db.flush()
+            proposal = ServiceRequestProposal(
+                request_id=request.id,
+                provider_profile_id=ids["profile"],
+                quoted_price=Decimal("500.00"),
+                currency="ARS",
+                status=ProposalStatus.PENDING,
+                valid_until=valid_until,
+                created_at=DEADLINE,
+            )
+            db.add(proposal)
+            await db.commit()
+            proposal_id = proposal.id
+
+        await scheduler.run_once()
+        assert recorded_kpis == []
+
+        clock.advance(seconds=1)
+        await scheduler.run_once()
+
+        async with session_factory() as db:
+            proposal = await db.get(ServiceRequestProposal, proposal_id)
+            assert proposal.status == ProposalStatus.EXPIRED
+        assert await _notifications(session_factory) == [
+            (ids["provider_user"], "proposal_expired")
+        ]
+        assert len(recorded_kpis) == 1
+        assert recorded_kpis[0][0] == ids["profile"]
+        await engine.dispose()
+
+    asyncio.run(scenario())
+
+
+def test_warranty_is_closed_with_the_clock_time():
+    async def scenario():
+        expires_at = DEADLINE + timedelta(days=30)
+        clock = FakeClock(expires_at - timedelta(hours=1))
+        engine, session_factory, scheduler, ids = await _setup(clock)
+        async with session_factory() as db:
+            request = ServiceRequest(
+                client_id=ids["client"],
+                description="Instalación de termotanque",
+                status=ServiceRequestStatus.CLOSED,
+            )
+            db.add(request)
+            await db.flush()
+            service = Service(
+                request_id=request.id,
+                client_id=ids["client"],
+                provider_profile_id=ids["profile"],
+                status=ServiceStatus.COMPLETED,
+                total_price=Decimal("1020.00"),
+                currency="ARS",
+                warranty_expires_at=expires_at,
+            )
+            db.add(service)
+            await db.commit()
+            service_id = service.id
+
+        await scheduler.run_once()
+        clock.advance(hours=2)
+        await scheduler.run_once()
+
+        async with session_factory() as db:
+            service = await db.get(Service, service_id)
+            assert service.warranty_closed_at == clock.now
+        assert await _notifications(session_factory) == [
+            (ids["client"], "warranty_expired")
+        ]
+        await engine.dispose()
+
+    asyncio.run(scenario())
@@ -0,0 +1,54 @@
+"""Tests de las métricas internas: sólo las ve un administrador."""
+
+import pytest
+from fastapi.testclient import TestClient
+
+from auth.auth_utils import check_user_login
+from main import create_app
+from models.User import User, UserRole
+
+INTERNAL_PATHS = [
+    "/health/scheduler",
+    "/health/push",
+    "/health/http",
+    "/health/offload",
+    "/health/db",
+    "/health/auth",
+]
+
+
+def _client(role=None):
+    app = create_app()
+    if role is not None:
+        app.dependency_overrides[check_user_login] = lambda: User(
+            id=1, role=role, is_active=True
+        )
+    # Sin `with`: no arranca el lifespan ni los workers
+    return TestClient(app)
+
+
+def test_public_health_check_needs_no_token():
+    response = _client().get("/health")
+    assert response.status_code == 200
+    assert response.json()["status"] == "ok"
+
+
+@pytest.mark.parametrize("path", INTERNAL_PATHS)
+def test_internal_metrics_require_a_token(path):
+    assert _client().get(path).status_code == 401
+
+
+@pytest.mark.parametrize("path", INTERNAL_PATHS)
+def test_internal_metrics_are_forbidden_to_non_admins(path):
+    assert _client(UserRole.CLIENT).get(path).status_code == 403
+
+
+@pytest.mark.parametrize("path", INTERNAL_PATHS)
+def test_admins_see_internal_metrics(path):
+    assert _client(UserRole.ADMIN).get(path).status_code == 200
+
+
+def test_internal_metrics_are_left_out_of_the_openapi_schema():
+    paths = _client().get("/openapi.json").json()["paths"]
+    assert "/health" in paths
+    assert not set(INTERNAL_PATHS) & set(paths)
@@ -0,0 +1,103 @@
+"""Tests del worker de variantes: una subida que falla no queda PROCESSING."""
+
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import select
+
+from models.ImageUpload import ImageUpload, ImageUploadStatus
+from services import image_variant_worker as worker_module
+from services.image_variant_worker import ImageVariantWorker
+from sqlite_db import create_database, create_user
+
+VARIANTS = [{"variant": "full", "format": "webp", "url": "http://minio/full.webp"}]
+
+
+async def _setup(upload_count: int = 2):
+    engine, session_factory = await create_database()
+    now = datetime.utcnow()
+    async with session_factory() as db:
+        user = await create_user(db)
+        for i in range(upload_count):
+            db.add(
+                ImageUpload(
+                    id=f"subida-{i}",
+                    user_id=user.id,
+                    purpose="service_request",
+                    s3_key=f"service_requests/{i}.jpg",
+                    content_type="image/jpeg",
+                    declared_size=1024,
+                    status=ImageUploadStatus.UPLOADED,
+                    run_after=now - timedelta(seconds=1),
+                    expires_at=now + timedelta(minutes=10),
+                )
+            )
+        await db.commit()
+    worker = ImageVariantWorker(session_factory, max_attempts=3, retry_backoff=60)
+    return engine, session_factory, worker
+
+
+async def _uploads(session_factory):
+    async with session_factory() as db:
+        return (
+            (await db.execute(select(ImageUpload).order_by(ImageUpload.id))).scalars().all()
+        )
+
+
+@pytest.fixture
+def fake_storage(monkeypatch):
+    stored = {}
+
+    async def download_image(s3_key):
+        return b"imagen"
+
+    async def store_variants(s3_key, image_data, max_width=1200):
+        return stored.get(s3_key, VARIANTS)
+
+    monkeypatch.setattr(worker_module.s3_service, "download_image", download_image)
+    monkeypatch.setattr(worker_module.s3_service, "store_variants", store_variants)
+    return stored
+
+
+def test_failure_saving_variants_requeues_the_upload(fake_storage):
+    # Un valor que no se puede serializar hace fallar el commit de las variantes
+    fake_storage["service_requests/0.jpg"] = [{"variant": "full", "url": object()}]
+
+    async def scenario():
+        engine, session_factory, worker = await _setup()
+        assert await worker.run_once() == 2
+        uploads = await _uploads(session_factory)
+        await engine.dispose()
+        return uploads
+
+    failed, ready = asyncio.run(scenario())
+    assert failed.status == ImageUploadStatus.UPLOADED
+    assert failed.locked_at is None
+    assert failed.run_after > datetime.utcnow()
+    assert failed.last_error.startswith("StatementError")
+    assert ready.status == ImageUploadStatus.READY
+    assert ready.variants == VARIANTS
+
+
+def test_unexpected_error_does_not_abort_the_batch(fake_storage, monkeypatch):
+    async def scenario():
+        engine, session_factory, worker = await _setup()
+        process = worker._process
+
+        async def flaky_process(upload_id):
+            if upload_id == "subida-0":
+                raise RuntimeError("conexión perdida")
+            await process(upload_id)
+
+        monkeypatch.setattr(worker, "_process", flaky_process)
+        assert await worker.run_once() == 2
+        uploads = await _uploads(session_factory)
+        await engine.dispose()
+        return uploads
+
+    failed, ready = asyncio.run(scenario())
+    assert failed.status == ImageUploadStatus.UPLOADED
+    assert failed.locked_at is None
+    assert failed.last_error == "RuntimeError: conexión perdida"
+    assert ready.status == ImageUploadStatus.READY
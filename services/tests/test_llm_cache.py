@@ -0,0 +1,101 @@
+"""Tests de la caché de LLM: los aciertos se cuentan en memoria y se vuelcan juntos."""
+
+import asyncio
+from datetime import datetime, timedelta
+
+from sqlalchemy import event, select
+
+from models.LLMResponseCache import LLMResponseCache
+from services.llm_cache import LLMResponseCacheService
+from sqlite_db import create_database
+
+
+async def _setup(**kwargs):
+    engine, session_factory = await create_database()
+    async with session_factory() as db:
+        for key in ("a", "b"):
+            db.add(
+                LLMResponseCache(
+                    cache_key=key,
+                    template="request_tags",
+                    model="gpt-test",
+                    response=f'{{"tags": ["{key}"]}}',
+                    hit_count=0,
+                    expires_at=datetime.utcnow() + timedelta(hours=1),
+                )
+            )
+        await db.commit()
+    cache = LLMResponseCacheService(session_factory, enabled=True, **kwargs)
+    return engine, session_factory, cache
+
+
+async def _hit_counts(session_factory):
+    async with session_factory() as db:
+        rows = await db.execute(
+            select(LLMResponseCache.cache_key, LLMResponseCache.hit_count)
+        )
+        return dict(rows.all())
+
+
+def test_hits_do_not_write_until_flush():
+    async def scenario():
+        engine, session_factory, cache = await _setup(hit_flush_interval=3600)
+        updates = []
+
+        def count_updates(conn, cursor, statement, *args):
+            if statement.lstrip().upper().startswith("UPDATE"):
+                updates.append(statement)
+
+        event.listen(engine.sync_engine, "before_cursor_execute", count_updates)
+
+        # Primer acceso desde la BD, los siguientes desde memoria
+        for _ in range(3):
+            assert await cache.get("a") == '{"tags": ["a"]}'
+        await cache.get("b")
+        assert updates == []
+        assert await _hit_counts(session_factory) == {"a": 0, "b": 0}
+
+        assert await cache.flush_hits() == 2
+        counts = await _hit_counts(session_factory)
+        stats = cache.stats()
+        await engine.dispose()
+        return counts, updates, stats
+
+    counts, updates, stats = asyncio.run(scenario())
+    assert counts == {"a": 3, "b": 1}
+    # Un UPDATE por incremento distinto, no uno por acierto
+    assert len(updates) == 2
+    assert stats["db_hits"] == 2
+    assert stats["memory_hits"] == 2
+    assert stats["pending_hit_keys"] == 0
+
+
+def test_hits_flush_after_interval():
+    async def scenario():
+        engine, session_factory, cache = await _setup(hit_flush_interval=0)
+        await cache.get("a")
+        await cache.get("a")
+        counts = await _hit_counts(session_factory)
+        await engine.dispose()
+        return counts
+
+    assert asyncio.run(scenario())["a"] == 2
+
+
+def test_failed_flush_keeps_pending_hits():
+    async def scenario():
+        engine, session_factory, cache = await _setup(hit_flush_interval=3600)
+        await cache.get("a")
+
+        def broken_factory():
+            raise RuntimeError("base caída")
+
+        cache.session_factory = broken_factory
+        assert await cache.flush_hits() == 0
+        cache.session_factory = session_factory
+        assert await cache.flush_hits() == 1
+        counts = await _hit_counts(session_factory)
+        await engine.dispose()
+        return counts
+
+    assert asyncio.run(scenario())["a"] == 1
@@ -0,0 +1,108 @@
+"""Tests del feed por radio: prefiltro por rango y solicitudes sin coordenadas."""
+
+import asyncio
+
+import pytest
+from sqlalchemy import event
+
+from models.Address import Address
+from models.ProviderProfile import ProviderLicense, ProviderProfile
+from models.ServiceRequest import ServiceRequest, ServiceRequestStatus, ServiceRequestType
+from models.Tag import ProviderLicenseTag, ServiceRequestTag, Tag
+from models.User import UserRole
+from services import match_index as match_index_module
+from sqlite_db import create_database, create_user
+
+CORDOBA = (-31.4201, -64.1888)
+
+
+@pytest.fixture
+def captured_rows(monkeypatch):
+    captured = []
+
+    async def capture_rows(db, rows):
+        captured.extend(rows)
+
+    # La escritura real usa INSERT ... ON DUPLICATE KEY UPDATE de MySQL
+    monkeypatch.setattr(match_index_module, "_insert_rows", capture_rows)
+    monkeypatch.setattr(match_index_module.settings, "MATCH_RADIUS_KM", 30.0)
+    return captured
+
+
+def _address(user_id, city, state, point=None):
+    return Address(
+        user_id=user_id,
+        title="Casa",
+        street="San Martín 100",
+        city=city,
+        state=state,
+        is_default=True,
+        latitude=point[0] if point else None,
+        longitude=point[1] if point else None,
+    )
+
+
+async def _setup(session_factory):
+    async with session_factory() as db:
+        client = await create_user(db, "1")
+        provider = await create_user(db, "2", role=UserRole.PROVIDER)
+        db.add(_address(provider.id, "Córdoba", "Córdoba", CORDOBA))
+        profile = ProviderProfile(user_id=provider.id)
+        tag = Tag(slug="gasista", name="GASISTA")
+        db.add_all([profile, tag])
+        await db.flush()
+        license_ = ProviderLicense(provider_profile_id=profile.id, title="Gasista")
+        db.add(license_)
+        await db.flush()
+        db.add(ProviderLicenseTag(license_id=license_.id, tag_id=tag.id, confidence=0.9))
+
+        cordoba = _address(client.id, "Córdoba", "Córdoba")
+        rosario = _address(client.id, "Rosario", "Santa Fe")
+        db.add_all([cordoba, rosario])
+        await db.flush()
+        requests = {
+            "cerca": ServiceRequest(lat_snapshot=-31.40, lon_snapshot=-64.20),
+            "lejos": ServiceRequest(lat_snapshot=-34.60, lon_snapshot=-58.38),
+            "sin_punto_cordoba": ServiceRequest(address_id=cordoba.id),
+            "sin_punto_rosario": ServiceRequest(address_id=rosario.id),
+        }
+        for title, service_request in requests.items():
+            service_request.client_id = client.id
+            service_request.title = title
+            service_request.description = "Revisión de la instalación de gas"
+            service_request.request_type = ServiceRequestType.FAST
+            service_request.status = ServiceRequestStatus.PUBLISHED
+        db.add_all(requests.values())
+        await db.flush()
+        db.add_all(
+            ServiceRequestTag(request_id=service_request.id, tag_id=tag.id, confidence=0.8)
+            for service_request in requests.values()
+        )
+        await db.commit()
+        return profile.id, {title: request.id for title, request in requests.items()}
+
+
+def test_feed_keeps_requests_without_coordinates_in_a_separate_query(captured_rows):
+    async def scenario():
+        engine, session_factory = await create_database()
+        profile_id, request_ids = await _setup(session_factory)
+        statements = []
+
+        @event.listens_for(engine.sync_engine, "before_cursor_execute")
+        def _record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        async with session_factory() as db:
+            await match_index_module.match_index.refresh_provider(db, profile_id)
+        await engine.dispose()
+        return request_ids, statements
+
+    request_ids, statements = asyncio.run(scenario())
+    matched = {row["request_id"] for row in captured_rows}
+    assert matched == {request_ids["cerca"], request_ids["sin_punto_cordoba"]}
+
+    # El rango y los IS NULL no comparten condición: cada rama usa su índice
+    feed_query = next(s for s in statements if "UNION ALL" in s)
+    ranged, unlocated = feed_query.split("UNION ALL")
+    assert "BETWEEN" in ranged and "IS NULL" not in ranged
+    assert "IS NULL" in unlocated and "BETWEEN" not in unlocated
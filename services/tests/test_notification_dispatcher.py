@@ -0,0 +1,139 @@
+"""Tests del dispatcher del outbox contra un stand-in de Expo con MockTransport."""
+
+import asyncio
+import json
+from datetime import datetime
+
+import httpx
+import pytest
+from sqlalchemy import func, select, text
+
+from models.NotificationOutbox import NotificationOutbox, NotificationStatus
+from models.PushTicket import PushTicket
+from models.PushToken import PushToken
+from services import notification_dispatcher as dispatcher_module
+from services.http_client import OutboundHttp
+from services.notification_dispatcher import NotificationDispatcher, delivery_metrics
+from sqlite_db import create_database, create_user
+
+DEAD_TOKEN = "ExponentPushToken[muerto]"
+
+
+class ExpoStandIn:
+    """Responde como la API de push de Expo y guarda el tamaño de cada lote."""
+
+    def __init__(self, status_code: int = 200) -> None:
+        self.status_code = status_code
+        self.batch_sizes = []
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        messages = json.loads(request.content)
+        self.batch_sizes.append(len(messages))
+        if self.status_code >= 500:
+            return httpx.Response(self.status_code, json={"errors": ["no disponible"]})
+        tickets = [
+            {
+                "status": "error",
+                "message": "El dispositivo no está registrado",
+                "details": {"error": "DeviceNotRegistered"},
+            }
+            if message["to"] == DEAD_TOKEN
+            else {"status": "ok", "id": f"ticket-{i}-{message['to']}"}
+            for i, message in enumerate(messages)
+        ]
+        return httpx.Response(200, json={"data": tickets})
+
+
+@pytest.fixture
+def expo(monkeypatch):
+    """Pool `expo` propio del test, servido por el stand-in."""
+    delivery_metrics.platforms.clear()
+    http = OutboundHttp()
+    monkeypatch.setattr(dispatcher_module, "outbound_http", http)
+
+    def serve(status_code: int = 200) -> ExpoStandIn:
+        stand_in = ExpoStandIn(status_code)
+        http.use_transport("expo", httpx.MockTransport(stand_in))
+        return stand_in
+
+    yield serve
+    asyncio.run(http.stop())
+    delivery_metrics.platforms.clear()
+
+
+async def _setup(token_count: int):
+    engine, session_factory = await create_database()
+    async with session_factory() as db:
+        user = await create_user(db)
+        tokens = [f"ExponentPushToken[{i}]" for i in range(token_count - 1)] + [DEAD_TOKEN]
+        db.add_all(PushToken(user_id=user.id, token=token, platform="ios") for token in tokens)
+        db.add(NotificationOutbox(user_id=user.id, title="Nueva oferta", body="Tenés una oferta"))
+        await db.commit()
+    dispatcher = NotificationDispatcher(session_factory, max_attempts=3, retry_backoff=60)
+    return engine, session_factory, dispatcher
+
+
+async def _outbox(session_factory):
+    async with session_factory() as db:
+        return (await db.execute(select(NotificationOutbox))).scalar_one()
+
+
+def test_messages_go_in_chunks_of_100_and_invalid_tokens_are_deleted(expo):
+    stand_in = expo()
+
+    async def scenario():
+        engine, session_factory, dispatcher = await _setup(token_count=150)
+        assert await dispatcher.run_once() == 1
+        notification = await _outbox(session_factory)
+        async with session_factory() as db:
+            tokens = set((await db.execute(select(PushToken.token))).scalars())
+            tickets = (await db.execute(select(func.count(PushTicket.id)))).scalar_one()
+        await engine.dispose()
+        return notification, tokens, tickets
+
+    notification, tokens, tickets = asyncio.run(scenario())
+    assert sorted(stand_in.batch_sizes) == [50, 100]
+    assert notification.status == NotificationStatus.SENT
+    assert DEAD_TOKEN not in tokens
+    assert len(tokens) == 149
+    assert tickets == 149
+    assert delivery_metrics["ios"].tokens_purged == 1
+
+
+def test_server_error_retries_with_backoff(expo):
+    stand_in = expo(status_code=503)
+
+    async def scenario():
+        engine, session_factory, dispatcher = await _setup(token_count=3)
+        await dispatcher.run_once()
+        notification = await _outbox(session_factory)
+        await engine.dispose()
+        return notification
+
+    notification = asyncio.run(scenario())
+    assert stand_in.batch_sizes == [3]
+    assert notification.status == NotificationStatus.PENDING
+    assert notification.attempts == 1
+    assert notification.locked_at is None
+    assert notification.run_after > datetime.utcnow()
+    assert notification.last_error.startswith("HTTPStatusError")
+
+
+def test_failure_outside_the_chunks_releases_the_claimed_batch(expo):
+    expo()
+
+    async def scenario():
+        engine, session_factory, dispatcher = await _setup(token_count=3)
+        # El envío sale bien pero falla el guardado de los tickets
+        async with engine.begin() as conn:
+            await conn.execute(text("DROP TABLE push_tickets"))
+        await dispatcher.run_once()
+        notification = await _outbox(session_factory)
+        await engine.dispose()
+        return notification
+
+    notification = asyncio.run(scenario())
+    assert notification.status == NotificationStatus.PENDING
+    assert notification.locked_at is None
+    assert notification.run_after > datetime.utcnow()
+    assert notification.last_error.startswith("OperationalError")
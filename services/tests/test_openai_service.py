@@ -0,0 +1,133 @@
+"""Tests de OpenAIService contra un servidor LLM falso (httpx.MockTransport)."""
+
+import asyncio
+import time
+
+import httpx
+import pytest
+from openai import BadRequestError, RateLimitError
+
+from services.openai import OpenAIService
+
+
+def _response(text: str) -> dict:
+    """Cuerpo mínimo de la Responses API."""
+    return {
+        "id": "resp_test",
+        "object": "response",
+        "created_at": 0,
+        "model": "gpt-test",
+        "status": "completed",
+        "output": [
+            {
+                "type": "message",
+                "id": "msg_test",
+                "role": "assistant",
+                "status": "completed",
+                "content": [{"type": "output_text", "text": text, "annotations": []}],
+            }
+        ],
+        "parallel_tool_calls": False,
+        "tool_choice": "auto",
+        "tools": [],
+    }
+
+
+class FakeLLMServer:
+    """Responde `/responses` con demora y falla con los códigos de `failures`."""
+
+    def __init__(self, *, delay: float = 0.0, failures: tuple = ()) -> None:
+        self.delay = delay
+        self.failures = list(failures)
+        self.calls = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.timestamps = []
+
+    async def handler(self, request: httpx.Request) -> httpx.Response:
+        assert request.url.path.endswith("/responses")
+        self.calls += 1
+        self.timestamps.append(time.monotonic())
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.in_flight -= 1
+        if self.failures:
+            status = self.failures.pop(0)
+            return httpx.Response(status, json={"error": {"message": "falla de prueba"}})
+        return httpx.Response(200, json=_response(" hola "))
+
+
+def _service(server: FakeLLMServer, **kwargs) -> OpenAIService:
+    return OpenAIService(
+        model="gpt-test",
+        api_key="test",
+        base_url="http://llm.test/v1",
+        http_client=httpx.AsyncClient(transport=httpx.MockTransport(server.handler)),
+        **kwargs,
+    )
+
+
+def test_run_returns_output_text():
+    server = FakeLLMServer()
+
+    async def scenario():
+        return await _service(server).run("sistema", "mensaje")
+
+    assert asyncio.run(scenario()) == "hola"
+    assert server.calls == 1
+
+
+def test_semaphore_limits_calls_in_flight():
+    server = FakeLLMServer(delay=0.05)
+
+    async def scenario():
+        service = _service(server, semaphore=asyncio.Semaphore(2))
+        return await asyncio.gather(*(service.run("sistema", str(i)) for i in range(6)))
+
+    results = asyncio.run(scenario())
+    assert results == ["hola"] * 6
+    assert server.calls == 6
+    assert server.max_in_flight == 2
+
+
+def test_retries_transient_errors_with_exponential_backoff():
+    server = FakeLLMServer(failures=(500, 429))
+    backoff = 0.05
+
+    async def scenario():
+        service = _service(server, max_retries=2, retry_backoff=backoff)
+        return await service.run("sistema", "mensaje")
+
+    assert asyncio.run(scenario()) == "hola"
+    assert server.calls == 3
+    first_gap = server.timestamps[1] - server.timestamps[0]
+    second_gap = server.timestamps[2] - server.timestamps[1]
+    assert first_gap >= backoff
+    assert second_gap >= 2 * backoff
+
+
+def test_gives_up_after_max_retries():
+    server = FakeLLMServer(failures=(503, 503, 429))
+
+    async def scenario():
+        service = _service(server, max_retries=2, retry_backoff=0.001)
+        return await service.run("sistema", "mensaje")
+
+    with pytest.raises(RateLimitError):
+        asyncio.run(scenario())
+    assert server.calls == 3
+
+
+def test_does_not_retry_client_errors():
+    server = FakeLLMServer(failures=(400,))
+
+    async def scenario():
+        service = _service(server, max_retries=2, retry_backoff=0.001)
+        return await service.run("sistema", "mensaje")
+
+    with pytest.raises(BadRequestError):
+        asyncio.run(scenario())
+    assert server.calls == 1
@@ -0,0 +1,174 @@
+"""Tests de la paginación por cursor de los listados del cliente."""
+
+import asyncio
+from datetime import datetime
+
+import pytest
+from fastapi import HTTPException
+
+import settings
+from models.ServiceRequest import ServiceRequest, ServiceRequestStatus
+from services.service_request_service import ServiceRequestService
+from sqlite_db import create_database, create_user
+from utils.pagination import decode_cursor, encode_cursor, resolve_page_size
+
+
+def test_decode_cursor_round_trip():
+    created_at = datetime(2026, 10, 17, 12, 30)
+    cursor = encode_cursor({"created_at": created_at, "id": 7})
+    assert decode_cursor(
+        cursor, required_keys=("created_at", "id"), datetime_keys=("created_at",)
+    ) == {"created_at": created_at, "id": 7}
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        encode_cursor({"id": 7}),
+        encode_cursor({"created_at": None, "id": 7}),
+        encode_cursor({"created_at": "no-es-fecha", "id": 7}),
+        "no-es-un-cursor",
+    ],
+)
+def test_decode_cursor_rejects_incomplete_cursors(cursor):
+    with pytest.raises(HTTPException) as excinfo:
+        decode_cursor(
+            cursor, required_keys=("created_at", "id"), datetime_keys=("created_at",)
+        )
+    assert excinfo.value.status_code == 400
+
+
+def test_resolve_page_size():
+    assert resolve_page_size(None, None) == settings.PAGINATION_UNPAGINATED_LIMIT
+    assert resolve_page_size(None, "cursor") == settings.PAGINATION_DEFAULT_LIMIT
+    assert resolve_page_size(10_000, None) == settings.PAGINATION_MAX_LIMIT
+    assert resolve_page_size(5, None) == 5
+
+
+async def _client_with_requests(count: int):
+    engine, session_factory = await create_database()
+    async with session_factory() as db:
+        client = await create_user(db)
+        for i in range(count):
+            db.add(
+                ServiceRequest(
+                    client_id=client.id,
+                    title=f"Solicitud {i}",
+                    description="Arreglo",
+                    status=ServiceRequestStatus.PUBLISHED,
+                    created_at=datetime(2026, 10, 1 + i),
+                    updated_at=datetime(2026, 10, 1 + i),
+                )
+            )
+        await db.commit()
+    return engine, session_factory, client.id
+
+
+@pytest.mark.parametrize(
+    "method, cursor",
+    [
+        ("list_active_without_service", encode_cursor({"id": 3})),
+        (
+            "list_all_for_client",
+            encode_cursor({"updated_at": "2026-10-02T00:00:00", "id": 3}),
+        ),
+    ],
+)
+def test_listings_answer_400_for_cursor_without_keys(method, cursor):
+    async def scenario():
+        engine, session_factory, client_id = await _client_with_requests(3)
+        try:
+            async with session_factory() as db:
+                await getattr(ServiceRequestService, method)(
+                    db, client_id=client_id, limit=2, cursor=cursor
+                )
+        finally:
+            await engine.dispose()
+
+    with pytest.raises(HTTPException) as excinfo:
+        asyncio.run(scenario())
+    assert excinfo.value.status_code == 400
+
+
+def test_unpaginated_listing_is_capped_and_returns_cursor(monkeypatch):
+    monkeypatch.setattr("utils.pagination.PAGINATION_UNPAGINATED_LIMIT", 3)
+
+    async def scenario():
+        engine, session_factory, client_id = await _client_with_requests(5)
+        async with session_factory() as db:
+            first = await ServiceRequestService.list_active_without_service(
+                db, client_id=client_id
+            )
+            rest = await ServiceRequestService.list_active_without_service(
+                db, client_id=client_id, cursor=first.next_cursor
+            )
+        await engine.dispose()
+        return first, rest
+
+    first, rest = asyncio.run(scenario())
+    assert [item.title for item in first.items] == [
+        "Solicitud 4",
+        "Solicitud 3",
+        "Solicitud 2",
+    ]
+    assert first.next_cursor is not None
+    assert [item.title for item in rest.items] == ["Solicitud 1", "Solicitud 0"]
+    assert rest.next_cursor is None
+
+
+@pytest.mark.parametrize("descending_created", [False, True])
+def test_keyset_after_walks_the_same_rows_as_offset(descending_created):
+    from sqlalchemy import insert, select
+
+    from models.ProviderRequestMatch import ProviderRequestMatch
+    from utils.pagination import keyset_after
+
+    created = ProviderRequestMatch.created_rank
+    keys = [
+        (ProviderRequestMatch.segment, True),
+        (ProviderRequestMatch.score_rank, True),
+        (created, not descending_created),
+        (ProviderRequestMatch.request_id, True),
+    ]
+    order_by = [expr if ascending else expr.desc() for expr, ascending in keys]
+
+    async def scenario():
+        engine, session_factory = await create_database()
+        async with session_factory() as db:
+            await db.execute(
+                insert(ProviderRequestMatch),
+                [
+                    {
+                        "provider_profile_id": 1,
+                        "request_id": request_id,
+                        "segment": request_id % 2,
+                        "type_rank": 0,
+                        "score_rank": request_id % 5,
+                        "distance_rank": 0,
+                        "created_rank": request_id % 7,
+                    }
+                    for request_id in range(1, 61)
+                ],
+            )
+            query = select(*(expr for expr, _ in keys)).order_by(*order_by)
+            expected = (await db.execute(query)).all()
+
+            walked, last = [], None
+            while True:
+                stmt = query.limit(7)
+                if last is not None:
+                    stmt = stmt.where(
+                        keyset_after(
+                            [(expr, asc, value) for (expr, asc), value in zip(keys, last)]
+                        )
+                    )
+                page = (await db.execute(stmt)).all()
+                if not page:
+                    break
+                walked.extend(page)
+                last = page[-1]
+        await engine.dispose()
+        return expected, walked
+
+    expected, walked = asyncio.run(scenario())
+    assert walked == expected
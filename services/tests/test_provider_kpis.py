@@ -0,0 +1,205 @@
+"""Tests del rollup de KPIs: el camino incremental y la reconstrucción usan el mismo mes."""
+
+import asyncio
+from collections import defaultdict
+from datetime import datetime
+from decimal import Decimal
+
+from sqlalchemy import insert, update
+
+from models.ProviderKpiMonthly import ProviderKpiMonthly
+from models.ProviderProfile import ProviderProfile
+from models.ServiceRequest import (
+    ProposalStatus,
+    Service,
+    ServiceRequest,
+    ServiceRequestProposal,
+    ServiceRequestStatus,
+    ServiceReview,
+    ServiceStatus,
+    ServiceStatusHistory,
+)
+from models.User import UserRole
+from services.provider_kpis import _COUNTERS, ProviderKpiRollup, month_start
+from sqlite_db import create_database, create_user
+
+# Todo ocurre alrededor del cambio de mes (hora Argentina)
+PROPOSAL_CREATED = datetime(2026, 9, 30, 23, 50)
+SERVICE_CREATED = datetime(2026, 9, 30, 23, 55)
+COMPLETED_AT = datetime(2026, 10, 1, 0, 20)
+REVIEW_CREATED = datetime(2026, 10, 2, 9, 0)
+SEPTEMBER, OCTOBER = month_start(SERVICE_CREATED), month_start(COMPLETED_AT)
+
+
+class RecordingRollup(ProviderKpiRollup):
+    """Rollup que acumula los deltas en memoria en lugar del upsert de MySQL."""
+
+    def __init__(self):
+        self.rows = defaultdict(
+            lambda: {counter: 0 for counter in _COUNTERS} | {"last_completed_at": None}
+        )
+
+    async def add(
+        self, db, provider_profile_id, currency, *, at=None, last_completed_at=None, **deltas
+    ):
+        row = self.rows[((currency or "").upper(), month_start(at))]
+        for counter, delta in deltas.items():
+            row[counter] += delta or 0
+        if last_completed_at is not None:
+            row["last_completed_at"] = max(
+                filter(None, (row["last_completed_at"], last_completed_at))
+            )
+
+
+async def _seed(session_factory):
+    """Crea las filas de origen con las fechas que se guardarían en producción."""
+    async with session_factory() as db:
+        client = await create_user(db, "1")
+        provider_user = await create_user(db, "2", role=UserRole.PROVIDER)
+        profile = ProviderProfile(user_id=provider_user.id)
+        db.add(profile)
+        await db.flush()
+        request = ServiceRequest(
+            client_id=client.id,
+            description="Cambio de grifería",
+            status=ServiceRequestStatus.CLOSED,
+        )
+        db.add(request)
+        await db.flush()
+        proposal = ServiceRequestProposal(
+            request_id=request.id,
+            provider_profile_id=profile.id,
+            quoted_price=Decimal("1000.00"),
+            currency="ARS",
+            status=ProposalStatus.PENDING,
+            created_at=PROPOSAL_CREATED,
+        )
+        db.add(proposal)
+        await db.flush()
+        service = Service(
+            request_id=request.id,
+            proposal_id=proposal.id,
+            client_id=client.id,
+            provider_profile_id=profile.id,
+            status=ServiceStatus.CONFIRMED,
+            total_price=Decimal("1020.00"),
+            currency="ARS",
+            created_at=SERVICE_CREATED,
+        )
+        db.add(service)
+        await db.flush()
+        review = ServiceReview(
+            service_id=service.id,
+            rater_user_id=client.id,
+            ratee_provider_profile_id=profile.id,
+            rating=4,
+            created_at=REVIEW_CREATED,
+        )
+        db.add(review)
+        db.add_all(
+            [
+                ServiceStatusHistory(
+                    service_id=service.id,
+                    to_status=ServiceStatus.CONFIRMED.value,
+                    changed_at=SERVICE_CREATED,
+                ),
+                ServiceStatusHistory(
+                    service_id=service.id,
+                    from_status=ServiceStatus.CONFIRMED.value,
+                    to_status=ServiceStatus.COMPLETED.value,
+                    changed_at=COMPLETED_AT,
+                ),
+            ]
+        )
+        await db.commit()
+        return profile.id, proposal, service, review
+
+
+async def _replay_incremental(session_factory, rollup, proposal, service, review):
+    """Las mismas llamadas que hacen los controladores, en orden."""
+    async with session_factory() as db:
+        await rollup.proposal_status_changed(db, proposal, None, ProposalStatus.PENDING)
+        await rollup.proposal_status_changed(
+            db, proposal, ProposalStatus.PENDING, ProposalStatus.ACCEPTED
+        )
+        await rollup.service_status_changed(db, service, None, ServiceStatus.CONFIRMED)
+        await rollup.service_status_changed(
+            db,
+            service,
+            ServiceStatus.CONFIRMED,
+            ServiceStatus.COMPLETED,
+            at=COMPLETED_AT,
+            first_completion=True,
+        )
+        await rollup.review_added(db, review, service.currency)
+        await db.commit()
+
+
+def test_incremental_rollup_matches_rebuild_month_by_month():
+    async def scenario():
+        engine, session_factory = await create_database()
+        profile_id, proposal, service, review = await _seed(session_factory)
+        # Los estados finales ya están en la base; los objetos llevan los previos
+        async with session_factory() as db:
+            await db.execute(
+                update(ServiceRequestProposal).values(status=ProposalStatus.ACCEPTED)
+            )
+            await db.execute(update(Service).values(status=ServiceStatus.COMPLETED))
+            await db.commit()
+
+        rollup = RecordingRollup()
+        await _replay_incremental(session_factory, rollup, proposal, service, review)
+        async with session_factory() as db:
+            expected = await rollup._expected_buckets(db, profile_id)
+        await engine.dispose()
+        return rollup.rows, expected
+
+    incremental, expected = asyncio.run(scenario())
+    assert set(incremental) == set(expected) == {("ARS", SEPTEMBER), ("ARS", OCTOBER)}
+    for key, want in expected.items():
+        have = incremental[key]
+        for counter in (*_COUNTERS, "last_completed_at"):
+            assert have[counter] == want[counter], (key, counter)
+
+    september, october = expected[("ARS", SEPTEMBER)], expected[("ARS", OCTOBER)]
+    assert september["services_completed"] == 1
+    assert september["proposals_accepted"] == 1
+    assert october["revenue_services"] == 1
+    assert october["rating_4_count"] == 1
+
+
+def test_check_compares_every_counter_per_month():
+    async def scenario():
+        engine, session_factory = await create_database()
+        profile_id, *_ = await _seed(session_factory)
+        rollup = ProviderKpiRollup()
+        async with session_factory() as db:
+            await db.execute(update(Service).values(status=ServiceStatus.COMPLETED))
+            expected = await rollup._expected_buckets(db, profile_id)
+            await db.execute(
+                update(ProviderProfile).values(**rollup._profile_rating(expected))
+            )
+            rows = [
+                {
+                    "provider_profile_id": profile_id,
+                    "currency": currency,
+                    "month": month,
+                    **values,
+                }
+                for (currency, month), values in expected.items()
+            ]
+            # Mismo total por moneda, pero el servicio quedó en el mes equivocado
+            for row in rows:
+                row["services_total"] = 1 if row["month"] == OCTOBER else 0
+            await db.execute(insert(ProviderKpiMonthly), rows)
+            await db.commit()
+
+            mismatches = await rollup.check_provider(db, profile_id)
+        await engine.dispose()
+        return mismatches
+
+    mismatches = asyncio.run(scenario())
+    assert {(m.month, m.counter, m.stored, m.expected) for m in mismatches} == {
+        (SEPTEMBER, "services_total", 0, 1),
+        (OCTOBER, "services_total", 1, 0),
+    }
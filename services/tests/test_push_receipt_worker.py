@@ -0,0 +1,140 @@
+"""Tests del worker de recibos: cada ticket lo consulta un solo proceso."""
+
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from pydantic import ValidationError
+from sqlalchemy import select
+
+from models.PushTicket import PushTicket
+from models.PushToken import PushToken, PushTokenCreate
+from services.notification_dispatcher import delivery_metrics
+from services.push_receipt_worker import PushReceiptWorker
+from sqlite_db import create_database, create_user
+
+
+def _worker(session_factory, receipts, requested):
+    worker = PushReceiptWorker(
+        session_factory, receipt_delay=60, receipt_ttl=3600, lock_timeout=300
+    )
+
+    async def fetch_receipts(ticket_ids):
+        requested.extend(ticket_ids)
+        return {ticket_id: receipts[ticket_id] for ticket_id in ticket_ids if ticket_id in receipts}
+
+    worker._fetch_receipts = fetch_receipts
+    return worker
+
+
+async def _setup(locked_at=None):
+    engine, session_factory = await create_database()
+    sent_at = datetime.utcnow() - timedelta(minutes=5)
+    async with session_factory() as db:
+        user = await create_user(db)
+        db.add_all(
+            [
+                PushToken(user_id=user.id, token="token-ok", platform="ios"),
+                PushToken(user_id=user.id, token="token-viejo", platform="android"),
+            ]
+        )
+        db.add_all(
+            [
+                PushTicket(ticket_id="t-ok", token="token-ok", platform="ios", created_at=sent_at),
+                PushTicket(
+                    ticket_id="t-error",
+                    token="token-viejo",
+                    platform="android",
+                    created_at=sent_at,
+                ),
+                PushTicket(
+                    ticket_id="t-pendiente",
+                    token="token-ok",
+                    platform="ios",
+                    created_at=sent_at,
+                    locked_at=locked_at,
+                ),
+            ]
+        )
+        await db.commit()
+    return engine, session_factory
+
+
+RECEIPTS = {
+    "t-ok": {"status": "ok"},
+    "t-error": {"status": "error", "details": {"error": "DeviceNotRegistered"}},
+}
+
+
+@pytest.fixture(autouse=True)
+def clean_metrics():
+    delivery_metrics.platforms.clear()
+    yield
+    delivery_metrics.platforms.clear()
+
+
+def test_claimed_tickets_are_not_fetched_by_another_worker():
+    async def scenario():
+        engine, session_factory = await _setup()
+        first_requested, second_requested = [], []
+        first = _worker(session_factory, RECEIPTS, first_requested)
+        second = _worker(session_factory, RECEIPTS, second_requested)
+
+        # El primero reclamó su lote y todavía no terminó de consultarlo
+        claimed = await first._claim(datetime.utcnow())
+        assert len(claimed) == 3
+        assert await second.run_once() == 0
+        assert second_requested == []
+        await engine.dispose()
+
+    asyncio.run(scenario())
+
+
+def test_receipts_are_counted_once_and_pending_tickets_released():
+    async def scenario():
+        engine, session_factory = await _setup()
+        first_requested, second_requested = [], []
+        first = _worker(session_factory, RECEIPTS, first_requested)
+        second = _worker(session_factory, RECEIPTS, second_requested)
+
+        assert await first.run_once() == 2
+        assert sorted(first_requested) == ["t-error", "t-ok", "t-pendiente"]
+        # Sólo queda el ticket sin recibo, liberado para el próximo ciclo
+        assert await second.run_once() == 0
+        assert second_requested == ["t-pendiente"]
+
+        assert delivery_metrics["ios"].receipts_ok == 1
+        assert delivery_metrics["android"].receipts_error == 1
+        assert delivery_metrics["android"].tokens_purged == 1
+        async with session_factory() as db:
+            tokens = (await db.execute(select(PushToken.token))).scalars().all()
+            tickets = (await db.execute(select(PushTicket))).scalars().all()
+        assert tokens == ["token-ok"]
+        assert [(t.ticket_id, t.locked_at) for t in tickets] == [("t-pendiente", None)]
+        await engine.dispose()
+
+    asyncio.run(scenario())
+
+
+def test_stale_claims_are_taken_over():
+    async def scenario():
+        engine, session_factory = await _setup(
+            locked_at=datetime.utcnow() - timedelta(hours=1)
+        )
+        requested = []
+        worker = _worker(session_factory, {"t-pendiente": {"status": "ok"}}, requested)
+
+        await worker.run_once()
+        assert "t-pendiente" in requested
+        await engine.dispose()
+
+    asyncio.run(scenario())
+
+
+def test_push_token_platform_is_normalized_and_bounded():
+    assert PushTokenCreate(token="t", platform=" iOS ").platform == "ios"
+    assert PushTokenCreate(token="t", platform="").platform is None
+    with pytest.raises(ValidationError):
+        PushTokenCreate(token="t", platform="x" * 30)
+    with pytest.raises(ValidationError):
+        PushTokenCreate(token="t", device_name="d" * 101)
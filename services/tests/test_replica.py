@@ -0,0 +1,175 @@
+"""Tests del ruteo a la réplica con dos bases SQLite como primario y réplica.
+
+La réplica tiene una copia atrasada: le falta la última solicitud del cliente,
+así que cada listado muestra de qué base leyó.
+"""
+
+import asyncio
+
+import pytest
+from fastapi import FastAPI, status
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+from auth.auth_utils import check_user_login
+from database import replica as replica_module
+from database.database import get_db
+from database.replica import (
+    LAST_WRITE_COOKIE,
+    LAST_WRITE_HEADER,
+    ReplicaRouter,
+    ReplicaSessionLocal,
+)
+from models.ServiceRequest import ServiceRequest, ServiceRequestStatus
+from models.User import User
+from routers.service_requests_router import router as service_requests_router
+from sqlite_db import create_database, create_user
+
+NOW = 1_800_000_000.0
+
+
+class FakeClock:
+    def __init__(self, now: float) -> None:
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+async def _seed(session_factory, titles):
+    async with session_factory() as db:
+        client = await create_user(db)
+        for title in titles:
+            db.add(
+                ServiceRequest(
+                    client_id=client.id,
+                    title=title,
+                    description="Pérdida de agua",
+                    status=ServiceRequestStatus.PUBLISHED,
+                )
+            )
+        await db.commit()
+        return client.id
+
+
+@pytest.fixture
+def databases(monkeypatch):
+    async def setup():
+        primary, primary_sessions = await create_database()
+        replica, replica_sessions = await create_database()
+        user_id = await _seed(primary_sessions, ["Vieja", "Nueva"])
+        await _seed(replica_sessions, ["Vieja"])
+        async with primary_sessions() as db:
+            user = await db.get(User, user_id)
+        return primary, primary_sessions, replica, user
+
+    primary, primary_sessions, replica, user = asyncio.run(setup())
+    monkeypatch.setattr(replica_module, "engine", primary)
+    monkeypatch.setattr(replica_module, "replica_engine", replica)
+    monkeypatch.setattr(replica_module, "AsyncSessionLocal", primary_sessions)
+    yield primary, primary_sessions, replica, user
+
+    async def teardown():
+        await primary.dispose()
+        await replica.dispose()
+
+    asyncio.run(teardown())
+
+
+def _worker(databases, monkeypatch, clock):
+    """Un worker de la API: su propio ReplicaRouter, sin estado compartido."""
+    primary, primary_sessions, replica, user = databases
+    router = ReplicaRouter(replica, sticky_seconds=5, clock=clock)
+    router.healthy = True
+
+    async def primary_db():
+        async with primary_sessions() as session:
+            yield session
+
+    app = FastAPI()
+    app.include_router(service_requests_router)
+
+    @app.post("/escritura", status_code=status.HTTP_204_NO_CONTENT)
+    async def write():
+        return None
+
+    app.middleware("http")(router.track_writes)
+    app.dependency_overrides[check_user_login] = lambda: user
+    app.dependency_overrides[get_db] = primary_db
+    # get_read_db usa el router del módulo; el test alterna entre workers
+    monkeypatch.setattr(replica_module, "replica_router", router)
+    return TestClient(app), router
+
+
+def _titles(client, **kwargs):
+    response = client.get("/service-requests/active", **kwargs)
+    assert response.status_code == 200, response.text
+    return sorted(item["title"] for item in response.json())
+
+
+def test_active_listing_reads_the_replica_without_recent_writes(databases, monkeypatch):
+    client, router = _worker(databases, monkeypatch, FakeClock(NOW))
+
+    assert _titles(client) == ["Vieja"]
+    assert router.metrics()["replica_reads"] == 1
+
+
+def test_write_on_one_worker_makes_another_worker_read_the_primary(
+    databases, monkeypatch
+):
+    clock = FakeClock(NOW)
+    writer, _ = _worker(databases, monkeypatch, clock)
+    response = writer.post("/escritura")
+    assert response.headers[LAST_WRITE_HEADER] == f"{NOW:.3f}"
+    assert response.cookies[LAST_WRITE_COOKIE] == f"{NOW:.3f}"
+
+    # Otro worker, con su propio router, recibe la cookie del cliente
+    reader, router = _worker(databases, monkeypatch, clock)
+    reader.cookies.set(LAST_WRITE_COOKIE, response.cookies[LAST_WRITE_COOKIE])
+    assert _titles(reader) == ["Nueva", "Vieja"]
+    assert router.metrics()["sticky_reads"] == 1
+
+    # Pasado DB_READ_YOUR_WRITES_SECONDS vuelve a la réplica
+    clock.now += 6
+    assert _titles(reader) == ["Vieja"]
+
+
+def test_echoed_header_works_without_cookies(databases, monkeypatch):
+    client, _ = _worker(databases, monkeypatch, FakeClock(NOW))
+
+    headers = {LAST_WRITE_HEADER: f"{NOW - 1:.3f}"}
+    assert _titles(client, headers=headers) == ["Nueva", "Vieja"]
+
+
+@pytest.mark.parametrize("value", ["basura", "nan", f"{NOW + 3600:.3f}"])
+def test_invalid_or_future_marks_are_ignored(databases, monkeypatch, value):
+    client, _ = _worker(databases, monkeypatch, FakeClock(NOW))
+
+    assert _titles(client, headers={LAST_WRITE_HEADER: value}) == ["Vieja"]
+
+
+def test_unhealthy_replica_falls_back_to_the_primary(databases, monkeypatch):
+    client, router = _worker(databases, monkeypatch, FakeClock(NOW))
+    router.healthy = False
+
+    assert _titles(client) == ["Nueva", "Vieja"]
+    assert router.metrics()["primary_reads"] == 1
+
+
+def test_writes_in_a_replica_session_go_to_the_primary(databases):
+    primary, primary_sessions, replica, user = databases
+
+    async def scenario():
+        async with ReplicaSessionLocal() as db:
+            await db.execute(
+                text("UPDATE service_requests SET title = 'Editada' WHERE title = 'Vieja'")
+            )
+            await db.commit()
+        async with primary_sessions() as db:
+            titles = (await db.execute(text("SELECT title FROM service_requests"))).scalars()
+            assert sorted(titles) == ["Editada", "Nueva"]
+        async with replica.connect() as conn:
+            titles = (await conn.execute(text("SELECT title FROM service_requests"))).scalars()
+            assert list(titles) == ["Vieja"]
+
+    asyncio.run(scenario())
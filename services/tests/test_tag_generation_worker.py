@@ -0,0 +1,124 @@
+"""Tests del worker de tags: un trabajo que falla no queda RUNNING."""
+
+import asyncio
+
+import pytest
+from sqlalchemy import select
+
+from controllers.tags_controllers import TagsController
+from models.ServiceRequest import ServiceRequest, ServiceRequestStatus
+from models.TagGenerationJob import TagGenerationJob, TagJobStatus
+from services import tag_generation_worker as worker_module
+from services.tag_generation_worker import TagGenerationWorker
+from sqlite_db import create_database, create_user
+
+
+async def _fake_generate_tags(db, service_request, raw_tag_generator):
+    await db.commit()
+
+
+async def _setup(request_count: int = 1):
+    engine, session_factory = await create_database()
+    async with session_factory() as db:
+        client = await create_user(db)
+        for i in range(request_count):
+            service_request = ServiceRequest(
+                client_id=client.id,
+                title=f"Solicitud {i}",
+                description="Pérdida de agua en la cocina",
+                status=ServiceRequestStatus.PUBLISHED,
+            )
+            db.add(service_request)
+            await db.flush()
+            TagGenerationWorker.enqueue(db, service_request.id)
+        await db.commit()
+    worker = TagGenerationWorker(session_factory, max_attempts=3, retry_backoff=60)
+    worker.completion_hooks = []
+    return engine, session_factory, worker
+
+
+async def _jobs(session_factory):
+    async with session_factory() as db:
+        return (
+            (await db.execute(select(TagGenerationJob).order_by(TagGenerationJob.id)))
+            .scalars()
+            .all()
+        )
+
+
+@pytest.fixture
+def fake_tags(monkeypatch):
+    monkeypatch.setattr(
+        TagsController, "generate_tags_for_service_request", _fake_generate_tags
+    )
+
+
+def test_job_is_done_after_tags_and_index_refresh(fake_tags, monkeypatch):
+    refreshed = []
+
+    async def refresh_request(db, request_id):
+        refreshed.append(request_id)
+
+    monkeypatch.setattr(worker_module.match_index, "refresh_request", refresh_request)
+
+    async def scenario():
+        engine, session_factory, worker = await _setup()
+        assert await worker.run_once() == 1
+        jobs = await _jobs(session_factory)
+        await engine.dispose()
+        return jobs
+
+    jobs = asyncio.run(scenario())
+    assert [job.status for job in jobs] == [TagJobStatus.DONE]
+    assert refreshed == [jobs[0].request_id]
+
+
+def test_failure_after_tag_commit_marks_job_failed(fake_tags, monkeypatch):
+    async def refresh_request(db, request_id):
+        raise RuntimeError("índice no disponible")
+
+    monkeypatch.setattr(worker_module.match_index, "refresh_request", refresh_request)
+
+    async def scenario():
+        engine, session_factory, worker = await _setup()
+        await worker.run_once()
+        jobs = await _jobs(session_factory)
+        await engine.dispose()
+        return jobs
+
+    (job,) = asyncio.run(scenario())
+    assert job.status == TagJobStatus.FAILED
+    assert job.locked_at is None
+    assert job.finished_at is not None
+    assert "índice no disponible" in job.last_error
+
+
+def test_unexpected_error_is_isolated_and_job_is_released(fake_tags, monkeypatch):
+    async def refresh_request(db, request_id):
+        pass
+
+    monkeypatch.setattr(worker_module.match_index, "refresh_request", refresh_request)
+    original_process_job = TagGenerationWorker._process_job
+
+    async def scenario():
+        engine, session_factory, worker = await _setup(request_count=2)
+        first_job_id = (await _jobs(session_factory))[0].id
+
+        async def process_job(job_id):
+            if job_id == first_job_id:
+                raise RuntimeError("falla inesperada")
+            await original_process_job(worker, job_id)
+
+        worker._process_job = process_job
+        assert await worker.run_once() == 2
+        jobs = await _jobs(session_factory)
+        await engine.dispose()
+        return jobs
+
+    failed, done = asyncio.run(scenario())
+    # El que falló vuelve a la cola con backoff; el otro termina normalmente
+    assert failed.status == TagJobStatus.PENDING
+    assert failed.locked_at is None
+    assert failed.attempts == 1
+    assert "falla inesperada" in failed.last_error
+    assert done.status == TagJobStatus.DONE
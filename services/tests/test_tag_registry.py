@@ -0,0 +1,38 @@
+"""Tests del registro de tags: ids confirmados fuera de orden."""
+
+import asyncio
+
+from models.Tag import Tag
+from services.tag_registry import TagRegistry
+from sqlite_db import create_database
+
+
+async def _add_tag(session_factory, tag_id, slug):
+    async with session_factory() as db:
+        db.add(Tag(id=tag_id, slug=slug, name=slug.capitalize()))
+        await db.commit()
+
+
+def test_tag_committed_below_the_watermark_is_found():
+    async def scenario():
+        engine, session_factory = await create_database()
+        registry = TagRegistry(refresh_interval=3600, full_reload_interval=3600)
+        await _add_tag(session_factory, 100, "plomero")
+        async with session_factory() as db:
+            await registry.ensure_fresh(db)
+
+        # Dos workers insertan 101 y 102; el 102 confirma primero
+        await _add_tag(session_factory, 102, "gasista")
+        async with session_factory() as db:
+            await registry.ensure_fresh(db, force=True)
+        await _add_tag(session_factory, 101, "electricista")
+
+        async with session_factory() as db:
+            # El refresco incremental ya no ve el 101: está debajo de la marca
+            await registry.ensure_fresh(db, force=True)
+            assert await registry.missing_ids(db, [100, 101, 102]) == set()
+            assert await registry.missing_ids(db, [101, 999]) == {999}
+            assert "Electricista" in await registry.names(db)
+        await engine.dispose()
+
+    asyncio.run(scenario())
@@ -0,0 +1,92 @@
+"""Tests de la lista de revocación: la limpieza no usa la sesión del request."""
+
+import asyncio
+from datetime import datetime, timedelta
+
+from sqlalchemy import select
+
+from auth.token_revocation import TokenRevocationList
+from models.RevokedToken import RevokedToken
+from models.User import User
+from sqlite_db import create_database, create_user
+
+
+async def _setup():
+    engine, session_factory = await create_database()
+    now = datetime.utcnow()
+    async with session_factory() as db:
+        user = await create_user(db)
+        db.add_all(
+            [
+                RevokedToken(
+                    token_id="vigente",
+                    user_id=user.id,
+                    reason="logout",
+                    expires_at=now + timedelta(days=1),
+                    revoked_at=now - timedelta(hours=1),
+                ),
+                RevokedToken(
+                    token_id="vencido",
+                    user_id=user.id,
+                    reason="logout",
+                    expires_at=now - timedelta(days=1),
+                    revoked_at=now - timedelta(days=2),
+                ),
+            ]
+        )
+        await db.commit()
+        user_id = user.id
+    revocations = TokenRevocationList(
+        session_factory, sync_interval=0, purge_interval=3600
+    )
+    return engine, session_factory, revocations, user_id
+
+
+def test_purge_does_not_commit_the_callers_transaction():
+    async def scenario():
+        engine, session_factory, revocations, user_id = await _setup()
+
+        async with session_factory() as db:
+            user = await db.get(User, user_id)
+            user.first_name = "Sin confirmar"
+            # La primera consulta reconstruye el filtro y borra los vencidos
+            assert await revocations.is_revoked(db, "vigente") is True
+            assert await revocations.is_revoked(db, "vencido") is False
+            assert db.in_transaction()
+            await db.rollback()
+
+        async with session_factory() as db:
+            assert (await db.get(User, user_id)).first_name == "Test"
+            token_ids = (await db.execute(select(RevokedToken.token_id))).scalars().all()
+            assert token_ids == ["vigente"]
+        assert revocations.metrics()["bloom_entries"] == 1
+        await engine.dispose()
+
+    asyncio.run(scenario())
+
+
+def test_incremental_sync_sees_revocations_from_other_processes():
+    async def scenario():
+        engine, session_factory, revocations, user_id = await _setup()
+
+        async with session_factory() as db:
+            assert await revocations.is_revoked(db, "otro-worker") is False
+
+        # Otro proceso revoca directamente en la base
+        async with session_factory() as db:
+            db.add(
+                RevokedToken(
+                    token_id="otro-worker",
+                    user_id=user_id,
+                    reason="reuse",
+                    expires_at=datetime.utcnow() + timedelta(days=1),
+                    revoked_at=datetime.utcnow(),
+                )
+            )
+            await db.commit()
+
+        async with session_factory() as db:
+            assert await revocations.is_revoked(db, "otro-worker") is True
+        await engine.dispose()
+
+    asyncio.run(scenario())